@@ -6,10 +6,18 @@ against local data. It is focused on the API fetching and verification component
 of the larger data sync system.
 """
 
-from .core import auth, client, secrets
-from .processing import raw_data_handler
-from .verification import api_local_verifier
-from . import config
+import importlib
+
+# Submodules are imported on first attribute access (PEP 562), so `import api_sync`
+# does not pull in requests, the Google client libraries or the verification stack.
+_LAZY_SUBMODULES = {
+    'auth': '.core.auth',
+    'client': '.core.client',
+    'secrets': '.core.secrets',
+    'raw_data_handler': '.processing.raw_data_handler',
+    'api_local_verifier': '.verification.api_local_verifier',
+    'config': '.config'
+}
 
 __all__ = [
     'auth',
@@ -21,3 +29,13 @@ __all__ = [
 ]
 
 __version__ = "1.0.0"
+
+def __getattr__(name):
+    if name in _LAZY_SUBMODULES:
+        module = importlib.import_module(_LAZY_SUBMODULES[name], __name__)
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -12,10 +12,10 @@ from pathlib import Path
 from datetime import datetime
 from typing import Optional, List
 
-from .core import auth, secrets, client
-from .processing import raw_data_handler
-from .verification import api_local_verifier
-from .utils import get_latest_sync_timestamp
+from .utils import is_timestamp_dir
+
+# The API client, Secret Manager and verification stacks are imported inside the
+# commands that use them, so `status` and `verify --quick` start fast and offline.
 
 def setup_logging(log_level: str = "INFO") -> None:
     """Setup logging configuration."""
@@ -66,6 +66,10 @@ def cmd_fetch(args) -> int:
     """
     Execute API fetch command.
     
+    The fetch runs through ApiSyncRunner.fetch_data, so it is charged to the daily
+    quota ledger, authenticates through the shared token provider and streams each
+    batch to disk with checkpoints (--resume continues an interrupted fetch).
+    
     Args:
         args: Parsed command line arguments
         
@@ -78,110 +82,51 @@ def cmd_fetch(args) -> int:
         
         print_header("API DATA FETCH")
         
-        # Determine the since timestamp
-        since_timestamp = args.since
-        if not since_timestamp and not args.full:
-            # Auto-detect latest sync timestamp
-            print("\n--- Auto-detecting Latest Sync ---")
-            latest_sync = get_latest_sync_timestamp()
-            if latest_sync:
-                since_timestamp = latest_sync
-                print(f"[OK] Using latest sync timestamp: {since_timestamp}")
-            else:
-                print("[WARN] No previous sync found, fetching all records")
-        elif args.full:
+        if args.resume:
+            return _fetch_resumable(args)
+        
+        if args.full:
             print("\n--- Full Sync Mode ---")
             print("[SYNC] Fetching all records (ignoring previous sync)")
-            since_timestamp = None
+        elif not args.since:
+            print("\n--- Auto-detecting Latest Sync ---")
         
         print(f"\n[FETCH] STARTING VERBOSE DATA FETCH")
         print(f"Module: {args.module}")
-        print(f"Since: {since_timestamp or 'All records'}")
         print(f"Verbose mode: ENABLED")
-        print(f"Since: {since_timestamp or 'All records'}")
-        
-        run_timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
-        
-        # Get credentials and initialize client
-        print("\n--- Step 1: Authentication ---")
-        zoho_credentials = secrets.get_zoho_credentials()
-        access_token = auth.get_access_token(zoho_credentials)
-        zoho_org_id = zoho_credentials.get('organization_id')
-        print("[OK] Authentication successful")
-        
-        # Initialize API client
-        print("\n--- Step 2: Initializing API Client ---")
-        zoho_client = client.ZohoClient(
-            access_token, 
-            zoho_org_id, 
-            "https://www.zohoapis.com/books/v3"
-        )
+        
+        # The runner authenticates and builds the client with the quota ledger
+        print("\n--- Step 1: Initializing API Client ---")
+        from .runner_api_sync import ApiSyncRunner
+        runner = ApiSyncRunner(args.log_level)
+        if not runner.api_client:
+            print("[ERROR] API client could not be initialized (check the credentials)")
+            print_footer(False)
+            return 1
         print("[OK] API client initialized")
         
-        # Fetch data
-        print(f"\n--- Step 3: Fetching {args.module} Data ---")
+        print(f"\n--- Step 2: Fetching {args.module} Data ---")
+        result = runner.fetch_data(args.module, since_timestamp=args.since, full_sync=args.full)
+        if not result.get("success"):
+            print(f"[ERROR] Fetch failed: {result.get('error')}")
+            print("[INFO] Progress is checkpointed; run again with --resume to continue")
+            print_footer(False)
+            return 1
         
-        # Check if this module has line items
-        if hasattr(zoho_client, 'MODULES_WITH_LINE_ITEMS') and args.module in zoho_client.MODULES_WITH_LINE_ITEMS:
-            print(f"[FETCH] Fetching {args.module} with line items...")
-            result = zoho_client.get_data_for_module_with_line_items(args.module, since_timestamp=since_timestamp)
-            headers = result['headers']
-            line_items = result['line_items']
-            
-            if not headers:
-                print(f"[WARN] No {args.module} found in API response")
-                print_footer(True)
-                return 0
-                
-            print(f"[OK] Retrieved {len(headers)} {args.module} headers with {len(line_items)} line items from API")
-            
-            # Save both headers and line items
-            print("\n--- Step 4: Saving Data ---")
-            raw_data_handler.save_raw_json(headers, args.module, run_timestamp)
-            print(f"[OK] Headers saved to data/raw_json/{run_timestamp}/{args.module}.json")
-            
-            if line_items:
-                raw_data_handler.save_raw_json(line_items, f"{args.module}_line_items", run_timestamp)
-                print(f"[OK] Line items saved to data/raw_json/{run_timestamp}/{args.module}_line_items.json")
-            
+        print(f"Since: {result.get('since') or 'All records'}")
+        if not result["record_count"]:
+            print(f"[WARN] No {args.module} found in API response")
         else:
-            # Standard fetch for modules without line items
-            records = zoho_client.get_data_for_module(args.module, since_timestamp=since_timestamp)
-            
-            if not records:
-                print(f"[WARN] No {args.module} found in API response")
-                print_footer(True)
-                return 0
-            
-            print(f"[OK] Retrieved {len(records)} {args.module} records from API")
-            
-            # Save data
-            print("\n--- Step 4: Saving Data ---")
-            raw_data_handler.save_raw_json(records, args.module, run_timestamp)
-            print(f"[OK] Data saved to data/raw_json/{run_timestamp}/{args.module}.json")
-            
-            headers = records
-            line_items = []
+            print(f"[OK] {result['record_count']} {args.module} records saved to {result['output_dir']}")
         
         # Quick analysis
-        print(f"\n--- Step 5: Quick Analysis ---")
-        total_records = len(headers)
-        if line_items:
-            print(f"[DATA] Total headers: {len(headers)}")
-            print(f"[DATA] Total line items: {len(line_items)}")
-            print(f"[DATA] Total records: {total_records + len(line_items)}")
+        print(f"\n--- Step 3: Quick Analysis ---")
+        if "line_item_count" in result:
+            print(f"[DATA] Total headers: {result['record_count']}")
+            print(f"[DATA] Total line items: {result['line_item_count']}")
+            print(f"[DATA] Total records: {result['record_count'] + result['line_item_count']}")
         else:
-            print(f"[DATA] Total records fetched: {total_records}")
-            
-            # Check for line items in document modules (fallback for old method)
-            if args.module in ['invoices', 'bills', 'salesorders', 'purchaseorders', 'creditnotes']:
-                line_items_found = 0
-                for record in headers:
-                    if 'line_items' in record and record['line_items']:
-                        line_items_found += len(record['line_items'])
-                
-                if line_items_found > 0:
-                    print(f"[DATA] Line items found in headers: {line_items_found}")
+            print(f"[DATA] Total records fetched: {result['record_count']}")
         
         print_footer(True)
         return 0
@@ -191,6 +136,37 @@ def cmd_fetch(args) -> int:
         print_footer(False)
         return 1
 
+def _fetch_resumable(args) -> int:
+    """
+    Run a checkpointed fetch through ApiSyncRunner, continuing an interrupted sync if one exists.
+    
+    Args:
+        args: Parsed command line arguments
+        
+    Returns:
+        Exit code (0 for success, 1 for failure)
+    """
+    from .runner_api_sync import ApiSyncRunner
+    
+    print(f"\n--- Resume Mode ---")
+    print(f"Module: {args.module}")
+    runner = ApiSyncRunner(args.log_level)
+    result = runner.fetch_data(args.module, since_timestamp=args.since, full_sync=args.full, resume=True)
+    
+    if not result.get("success"):
+        print(f"[ERROR] Fetch failed: {result.get('error')}")
+        print("[INFO] Progress is checkpointed; run the same command again to continue")
+        print_footer(False)
+        return 1
+    
+    if result.get("resumed"):
+        print(f"[RESUME] Continued interrupted sync {result['timestamp']}")
+    print(f"[OK] {result['record_count']} {args.module} records saved to {result['output_dir']}")
+    if "line_item_count" in result:
+        print(f"[DATA] Total line items: {result['line_item_count']}")
+    print_footer(True)
+    return 0
+
 def cmd_verify(args) -> int:
     """
     Execute verification command.
@@ -213,7 +189,7 @@ def cmd_verify(args) -> int:
                 # Find the latest session directory
                 base_dir = Path("data/raw_json")
                 if base_dir.exists():
-                    dirs = [d.name for d in base_dir.iterdir() if d.is_dir()]
+                    dirs = [d.name for d in base_dir.iterdir() if d.is_dir() and is_timestamp_dir(d.name)]
                     if dirs:
                         session_dir = sorted(dirs)[-1]
                         print(f"📁 Using latest session: {session_dir}")
@@ -244,6 +220,7 @@ def cmd_verify(args) -> int:
                 print("📋 Modules: All available")
             
             # Run verification
+            from .verification import api_local_verifier
             verifier = api_local_verifier.ApiLocalVerifier()
             results = verifier.verify_data_completeness(
                 timestamp_dir=args.directory,
@@ -286,35 +263,44 @@ def cmd_status(args) -> int:
         print("\n📊 SYSTEM STATUS")
         print("-" * 30)
         
-        # Check credentials
+        # Check credentials in the local cache only; status never contacts Secret Manager
+        from .core.secrets import get_cached_zoho_credentials
         try:
-            secrets.get_zoho_credentials()
-            print("🔐 Credentials: ✅ Available")
-        except:
+            if get_cached_zoho_credentials():
+                print("🔐 Credentials: ✅ Cached")
+            else:
+                print("🔐 Credentials: ⚠️  Not cached (fetched from Secret Manager on the next sync)")
+        except Exception:
             print("🔐 Credentials: ❌ Not Available")
         
         # Check data directories
         base_dir = Path("data/raw_json")
         if base_dir.exists():
-            dirs = [d.name for d in base_dir.iterdir() if d.is_dir()]
+            dirs = [d.name for d in base_dir.iterdir() if d.is_dir() and is_timestamp_dir(d.name)]
             print(f"📁 JSON Directories: ✅ {len(dirs)} available")
             
+            from .processing.snapshot import ConsolidatedView
+            view = ConsolidatedView(str(base_dir))
+            if view.has_snapshot():
+                print(f"🗜️  Snapshot: through {view.state()['compacted_through']} ({view.describe()})")
+            
             if dirs:
                 latest = sorted(dirs)[-1]
                 print(f"📅 Latest Directory: {latest}")
                 
-                # Show modules in latest directory
-                latest_path = base_dir / latest
-                json_files = list(latest_path.glob("*.json"))
-                if json_files:
-                    print(f"📋 Available Modules ({len(json_files)}):")
-                    for json_file in json_files:
-                        try:
-                            with open(json_file, 'r') as f:
-                                data = json.load(f)
-                            print(f"  📄 {json_file.stem}: {len(data)} records")
-                        except:
-                            print(f"  📄 {json_file.stem}: Error reading file")
+                # Show modules in latest directory (record counts come from the sync summary index)
+                from .processing import raw_store
+                from .processing.local_index import SyncSummaryIndex
+                module_paths = raw_store.list_module_paths(base_dir / latest)
+                if module_paths:
+                    print(f"📋 Available Modules ({len(module_paths)}):")
+                    summary_index = SyncSummaryIndex(str(base_dir), read_only=True)
+                    for module_name in module_paths:
+                        summary = summary_index.get(latest, module_name)
+                        if summary is not None:
+                            print(f"  📄 {module_name}: {summary['record_count']} records")
+                        else:
+                            print(f"  📄 {module_name}: Error reading file")
         else:
             print("📁 JSON Directories: ❌ data/raw_json not found")
         
@@ -326,6 +312,124 @@ def cmd_status(args) -> int:
         print_footer(False)
         return 1
 
+def cmd_cleanup(args) -> int:
+    """
+    Execute cleanup command: enforce retention and garbage-collect the record store.
+    
+    Args:
+        args: Parsed command line arguments
+        
+    Returns:
+        Exit code (0 for success, 1 for failure)
+    """
+    try:
+        from .config import get_config
+        from .processing import record_store
+        
+        print_header("STORAGE CLEANUP")
+        config = get_config()
+        keep = args.keep or config.max_sessions_to_keep
+        base_dirs = [args.directory] if args.directory else [config.json_base_dir, "data/sync_sessions"]
+        
+        print(f"\n🧹 Keeping the newest {keep} directories per location"
+              f"{' (dry run, nothing is deleted)' if args.dry_run else ''}")
+        for base_dir in base_dirs:
+            if not Path(base_dir).is_dir():
+                continue
+            result = record_store.collect_garbage(base_dir, keep, dedupe=args.dedupe, dry_run=args.dry_run)
+            print(f"\n📁 {base_dir}")
+            print(f"  🗑️  {'Would delete' if args.dry_run else 'Deleted'}: "
+                  f"{', '.join(result['deleted_dirs']) or 'nothing'}")
+            if args.dedupe and not args.dry_run:
+                print(f"  🔗 Modules converted to manifests: {result['deduplicated_modules']}")
+            print(f"  💾 Space freed: {result['freed_bytes'] / (1024 * 1024):.1f} MB")
+            if "store" in result:
+                print(f"  📦 Record store: {result['store']['records']} records "
+                      f"({result['removed_records']} unreferenced removed)")
+        
+        print_footer(True)
+        return 0
+        
+    except Exception as e:
+        print(f"❌ Cleanup failed: {e}")
+        print_footer(False)
+        return 1
+
+def cmd_compact(args) -> int:
+    """
+    Execute compact command: fold the sync directories into the latest-state snapshot.
+    
+    Args:
+        args: Parsed command line arguments
+        
+    Returns:
+        Exit code (0 for success, 1 for failure)
+    """
+    try:
+        from .config import get_config
+        from .processing.snapshot import ConsolidatedView
+        
+        print_header("SNAPSHOT COMPACTION")
+        config = get_config()
+        view = ConsolidatedView(args.directory or config.json_base_dir)
+        print(f"\n📁 {view.json_base_dir}: {view.describe()}")
+        
+        result = view.compact(storage_format=args.format or config.raw_storage_format)
+        if result["compacted"]:
+            print(f"🗜️  Merged {result['deltas_merged']} directories into {view.snapshot_dir} "
+                  f"(through {result['compacted_through']})")
+            for module_name, count in result["modules"].items():
+                print(f"  📄 {module_name}: {count} records")
+        else:
+            print("✅ Snapshot is up to date, nothing to compact")
+        
+        print_footer(True)
+        return 0
+        
+    except Exception as e:
+        print(f"❌ Compaction failed: {e}")
+        print_footer(False)
+        return 1
+
+def cmd_catalog(args) -> int:
+    """
+    Execute catalog command: list the catalogued syncs, rebuilding the catalog first if asked.
+    
+    Args:
+        args: Parsed command line arguments
+        
+    Returns:
+        Exit code (0 for success, 1 for failure)
+    """
+    try:
+        from .config import get_config
+        from .processing.sync_catalog import SyncCatalog
+        
+        print_header("SYNC CATALOG")
+        config = get_config()
+        base_dirs = [args.directory] if args.directory else [config.json_base_dir, "data/sync_sessions"]
+        
+        for base_dir in base_dirs:
+            if not Path(base_dir).is_dir():
+                continue
+            catalog = SyncCatalog(base_dir)
+            if args.rebuild:
+                catalog.rebuild()
+            entries = catalog.entries(base=None)
+            print(f"\n📁 {base_dir}: {len(entries)} finalized syncs"
+                  f"{' (rescanned from disk)' if args.rebuild else ''}")
+            for entry in entries[:5]:
+                location = f"{entry['base']}/{entry['timestamp_dir']}" if entry['base'] else entry['timestamp_dir']
+                print(f"  📄 {location}: {', '.join(sorted(entry['modules'])) or 'no modules'}")
+        
+        print_footer(True)
+        return 0
+        
+    except Exception as e:
+        print(f"❌ Catalog command failed: {e}")
+        print_footer(False)
+        return 1
+
 def create_parser() -> argparse.ArgumentParser:
     """Create and configure argument parser."""
     parser = argparse.ArgumentParser(
@@ -351,6 +455,8 @@ def create_parser() -> argparse.ArgumentParser:
                              help='Only fetch records modified since this timestamp (ISO format)')
     fetch_parser.add_argument('--full', action='store_true',
                              help='Fetch all records, ignore latest sync timestamp')
+    fetch_parser.add_argument('--resume', action='store_true',
+                             help='Continue the latest interrupted sync of this module from its checkpoint')
     
     # Verify command
     verify_parser = subparsers.add_parser('verify', help='Verify local data against API')
@@ -368,6 +474,31 @@ def create_parser() -> argparse.ArgumentParser:
     # Status command
     status_parser = subparsers.add_parser('status', help='Show system status')
     
+    # Cleanup command
+    cleanup_parser = subparsers.add_parser('cleanup', help='Delete old sync directories and unreferenced stored records')
+    cleanup_parser.add_argument('--keep', type=int,
+                               help='Timestamp directories/sessions to keep (default: max_sessions_to_keep)')
+    cleanup_parser.add_argument('--dedupe', action='store_true',
+                               help='Convert kept module files into manifests of the deduplicated record store')
+    cleanup_parser.add_argument('--dry-run', action='store_true',
+                               help='Only show what would be deleted')
+    cleanup_parser.add_argument('--directory', '-d',
+                               help='Base directory to clean (default: data/raw_json and data/sync_sessions)')
+    
+    # Compact command
+    compact_parser = subparsers.add_parser('compact', help='Merge sync directories into the latest-state snapshot')
+    compact_parser.add_argument('--directory', '-d',
+                               help='Raw JSON base directory (default: json_base_dir from config)')
+    compact_parser.add_argument('--format', choices=['json', 'ndjson.gz', 'ndjson.zst', 'cas'],
+                               help='Storage format of the snapshot files (default: raw_storage_format)')
+    
+    # Catalog command
+    catalog_parser = subparsers.add_parser('catalog', help='List the catalogued syncs or rebuild the sync catalog')
+    catalog_parser.add_argument('--rebuild', action='store_true',
+                               help='Rescan the sync directories on disk into the catalog')
+    catalog_parser.add_argument('--directory', '-d',
+                               help='Base directory of the catalog (default: data/raw_json and data/sync_sessions)')
+    
     return parser
 
 def main() -> int:
@@ -394,6 +525,12 @@ def main() -> int:
         return cmd_verify(args)
     elif args.command == 'status':
         return cmd_status(args)
+    elif args.command == 'cleanup':
+        return cmd_cleanup(args)
+    elif args.command == 'compact':
+        return cmd_compact(args)
+    elif args.command == 'catalog':
+        return cmd_catalog(args)
     else:
         parser.print_help()
         return 1
@@ -40,10 +40,59 @@ class ApiSyncConfig:
     # Line Items Fetch Behavior
     prompt_for_line_items_date: bool = True  # Prompt user for date when no comprehensive data found
     
+    # Detail Fetch Concurrency
+    requests_per_minute: int = 100  # Zoho Books per-minute quota shared by all workers
+    detail_fetch_concurrency: dict = None  # Module -> worker count, set in post_init
+    
+    # Reuse saved detailed records whose last_modified_time is unchanged (skips detail calls)
+    reuse_unchanged_details: bool = True
+    
+    # Detail Record Cache (detail responses keyed by module, record ID and last_modified_time)
+    detail_cache_enabled: bool = True
+    detail_cache_file: str = "data/detail_cache.db"
+    detail_cache_max_mb: int = 256
+    detail_cache_bypass: bool = False  # Always fetch details, but keep refreshing the cache
+    
+    # Fetch Engine ("sync" uses requests, "async" uses aiohttp on one event loop)
+    fetch_engine: str = "sync"
+    async_max_connections: int = 100
+    
+    # Daily API Quota
+    daily_call_limit: int = 5000  # Used until Zoho reports its own limit in response headers
+    quota_ledger_file: str = "data/api_quota_ledger.json"
+    quota_reserve_calls: int = 50  # fetch_all_modules stops when fewer calls than this remain
+    module_priority: list = None  # fetch_all_modules order, set in post_init
+    
+    # Parallel Module Fetch (fetch_all_modules runs modules concurrently under one rate budget)
+    parallel_modules: bool = False
+    max_parallel_modules: int = 4
+    
+    # Raw Storage ("json" arrays, "ndjson.gz"/"ndjson.zst" compressed NDJSON parts,
+    # or "cas" manifests into the deduplicated record store)
+    raw_storage_format: str = "json"
+    raw_chunk_records: int = 5000  # Records per NDJSON part file
+    max_sessions_to_keep: int = 10  # Timestamp directories / sessions kept by `cleanup`
+    compaction_threshold: int = 20  # Re-compact the snapshot after this many new sync directories (0 = never)
+    
     def __post_init__(self):
-        """Initialize default excluded modules if not set."""
+        """Initialize default excluded modules, detail fetch concurrency and module priority if not set."""
         if self.excluded_modules is None:
             self.excluded_modules = ["organizations"]
+        if self.detail_fetch_concurrency is None:
+            self.detail_fetch_concurrency = {
+                "invoices": 4,
+                "bills": 4,
+                "salesorders": 4,
+                "purchaseorders": 2,
+                "creditnotes": 2
+            }
+        if self.module_priority is None:
+            # Transaction modules first so a tight quota is not spent on reference data
+            self.module_priority = [
+                "invoices", "bills", "customerpayments", "vendorpayments",
+                "salesorders", "purchaseorders", "creditnotes",
+                "contacts", "items", "organizations"
+            ]
 
 # Read configuration from environment variables
 # Google Cloud Project ID - Required for Secret Manager
@@ -58,11 +107,72 @@ JSON_BASE_DIR = os.getenv("JSON_BASE_DIR", "data/raw_json")
 # Fetch behavior configuration
 DEFAULT_ORGANIZATION_ID = os.getenv("DEFAULT_ORGANIZATION_ID", "806931205")
 EXCLUDED_MODULES = os.getenv("EXCLUDED_MODULES", "organizations").split(",") if os.getenv("EXCLUDED_MODULES") else ["organizations"]
+FETCH_ENGINE = os.getenv("API_SYNC_FETCH_ENGINE", "sync").lower()
+DAILY_CALL_LIMIT = int(os.getenv("ZOHO_DAILY_API_LIMIT", "5000"))
+PARALLEL_MODULES = os.getenv("API_SYNC_PARALLEL_MODULES")
+RAW_STORAGE_FORMAT = os.getenv("API_SYNC_RAW_FORMAT", "json").lower()
+DETAIL_CACHE_BYPASS = os.getenv("API_SYNC_DETAIL_CACHE_BYPASS", "").lower() in ("1", "true", "yes")
+
+# settings.yaml next to this module; its "api_sync" section tunes fetch_all_modules
+SETTINGS_FILE = os.getenv("API_SYNC_SETTINGS_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "settings.yaml"))
+
+def load_settings_file(path: str = SETTINGS_FILE) -> Dict[str, Any]:
+    """
+    Load the "api_sync" section of the settings file.
+    
+    Args:
+        path: Path to the YAML settings file
+        
+    Returns:
+        Dictionary with the section contents (empty if the file or PyYAML is unavailable)
+    """
+    if not os.path.exists(path):
+        return {}
+    try:
+        import yaml
+    except ImportError:
+        logger.debug(f"PyYAML not installed, ignoring {path}")
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            settings = yaml.safe_load(f) or {}
+    except Exception as e:
+        logger.warning(f"Could not read settings file {path}: {e}")
+        return {}
+    return settings.get("api_sync") or {}
+
+def apply_settings(config: ApiSyncConfig, settings: Dict[str, Any]) -> None:
+    """
+    Apply the settings file section to a configuration.
+    
+    Per-module "priority" reorders module_priority and "max_concurrency" sets the
+    module's detail-fetch workers.
+    
+    Args:
+        config: Configuration to update in place
+        settings: Section returned by load_settings_file()
+    """
+    if "parallel_modules" in settings:
+        config.parallel_modules = bool(settings["parallel_modules"])
+    if "max_parallel_modules" in settings:
+        config.max_parallel_modules = max(1, int(settings["max_parallel_modules"]))
+    
+    modules = settings.get("modules") or {}
+    ranked = {name: opts["priority"] for name, opts in modules.items() if isinstance(opts, dict) and "priority" in opts}
+    if ranked:
+        unranked = [name for name in config.module_priority if name not in ranked]
+        config.module_priority = sorted(ranked, key=ranked.get) + unranked
+    for name, opts in modules.items():
+        if isinstance(opts, dict) and "max_concurrency" in opts:
+            config.detail_fetch_concurrency[name] = max(1, int(opts["max_concurrency"]))
 
-def get_config() -> ApiSyncConfig:
+def get_config(use_settings_file: bool = True) -> ApiSyncConfig:
     """
     Get configuration from environment variables with fallbacks to defaults.
     
+    Args:
+        use_settings_file: Apply the settings file (this imports PyYAML)
+        
     Returns:
         ApiSyncConfig object with configuration values
     """
@@ -73,6 +183,14 @@ def get_config() -> ApiSyncConfig:
     config.json_base_dir = JSON_BASE_DIR
     config.default_organization_id = DEFAULT_ORGANIZATION_ID
     config.excluded_modules = EXCLUDED_MODULES.copy()  # Make a copy to avoid mutation
+    config.fetch_engine = FETCH_ENGINE
+    config.daily_call_limit = DAILY_CALL_LIMIT
+    config.detail_cache_bypass = DETAIL_CACHE_BYPASS
+    config.raw_storage_format = RAW_STORAGE_FORMAT
+    if use_settings_file:
+        apply_settings(config, load_settings_file())
+    if PARALLEL_MODULES is not None:
+        config.parallel_modules = PARALLEL_MODULES.lower() in ("1", "true", "yes")
     
     logger.debug(f"Loaded configuration: {config}")
     return config
@@ -160,18 +278,29 @@ def print_config_info(config: ApiSyncConfig) -> None:
     print(f"⏱️  Request Timeout: {config.request_timeout}s")
     print(f"🔁 Retry Count: {config.retry_count}")
     print(f"💤 Rate Limit Delay: {config.rate_limit_delay}s")
+    print(f"🚦 Requests Per Minute: {config.requests_per_minute}")
+    print(f"🧵 Detail Fetch Workers: {config.detail_fetch_concurrency}")
+    print(f"♻️  Reuse Unchanged Details: {config.reuse_unchanged_details}")
+    print(f"🗃️  Detail Cache: {'off' if not config.detail_cache_enabled else 'bypass' if config.detail_cache_bypass else 'on'} "
+          f"({config.detail_cache_file}, {config.detail_cache_max_mb} MB)")
+    print(f"⚙️  Fetch Engine: {config.fetch_engine}")
+    print(f"🔀 Parallel Modules: {config.parallel_modules} (max {config.max_parallel_modules})")
+    print(f"🗜️  Raw Storage: {config.raw_storage_format}"
+          f"{f' ({config.raw_chunk_records} records per part)' if config.raw_storage_format.startswith('ndjson') else ''}")
+    print(f"📈 Daily Call Limit: {config.daily_call_limit} (reserve {config.quota_reserve_calls})")
     print(f"📝 Log Level: {config.log_level}")
     print(f"📅 Prompt for Line Items Date: {config.prompt_for_line_items_date}")
     print("=" * 50)
 
 
-# Create default configuration instance
-_default_config = get_config()
+# Create default configuration instance (the constants below don't depend on the
+# settings file, so importing this module does not import PyYAML)
+_default_config = get_config(use_settings_file=False)
 
 # Export commonly used values as module-level constants for backward compatibility
 JSON_BASE_DIR = _default_config.json_base_dir
 SUPPORTED_MODULES = get_supported_modules()
-FETCHABLE_MODULES = get_fetchable_modules()
+FETCHABLE_MODULES = get_fetchable_modules(_default_config.excluded_modules)
 GCP_PROJECT_ID = _default_config.gcp_project_id
 DEFAULT_ORGANIZATION_ID = _default_config.default_organization_id
 EXCLUDED_MODULES = _default_config.excluded_modules
@@ -1,7 +1,23 @@
 """Core modules for API authentication and communication."""
 
-from .auth import get_access_token
-from .client import ZohoClient
-from .secrets import get_zoho_credentials
+import importlib
+
+# Imported on first use so that loading api_sync.core (or one of its light
+# submodules such as token_cache) does not import requests or Google libraries
+_LAZY_ATTRIBUTES = {
+    'get_access_token': '.auth',
+    'ZohoClient': '.client',
+    'get_zoho_credentials': '.secrets'
+}
 
 __all__ = ['get_access_token', 'ZohoClient', 'get_zoho_credentials']
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,678 @@
+"""
+Asyncio variant of the Zoho Books API client.
+
+AsyncZohoClient mirrors the public fetch methods of ZohoClient as coroutines and
+multiplexes many in-flight requests over one pooled aiohttp session on a single
+thread. AsyncZohoClientAdapter wraps it in the blocking ZohoClient interface so
+ApiSyncRunner can switch engines through configuration.
+
+aiohttp is an optional dependency; it is only imported when the async engine is used.
+"""
+
+import asyncio
+import logging
+import threading
+from typing import List, Dict, Any, Optional, Tuple, Iterator, AsyncIterator, Set
+
+from ..utils import ensure_zoho_timestamp_format
+from .record_helpers import ZohoRecordHelpers
+from .rate_limiter import TokenBucketRateLimiter
+from .quota import QuotaLedger
+from .detail_cache import DetailRecordCache
+from ..processing.local_index import LocalRecordIndex
+from .transport import (
+    CircuitBreaker, CircuitOpenError, compute_backoff,
+    RETRY_STATUS_CODES, DEFAULT_MAX_RETRIES, DEFAULT_BACKOFF_BASE, DEFAULT_THROTTLE_BACKOFF_BASE
+)
+
+logger = logging.getLogger(__name__)
+
+# Maximum pooled connections held open by the async session
+DEFAULT_MAX_CONNECTIONS = 100
+
+
+def _import_aiohttp():
+    """Import aiohttp lazily so the synchronous engine does not require it."""
+    try:
+        import aiohttp
+    except ImportError as e:
+        raise ImportError(
+            "The async fetch engine requires aiohttp. Install it with 'pip install -r requirements-optional.txt' "
+            "or set fetch_engine to 'sync'."
+        ) from e
+    return aiohttp
+
+
+class AsyncZohoClient(ZohoRecordHelpers):
+    """
+    Coroutine-based client for the Zoho Books API.
+
+    Shares line item extraction, local data checks and report filtering with
+    ZohoClient through ZohoRecordHelpers; only the network layer differs.
+    Blocking work (quota ledger, detail cache, record index, token renewal)
+    runs in worker threads so it never blocks the event loop. Use as an async
+    context manager (or call ``close()``) to release the pooled session.
+    """
+
+    def __init__(self, access_token: str, organization_id: str, api_base_url: str,
+                 rate_limiter: Optional[TokenBucketRateLimiter] = None,
+                 detail_concurrency: Optional[Dict[str, int]] = None,
+                 max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                 quota_ledger: Optional[QuotaLedger] = None,
+                 record_index: Optional[LocalRecordIndex] = None,
+                 detail_cache: Optional[DetailRecordCache] = None,
+                 token_provider=None):
+        """
+        Initializes the async Zoho API client.
+
+        Args:
+            access_token: The active OAuth2 access token.
+            organization_id: The ID of the Zoho Books organization to query.
+            api_base_url: The base URL for the Zoho Books API.
+            rate_limiter: Shared token bucket for all requests.
+            detail_concurrency: Optional mapping of module name -> in-flight detail requests.
+            max_connections: Size of the pooled connection limit for the session.
+            quota_ledger: Daily call ledger charged for every attempt (optional).
+            record_index: Index of locally saved detailed records used to skip unchanged details.
+            detail_cache: Persistent cache of detail responses consulted by every detail fetch.
+            token_provider: AccessTokenProvider that renews the token before it expires and after a 401.
+        """
+        if not all([access_token, organization_id, api_base_url]):
+            raise ValueError("Access token, organization ID, and API base URL are required.")
+
+        self._init_record_helpers(detail_concurrency, record_index, detail_cache)
+        self.token_provider = token_provider
+        self.access_token = access_token
+        self.organization_id = organization_id
+        self.base_url = api_base_url
+        self.headers = {"Authorization": f"Zoho-oauthtoken {access_token}"}
+        self.rate_limiter = rate_limiter or TokenBucketRateLimiter()
+        self.max_connections = max_connections
+        self.max_retries = DEFAULT_MAX_RETRIES
+        self.circuit_breaker = CircuitBreaker()
+        self.quota_ledger = quota_ledger
+        self._session = None
+        logger.info("AsyncZohoClient initialized successfully.")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _get_session(self):
+        """Create the pooled aiohttp session on first use (inside the running loop)."""
+        if self._session is None or self._session.closed:
+            aiohttp = _import_aiohttp()
+            connector = aiohttp.TCPConnector(limit=self.max_connections, ttl_dns_cache=300)
+            # aiohttp negotiates gzip/deflate and keeps connections alive by default
+            self._session = aiohttp.ClientSession(headers=self.headers, connector=connector)
+        return self._session
+
+    async def close(self) -> None:
+        """Close the pooled session and its connections."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _get_json(self, endpoint: str, params: Dict[str, Any] = None, module: Optional[str] = None) -> Tuple[int, Optional[Dict[str, Any]]]:
+        """
+        Perform a rate-limited GET and decode the JSON body.
+
+        Uses the same retry policy as ZohoTransport: 429/5xx responses and
+        connection errors are retried with jittered exponential backoff that
+        honours Retry-After, behind a shared circuit breaker. A 401 triggers one
+        token refresh and retry when a token provider is configured.
+
+        Returns:
+            Tuple of (status_code, data). Data is None for non-2xx responses.
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open.
+        """
+        aiohttp = _import_aiohttp()
+        session = await self._get_session()
+        full_url = f"{self.base_url}{endpoint}"
+
+        attempt = 0
+        token_refreshed = False
+        while True:
+            if not self.circuit_breaker.allow_request():
+                raise CircuitOpenError(f"Circuit breaker open; refusing request to {full_url}")
+
+            # Renewing an expired token is a blocking HTTP exchange (and a cache write)
+            token = await asyncio.to_thread(self.token_provider.get_token) if self.token_provider else None
+            auth_headers = {"Authorization": f"Zoho-oauthtoken {token}"} if token else None
+
+            await self.rate_limiter.acquire_async()
+            try:
+                async with session.get(full_url, params=params, headers=auth_headers) as response:
+                    if self.quota_ledger:
+                        await asyncio.to_thread(self.quota_ledger.record_call, module, response.status, response.headers)
+                    if response.status == 401 and token and not token_refreshed:
+                        # The token expired or was revoked mid-run: refresh once and retry
+                        token_refreshed = await self._refresh_token(token)
+                        if token_refreshed:
+                            continue
+                    if response.status == 429:
+                        self.rate_limiter.record_throttled()
+                    if response.status in RETRY_STATUS_CODES and attempt < self.max_retries:
+                        if response.status != 429:
+                            self.circuit_breaker.record_failure()
+                        base = DEFAULT_THROTTLE_BACKOFF_BASE if response.status == 429 else DEFAULT_BACKOFF_BASE
+                        delay = compute_backoff(attempt, response.headers.get("Retry-After"), base)
+                        logger.warning(f"Status {response.status} from {full_url}; retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+                    elif response.status >= 400:
+                        if response.status >= 500:
+                            self.circuit_breaker.record_failure()
+                        body = await response.text()
+                        logger.error(f"Request to {full_url} failed - Status: {response.status}")
+                        logger.debug(f"Response Body: {body}")
+                        return response.status, None
+                    else:
+                        self.circuit_breaker.record_success()
+                        self.rate_limiter.record_success()
+                        return response.status, await response.json(content_type=None)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if self.quota_ledger:
+                    await asyncio.to_thread(self.quota_ledger.record_call, module)
+                self.circuit_breaker.record_failure()
+                if attempt >= self.max_retries:
+                    raise
+                delay = compute_backoff(attempt)
+                logger.warning(f"Network error on {full_url} ({e}); retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _refresh_token(self, rejected_token: str) -> bool:
+        """
+        Ask the token provider for a new token after a 401 (in a worker thread).
+
+        Returns:
+            True if a token is available for a retry, False if the refresh failed
+            (the 401 is then returned to the caller).
+        """
+        try:
+            await asyncio.to_thread(self.token_provider.refresh, rejected_token)
+            return True
+        except (Exception, SystemExit) as e:
+            logger.error(f"Access token refresh failed: {e}")
+            return False
+
+    async def iter_pages(self, module_name: str, params: Dict[str, Any] = None, start_page: int = 1) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Async generator version of ZohoClient.iter_pages, yielding one page at a time.
+
+        Like the synchronous generator, the next page is requested as soon as the
+        current one reports has_more_page, so it is in flight while the caller
+        processes the current page. A page that cannot be fetched raises.
+        """
+        page = start_page
+        total_items = 0
+        endpoint = f"/{module_name}"
+
+        params = dict(params or {})
+        params['organization_id'] = self.organization_id
+
+        logger.info(f"Fetching all records for module: '{module_name}'")
+        print(f"[ASYNC] Starting paginated fetch for {module_name}...")
+
+        in_flight = asyncio.ensure_future(self._get_json(endpoint, dict(params, page=page), module=module_name))
+        try:
+            while in_flight is not None:
+                try:
+                    status, data = await in_flight
+                except Exception as e:
+                    logger.error(f"A network error occurred while fetching '{module_name}' on page {page}: {e}")
+                    logger.error("Aborting fetch for this module.")
+                    raise
+
+                if data is None:
+                    logger.error("Aborting fetch for this module.")
+                    raise RuntimeError(f"Fetching '{module_name}' page {page} failed with status {status}")
+
+                items_on_page = data.get(module_name, [])
+                total_items += len(items_on_page)
+                has_more_pages = data.get("page_context", {}).get("has_more_page", False)
+                logger.debug(f"Found {len(items_on_page)} items on page {page}. More pages: {has_more_pages}")
+                print(f"[ASYNC] Page {page}: Found {len(items_on_page)} records. Total so far: {total_items}")
+
+                in_flight = None
+                if has_more_pages:
+                    in_flight = asyncio.ensure_future(
+                        self._get_json(endpoint, dict(params, page=page + 1), module=module_name)
+                    )
+                del data
+                yield items_on_page
+                page += 1
+        finally:
+            # Don't leave a prefetch running if the caller stops early
+            if in_flight is not None and not in_flight.done():
+                in_flight.cancel()
+
+        logger.info(f"Finished. Total records for '{module_name}': {total_items}")
+
+    async def _get_all_pages(self, module_name: str, params: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """Coroutine version of ZohoClient._get_all_pages."""
+        all_items = []
+        try:
+            async for items_on_page in self.iter_pages(module_name, params):
+                all_items.extend(items_on_page)
+        except Exception as e:
+            # A partial module must not pass for a complete one: the caller marks it failed
+            logger.error(f"Fetching '{module_name}' failed after {len(all_items)} records: {e}")
+            raise
+        return all_items
+
+    async def iter_module_pages(self, module_name: str, since_timestamp: str = None, start_page: int = 1) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Async generator version of ZohoClient.iter_module_pages.
+
+        Args:
+            module_name: The name of the module to fetch data for (e.g., 'invoices').
+            since_timestamp: Optional ISO-8601 timestamp to only fetch records modified since that time.
+            start_page: First page to request (used when resuming an interrupted sync).
+        """
+        params = {}
+        if since_timestamp:
+            zoho_timestamp = ensure_zoho_timestamp_format(since_timestamp)
+            if zoho_timestamp:
+                params['last_modified_time'] = zoho_timestamp
+                logger.info(f"🚀 API FILTER: Fetching '{module_name}' modified since {zoho_timestamp}")
+            else:
+                logger.warning(f"Invalid timestamp format: {since_timestamp}")
+
+        if module_name == "organizations":
+            if start_page == 1:
+                yield await self._get_organizations()
+            return
+
+        async for items_on_page in self.iter_pages(module_name, params, start_page):
+            yield items_on_page
+
+    async def get_data_for_module(self, module_name: str, since_timestamp: str = None) -> List[Dict[str, Any]]:
+        """
+        Coroutine version of ZohoClient.get_data_for_module.
+
+        Args:
+            module_name: The name of the module to fetch data for (e.g., 'invoices').
+            since_timestamp: Optional ISO-8601 timestamp to only fetch records modified since that time.
+
+        Returns:
+            A list of records from the specified module.
+
+        Raises:
+            Exception: If a page cannot be fetched (logged with the records fetched so far).
+        """
+        all_items = []
+        try:
+            async for items_on_page in self.iter_module_pages(module_name, since_timestamp):
+                all_items.extend(items_on_page)
+        except Exception as e:
+            # A partial module must not pass for a complete one: the caller marks it failed
+            logger.error(f"Fetching '{module_name}' failed after {len(all_items)} records: {e}")
+            raise
+        logger.info(f"📊 API FILTER RESULTS: Fetched {len(all_items)} {module_name} records")
+        return all_items
+
+    async def _get_organizations(self) -> List[Dict[str, Any]]:
+        """Coroutine version of ZohoClient._get_organizations."""
+        try:
+            status, data = await self._get_json("/organizations", module="organizations")
+            if data is None:
+                return []
+            organizations = data.get("organizations", [])
+            logger.info(f"Found {len(organizations)} organizations")
+            return organizations
+        except Exception as e:
+            logger.error(f"An unexpected error occurred while fetching organizations: {str(e)}")
+            return []
+
+    async def get_data_for_module_with_line_items(self, module_name: str, since_timestamp: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Coroutine version of ZohoClient.get_data_for_module_with_line_items.
+
+        Returns:
+            Dictionary with 'headers' and 'line_items' lists
+
+        Raises:
+            Exception: If a page cannot be fetched (logged with the records fetched so far).
+        """
+        detailed_records = []
+        all_line_items = []
+        try:
+            async for batch in self.iter_data_with_line_items(module_name, since_timestamp):
+                detailed_records.extend(batch['headers'])
+                all_line_items.extend(batch['line_items'])
+        except Exception as e:
+            # A partial module must not pass for a complete one: the caller marks it failed
+            logger.error(f"Fetching '{module_name}' with line items failed after "
+                         f"{len(detailed_records)} records: {e}")
+            raise
+
+        return {
+            'headers': detailed_records,
+            'line_items': all_line_items
+        }
+
+    async def iter_data_with_line_items(self, module_name: str, since_timestamp: Optional[str] = None,
+                                        start_page: int = 1, skip_ids: Optional[Set[str]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Async generator version of ZohoClient.iter_data_with_line_items.
+
+        All detail requests of a header page are started at once behind one
+        semaphore, so up to the module's configured concurrency (and the shared rate
+        limiter) are in flight while earlier batches are yielded. Records are still
+        yielded in header order in batches of DETAIL_BATCH_SIZE.
+        """
+        if module_name not in self.MODULES_WITH_LINE_ITEMS:
+            page_number = start_page
+            async for headers in self.iter_module_pages(module_name, since_timestamp, start_page):
+                yield {'headers': headers, 'line_items': [], 'page': page_number, 'page_complete': True}
+                page_number += 1
+            return
+
+        # Same OPTION A decision as the synchronous client: incremental syncs always fetch details
+        if not since_timestamp and await asyncio.to_thread(self._has_comprehensive_line_item_data, module_name):
+            logger.info(f"📊 SMART FETCH: Found comprehensive {module_name} line item data, skipping individual fetches")
+            page_number = start_page
+            async for headers in self.iter_module_pages(module_name, since_timestamp, start_page):
+                yield {'headers': headers, 'line_items': [], 'page': page_number, 'page_complete': True}
+                page_number += 1
+            return
+
+        id_field = self.MODULES_WITH_LINE_ITEMS[module_name]
+        concurrency = self.get_detail_concurrency(module_name)
+        semaphore = asyncio.Semaphore(concurrency)
+        total_records = 0
+        total_line_items = 0
+        reused_total = 0
+
+        page_number = start_page - 1
+        async for headers in self.iter_module_pages(module_name, since_timestamp, start_page):
+            page_number += 1
+            pending = [h for h in headers if h.get(id_field)]
+            if len(pending) < len(headers):
+                logger.warning(f"{len(headers) - len(pending)} {module_name} records have no {id_field}")
+            if skip_ids:
+                resumable = [h for h in pending if h[id_field] not in skip_ids]
+                if len(resumable) < len(pending):
+                    logger.info(f"⏭️ RESUME: {len(pending) - len(resumable)} {module_name} details on page {page_number} already fetched")
+                pending = resumable
+
+            if not pending:
+                yield {'headers': [], 'line_items': [], 'page': page_number, 'page_complete': True}
+                continue
+
+            # Headers unchanged since they were saved reuse the local detailed record
+            reused, to_fetch = await asyncio.to_thread(self._reuse_unchanged_details, module_name, pending, id_field)
+            reused_total += len(reused)
+            in_flight = min(concurrency, len(to_fetch))
+            logger.info(f"📋 ASYNC DETAIL FETCH: {len(to_fetch)} {module_name} records, {in_flight} in flight")
+            print(f"[ASYNC] Fetching {len(to_fetch)} detailed {module_name} records ({in_flight} in flight)...")
+            tasks = {
+                h[id_field]: asyncio.ensure_future(self._get_detailed_record_bounded(
+                    semaphore, module_name, h[id_field], h.get('last_modified_time')))
+                for h in to_fetch
+            }
+
+            # IDs on this page without a detailed record; the page stays open for resume
+            missing_on_page = 0
+            try:
+                for batch_start in range(0, len(pending), self.DETAIL_BATCH_SIZE):
+                    batch_ids = [h[id_field] for h in pending[batch_start:batch_start + self.DETAIL_BATCH_SIZE]]
+                    batch_tasks = [tasks[record_id] for record_id in batch_ids if record_id in tasks]
+                    if batch_tasks:
+                        # Let the whole batch settle so every failure is retrieved, then fail on the first
+                        results = await asyncio.gather(*batch_tasks, return_exceptions=True)
+                        errors = [result for result in results if isinstance(result, BaseException)]
+                        if errors:
+                            raise errors[0]
+
+                    detailed_records = []
+                    batch_line_items = []
+                    for record_id in batch_ids:
+                        detailed_record = reused.get(str(record_id))
+                        if detailed_record is None and record_id in tasks:
+                            detailed_record = tasks[record_id].result()
+                        if not detailed_record:
+                            missing_on_page += 1
+                            continue
+                        detailed_records.append(detailed_record)
+                        batch_line_items.extend(self._extract_line_items(detailed_record, module_name, record_id))
+
+                    total_records += len(detailed_records)
+                    total_line_items += len(batch_line_items)
+                    yield {
+                        'headers': detailed_records,
+                        'line_items': batch_line_items,
+                        'page': page_number,
+                        'page_complete': batch_start + self.DETAIL_BATCH_SIZE >= len(pending) and not missing_on_page
+                    }
+            finally:
+                # Don't leave detail requests running if the caller stops early or a write fails
+                for task in tasks.values():
+                    if not task.done():
+                        task.cancel()
+                    elif not task.cancelled():
+                        # Later batches are never awaited; retrieve their failures so asyncio does not log them as lost
+                        task.exception()
+            if missing_on_page:
+                logger.warning(f"{missing_on_page} {module_name} details on page {page_number} could not be fetched; "
+                               f"a resumed sync retries them")
+
+        if total_records == 0:
+            logger.info(f"No {module_name} found, no line items to fetch")
+            return
+
+        logger.info(f"Successfully fetched {total_records} detailed {module_name} with {total_line_items} total line items")
+        print(f"[ASYNC] Completed: {total_records} detailed records with {total_line_items} line items")
+        if reused_total:
+            logger.info(f"⏭️ UNCHANGED: Reused {reused_total} saved {module_name} records, "
+                        f"{total_records - reused_total} detail calls made")
+
+    async def _gather_detailed_records(self, module_name: str, record_ids: List[str], concurrency: int,
+                                       last_modified_times: Optional[Dict[str, str]] = None,
+                                       use_cache: bool = True) -> List[Optional[Dict[str, Any]]]:
+        """
+        Fetch detail records with at most ``concurrency`` in flight, preserving input order.
+
+        A record whose request fails after all retries comes back as its exception.
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        last_modified_times = last_modified_times or {}
+        return await asyncio.gather(*(
+            self._get_detailed_record_bounded(semaphore, module_name, record_id,
+                                              last_modified_times.get(record_id), use_cache=use_cache)
+            for record_id in record_ids
+        ), return_exceptions=True)
+
+    async def _get_detailed_record_bounded(self, semaphore: asyncio.Semaphore, module_name: str, record_id: str,
+                                           last_modified_time: Optional[str] = None,
+                                           use_cache: bool = True) -> Optional[Dict[str, Any]]:
+        """_get_detailed_record, waiting for a slot of ``semaphore`` first."""
+        async with semaphore:
+            return await self._get_detailed_record(module_name, record_id, last_modified_time, use_cache=use_cache)
+
+    async def _get_detailed_record(self, module_name: str, record_id: str,
+                                   last_modified_time: Optional[str] = None,
+                                   use_cache: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Coroutine version of ZohoClient._get_detailed_record.
+
+        With ``use_cache`` off the detail cache is not consulted, but the fetched
+        record is still stored in it.
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open.
+            RuntimeError: If a 429/5xx is still returned after the last retry.
+            aiohttp.ClientConnectionError, asyncio.TimeoutError: If a connection error
+            persists after all retries.
+        """
+        aiohttp = _import_aiohttp()
+        if use_cache:
+            cached = await asyncio.to_thread(self._cached_detail, module_name, record_id, last_modified_time)
+            if cached is not None:
+                return cached
+        try:
+            status, data = await self._get_json(f"/{module_name}/{record_id}",
+                                                {'organization_id': self.organization_id},
+                                                module=module_name)
+        except (CircuitOpenError, aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            # Same rule as ZohoClient: a failure that outlasted the retries fails the
+            # module instead of silently dropping the record
+            logger.error(f"Giving up on detailed {module_name} record {record_id}: {e}")
+            raise
+        except Exception as e:
+            logger.warning(f"Unexpected error fetching detailed {module_name} record {record_id}: {e}")
+            return None
+
+        if data is None:
+            if status in RETRY_STATUS_CODES:
+                logger.error(f"Giving up on detailed {module_name} record {record_id} (status {status})")
+                raise RuntimeError(f"Fetching detailed {module_name} record {record_id} failed with status {status}")
+            logger.warning(f"Failed to fetch detailed {module_name} record {record_id} (status {status})")
+            return None
+        try:
+            singular_key = module_name.rstrip('s')
+            record = data.get(singular_key, data)
+            await asyncio.to_thread(self._store_detail, module_name, record_id, record, last_modified_time)
+            return record
+        except Exception as e:
+            logger.warning(f"Unexpected error fetching detailed {module_name} record {record_id}: {e}")
+            return None
+
+    async def get_modified_records_report(self, module_name: str, since_timestamp: str) -> List[Dict[str, Any]]:
+        """
+        Coroutine version of ZohoClient.get_modified_records_report.
+
+        Returns:
+            List of dictionaries with minimal fields (id, last_modified_time, etc.)
+        """
+        zoho_timestamp = ensure_zoho_timestamp_format(since_timestamp)
+        if not zoho_timestamp:
+            logger.error(f"Invalid timestamp format: {since_timestamp}")
+            return []
+
+        params = {
+            'organization_id': self.organization_id,
+            'last_modified_time': zoho_timestamp,
+            'fields': 'invoice_id,last_modified_time,date,created_time'
+        }
+
+        all_modified_records = []
+        page = 1
+        has_more_pages = True
+        while has_more_pages:
+            params['page'] = page
+            try:
+                status, data = await self._get_json(f"/{module_name}", params, module=module_name)
+            except Exception as e:
+                logger.error(f"Error fetching report page {page}: {e}")
+                break
+
+            if data is None:
+                break
+
+            items_on_page = data.get(module_name, [])
+            if not items_on_page:
+                break
+
+            all_modified_records.extend(
+                self._build_modified_report_items(module_name, items_on_page, since_timestamp)
+            )
+            has_more_pages = data.get("page_context", {}).get("has_more_page", False)
+            page += 1
+
+        logger.info(f"📊 Modified records report complete: {len(all_modified_records)} records found")
+        return all_modified_records
+
+    async def fetch_specific_records(self, module_name: str, record_ids: List[str]) -> List[Dict[str, Any]]:
+        """
+        Coroutine version of ZohoClient.fetch_specific_records.
+
+        Returns:
+            List of full record data for the specified IDs, in input order
+        """
+        record_ids = [record_id for record_id in record_ids if record_id]
+        if not record_ids:
+            logger.info("No record IDs provided, returning empty list")
+            return []
+
+        concurrency = self.get_detail_concurrency(module_name)
+        logger.info(f"🎯 Fetching {len(record_ids)} specific {module_name} records ({concurrency} in flight)")
+        # Targeted re-fetches repair missing or stale records, so they always go to the API
+        results = await self._gather_detailed_records(module_name, record_ids, concurrency, use_cache=False)
+
+        # As in ZohoClient, a record that cannot be fetched is counted as failed
+        fetched_records = [record for record in results if record and not isinstance(record, BaseException)]
+        failed_count = len(record_ids) - len(fetched_records)
+        logger.info(f"📊 Targeted fetch complete: {len(fetched_records)} successful, {failed_count} failed")
+        return fetched_records
+
+
+class AsyncZohoClientAdapter:
+    """
+    Blocking facade over AsyncZohoClient with the same interface as ZohoClient.
+
+    Owns a private event loop, running on its own thread, so the pooled session
+    is reused across calls and several threads (e.g. parallel module fetches)
+    can use the adapter at once.
+    """
+
+    MODULES_WITH_LINE_ITEMS = ZohoRecordHelpers.MODULES_WITH_LINE_ITEMS
+
+    def __init__(self, *args, **kwargs):
+        """Accepts the same arguments as AsyncZohoClient."""
+        _import_aiohttp()
+        self.async_client = AsyncZohoClient(*args, **kwargs)
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=self._loop.run_forever, name="zoho-async-loop", daemon=True)
+        self._loop_thread.start()
+
+    def _run(self, awaitable):
+        async def wrapper():
+            return await awaitable
+        return asyncio.run_coroutine_threadsafe(wrapper(), self._loop).result()
+
+    def _iterate(self, async_gen):
+        """Drive an async generator on the private loop, yielding its items synchronously."""
+        try:
+            while True:
+                try:
+                    yield self._run(async_gen.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            self._run(async_gen.aclose())
+
+    def get_data_for_module(self, module_name: str, since_timestamp: str = None) -> List[Dict[str, Any]]:
+        return self._run(self.async_client.get_data_for_module(module_name, since_timestamp))
+
+    def iter_module_pages(self, module_name: str, since_timestamp: str = None, start_page: int = 1) -> Iterator[List[Dict[str, Any]]]:
+        return self._iterate(self.async_client.iter_module_pages(module_name, since_timestamp, start_page))
+
+    def iter_data_with_line_items(self, module_name: str, since_timestamp: Optional[str] = None,
+                                  start_page: int = 1, skip_ids: Optional[Set[str]] = None) -> Iterator[Dict[str, Any]]:
+        return self._iterate(self.async_client.iter_data_with_line_items(module_name, since_timestamp, start_page, skip_ids))
+
+    def get_data_for_module_with_line_items(self, module_name: str, since_timestamp: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+        return self._run(self.async_client.get_data_for_module_with_line_items(module_name, since_timestamp))
+
+    def fetch_specific_records(self, module_name: str, record_ids: List[str]) -> List[Dict[str, Any]]:
+        return self._run(self.async_client.fetch_specific_records(module_name, record_ids))
+
+    def get_detail_cache_stats(self) -> Optional[Dict[str, Any]]:
+        return self.async_client.get_detail_cache_stats()
+
+    def get_modified_records_report(self, module_name: str, since_timestamp: str) -> List[Dict[str, Any]]:
+        return self._run(self.async_client.get_modified_records_report(module_name, since_timestamp))
+
+    def close(self) -> None:
+        """Close the pooled session and the private event loop."""
+        if not self._loop.is_closed():
+            self._run(self.async_client.close())
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop_thread.join()
+            self._loop.close()
@@ -1,14 +1,36 @@
-import requests
 import sys
 import logging
-from typing import Dict
+import threading
+import time
+from typing import Dict, Optional, Tuple
 
 # Updated import for the new package structure
 from . import secrets
+from .token_cache import CredentialCache, cache_enabled, TOKEN_EXPIRY_MARGIN
 
 logger = logging.getLogger(__name__)
 
-def get_access_token(zoho_credentials: Dict[str, str]) -> str:
+# Zoho access tokens are valid for one hour unless the response says otherwise
+DEFAULT_TOKEN_LIFETIME = 3600
+
+def get_access_token(zoho_credentials: Dict[str, str], use_cache: bool = True) -> str:
+    """
+    Returns a Zoho access token, reusing a cached one while it is still valid.
+
+    Args:
+        zoho_credentials: A dictionary containing client_id, client_secret,
+                          and refresh_token fetched from GCP.
+        use_cache: Reuse (and store) tokens in the local credential cache.
+
+    Returns:
+        The access token as a string.
+
+    Raises:
+        SystemExit: If the API call fails or the response is invalid.
+    """
+    return AccessTokenProvider(zoho_credentials, use_cache=use_cache).get_token()
+
+def request_access_token(zoho_credentials: Dict[str, str]) -> Tuple[str, int]:
     """
     Exchanges a Zoho refresh token for a new access token.
 
@@ -17,11 +39,13 @@ def get_access_token(zoho_credentials: Dict[str, str]) -> str:
                           and refresh_token fetched from GCP.
 
     Returns:
-        The new access token as a string.
+        Tuple of (access token, lifetime in seconds).
 
     Raises:
         SystemExit: If the API call fails or the response is invalid.
     """
+    import requests
+
     logger.info("Preparing to fetch Zoho access token...")
 
     # We get the URL from the credentials dict, which will later come from settings.
@@ -50,7 +74,7 @@ def get_access_token(zoho_credentials: Dict[str, str]) -> str:
             raise SystemExit(1)
 
         logger.info("Successfully obtained new Zoho access token.")
-        return access_token
+        return access_token, int(response_json.get("expires_in") or DEFAULT_TOKEN_LIFETIME)
 
     except requests.exceptions.RequestException as e:
         logger.error(f"A network error occurred while contacting Zoho: {e}")
@@ -60,5 +84,65 @@ def get_access_token(zoho_credentials: Dict[str, str]) -> str:
             logger.error(f"Response Body: {e.response.text}")
         raise SystemExit(1)
     except Exception as e:
-        logger.error(f"An unexpected error occurred in get_access_token: {e}")
+        logger.error(f"An unexpected error occurred in request_access_token: {e}")
         raise SystemExit(1)
+
+
+class AccessTokenProvider:
+    """
+    Hands out a valid access token and refreshes it when it expires or is rejected.
+
+    Tokens are shared through the local credential cache, so consecutive runs
+    within the hour reuse one token. ``get_token()`` renews a token shortly
+    before it expires, and ``refresh()`` replaces one the API rejected. Both are
+    thread-safe: when several workers see the same 401, only the first one
+    exchanges the refresh token and the others get the new token.
+    """
+
+    def __init__(self, zoho_credentials: Dict[str, str], cache: Optional[CredentialCache] = None,
+                 use_cache: bool = True):
+        """
+        Args:
+            zoho_credentials: Credentials holding the refresh token.
+            cache: Credential cache to use (the default cache if None).
+            use_cache: Set False to always request new tokens.
+        """
+        self.zoho_credentials = zoho_credentials
+        self.cache = (cache or CredentialCache()) if use_cache and cache_enabled() else None
+        self._lock = threading.Lock()
+        self._token = None
+        self._expires_at = 0.0
+
+    def get_token(self) -> str:
+        """Return a valid token: the current one, a cached one, or a new exchange."""
+        with self._lock:
+            if self._token is not None and self._expires_at - TOKEN_EXPIRY_MARGIN > time.time():
+                return self._token
+            cached = self.cache.get_access_token(self.zoho_credentials) if self.cache else None
+            if cached and cached["access_token"] != self._token:
+                logger.info("Using cached Zoho access token.")
+                self._token, self._expires_at = cached["access_token"], cached["expires_at"]
+            else:
+                self._exchange()
+            return self._token
+
+    def refresh(self, rejected_token: Optional[str] = None) -> str:
+        """
+        Get a new token after ``rejected_token`` was refused (e.g. a 401 mid-run).
+
+        Returns:
+            The new token (or a newer one another thread already obtained).
+        """
+        with self._lock:
+            if rejected_token is not None and self._token is not None and self._token != rejected_token:
+                return self._token
+            logger.info("🔑 Access token rejected or expired, requesting a new one...")
+            self._exchange()
+            return self._token
+
+    def _exchange(self) -> None:
+        """Request a new token (caller holds the lock)."""
+        access_token, expires_in = request_access_token(self.zoho_credentials)
+        self._token, self._expires_at = access_token, time.time() + expires_in
+        if self.cache:
+            self.cache.save_access_token(self.zoho_credentials, access_token, expires_in)
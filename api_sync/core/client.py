@@ -1,20 +1,37 @@
-import time
 import requests
 import json
 import logging
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple, Iterator, Set
 from ..utils import ensure_zoho_timestamp_format
+from .rate_limiter import TokenBucketRateLimiter
+from .transport import ZohoTransport, is_exhausted_failure
+from .quota import QuotaLedger
+from .detail_cache import DetailRecordCache
+from .record_helpers import ZohoRecordHelpers
+from ..processing.local_index import LocalRecordIndex
 
 logger = logging.getLogger(__name__)
 
-class ZohoClient:
+class ZohoClient(ZohoRecordHelpers):
     """
     A client for interacting with the Zoho Books API.
 
     Handles authentication headers, pagination, and basic error handling.
-    Designed to fetch data one module at a time.
+    Designed to fetch data one module at a time. Detail records for modules with
+    line items can be fetched by a bounded worker pool that shares one rate limiter.
+    All requests go through a single ZohoTransport (pooled session, retries with
+    backoff, circuit breaker). Record handling that does not touch the network is
+    inherited from ZohoRecordHelpers (shared with AsyncZohoClient).
     """
-    def __init__(self, access_token: str, organization_id: str, api_base_url: str):
+    def __init__(self, access_token: str, organization_id: str, api_base_url: str,
+                 rate_limiter: Optional[TokenBucketRateLimiter] = None,
+                 detail_concurrency: Optional[Dict[str, int]] = None,
+                 transport: Optional[ZohoTransport] = None,
+                 quota_ledger: Optional[QuotaLedger] = None,
+                 record_index: Optional[LocalRecordIndex] = None,
+                 detail_cache: Optional[DetailRecordCache] = None,
+                 token_provider=None):
         """
         Initializes the Zoho API client.
 
@@ -22,6 +39,19 @@ class ZohoClient:
             access_token: The active OAuth2 access token.
             organization_id: The ID of the Zoho Books organization to query.
             api_base_url: The base URL for the Zoho Books API.
+            rate_limiter: Shared token bucket for all detail fetch workers.
+                          A default limiter sized to Zoho's per-minute quota is used if None.
+            detail_concurrency: Optional mapping of module name -> number of detail
+                                fetch workers. Modules not listed fetch sequentially.
+            transport: HTTP transport for all requests. A default one using
+                       ``rate_limiter`` and pooled for the largest worker count is used if None.
+            quota_ledger: Daily call ledger for the default transport (optional).
+            record_index: Index of locally saved detailed records. When given, detail
+                          calls are skipped for headers whose last_modified_time is unchanged.
+            detail_cache: Persistent cache of detail responses consulted by every
+                          detail fetch (optional).
+            token_provider: AccessTokenProvider used by the default transport to renew the
+                            token before it expires and after a 401 (optional).
         """
         if not all([access_token, organization_id, api_base_url]):
             raise ValueError("Access token, organization ID, and API base URL are required.")
@@ -32,31 +62,46 @@ class ZohoClient:
         self.headers = {
             "Authorization": f"Zoho-oauthtoken {self.access_token}"
         }
+        self.rate_limiter = rate_limiter or TokenBucketRateLimiter()
+        self._init_record_helpers(detail_concurrency, record_index, detail_cache)
+        self.transport = transport or ZohoTransport(
+            self.headers,
+            rate_limiter=self.rate_limiter,
+            pool_maxsize=max([10] + list(self.detail_concurrency.values())),
+            quota_ledger=quota_ledger,
+            token_provider=token_provider
+        )
+        self.token_provider = token_provider
+        self.quota_ledger = self.transport.quota_ledger
         logger.info("ZohoClient initialized successfully.")
 
-    def _get_all_pages(self, module_name: str, params: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+    def iter_pages(self, module_name: str, params: Dict[str, Any] = None, start_page: int = 1) -> Iterator[List[Dict[str, Any]]]:
         """
-        Private helper method to handle pagination for any given module.
+        Generator that handles pagination for any given module, yielding one page at a time.
         This is the core engine for all data-fetching methods.
         
-        � OPTIMIZED: Uses efficient API-side filtering (all modules support it)
+        Only the current page is held in memory, so callers that write each page
+        to disk as it arrives keep memory bounded by the page size.
 
         Args:
             module_name: The API name of the module (e.g., 'invoices', 'contacts').
                          This is also used as the response key.
             params: Optional dictionary of query parameters.
+            start_page: First page to request (used when resuming an interrupted sync).
 
-        Returns:
-            A list containing all items for the module from all pages.
+        Yields:
+            The list of items on each page, in page order starting at ``start_page``.
+
+        Raises:
+            requests.exceptions.RequestException: If a page cannot be fetched. Pages
+            already yielded stand, so streaming callers can checkpoint and resume.
         """
-        all_items = []
-        page = 1
-        has_more_pages = True
-        endpoint = f"/{module_name}"
+        page = start_page
+        total_items = 0
+        full_url = f"{self.base_url}/{module_name}"
 
-        # Ensure params is a dict and add the mandatory organization_id
-        if params is None:
-            params = {}
+        # Copy params (each in-flight request gets its own) and add the mandatory organization_id
+        params = dict(params or {})
         params['organization_id'] = self.organization_id
 
         # Check if we're doing incremental sync with API filtering
@@ -68,74 +113,98 @@ class ZohoClient:
         logger.info(f"Fetching all records for module: '{module_name}'")
         print(f"[FETCH] Starting paginated fetch for {module_name}...")
         
-        while has_more_pages:
-            params['page'] = page
+        # PIPELINED: as soon as a page says has_more_page, the next page is requested
+        # in the background while the caller parses and persists the current one.
+        # Pacing comes from the shared rate limiter inside the transport.
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"zoho-{module_name}-pages") as prefetcher:
+            print(f"[FETCH] Fetching page {page} of {module_name}...")
+            in_flight = prefetcher.submit(self._fetch_page, full_url, dict(params, page=page), module_name)
             
-            try:
-                full_url = f"{self.base_url}{endpoint}"
-                logger.debug(f"Requesting page {page} from {full_url}")
-                print(f"[FETCH] Fetching page {page} of {module_name}...")
-                
-                response = requests.get(full_url, headers=self.headers, params=params)
-                
-                # Gracefully handle rate limiting (429 Too Many Requests)
-                if response.status_code == 429:
-                    logger.warning("Rate limit hit. Waiting for 60 seconds before retrying...")
-                    print("[WARN] Rate limit hit. Waiting 60 seconds before retrying...")
-                    time.sleep(60)
-                    continue # Retry the same page without incrementing
-
-                response.raise_for_status() # Raise an exception for other bad status codes (4xx, 5xx)
-                
-                data = response.json()
+            while in_flight is not None:
+                try:
+                    data = in_flight.result()
+                except requests.exceptions.RequestException as e:
+                    logger.error(f"A network error occurred while fetching '{module_name}' on page {page}.")
+                    if e.response is not None:
+                        logger.error(f"Response Status: {e.response.status_code}")
+                        logger.error(f"Response Body: {e.response.text}")
+                    logger.error("Aborting fetch for this module.")
+                    raise
                 
                 # The response key (e.g., "invoices") is the same as the module name
                 items_on_page = data.get(module_name, [])
-                
-                if items_on_page:
-                    all_items.extend(items_on_page)
+                total_items += len(items_on_page)
                 
                 page_context = data.get("page_context", {})
                 has_more_pages = page_context.get("has_more_page", False)
                 
                 logger.debug(f"Found {len(items_on_page)} items on page {page}. More pages: {has_more_pages}")
-                print(f"[FETCH] Page {page}: Found {len(items_on_page)} records. Total so far: {len(all_items)}")
-
+                print(f"[FETCH] Page {page}: Found {len(items_on_page)} records. Total so far: {total_items}")
+                
+                in_flight = None
                 if has_more_pages:
-                    page += 1
-                    print(f"[FETCH] More pages available. Moving to page {page}...")
+                    print(f"[FETCH] More pages available. Prefetching page {page + 1}...")
+                    in_flight = prefetcher.submit(self._fetch_page, full_url, dict(params, page=page + 1), module_name)
                 else:
-                    print(f"[FETCH] Completed fetch. Total records: {len(all_items)}")
+                    print(f"[FETCH] Completed fetch. Total records: {total_items}")
                 
-                # Be a good API citizen: add a small delay between paged requests
-                time.sleep(1.2)
-
-            except requests.exceptions.RequestException as e:
-                logger.error(f"A network error occurred while fetching '{module_name}' on page {page}.")
-                if e.response is not None:
-                    logger.error(f"Response Status: {e.response.status_code}")
-                    logger.error(f"Response Body: {e.response.text}")
-                logger.error("Aborting fetch for this module.")
-                # On error, stop processing this module and return what we have so far
-                break
+                # Release the response before handing the page to the caller
+                del data
+                yield items_on_page
+                page += 1
 
-        logger.info(f"Finished. Total records for '{module_name}': {len(all_items)}")
+        logger.info(f"Finished. Total records for '{module_name}': {total_items}")
         if using_api_filter:
-            logger.info(f"🎯 API-FILTERED: Efficiently fetched {len(all_items)} filtered records")
+            logger.info(f"🎯 API-FILTERED: Efficiently fetched {total_items} filtered records")
+
+    def _fetch_page(self, full_url: str, params: Dict[str, Any], module_name: str) -> Dict[str, Any]:
+        """
+        Fetch and decode one list page.
+
+        Raises:
+            requests.exceptions.RequestException: If the request fails after the transport's retries.
+        """
+        logger.debug(f"Requesting page {params.get('page')} from {full_url}")
+        # The transport retries rate limits (429) and server errors with backoff
+        response = self.transport.get(full_url, params=params, module=module_name)
+        response.raise_for_status() # Raise an exception for other bad status codes (4xx, 5xx)
+        return response.json()
+
+    def _get_all_pages(self, module_name: str, params: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """
+        Private helper that collects every page from ``iter_pages`` into one list.
+
+        Args:
+            module_name: The API name of the module (e.g., 'invoices', 'contacts').
+            params: Optional dictionary of query parameters.
+
+        Returns:
+            A list containing all items for the module from all pages.
+
+        Raises:
+            requests.exceptions.RequestException: If a page cannot be fetched
+            (see ZohoRecordHelpers for the failure contract).
+        """
+        all_items = []
+        try:
+            for items_on_page in self.iter_pages(module_name, params):
+                all_items.extend(items_on_page)
+        except requests.exceptions.RequestException as e:
+            # A partial module must not pass for a complete one: the caller marks it failed
+            logger.error(f"Fetching '{module_name}' failed after {len(all_items)} records: {e}")
+            raise
         return all_items
 
-    def get_data_for_module(self, module_name: str, since_timestamp: str = None) -> List[Dict[str, Any]]:
+    def _build_module_params(self, module_name: str, since_timestamp: str = None) -> Dict[str, Any]:
         """
-        Fetches all records for a specific module with efficient API-side filtering.
-        
-        ✅ OPTIMIZED: Uses API-side filtering (all modules support last_modified_time)
-        
+        Build list-endpoint query parameters, adding the API-side modified-time filter.
+
         Args:
-            module_name: The name of the module to fetch data for (e.g., 'invoices').
+            module_name: The name of the module being fetched.
             since_timestamp: Optional ISO-8601 timestamp to only fetch records modified since that time.
-        
+
         Returns:
-            A list of records from the specified module.
+            Query parameters for the module list endpoint.
         """
         params = {}
         
@@ -149,14 +218,56 @@ class ZohoClient:
                 print(f"[API-FILTER] {module_name}: Using cutoff {zoho_timestamp}")
             else:
                 logger.warning(f"Invalid timestamp format: {since_timestamp}")
+        return params
+
+    def iter_module_pages(self, module_name: str, since_timestamp: str = None, start_page: int = 1) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Streaming counterpart of ``get_data_for_module``: yields the module's records page by page.
+        
+        Args:
+            module_name: The name of the module to fetch data for (e.g., 'invoices').
+            since_timestamp: Optional ISO-8601 timestamp to only fetch records modified since that time.
+            start_page: First page to request (used when resuming an interrupted sync).
+        
+        Yields:
+            Lists of records, one per API page.
+        """
+        params = self._build_module_params(module_name, since_timestamp)
         
         # Special handling for certain modules
         if module_name == "organizations":
             # Organizations endpoint is different and returns a direct list
-            return self._get_organizations()
+            if start_page == 1:
+                yield self._get_organizations()
+            return
+        
+        yield from self.iter_pages(module_name, params, start_page)
+
+    def get_data_for_module(self, module_name: str, since_timestamp: str = None) -> List[Dict[str, Any]]:
+        """
+        Fetches all records for a specific module with efficient API-side filtering.
         
-        # Fetch records using efficient API-side filtering
-        all_items = self._get_all_pages(module_name, params)
+        ✅ OPTIMIZED: Uses API-side filtering (all modules support last_modified_time)
+        
+        Args:
+            module_name: The name of the module to fetch data for (e.g., 'invoices').
+            since_timestamp: Optional ISO-8601 timestamp to only fetch records modified since that time.
+        
+        Returns:
+            A list of records from the specified module.
+
+        Raises:
+            requests.exceptions.RequestException: If a page cannot be fetched
+            (see ZohoRecordHelpers for the failure contract).
+        """
+        all_items = []
+        try:
+            for items_on_page in self.iter_module_pages(module_name, since_timestamp):
+                all_items.extend(items_on_page)
+        except requests.exceptions.RequestException as e:
+            # A partial module must not pass for a complete one: the caller marks it failed
+            logger.error(f"Fetching '{module_name}' failed after {len(all_items)} records: {e}")
+            raise
         
         logger.info(f"📊 API FILTER RESULTS: Fetched {len(all_items)} {module_name} records")
         if since_timestamp:
@@ -173,7 +284,7 @@ class ZohoClient:
             full_url = f"{self.base_url}{endpoint}"
             
             logger.info(f"Fetching organizations from {full_url}")
-            response = requests.get(full_url, headers=self.headers)
+            response = self.transport.get(full_url, module="organizations")
             response.raise_for_status()
             
             data = response.json()
@@ -192,15 +303,6 @@ class ZohoClient:
             logger.error(f"An unexpected error occurred while fetching organizations: {str(e)}")
             return []
     
-    # Modules that have line items and need detailed fetching
-    MODULES_WITH_LINE_ITEMS = {
-        'invoices': 'invoice_id',
-        'bills': 'bill_id', 
-        'salesorders': 'salesorder_id',
-        'purchaseorders': 'purchaseorder_id',
-        'creditnotes': 'creditnote_id'
-    }
-
     def get_data_for_module_with_line_items(self, module_name: str, since_timestamp: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
         """
         Fetches all data for a module including detailed records with line items.
@@ -219,11 +321,53 @@ class ZohoClient:
             
         Returns:
             Dictionary with 'headers' and 'line_items' lists
+
+        Raises:
+            requests.exceptions.RequestException: If a page or a detail record cannot be
+            fetched (see ZohoRecordHelpers for the failure contract).
+        """
+        detailed_records = []
+        all_line_items = []
+        try:
+            for batch in self.iter_data_with_line_items(module_name, since_timestamp):
+                detailed_records.extend(batch['headers'])
+                all_line_items.extend(batch['line_items'])
+        except requests.exceptions.RequestException as e:
+            # A partial module must not pass for a complete one: the caller marks it failed
+            logger.error(f"Fetching '{module_name}' with line items failed after "
+                         f"{len(detailed_records)} records: {e}")
+            raise
+        
+        return {
+            'headers': detailed_records,
+            'line_items': all_line_items
+        }
+
+    def iter_data_with_line_items(self, module_name: str, since_timestamp: Optional[str] = None,
+                                  start_page: int = 1, skip_ids: Optional[Set[str]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Streaming counterpart of ``get_data_for_module_with_line_items``.
+        
+        Yields batches of at most DETAIL_BATCH_SIZE detailed records, so detailed
+        records and line items are only held in memory for a small batch at a time.
+        Each batch carries the list page it came from and whether that page is now
+        complete, which is what resume checkpoints are built on. A page is only
+        complete once every header with an ID on it produced a detailed record.
+        
+        Args:
+            module_name: The name of the module to fetch
+            since_timestamp: Optional timestamp to filter records
+            start_page: First header page to request (used when resuming)
+            skip_ids: Record IDs whose details were already fetched (used when resuming)
+            
+        Yields:
+            Dictionaries with 'headers', 'line_items', 'page' and 'page_complete'
         """
         if module_name not in self.MODULES_WITH_LINE_ITEMS:
             # For modules without line items, just return headers
-            headers = self.get_data_for_module(module_name, since_timestamp)
-            return {'headers': headers, 'line_items': []}
+            for page_offset, headers in enumerate(self.iter_module_pages(module_name, since_timestamp, start_page)):
+                yield {'headers': headers, 'line_items': [], 'page': start_page + page_offset, 'page_complete': True}
+            return
         
         # SMART CHECK: Do we already have comprehensive line item data?
         # OPTION A: Force bypass comprehensive data check during incremental sync
@@ -247,8 +391,9 @@ class ZohoClient:
             print(f"[SMART] This saves {1000}+ individual API calls!")
             
             # Just get headers, we already have line items in consolidated data
-            headers = self.get_data_for_module(module_name, since_timestamp)
-            return {'headers': headers, 'line_items': []}
+            for page_offset, headers in enumerate(self.iter_module_pages(module_name, since_timestamp, start_page)):
+                yield {'headers': headers, 'line_items': [], 'page': start_page + page_offset, 'page_complete': True}
+            return
         
         # OPTION A: When incremental sync is requested, ALWAYS fetch line items individually
         if since_timestamp:
@@ -263,79 +408,170 @@ class ZohoClient:
         
         # Get the ID field for this module
         id_field = self.MODULES_WITH_LINE_ITEMS[module_name]
+        total_records = 0
+        total_line_items = 0
+        reused_total = 0
         
-        # First, get the list of records (headers only)
+        # Headers arrive page by page; each page's details are fetched before the next page
         logger.info(f"Fetching {module_name} headers...")
         print(f"[VERBOSE] Step 1: Fetching {module_name} headers...")
-        headers = self.get_data_for_module(module_name, since_timestamp)
-        
-        if not headers:
+        for page_offset, headers in enumerate(self.iter_module_pages(module_name, since_timestamp, start_page)):
+            page_number = start_page + page_offset
+            print(f"[VERBOSE] Found {len(headers)} {module_name} headers")
+            
+            if skip_ids:
+                pending = [header for header in headers if header.get(id_field) not in skip_ids]
+                if len(pending) < len(headers):
+                    logger.info(f"⏭️ RESUME: {len(headers) - len(pending)} {module_name} details on page {page_number} already fetched")
+                headers = pending
+            
+            if not headers:
+                yield {'headers': [], 'line_items': [], 'page': page_number, 'page_complete': True}
+                continue
+            
+            # Then fetch detailed data for each record to get line items
+            logger.info(f"📋 INDIVIDUAL FETCH: Processing {len(headers)} records to get line items")
+            print(f"[VERBOSE] Step 2: Fetching detailed records with line items...")
+            # IDs on this page without a detailed record; the page stays open for resume
+            missing_on_page = 0
+            for batch_start in range(0, len(headers), self.DETAIL_BATCH_SIZE):
+                batch_headers = headers[batch_start:batch_start + self.DETAIL_BATCH_SIZE]
+                reused, to_fetch = self._reuse_unchanged_details(module_name, batch_headers, id_field)
+                fetched = dict(self._fetch_detailed_records(module_name, to_fetch, id_field)) if to_fetch else {}
+                reused_total += len(reused)
+                detailed_records = []
+                batch_line_items = []
+                
+                # Keep header order across reused and freshly fetched records
+                for header in batch_headers:
+                    record_id = header.get(id_field)
+                    detailed_record = reused.get(str(record_id)) or fetched.get(record_id)
+                    if not detailed_record:
+                        if record_id:
+                            missing_on_page += 1
+                        continue
+                    detailed_records.append(detailed_record)
+                    
+                    # Extract line items if present
+                    line_items = self._extract_line_items(detailed_record, module_name, record_id)
+                    batch_line_items.extend(line_items)
+                
+                total_records += len(detailed_records)
+                total_line_items += len(batch_line_items)
+                # Use detailed records instead of basic headers
+                yield {
+                    'headers': detailed_records,
+                    'line_items': batch_line_items,
+                    'page': page_number,
+                    'page_complete': batch_start + self.DETAIL_BATCH_SIZE >= len(headers) and not missing_on_page
+                }
+            if missing_on_page:
+                logger.warning(f"{missing_on_page} {module_name} details on page {page_number} could not be fetched; "
+                               f"a resumed sync retries them")
+        
+        if total_records == 0:
             logger.info(f"No {module_name} found, no line items to fetch")
             print(f"[VERBOSE] No {module_name} found, no line items to fetch")
-            return {'headers': [], 'line_items': []}
+            return
         
-        print(f"[VERBOSE] Found {len(headers)} {module_name} headers")
-        
-        # Then fetch detailed data for each record to get line items
-        logger.info(f"Fetching detailed data with line items for {len(headers)} {module_name}...")
-        logger.info(f"📋 INDIVIDUAL FETCH: Processing {len(headers)} records to get line items")
         if since_timestamp:
             logger.info(f"📅 Incremental sync active: since {since_timestamp}")
         else:
             logger.info(f"📅 Full sync: no timestamp filter")
-        print(f"[VERBOSE] Step 2: Fetching detailed records with line items...")
-        detailed_records = []
-        all_line_items = []
+        logger.info(f"Successfully fetched {total_records} detailed {module_name} with {total_line_items} total line items")
+        print(f"[VERBOSE] Completed: {total_records} detailed records with {total_line_items} line items")
+        if reused_total:
+            logger.info(f"⏭️ UNCHANGED: Reused {reused_total} saved {module_name} records, "
+                        f"{total_records - reused_total} detail calls made")
+            print(f"[SMART] Reused {reused_total} unchanged {module_name} records from local storage")
+    
+    def _fetch_detailed_records(self, module_name: str, headers: List[Dict[str, Any]], id_field: str) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Fetch the detailed record for every header, preserving header order.
+        
+        Uses a bounded worker pool sized by the module's configured concurrency.
+        Every request goes through the transport, which takes a token from the
+        shared rate limiter so the combined request rate stays within quota.
         
+        Args:
+            module_name: The module name (e.g., 'invoices')
+            headers: Header records returned by the list endpoint
+            id_field: Name of the record ID field for this module
+            
+        Returns:
+            List of (record_id, detailed_record) tuples in header order
+            (records the API could not return, e.g. 404s, are omitted)
+
+        Raises:
+            requests.exceptions.RequestException: If a detail request fails after the
+            transport's retries or the circuit is open.
+        """
+        record_ids = []
+        modified_times = {}
         for i, header in enumerate(headers):
             record_id = header.get(id_field)
             if not record_id:
                 logger.warning(f"No {id_field} found in {module_name} record {i+1}")
                 continue
-            
+            record_ids.append(record_id)
+            modified_times[record_id] = header.get('last_modified_time')
+        
+        total = len(record_ids)
+        workers = min(self.get_detail_concurrency(module_name), max(1, total))
+        logger.info(f"📋 DETAIL FETCH: {total} {module_name} records with {workers} worker(s)")
+        
+        def fetch_one(indexed_id):
+            index, record_id = indexed_id
+            detailed_record = self._get_detailed_record(module_name, record_id, modified_times.get(record_id))
             # Show progress for large batches
-            if len(headers) > 10 and (i + 1) % 10 == 0:
-                print(f"[VERBOSE] Processing record {i+1}/{len(headers)}...")
-                
-            # Fetch detailed record
-            detailed_record = self._get_detailed_record(module_name, record_id)
-            if detailed_record:
-                detailed_records.append(detailed_record)
-                
-                # Extract line items if present
-                line_items = self._extract_line_items(detailed_record, module_name, record_id)
-                all_line_items.extend(line_items)
-                
-            # Rate limiting - small delay between requests
-            if i > 0 and i % 10 == 0:
-                logger.info(f"Processed {i+1}/{len(headers)} {module_name} records...")
-                time.sleep(0.5)  # Short pause every 10 requests
+            if total > 10 and (index + 1) % 10 == 0:
+                print(f"[VERBOSE] Processing record {index+1}/{total}...")
+                logger.info(f"Processed {index+1}/{total} {module_name} records...")
+            return detailed_record
         
-        logger.info(f"Successfully fetched {len(detailed_records)} detailed {module_name} with {len(all_line_items)} total line items")
-        print(f"[VERBOSE] Completed: {len(detailed_records)} detailed records with {len(all_line_items)} line items")
+        if workers == 1:
+            results = [fetch_one(item) for item in enumerate(record_ids)]
+        else:
+            # executor.map yields results in submission order, keeping header order
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"zoho-{module_name}") as executor:
+                try:
+                    results = list(executor.map(fetch_one, enumerate(record_ids)))
+                except Exception:
+                    # The module fails anyway: don't spend calls on the queued records
+                    executor.shutdown(wait=True, cancel_futures=True)
+                    raise
         
-        return {
-            'headers': detailed_records,  # Use detailed records instead of basic headers
-            'line_items': all_line_items
-        }
-    
-    def _get_detailed_record(self, module_name: str, record_id: str) -> Optional[Dict[str, Any]]:
+        return [(record_id, record) for record_id, record in zip(record_ids, results) if record]
+
+    def _get_detailed_record(self, module_name: str, record_id: str,
+                             last_modified_time: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """
         Fetch detailed data for a single record including line items.
         
+        The detail cache is consulted first; a fetched record is added to it.
+        
         Args:
             module_name: The module name (e.g., 'invoices')
             record_id: The ID of the specific record
+            last_modified_time: The header's last_modified_time (cache key), if known
             
         Returns:
             Detailed record data or None if failed
+
+        Raises:
+            requests.exceptions.RequestException: If the circuit is open or the request
+            still fails after the transport's retries (see ``is_exhausted_failure``).
         """
+        cached = self._cached_detail(module_name, record_id, last_modified_time)
+        if cached is not None:
+            return cached
+        
         try:
             endpoint = f"/{module_name}/{record_id}"
             params = {'organization_id': self.organization_id}
             full_url = f"{self.base_url}{endpoint}"
             
-            response = requests.get(full_url, headers=self.headers, params=params)
+            response = self.transport.get(full_url, params=params, module=module_name)
             response.raise_for_status()
             
             data = response.json()
@@ -345,176 +581,21 @@ class ZohoClient:
             singular_key = module_name.rstrip('s')  # invoices -> invoice, bills -> bill
             record = data.get(singular_key, data)
             
+            self._store_detail(module_name, record_id, record, last_modified_time)
             return record
             
         except requests.exceptions.RequestException as e:
+            if is_exhausted_failure(e):
+                # Dropping the record would let the module finalize without it; fail the
+                # module instead so the temporary directory stays resumable
+                logger.error(f"Giving up on detailed {module_name} record {record_id}: {e}")
+                raise
             logger.warning(f"Failed to fetch detailed {module_name} record {record_id}: {e}")
-            if e.response is not None and e.response.status_code == 429:
-                # Rate limit hit, wait and retry once
-                logger.info("Rate limit hit, waiting 60 seconds...")
-                time.sleep(60)
-                try:
-                    response = requests.get(full_url, headers=self.headers, params=params)
-                    response.raise_for_status()
-                    data = response.json()
-                    singular_key = module_name.rstrip('s')
-                    return data.get(singular_key, data)
-                except:
-                    pass
             return None
         except Exception as e:
             logger.warning(f"Unexpected error fetching detailed {module_name} record {record_id}: {e}")
             return None
-    
-    def _extract_line_items(self, detailed_record: Dict[str, Any], module_name: str, record_id: str) -> List[Dict[str, Any]]:
-        """
-        Extract line items from a detailed record.
-        
-        Args:
-            detailed_record: The detailed record containing line items
-            module_name: The module name for context
-            record_id: The parent record ID
-            
-        Returns:
-            List of line item dictionaries
-        """
-        line_items = []
-        
-        # Common line item field names in Zoho Books
-        line_item_fields = ['line_items', 'invoice_items', 'bill_items', 'items']
-        
-        for field in line_item_fields:
-            if field in detailed_record:
-                items = detailed_record[field]
-                if isinstance(items, list):
-                    for item in items:
-                        # Add parent reference to line item
-                        if isinstance(item, dict):
-                            item['parent_id'] = record_id
-                            item['parent_type'] = module_name.rstrip('s')  # invoices -> invoice
-                            line_items.append(item)
-                break
-        
-        return line_items
 
-    def _has_comprehensive_line_item_data(self, module_name: str) -> bool:
-        """
-        Check if we already have comprehensive line item data for a module.
-        This prevents unnecessary individual API calls when we have complete data.
-        
-        ⚠️ FIXED: Now prioritizes JSON storage (API sync data) over database
-        
-        Priority order for API sync operations:
-        1. Check recent timestamped directories (most recent API data)
-        2. Check consolidated JSON files with line items  
-        3. Check database for existing line items (fallback)
-        """
-        logger.info(f"🔍 CHECKING for comprehensive {module_name} line item data...")
-        
-        try:
-            # PRIORITY 1: Check recent timestamped directories first (most recent API data)
-            from pathlib import Path
-            import json
-            
-            base_path = Path("data/raw_json")
-            logger.info(f"� Checking JSON storage in: {base_path}")
-            
-            timestamped_dirs = [d for d in base_path.iterdir() 
-                              if d.is_dir() and self._is_timestamped_dir(d.name)]
-            
-            if timestamped_dirs:
-                logger.info(f"� Found {len(timestamped_dirs)} timestamped directories")
-                # Check last few recent directories
-                recent_dirs = sorted(timestamped_dirs, key=lambda x: x.name)[-5:]
-                logger.info(f"📂 Checking {len(recent_dirs)} most recent directories")
-                
-                for directory in reversed(recent_dirs):  # Start with most recent
-                    line_items_file = directory / f"{module_name}_line_items.json"
-                    logger.info(f"📄 Checking: {line_items_file}")
-                    if line_items_file.exists():
-                        with open(line_items_file, 'r') as f:
-                            line_items_data = json.load(f)
-                            if line_items_data and len(line_items_data) > 100:  # Substantial data
-                                logger.warning(f"🎯 FOUND comprehensive line items in {directory.name} ({len(line_items_data)} items)")
-                                logger.warning(f"🚨 This will SKIP individual API fetches!")
-                                return True
-                            else:
-                                logger.info(f"� File exists but insufficient data: {len(line_items_data) if line_items_data else 0} items")
-                    else:
-                        logger.info(f"� Line items file not found in {directory.name}")
-            else:
-                logger.info(f"📂 No timestamped directories found in {base_path}")
-            
-            # PRIORITY 2: Check consolidated JSON files with line items
-            
-            # Check consolidated directory first
-            consolidated_dirs = [d for d in base_path.iterdir() 
-                               if d.is_dir() and d.name.startswith("CONSOLIDATED_")]
-            
-            if consolidated_dirs:
-                # Use most recent consolidated directory
-                latest_consolidated = sorted(consolidated_dirs, key=lambda x: x.name)[-1]
-                module_file = latest_consolidated / f"{module_name}.json"
-                line_items_file = latest_consolidated / f"{module_name}_line_items.json"
-                
-                if module_file.exists():
-                    # Check if the main module file has line items embedded
-                    with open(module_file, 'r') as f:
-                        data = json.load(f)
-                        if data and len(data) > 0:
-                            # Check if records have line_items embedded
-                            sample_record = data[0] if isinstance(data, list) else data
-                            if isinstance(sample_record, dict) and 'line_items' in sample_record:
-                                logger.info(f"Found comprehensive {module_name} data with embedded line items")
-                                return True
-                
-                if line_items_file.exists():
-                    logger.info(f"Found separate {module_name} line items file")
-                    return True
-            
-            # PRIORITY 3: Check recent timestamped directories for comprehensive data
-            timestamped_dirs = [d for d in base_path.iterdir() 
-                              if d.is_dir() and self._is_timestamped_dir(d.name)]
-            
-            if timestamped_dirs:
-                # Check last few recent directories
-                recent_dirs = sorted(timestamped_dirs, key=lambda x: x.name)[-5:]
-                
-                for directory in reversed(recent_dirs):  # Start with most recent
-                    line_items_file = directory / f"{module_name}_line_items.json"
-                    if line_items_file.exists():
-                        with open(line_items_file, 'r') as f:
-                            line_items_data = json.load(f)
-                            if line_items_data and len(line_items_data) > 100:  # Substantial data
-                                logger.info(f"Found comprehensive line items in {directory.name}")
-                                return True
-            
-            logger.info(f"🔍 NO comprehensive {module_name} line item data found")
-            logger.info(f"📋 Will need to fetch line items individually")
-            return False
-            
-        except Exception as e:
-            logger.warning(f"Error checking for comprehensive data: {e}")
-            logger.info(f"🔍 Due to error, assuming NO comprehensive data - will fetch individually")
-            return False
-    
-    def _is_timestamped_dir(self, dirname: str) -> bool:
-        """Check if directory name follows timestamp pattern."""
-        try:
-            parts = dirname.split('_')
-            if len(parts) != 2:
-                return False
-            
-            date_part, time_part = parts
-            date_elements = date_part.split('-')
-            time_elements = time_part.split('-')
-            
-            return (len(date_elements) == 3 and 
-                    len(time_elements) == 3 and
-                    all(elem.isdigit() for elem in date_elements + time_elements))
-        except:
-            return False
-    
     def get_modified_records_report(self, module_name: str, since_timestamp: str) -> List[Dict[str, Any]]:
         """
         Get a lightweight report of records modified since a given timestamp.
@@ -561,15 +642,7 @@ class ZohoClient:
                 logger.debug(f"Report request - Page {page}: {full_url}")
                 print(f"[REPORT] Scanning page {page} for modified records...")
                 
-                response = requests.get(full_url, headers=self.headers, params=params)
-                
-                # Handle rate limiting
-                if response.status_code == 429:
-                    logger.warning("Rate limit hit during report generation. Waiting...")
-                    print("[REPORT] Rate limit hit. Waiting 60 seconds...")
-                    time.sleep(60)
-                    continue
-                
+                response = self.transport.get(full_url, params=params, module=module_name)
                 response.raise_for_status()
                 data = response.json()
                 
@@ -579,59 +652,7 @@ class ZohoClient:
                     break
                 
                 # Filter records on client-side as backup (in case API filtering doesn't work)
-                filtered_items = []
-                cutoff_dt = None
-                
-                try:
-                    from datetime import datetime
-                    if 'T' in since_timestamp:
-                        cutoff_dt = datetime.fromisoformat(since_timestamp.replace('Z', '+00:00'))
-                    else:
-                        cutoff_dt = datetime.fromisoformat(since_timestamp)
-                    cutoff_dt = cutoff_dt.replace(tzinfo=None)
-                except Exception as e:
-                    logger.warning(f"Could not parse cutoff date: {e}")
-                
-                for item in items_on_page:
-                    # Check if this record was modified after our cutoff
-                    item_modified_str = item.get('last_modified_time') or item.get('updated_time')
-                    
-                    if item_modified_str and cutoff_dt:
-                        try:
-                            if 'T' in item_modified_str:
-                                item_modified_dt = datetime.fromisoformat(item_modified_str.replace('Z', '+00:00'))
-                            else:
-                                item_modified_dt = datetime.strptime(item_modified_str, '%Y-%m-%d')
-                            item_modified_dt = item_modified_dt.replace(tzinfo=None)
-                            
-                            if item_modified_dt >= cutoff_dt:
-                                # Keep only essential fields for the report
-                                report_item = {
-                                    'id': item.get(f'{module_name.rstrip("s")}_id', item.get('id')),
-                                    'last_modified_time': item_modified_str,
-                                    'date': item.get('date'),
-                                    'created_time': item.get('created_time')
-                                }
-                                filtered_items.append(report_item)
-                        except Exception as e:
-                            logger.warning(f"Could not parse modified time '{item_modified_str}': {e}")
-                            # Include item if we can't parse (safer)
-                            report_item = {
-                                'id': item.get(f'{module_name.rstrip("s")}_id', item.get('id')),
-                                'last_modified_time': item_modified_str,
-                                'date': item.get('date'),
-                                'created_time': item.get('created_time')
-                            }
-                            filtered_items.append(report_item)
-                    else:
-                        # No modified time or couldn't parse cutoff - include it (safer)
-                        report_item = {
-                            'id': item.get(f'{module_name.rstrip("s")}_id', item.get('id')),
-                            'last_modified_time': item_modified_str,
-                            'date': item.get('date'),
-                            'created_time': item.get('created_time')
-                        }
-                        filtered_items.append(report_item)
+                filtered_items = self._build_modified_report_items(module_name, items_on_page, since_timestamp)
                 
                 all_modified_records.extend(filtered_items)
                 
@@ -646,9 +667,7 @@ class ZohoClient:
                     page += 1
                 else:
                     print(f"[REPORT] Report complete: {len(all_modified_records)} modified records total")
-                
-                # Small delay between pages
-                time.sleep(0.8)
+
                 
             except requests.exceptions.RequestException as e:
                 logger.error(f"Error fetching report page {page}: {e}")
@@ -694,18 +713,13 @@ class ZohoClient:
                 if len(record_ids) > 10 and (i + 1) % 10 == 0:
                     print(f"[TARGETED] Fetching record {i+1}/{len(record_ids)}...")
                 
+                # Targeted re-fetches repair missing or stale records, so they
+                # always go to the API (the fresh record still refreshes the cache)
                 endpoint = f"/{module_name}/{record_id}"
                 params = {'organization_id': self.organization_id}
                 full_url = f"{self.base_url}{endpoint}"
                 
-                response = requests.get(full_url, headers=self.headers, params=params)
-                
-                # Handle rate limiting
-                if response.status_code == 429:
-                    logger.warning(f"Rate limit hit while fetching {record_id}. Waiting...")
-                    time.sleep(60)
-                    # Retry once
-                    response = requests.get(full_url, headers=self.headers, params=params)
+                response = self.transport.get(full_url, params=params, module=module_name)
                 
                 if response.status_code == 404:
                     logger.warning(f"Record {record_id} not found (404), skipping")
@@ -720,13 +734,12 @@ class ZohoClient:
                 record = data.get(singular_key, data)
                 
                 if record:
+                    self._store_detail(module_name, record_id, record)
                     fetched_records.append(record)
                 else:
                     logger.warning(f"No data returned for record {record_id}")
                     failed_count += 1
-                
-                # Rate limiting delay
-                time.sleep(0.3)
+
                 
             except requests.exceptions.RequestException as e:
                 logger.warning(f"Failed to fetch record {record_id}: {e}")
@@ -0,0 +1,203 @@
+"""
+Persistent cache of Zoho detail records.
+
+DetailRecordCache stores every detailed record fetched from ``/{module}/{id}``
+in a small SQLite file, compressed, keyed by (module, record_id,
+last_modified_time). A detail call for a record whose last_modified_time has
+not changed is answered from the cache, across runs, so re-running a failed
+sync repeats almost no detail calls. The file is bounded by size and evicts the
+least recently used records first.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from ..processing import json_codec
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Without a last_modified_time to compare, a cached record is only trusted this long
+DEFAULT_UNTIMED_MAX_AGE = 15 * 60
+
+# Eviction shrinks the cache to this fraction of max_bytes so it doesn't run on every store
+EVICTION_TARGET = 0.9
+
+
+class DetailRecordCache:
+    """
+    Size-bounded, LRU-evicted, compressed on-disk cache of detailed records.
+
+    Only the newest version of a record is kept: storing a record replaces any
+    entry for the same (module, record_id). Lookups with a last_modified_time
+    hit only when it equals the stored one. Lookups without one (e.g. targeted
+    fetches by ID) hit only entries stored within ``untimed_max_age`` seconds.
+
+    With ``bypass`` set, lookups always miss but fetched records are still
+    stored, which refreshes the cache without trusting it.
+    """
+
+    def __init__(self, cache_path: str = "data/detail_cache.db", max_bytes: int = DEFAULT_MAX_BYTES,
+                 untimed_max_age: float = DEFAULT_UNTIMED_MAX_AGE, bypass: bool = False):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_path: SQLite file holding the cache.
+            max_bytes: Maximum total size of the compressed records.
+            untimed_max_age: Seconds an entry may answer a lookup without last_modified_time.
+            bypass: Skip lookups (records are still stored).
+        """
+        self.cache_path = Path(cache_path)
+        self.max_bytes = max_bytes
+        self.untimed_max_age = untimed_max_age
+        self.bypass = bypass
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.cache_path), timeout=30, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS detail_records (
+                    module TEXT NOT NULL,
+                    record_id TEXT NOT NULL,
+                    last_modified_time TEXT,
+                    value BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    stored_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    PRIMARY KEY (module, record_id)
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_detail_records_access ON detail_records (last_access)")
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM detail_records").fetchone()[0]
+
+    def get(self, module_name: str, record_id: str,
+            last_modified_time: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Return the cached detailed record, or None on a miss.
+
+        Args:
+            module_name: The module name (e.g., 'invoices')
+            record_id: The record ID
+            last_modified_time: The header's last_modified_time, if known
+
+        Returns:
+            The detailed record, or None
+        """
+        if self.bypass:
+            return None
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT last_modified_time, value, stored_at FROM detail_records WHERE module = ? AND record_id = ?",
+                (module_name, str(record_id))
+            ).fetchone()
+
+            if row is not None:
+                cached_modified, value, stored_at = row
+                if last_modified_time:
+                    fresh = cached_modified == last_modified_time
+                else:
+                    fresh = time.time() - stored_at <= self.untimed_max_age
+                if fresh:
+                    self.hits += 1
+                    with self._conn:
+                        self._conn.execute(
+                            "UPDATE detail_records SET last_access = ? WHERE module = ? AND record_id = ?",
+                            (time.time(), module_name, str(record_id))
+                        )
+                    return json_codec.loads(zlib.decompress(value))
+
+            self.misses += 1
+            return None
+
+    def put(self, module_name: str, record_id: str, record: Dict[str, Any],
+            last_modified_time: Optional[str] = None) -> None:
+        """
+        Store a detailed record, replacing any older version.
+
+        Args:
+            module_name: The module name (e.g., 'invoices')
+            record_id: The record ID
+            record: The detailed record
+            last_modified_time: Fallback key when the record carries no last_modified_time
+        """
+        modified = record.get('last_modified_time') or last_modified_time
+        value = zlib.compress(json_codec.dumpb(record))
+        now = time.time()
+
+        with self._lock:
+            previous = self._conn.execute(
+                "SELECT size FROM detail_records WHERE module = ? AND record_id = ?",
+                (module_name, str(record_id))
+            ).fetchone()
+            with self._conn:
+                self._conn.execute("""
+                    INSERT OR REPLACE INTO detail_records
+                        (module, record_id, last_modified_time, value, size, stored_at, last_access)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, (module_name, str(record_id), modified, value, len(value), now, now))
+            self._total_bytes += len(value) - (previous[0] if previous else 0)
+            self.stores += 1
+
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        """Delete least recently used records until the cache is below the eviction target."""
+        target = self.max_bytes * EVICTION_TARGET
+        victims = []
+        for module_name, record_id, size in self._conn.execute(
+                "SELECT module, record_id, size FROM detail_records ORDER BY last_access"):
+            if self._total_bytes <= target:
+                break
+            victims.append((module_name, record_id))
+            self._total_bytes -= size
+
+        with self._conn:
+            self._conn.executemany("DELETE FROM detail_records WHERE module = ? AND record_id = ?", victims)
+        self.evictions += len(victims)
+        logger.debug(f"Detail cache evicted {len(victims)} records ({self._total_bytes} bytes kept)")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters for this process and the current cache size.
+
+        Returns:
+            Dictionary with hits, misses, hit_rate, stores, evictions, entries and bytes
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM detail_records").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": self._total_bytes,
+            "bypass": self.bypass
+        }
+
+    def clear(self) -> None:
+        """Remove every cached record."""
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM detail_records")
+            self._total_bytes = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,271 @@
+"""
+Daily API quota accounting for Zoho Books.
+
+QuotaLedger counts API calls per organization per day (and per module), records
+the rate-limit headers Zoho returns, and persists everything to a small JSON
+file so that the budget survives across process runs on the same day.
+"""
+
+import atexit
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+# Fallback daily limit when Zoho does not report one in response headers
+DEFAULT_DAILY_CALL_LIMIT = 5000
+
+# Rate-limit headers returned by Zoho APIs
+LIMIT_HEADER = "X-Rate-Limit-Limit"
+REMAINING_HEADER = "X-Rate-Limit-Remaining"
+RESET_HEADER = "X-Rate-Limit-Reset"
+
+
+@contextmanager
+def _file_lock(lock_path: Path):
+    """Hold an exclusive inter-process lock on ``lock_path`` (created if missing)."""
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, 'a+') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            while True:
+                try:
+                    # LK_LOCK itself gives up after 10 one-second attempts
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class QuotaLedger:
+    """
+    Persistent per-organization, per-day API call ledger.
+
+    Calls are counted in memory and merged into the ledger file at most every
+    ``flush_interval`` seconds (and on ``flush()``). Each merge re-reads the
+    file under an inter-process lock (``<ledger>.lock``) and replaces it
+    atomically, so concurrent processes add to each other's counts instead of
+    overwriting them.
+    """
+
+    def __init__(self, ledger_path: str, organization_id: str,
+                 daily_limit: int = DEFAULT_DAILY_CALL_LIMIT, flush_interval: float = 5.0):
+        """
+        Initialize the ledger.
+
+        Args:
+            ledger_path: JSON file that stores the ledger.
+            organization_id: Zoho organization the calls are charged to.
+            daily_limit: Configured daily call limit (used until Zoho reports one).
+            flush_interval: Minimum seconds between automatic writes.
+        """
+        self.ledger_path = Path(ledger_path)
+        self.organization_id = str(organization_id)
+        self.daily_limit = daily_limit
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._pending_calls: Dict[str, int] = {}
+        self._pending_throttled = 0
+        self._reported: Dict[str, Any] = {}
+        self._last_flush = time.monotonic()
+        self._day = date.today().isoformat()
+        self._persisted = self._read_day_entry()
+        # Make sure counts from this process reach the file even without an explicit flush
+        atexit.register(self.flush)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _read_ledger(self) -> Dict[str, Any]:
+        if not self.ledger_path.exists():
+            return {}
+        try:
+            with open(self.ledger_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"Could not read quota ledger {self.ledger_path}: {e}")
+            return {}
+
+    def _read_day_entry(self) -> Dict[str, Any]:
+        entry = self._read_ledger().get(self.organization_id, {}).get(self._day, {})
+        return {
+            "calls": entry.get("calls", 0),
+            "by_module": dict(entry.get("by_module", {})),
+            "throttled": entry.get("throttled", 0),
+            "reported": dict(entry.get("reported", {}))
+        }
+
+    def flush(self) -> None:
+        """Merge pending counts into the ledger file (atomic replace)."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        self._last_flush = time.monotonic()
+        if not self._pending_calls and not self._pending_throttled and not self._reported:
+            return
+
+        try:
+            with _file_lock(self.ledger_path.with_suffix(self.ledger_path.suffix + ".lock")):
+                day_entry, by_module = self._merge_into_file()
+
+            self._persisted = {
+                "calls": day_entry["calls"],
+                "by_module": dict(by_module),
+                "throttled": day_entry["throttled"],
+                "reported": dict(day_entry.get("reported", {}))
+            }
+            self._pending_calls = {}
+            self._pending_throttled = 0
+        except Exception as e:
+            logger.warning(f"Could not write quota ledger {self.ledger_path}: {e}")
+
+    def _merge_into_file(self) -> Tuple[Dict[str, Any], Dict[str, int]]:
+        """
+        Add pending counts to the ledger file (the caller holds the file lock).
+
+        Returns:
+            Tuple of (today's entry, its per-module counts) as written
+        """
+        ledger = self._read_ledger()
+        org_entry = ledger.setdefault(self.organization_id, {})
+        # Keep only the current day; older days are no longer useful for budgeting
+        for day in [d for d in org_entry if d != self._day]:
+            del org_entry[day]
+        day_entry = org_entry.setdefault(self._day, {"calls": 0, "by_module": {}, "throttled": 0})
+
+        by_module = day_entry.setdefault("by_module", {})
+        for module, count in self._pending_calls.items():
+            day_entry["calls"] = day_entry.get("calls", 0) + count
+            by_module[module] = by_module.get(module, 0) + count
+        day_entry["throttled"] = day_entry.get("throttled", 0) + self._pending_throttled
+        if self._reported:
+            day_entry["reported"] = dict(self._reported)
+
+        # A temp file per writer, so concurrent flushes never share one
+        fd, temp_path = tempfile.mkstemp(prefix=self.ledger_path.name + ".", suffix=".tmp",
+                                         dir=str(self.ledger_path.parent))
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(ledger, f, indent=2)
+            os.replace(temp_path, self.ledger_path)
+        except Exception:
+            os.unlink(temp_path)
+            raise
+        return day_entry, by_module
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def _roll_day_if_needed(self) -> None:
+        today = date.today().isoformat()
+        if today != self._day:
+            self._flush_locked()
+            self._day = today
+            self._reported = {}
+            self._persisted = self._read_day_entry()
+
+    def record_call(self, module: Optional[str] = None, status_code: Optional[int] = None,
+                    headers: Optional[Dict[str, str]] = None) -> None:
+        """
+        Count one API call and capture any rate-limit headers.
+
+        Args:
+            module: Module the call was made for (e.g. 'invoices').
+            status_code: HTTP status of the response.
+            headers: Response headers (case-insensitive mapping).
+        """
+        with self._lock:
+            self._roll_day_if_needed()
+            key = module or "other"
+            self._pending_calls[key] = self._pending_calls.get(key, 0) + 1
+            if status_code == 429:
+                self._pending_throttled += 1
+
+            if headers:
+                reported = {}
+                for field, header in (("limit", LIMIT_HEADER), ("remaining", REMAINING_HEADER), ("reset", RESET_HEADER)):
+                    value = headers.get(header)
+                    if value is not None:
+                        try:
+                            reported[field] = int(float(value))
+                        except ValueError:
+                            continue
+                if reported:
+                    reported["observed_at"] = time.time()
+                    self._reported = reported
+
+            if time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush_locked()
+
+    # ------------------------------------------------------------------
+    # Budget
+    # ------------------------------------------------------------------
+
+    def calls_today(self) -> int:
+        """Total calls charged to this organization today (all processes)."""
+        with self._lock:
+            self._roll_day_if_needed()
+            return self._persisted["calls"] + sum(self._pending_calls.values())
+
+    def remaining_budget(self) -> int:
+        """
+        Calls left today.
+
+        The configured (or Zoho-reported) daily limit minus calls counted, capped by
+        the remaining count Zoho last reported in its rate-limit headers.
+        """
+        used = self.calls_today()
+        with self._lock:
+            reported = self._reported or self._persisted.get("reported", {})
+        limit = reported.get("limit", self.daily_limit)
+        remaining = limit - used
+        if "remaining" in reported:
+            remaining = min(remaining, reported["remaining"])
+        return max(0, remaining)
+
+    def get_status(self) -> Dict[str, Any]:
+        """Snapshot of today's usage for reporting."""
+        used = self.calls_today()
+        with self._lock:
+            by_module = dict(self._persisted["by_module"])
+            for module, count in self._pending_calls.items():
+                by_module[module] = by_module.get(module, 0) + count
+            throttled = self._persisted["throttled"] + self._pending_throttled
+            reported = dict(self._reported or self._persisted.get("reported", {}))
+        return {
+            "organization_id": self.organization_id,
+            "date": self._day,
+            "calls_today": used,
+            "daily_limit": reported.get("limit", self.daily_limit),
+            "remaining": self.remaining_budget(),
+            "throttled_today": throttled,
+            "by_module": by_module,
+            "reported_headers": reported
+        }
@@ -0,0 +1,155 @@
+"""
+Rate limiting for Zoho API calls.
+
+Provides a thread-safe token bucket that all API workers share so that
+concurrent fetches stay within Zoho's per-minute request quota. The bucket
+adapts its rate from observed throttling: it halves on a 429 (once per
+throttling event) and creeps back towards the configured quota on successful
+calls.
+"""
+
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Zoho Books allows 100 requests per minute per organization
+DEFAULT_REQUESTS_PER_MINUTE = 100
+
+# Lowest rate the adaptive limiter will back off to (requests per minute)
+MIN_REQUESTS_PER_MINUTE = 5
+
+
+class TokenBucketRateLimiter:
+    """
+    Thread-safe token bucket rate limiter.
+
+    Tokens refill continuously at ``requests_per_minute / 60`` per second up to
+    ``burst`` tokens. Every API call takes one token; callers block until a token
+    is available, so any number of workers can share one limiter.
+    """
+
+    def __init__(self, requests_per_minute: int = DEFAULT_REQUESTS_PER_MINUTE, burst: int = None):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            requests_per_minute: Sustained request rate allowed by the quota.
+            burst: Maximum tokens that can accumulate (defaults to 10% of the
+                   per-minute quota, minimum 1).
+        """
+        if requests_per_minute <= 0:
+            raise ValueError("requests_per_minute must be positive.")
+
+        self.requests_per_minute = requests_per_minute
+        self.max_rate = requests_per_minute / 60.0
+        self.min_rate = min(self.max_rate, MIN_REQUESTS_PER_MINUTE / 60.0)
+        self.rate = self.max_rate
+        self.capacity = float(burst if burst else max(1, requests_per_minute // 10))
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        # 429s arriving before this time belong to the throttling event already backed off from
+        self._decrease_cooldown_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        """Add tokens for the time elapsed since the last refill (lock must be held)."""
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._last_refill = now
+
+    def _take_or_wait_time(self, tokens: float) -> float:
+        """
+        Consume ``tokens`` if available.
+
+        Returns:
+            0.0 if the tokens were consumed, otherwise the seconds to wait before retrying.
+        """
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Block until ``tokens`` are available and consume them.
+
+        Args:
+            tokens: Number of tokens to consume (one per API call).
+
+        Returns:
+            Seconds spent waiting for the tokens.
+        """
+        waited = 0.0
+        while True:
+            wait_time = self._take_or_wait_time(tokens)
+            if wait_time <= 0:
+                return waited
+            time.sleep(wait_time)
+            waited += wait_time
+
+    async def acquire_async(self, tokens: float = 1.0) -> float:
+        """
+        Coroutine version of ``acquire`` that waits without blocking the event loop.
+
+        Args:
+            tokens: Number of tokens to consume (one per API call).
+
+        Returns:
+            Seconds spent waiting for the tokens.
+        """
+        # Only the async engine awaits here, and it has already imported asyncio;
+        # importing it at module level would slow down every synchronous entry point
+        import asyncio
+
+        waited = 0.0
+        while True:
+            wait_time = self._take_or_wait_time(tokens)
+            if wait_time <= 0:
+                return waited
+            await asyncio.sleep(wait_time)
+            waited += wait_time
+
+    def record_throttled(self) -> None:
+        """
+        Drain the bucket after a 429 and halve the request rate (multiplicative decrease).
+
+        Concurrent requests throttled by the same event return their 429s
+        together, so the rate is halved at most once per cooldown of one
+        request interval (``1 / rate`` seconds) after the last decrease.
+        """
+        with self._lock:
+            self._refill()
+            self._tokens = 0.0
+            now = time.monotonic()
+            if now < self._decrease_cooldown_until:
+                return
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._decrease_cooldown_until = now + 1.0 / self.rate
+        logger.warning(f"Rate limiter backing off to {self.rate * 60:.1f} requests/minute")
+
+    def record_success(self) -> None:
+        """Recover the request rate after a successful call (additive increase, 1% of quota)."""
+        if self.rate >= self.max_rate:
+            return
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.01)
+
+    @property
+    def current_requests_per_minute(self) -> float:
+        """Effective request rate after adaptation."""
+        return self.rate * 60.0
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """
+        Consume ``tokens`` only if they are immediately available.
+
+        Returns:
+            True if the tokens were consumed, False otherwise.
+        """
+        return self._take_or_wait_time(tokens) <= 0
@@ -0,0 +1,296 @@
+"""
+Record handling shared by the synchronous and async Zoho clients.
+
+ZohoRecordHelpers holds everything about detail fetching that does not touch
+the network: which modules have line items, reuse of unchanged saved records,
+the detail cache, line item extraction, the local "comprehensive data" check
+and report filtering. ZohoClient and AsyncZohoClient both inherit it, so the
+async client does not need a synchronous client (and its transport) for them.
+"""
+
+import logging
+from typing import List, Dict, Any, Optional, Tuple
+
+from .detail_cache import DetailRecordCache
+from ..processing.local_index import LocalRecordIndex, SyncSummaryIndex
+from common import dates
+
+logger = logging.getLogger(__name__)
+
+
+class ZohoRecordHelpers:
+    """
+    Network-free record helpers of the Zoho clients.
+
+    Subclasses call ``_init_record_helpers`` from their ``__init__``.
+
+    Failure contract shared by ZohoClient, AsyncZohoClient and its adapter:
+    ``get_data_for_module``, ``get_data_for_module_with_line_items`` and the
+    ``iter_*`` generators never return a partial module as if it were complete.
+    A list page that cannot be fetched, or a detail request that still fails
+    after every retry (or is refused by the open circuit breaker), raises; the
+    streaming generators keep what they already yielded so callers can
+    checkpoint and resume. The sync engine raises
+    ``requests.exceptions.RequestException``; the async engine raises
+    ``CircuitOpenError``, aiohttp connection errors or ``RuntimeError`` for a
+    failed status. Records the API cannot return (e.g. a 404 for a record
+    deleted mid-sync) are skipped. ``get_modified_records_report`` stops at a
+    failing page and returns what it found, and ``fetch_specific_records``
+    counts failed records instead of raising.
+    """
+
+    # Modules that have line items and need detailed fetching
+    MODULES_WITH_LINE_ITEMS = {
+        'invoices': 'invoice_id',
+        'bills': 'bill_id', 
+        'salesorders': 'salesorder_id',
+        'purchaseorders': 'purchaseorder_id',
+        'creditnotes': 'creditnote_id'
+    }
+
+    # Detailed records are yielded (and checkpointed) in batches of this size
+    DETAIL_BATCH_SIZE = 50
+
+    def _init_record_helpers(self, detail_concurrency: Optional[Dict[str, int]] = None,
+                             record_index: Optional[LocalRecordIndex] = None,
+                             detail_cache: Optional[DetailRecordCache] = None) -> None:
+        """
+        Set up the state the helpers use.
+
+        Args:
+            detail_concurrency: Optional mapping of module name -> in-flight detail requests.
+            record_index: Index of locally saved detailed records used to skip unchanged details.
+            detail_cache: Persistent cache of detail responses consulted by every detail fetch.
+        """
+        self.detail_concurrency = dict(detail_concurrency or {})
+        self.record_index = record_index
+        self.detail_cache = detail_cache
+
+    def _reuse_unchanged_details(self, module_name: str, headers: List[Dict[str, Any]],
+                                 id_field: str) -> Tuple[Dict[str, Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Split headers into ones whose saved detailed record can be reused and ones that need a detail call.
+        
+        A header is unchanged when the local record index holds a detailed record
+        with the same ID and identical last_modified_time.
+        
+        Args:
+            module_name: The module name (e.g., 'invoices')
+            headers: Header records returned by the list endpoint
+            id_field: Name of the record ID field for this module
+            
+        Returns:
+            Tuple of (saved detailed records keyed by str(record_id), headers still to fetch)
+        """
+        if not self.record_index or not headers:
+            return {}, headers
+        
+        try:
+            reused = self.record_index.find_unchanged(module_name, headers, id_field)
+        except Exception as e:
+            logger.warning(f"Local record index unavailable for {module_name}, fetching all details: {e}")
+            return {}, headers
+        
+        to_fetch = [header for header in headers if str(header.get(id_field)) not in reused]
+        if reused:
+            logger.info(f"⏭️ UNCHANGED: {len(reused)} of {len(headers)} {module_name} headers match saved records")
+        return reused, to_fetch
+
+    def get_detail_concurrency(self, module_name: str) -> int:
+        """Return the number of detail fetch workers configured for a module (minimum 1)."""
+        return max(1, int(self.detail_concurrency.get(module_name, 1)))
+
+    def _cached_detail(self, module_name: str, record_id: str,
+                       last_modified_time: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Look up a detailed record in the detail cache (None if absent, stale or no cache).
+        """
+        if not self.detail_cache:
+            return None
+        try:
+            return self.detail_cache.get(module_name, record_id, last_modified_time)
+        except Exception as e:
+            logger.warning(f"Detail cache lookup failed for {module_name} {record_id}: {e}")
+            return None
+
+    def _store_detail(self, module_name: str, record_id: str, record: Optional[Dict[str, Any]],
+                      last_modified_time: Optional[str] = None) -> None:
+        """
+        Store a fetched detailed record in the detail cache (if any).
+        """
+        if not self.detail_cache or not isinstance(record, dict):
+            return
+        try:
+            self.detail_cache.put(module_name, record_id, record, last_modified_time)
+        except Exception as e:
+            logger.warning(f"Detail cache store failed for {module_name} {record_id}: {e}")
+
+    def get_detail_cache_stats(self) -> Optional[Dict[str, Any]]:
+        """
+        Get detail cache hit/miss counters, or None if no cache is configured.
+        """
+        return self.detail_cache.stats() if self.detail_cache else None
+
+    def _extract_line_items(self, detailed_record: Dict[str, Any], module_name: str, record_id: str) -> List[Dict[str, Any]]:
+        """
+        Extract line items from a detailed record.
+        
+        Args:
+            detailed_record: The detailed record containing line items
+            module_name: The module name for context
+            record_id: The parent record ID
+            
+        Returns:
+            List of line item dictionaries
+        """
+        line_items = []
+        
+        # Common line item field names in Zoho Books
+        line_item_fields = ['line_items', 'invoice_items', 'bill_items', 'items']
+        
+        for field in line_item_fields:
+            if field in detailed_record:
+                items = detailed_record[field]
+                if isinstance(items, list):
+                    for item in items:
+                        # Add parent reference to line item
+                        if isinstance(item, dict):
+                            item['parent_id'] = record_id
+                            item['parent_type'] = module_name.rstrip('s')  # invoices -> invoice
+                            line_items.append(item)
+                break
+        
+        return line_items
+
+    def _has_comprehensive_line_item_data(self, module_name: str) -> bool:
+        """
+        Check if we already have comprehensive line item data for a module.
+        This prevents unnecessary individual API calls when we have complete data.
+        
+        ⚠️ FIXED: Now prioritizes JSON storage (API sync data) over database
+        
+        Priority order for API sync operations:
+        1. Check recent timestamped directories (most recent API data)
+        2. Check consolidated JSON files with line items  
+        3. Check database for existing line items (fallback)
+        """
+        logger.info(f"🔍 CHECKING for comprehensive {module_name} line item data...")
+        
+        try:
+            # PRIORITY 1: Check recent timestamped directories first (most recent API data)
+            from pathlib import Path
+            
+            base_path = Path("data/raw_json")
+            logger.info(f"📁 Checking JSON storage in: {base_path}")
+            # Record/line-item counts come from the sync summary index, not from parsing the files
+            summaries = SyncSummaryIndex(base_path)
+            
+            timestamped_dirs = [d for d in base_path.iterdir() 
+                              if d.is_dir() and self._is_timestamped_dir(d.name)]
+            
+            if timestamped_dirs:
+                logger.info(f"📁 Found {len(timestamped_dirs)} timestamped directories")
+                # Check last few recent directories
+                recent_dirs = sorted(timestamped_dirs, key=lambda x: x.name)[-5:]
+                logger.info(f"📂 Checking {len(recent_dirs)} most recent directories")
+                
+                for directory in reversed(recent_dirs):  # Start with most recent
+                    summary = summaries.get(directory.name, f"{module_name}_line_items")
+                    if summary is None:
+                        logger.info(f"📄 Line items file not found in {directory.name}")
+                    elif summary["record_count"] > 100:  # Substantial data
+                        logger.warning(f"🎯 FOUND comprehensive line items in {directory.name} ({summary['record_count']} items)")
+                        logger.warning(f"🚨 This will SKIP individual API fetches!")
+                        return True
+                    else:
+                        logger.info(f"📄 File exists but insufficient data: {summary['record_count']} items")
+            else:
+                logger.info(f"📂 No timestamped directories found in {base_path}")
+            
+            # PRIORITY 2: Check consolidated JSON files with line items
+            
+            # Check consolidated directory first
+            consolidated_dirs = [d for d in base_path.iterdir() 
+                               if d.is_dir() and d.name.startswith("CONSOLIDATED_")]
+            
+            if consolidated_dirs:
+                # Use most recent consolidated directory
+                latest_consolidated = sorted(consolidated_dirs, key=lambda x: x.name)[-1]
+                
+                # Check if the main module file has line items embedded
+                summary = summaries.get(latest_consolidated.name, module_name)
+                if summary and summary["records_with_line_items"] > 0:
+                    logger.info(f"Found comprehensive {module_name} data with embedded line items")
+                    return True
+                
+                if (latest_consolidated / f"{module_name}_line_items.json").exists():
+                    logger.info(f"Found separate {module_name} line items file")
+                    return True
+            
+            logger.info(f"🔍 NO comprehensive {module_name} line item data found")
+            logger.info(f"📋 Will need to fetch line items individually")
+            return False
+            
+        except Exception as e:
+            logger.warning(f"Error checking for comprehensive data: {e}")
+            logger.info(f"🔍 Due to error, assuming NO comprehensive data - will fetch individually")
+            return False
+
+    def _is_timestamped_dir(self, dirname: str) -> bool:
+        """Check if directory name follows timestamp pattern."""
+        try:
+            parts = dirname.split('_')
+            if len(parts) != 2:
+                return False
+            
+            date_part, time_part = parts
+            date_elements = date_part.split('-')
+            time_elements = time_part.split('-')
+            
+            return (len(date_elements) == 3 and 
+                    len(time_elements) == 3 and
+                    all(elem.isdigit() for elem in date_elements + time_elements))
+        except:
+            return False
+
+    def _build_modified_report_items(self, module_name: str, items: List[Dict[str, Any]], since_timestamp: str) -> List[Dict[str, Any]]:
+        """
+        Reduce a page of list records to report items modified at or after the cutoff.
+        
+        Records whose modification time cannot be parsed are kept (safer).
+        
+        Args:
+            module_name: The module the records belong to
+            items: Records from one list page
+            since_timestamp: ISO cutoff timestamp
+            
+        Returns:
+            List of report dictionaries (id, last_modified_time, date, created_time)
+        """
+        cutoff_dt = dates.parse_date(since_timestamp)
+        if cutoff_dt is None:
+            logger.warning(f"Could not parse cutoff date: {since_timestamp}")
+        
+        id_key = f'{module_name.rstrip("s")}_id'
+        modified_strs = [item.get('last_modified_time') or item.get('updated_time') for item in items]
+        # Whole page parsed at once; records without a parseable time are included (safer)
+        modified_since = dates.on_or_after(modified_strs, cutoff_dt) if cutoff_dt else None
+        filtered_items = []
+        for index, item in enumerate(items):
+            # Check if this record was modified after our cutoff
+            item_modified_str = modified_strs[index]
+            
+            if item_modified_str and modified_since is not None and not modified_since[index]:
+                if dates.parse_date(item_modified_str) is not None:
+                    continue
+                logger.warning(f"Could not parse modified time '{item_modified_str}'")
+            
+            # Keep only essential fields for the report
+            filtered_items.append({
+                'id': item.get(id_key, item.get('id')),
+                'last_modified_time': item_modified_str,
+                'date': item.get('date'),
+                'created_time': item.get('created_time')
+            })
+        
+        return filtered_items
@@ -1,9 +1,8 @@
 import os
 import logging
-from dotenv import load_dotenv
-from google.cloud import secretmanager
-from google.api_core import exceptions
-from typing import Dict
+from typing import Dict, Optional
+
+from .token_cache import CredentialCache, cache_enabled
 
 logger = logging.getLogger(__name__)
 
@@ -17,12 +16,17 @@ OPTIONAL_ZOHO_SECRETS = [
     "ZOHO_ORGANIZATION_ID",
 ]
 
-def get_zoho_credentials() -> Dict[str, str]:
+def get_zoho_credentials(use_cache: bool = True) -> Dict[str, str]:
     """
     Fetches Zoho credentials from Google Cloud Secret Manager.
 
     This function relies on GOOGLE_APPLICATION_CREDENTIALS for authentication.
     It reads the GCP_PROJECT_ID from a .env file to know which project to get secrets from.
+    Fetched credentials are kept in the local credential cache (see token_cache)
+    so later runs skip Secret Manager until the cache entry expires.
+    
+    Args:
+        use_cache: Read from and write to the local credential cache
     
     Returns:
         Dictionary containing Zoho credentials with lowercase keys
@@ -30,6 +34,10 @@ def get_zoho_credentials() -> Dict[str, str]:
     Raises:
         SystemExit: If credentials cannot be retrieved
     """
+    # dotenv and the Google client libraries are imported here, not at module level,
+    # so importing the package (e.g. for `status`) stays fast and offline
+    from dotenv import load_dotenv
+
     logger.info("Loading environment variables from .env file...")
     load_dotenv()
 
@@ -40,7 +48,16 @@ def get_zoho_credentials() -> Dict[str, str]:
         logger.error("Please create a .env file in the project root with GCP_PROJECT_ID='your-project-id'")
         raise SystemExit(1)
 
+    cache = CredentialCache() if use_cache and cache_enabled() else None
+    if cache:
+        cached = cache.get_credentials(project_id)
+        if cached:
+            logger.info("Using cached Zoho credentials (Secret Manager skipped).")
+            return cached
+
     logger.info(f"Fetching secrets from GCP Project ID '{project_id}'.")
+    from google.cloud import secretmanager
+    from google.api_core import exceptions
     
     try:
         client = secretmanager.SecretManagerServiceClient()
@@ -96,4 +113,23 @@ def get_zoho_credentials() -> Dict[str, str]:
         logger.warning("Set ZOHO_ORGANIZATION_ID environment variable or add to Secret Manager.")
     
     logger.info("All secrets fetched successfully.")
+    if cache:
+        cache.save_credentials(project_id, credentials)
     return credentials
+
+def get_cached_zoho_credentials() -> Optional[Dict[str, str]]:
+    """
+    Returns Zoho credentials from the local credential cache without contacting
+    Secret Manager (no Google client libraries are imported).
+
+    Returns:
+        Cached credentials, or None if GCP_PROJECT_ID is unset, the cache is
+        disabled, or nothing valid is cached
+    """
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    project_id = os.getenv("GCP_PROJECT_ID")
+    if not project_id or not cache_enabled():
+        return None
+    return CredentialCache().get_credentials(project_id)
@@ -0,0 +1,168 @@
+"""
+Local cache for Zoho credentials and OAuth access tokens.
+
+Fetching the Zoho secrets from GCP Secret Manager and exchanging the refresh
+token for an access token both take seconds, and Zoho access tokens stay valid
+for an hour. CredentialCache keeps both in one JSON file with expiry metadata so
+CLI invocations and scheduled jobs can skip those round trips. The file holds
+secrets, so it is created with owner-only permissions (0600, directory 0700)
+and replaced atomically under an inter-process lock.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from .quota import _file_lock
+
+logger = logging.getLogger(__name__)
+
+# Outside the project tree so cached secrets are never committed or synced with the data
+DEFAULT_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".cache", "zoho_data_sync", "credentials.json")
+
+DEFAULT_CREDENTIALS_TTL = 24 * 3600
+
+# Tokens are treated as expired this long before Zoho's expiry
+TOKEN_EXPIRY_MARGIN = 300
+
+
+def cache_enabled() -> bool:
+    """Whether the credential cache is in use (set ZOHO_DISABLE_CREDENTIAL_CACHE=1 to turn it off)."""
+    return os.getenv("ZOHO_DISABLE_CREDENTIAL_CACHE", "").lower() not in ("1", "true", "yes")
+
+
+def _token_key(zoho_credentials: Dict[str, str]) -> str:
+    """Cache key for tokens issued from a refresh token (the token itself is never used as a key)."""
+    material = f"{zoho_credentials.get('zoho_client_id', '')}:{zoho_credentials.get('zoho_refresh_token', '')}"
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()[:16]
+
+
+class CredentialCache:
+    """
+    Owner-only JSON file holding Secret Manager credentials and access tokens.
+
+    Every entry carries an ``expires_at`` timestamp; expired entries are ignored.
+    Read or write failures are logged and treated as a cache miss, so a broken
+    cache never stops a sync.
+    """
+
+    def __init__(self, cache_file: Optional[str] = None, credentials_ttl: float = DEFAULT_CREDENTIALS_TTL):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_file: Cache file path (defaults to ZOHO_CREDENTIAL_CACHE or ~/.cache/zoho_data_sync/credentials.json)
+            credentials_ttl: Seconds Secret Manager credentials stay valid in the cache
+        """
+        self.cache_file = Path(cache_file or os.getenv("ZOHO_CREDENTIAL_CACHE") or DEFAULT_CACHE_FILE)
+        self.credentials_ttl = credentials_ttl
+        self._lock = threading.Lock()
+
+    def _read(self) -> Dict[str, Any]:
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable credential cache {self.cache_file}: {e}")
+            return {}
+
+    def _write(self, data: Dict[str, Any]) -> None:
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                os.chmod(self.cache_file.parent, 0o700)
+            except OSError:
+                pass
+            fd, temp_path = tempfile.mkstemp(prefix=".credentials.", dir=str(self.cache_file.parent))
+            try:
+                # mkstemp creates the file 0600, so secrets are never world-readable
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(data, f)
+                os.chmod(temp_path, 0o600)
+                os.replace(temp_path, self.cache_file)
+            except Exception:
+                os.unlink(temp_path)
+                raise
+        except Exception as e:
+            logger.warning(f"Could not write credential cache {self.cache_file}: {e}")
+
+    def _update(self, section: str, key: str, entry: Dict[str, Any]) -> None:
+        try:
+            # The lock file lives next to the cache, so create the directory owner-only first
+            self.cache_file.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+            # Other processes (CLI runs, scheduled jobs) rewrite the same file
+            with self._lock, _file_lock(self.cache_file.with_suffix(self.cache_file.suffix + ".lock")):
+                data = self._read()
+                entries = data.setdefault(section, {})
+                # Drop expired entries while rewriting
+                now = time.time()
+                for stale_key in [k for k, v in entries.items() if v.get("expires_at", 0) <= now]:
+                    del entries[stale_key]
+                entries[key] = entry
+                self._write(data)
+        except Exception as e:
+            logger.warning(f"Could not update credential cache {self.cache_file}: {e}")
+
+    def _get(self, section: str, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._read().get(section, {}).get(key)
+        if entry and entry.get("expires_at", 0) > time.time():
+            return entry
+        return None
+
+    def get_credentials(self, project_id: str) -> Optional[Dict[str, str]]:
+        """
+        Get cached Secret Manager credentials for a GCP project, or None if absent/expired.
+        """
+        entry = self._get("credentials", project_id)
+        return dict(entry["values"]) if entry else None
+
+    def save_credentials(self, project_id: str, credentials: Dict[str, str]) -> None:
+        """
+        Cache Secret Manager credentials for ``credentials_ttl`` seconds.
+        """
+        now = time.time()
+        self._update("credentials", project_id, {
+            "values": credentials,
+            "cached_at": now,
+            "expires_at": now + self.credentials_ttl
+        })
+
+    def get_access_token(self, zoho_credentials: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """
+        Get the cached access token entry for these credentials if it is still valid (with margin).
+
+        Returns:
+            Dictionary with access_token and expires_at, or None
+        """
+        entry = self._get("access_tokens", _token_key(zoho_credentials))
+        if entry and entry["expires_at"] - TOKEN_EXPIRY_MARGIN > time.time():
+            return entry
+        return None
+
+    def save_access_token(self, zoho_credentials: Dict[str, str], access_token: str, expires_in: float) -> None:
+        """
+        Cache an access token until Zoho's reported expiry.
+        """
+        now = time.time()
+        self._update("access_tokens", _token_key(zoho_credentials), {
+            "access_token": access_token,
+            "cached_at": now,
+            "expires_at": now + expires_in
+        })
+
+    def clear(self) -> None:
+        """Delete the cache file."""
+        with self._lock:
+            try:
+                self.cache_file.unlink()
+            except FileNotFoundError:
+                pass
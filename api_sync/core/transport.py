@@ -0,0 +1,293 @@
+"""
+HTTP transport for Zoho API calls.
+
+ZohoTransport owns a pooled keep-alive requests.Session and is the single place
+where Zoho requests are sent. It applies the shared rate limiter, retries
+429/5xx responses and connection errors with jittered exponential backoff that
+honours Retry-After, and opens a circuit breaker after a burst of failures so a
+struggling API is not hammered. Every attempt is charged to the optional quota
+ledger and 429s slow the adaptive rate limiter down. With a token provider, the
+access token is renewed before it expires and a 401 triggers one transparent
+token refresh and retry.
+"""
+
+import random
+import threading
+import time
+import logging
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .rate_limiter import TokenBucketRateLimiter
+from .quota import QuotaLedger
+
+logger = logging.getLogger(__name__)
+
+# Status codes that are retried by the transport
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BACKOFF_BASE = 1.0
+# 429s without Retry-After: Zoho's limits are per minute, so a 1 s base would
+# retry into the same exhausted window several times
+DEFAULT_THROTTLE_BACKOFF_BASE = 5.0
+DEFAULT_BACKOFF_MAX = 120.0
+DEFAULT_TIMEOUT = 300
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised when the circuit breaker is open and requests are being rejected."""
+
+
+def is_exhausted_failure(error: requests.exceptions.RequestException) -> bool:
+    """
+    Return True if ``error`` is a failure the transport could not retry its way out of.
+
+    That is an open circuit, a connection error or timeout that persisted through
+    every retry, or a 429/5xx still returned after the last retry. Such failures say
+    nothing about the record requested, so callers must not treat them as a
+    missing record.
+    """
+    if isinstance(error, (CircuitOpenError, requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return True
+    response = getattr(error, "response", None)
+    return response is not None and response.status_code in RETRY_STATUS_CODES
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header value.
+
+    Args:
+        value: Header value, either delay-seconds or an HTTP-date.
+
+    Returns:
+        Seconds to wait, or None if the header is missing or invalid.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def compute_backoff(attempt: int, retry_after: Optional[str] = None,
+                    base: float = DEFAULT_BACKOFF_BASE, maximum: float = DEFAULT_BACKOFF_MAX) -> float:
+    """
+    Compute the delay before retry ``attempt`` (0-based).
+
+    Retry-After wins when present; otherwise exponential backoff capped at
+    ``maximum`` with "equal jitter" (half fixed, half random) to avoid
+    synchronized retries from concurrent workers.
+    """
+    delay = parse_retry_after(retry_after)
+    if delay is not None:
+        return min(delay, maximum)
+    capped = min(maximum, base * (2 ** attempt))
+    return capped / 2 + random.uniform(0, capped / 2)
+
+
+class CircuitBreaker:
+    """
+    Thread-safe consecutive-failure circuit breaker.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    requests are rejected for ``reset_timeout`` seconds. Then a single trial
+    request is allowed (half-open); success closes the circuit, failure reopens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        """Return True if a request may be sent now."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                logger.info("Circuit breaker half-open: allowing a trial request")
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info("Circuit breaker closed")
+            self.state = self.CLOSED
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(f"Circuit breaker opened after {self._failures} consecutive failures")
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+class ZohoTransport:
+    """
+    Pooled, rate-limited, retrying HTTP transport shared by all ZohoClient calls.
+    """
+
+    def __init__(self, headers: Dict[str, str],
+                 rate_limiter: Optional[TokenBucketRateLimiter] = None,
+                 max_retries: int = DEFAULT_MAX_RETRIES,
+                 backoff_base: float = DEFAULT_BACKOFF_BASE,
+                 backoff_max: float = DEFAULT_BACKOFF_MAX,
+                 throttle_backoff_base: float = DEFAULT_THROTTLE_BACKOFF_BASE,
+                 timeout: float = DEFAULT_TIMEOUT,
+                 pool_maxsize: int = 10,
+                 circuit_breaker: Optional[CircuitBreaker] = None,
+                 quota_ledger: Optional[QuotaLedger] = None,
+                 token_provider=None):
+        """
+        Initialize the transport.
+
+        Args:
+            headers: Default headers (e.g. Authorization) sent with every request.
+            rate_limiter: Token bucket consulted before every request attempt.
+            max_retries: Retries after the first attempt for retryable failures.
+            backoff_base: Base delay in seconds for exponential backoff (5xx and connection errors).
+            backoff_max: Maximum delay in seconds between attempts.
+            throttle_backoff_base: Base delay in seconds after a 429 without Retry-After.
+            timeout: Per-request timeout in seconds.
+            pool_maxsize: Keep-alive connections held per host (should cover worker count).
+            circuit_breaker: Breaker shared by all calls (a default one is created if None).
+            quota_ledger: Daily call ledger charged for every attempt (optional).
+            token_provider: AccessTokenProvider that supplies the Authorization token
+                            and refreshes it on 401 (optional; ``headers`` are used as-is if None).
+        """
+        self.token_provider = token_provider
+        self.rate_limiter = rate_limiter or TokenBucketRateLimiter()
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.throttle_backoff_base = throttle_backoff_base
+        self.timeout = timeout
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.quota_ledger = quota_ledger
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(headers)
+        self.session.headers["Accept-Encoding"] = "gzip, deflate"
+
+    def get(self, url: str, params: Dict[str, Any] = None, module: Optional[str] = None) -> requests.Response:
+        """
+        Send a GET request with rate limiting, retries and circuit breaking.
+
+        Args:
+            url: Full request URL.
+            params: Query parameters.
+            module: Module the call is made for, used for quota accounting.
+
+        Retryable responses (429/5xx) that still fail after all retries are
+        returned to the caller, which decides how to handle them
+        (typically ``raise_for_status``).
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open.
+            requests.exceptions.RequestException: If a connection error persists after all retries.
+        """
+        attempt = 0
+        token_refreshed = False
+        while True:
+            if not self.circuit_breaker.allow_request():
+                raise CircuitOpenError(f"Circuit breaker open; refusing request to {url}")
+
+            token = self.token_provider.get_token() if self.token_provider else None
+            auth_headers = {"Authorization": f"Zoho-oauthtoken {token}"} if token else None
+
+            self.rate_limiter.acquire()
+            try:
+                response = self.session.get(url, params=params, headers=auth_headers, timeout=self.timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if self.quota_ledger:
+                    self.quota_ledger.record_call(module)
+                self.circuit_breaker.record_failure()
+                if attempt >= self.max_retries:
+                    raise
+                delay = compute_backoff(attempt, None, self.backoff_base, self.backoff_max)
+                logger.warning(f"Network error on {url} ({e}); retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+                time.sleep(delay)
+                attempt += 1
+                continue
+
+            if self.quota_ledger:
+                self.quota_ledger.record_call(module, response.status_code, response.headers)
+
+            if response.status_code == 401 and token and not token_refreshed:
+                # The token expired or was revoked mid-run: refresh once and retry
+                token_refreshed = self._refresh_token(token)
+                if token_refreshed:
+                    response.close()
+                    continue
+
+            if response.status_code not in RETRY_STATUS_CODES:
+                self.circuit_breaker.record_success()
+                self.rate_limiter.record_success()
+                return response
+
+            # Throttling is handled by backoff and the adaptive limiter;
+            # only server errors count towards the breaker
+            if response.status_code == 429:
+                self.rate_limiter.record_throttled()
+            else:
+                self.circuit_breaker.record_failure()
+            if attempt >= self.max_retries:
+                logger.error(f"Giving up on {url} after {attempt + 1} attempts (status {response.status_code})")
+                return response
+
+            base = self.throttle_backoff_base if response.status_code == 429 else self.backoff_base
+            delay = compute_backoff(attempt, response.headers.get("Retry-After"), base, self.backoff_max)
+            logger.warning(f"Status {response.status_code} from {url}; retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+            print(f"[WARN] API returned {response.status_code}. Retrying in {delay:.1f} seconds...")
+            response.close()
+            time.sleep(delay)
+            attempt += 1
+
+    def _refresh_token(self, rejected_token: str) -> bool:
+        """
+        Ask the token provider for a new token after a 401.
+
+        Returns:
+            True if a token is available for a retry, False if the refresh failed
+            (the 401 is then returned to the caller).
+        """
+        try:
+            self.token_provider.refresh(rejected_token)
+            return True
+        except (Exception, SystemExit) as e:
+            logger.error(f"Access token refresh failed: {e}")
+            return False
+
+    def close(self) -> None:
+        """Close pooled connections."""
+        self.session.close()
@@ -455,16 +455,18 @@ Individual module sync operations create subdirectories with their own timestamp
         """Analyze JSON files in a timestamp directory."""
         modules_data = []
         
-        for json_file in timestamp_dir.glob("*.json"):
+        try:
+            from api_sync.processing import raw_store
+        except ImportError:
+            from processing import raw_store
+        
+        # Module files in any storage format (JSON, compressed NDJSON or record store manifests)
+        for module_name, json_file in raw_store.list_module_paths(timestamp_dir).items():
             try:
-                module_name = json_file.stem
-                
                 # Load and analyze the JSON data
-                import json
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                data = raw_store.load_records(json_file)
                 
-                if not isinstance(data, list) or not data:
+                if not data:
                     continue
                 
                 # Extract date information
@@ -547,21 +549,8 @@ Individual module sync operations create subdirectories with their own timestamp
         """Parse various date string formats into datetime object."""
         if not isinstance(date_str, str):
             return None
-            
-        try:
-            # Handle ISO format and other common formats
-            if 'T' in date_str:
-                # Parse datetime with timezone awareness
-                date_obj = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-                # Convert to naive datetime for comparison
-                if date_obj.tzinfo is not None:
-                    date_obj = date_obj.replace(tzinfo=None)
-            else:
-                # Parse date-only format
-                date_obj = datetime.strptime(date_str, '%Y-%m-%d')
-            return date_obj
-        except Exception:
-            return None
+        from common.dates import parse_date
+        return parse_date(date_str)
     
     def _is_timestamp_dir(self, dirname):
         """Check if directory name matches timestamp format."""
@@ -689,7 +678,11 @@ def test_wrapper_functionality():
                 if timestamp_dirs:
                     # Check the latest directory for data
                     latest_dir = sorted(timestamp_dirs, key=lambda x: x.name)[-1]
-                    json_files = list(latest_dir.glob("*.json"))
+                    try:
+                        from api_sync.processing import raw_store
+                    except ImportError:
+                        from processing import raw_store
+                    json_files = list(raw_store.list_module_paths(latest_dir).values())
                     
                     print(f"✅ Latest directory: {latest_dir.name}")
                     print(f"✅ JSON files in latest: {len(json_files)}")
@@ -699,12 +692,8 @@ def test_wrapper_functionality():
                     modules_found = set()
                     for json_file in json_files:
                         try:
-                            import json
-                            with open(json_file, 'r') as f:
-                                data = json.load(f)
-                            if isinstance(data, list):
-                                total_records += len(data)
-                                modules_found.add(json_file.stem)
+                            total_records += raw_store.count_records(json_file)
+                            modules_found.add(raw_store.module_name_for_path(json_file))
                         except:
                             pass
                     
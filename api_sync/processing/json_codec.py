@@ -0,0 +1,155 @@
+"""
+JSON codec used by the sync loaders and writers.
+
+Uses orjson when it is installed and the standard library json module
+otherwise. Both backends produce the same text: UTF-8 (non-ASCII characters
+are not escaped), compact separators, or two-space indentation with
+``indent=True``. orjson also decodes straight from bytes, so large files are
+parsed from a read-only memory map instead of being read into a string first.
+
+Set API_SYNC_JSON_BACKEND=json to force the standard library (``auto``, the
+default, picks orjson when available).
+"""
+
+import json
+import logging
+import mmap
+import os
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+BACKEND_ENV = "API_SYNC_JSON_BACKEND"
+BACKENDS = ("auto", "orjson", "json")
+
+# Files at least this large are decoded from a memory map (orjson only)
+MMAP_MIN_BYTES = 1024 * 1024
+
+
+def _select_backend(name: Optional[str] = None):
+    """Return the orjson module for the requested backend, or None for the standard library."""
+    name = (name or os.getenv(BACKEND_ENV, "auto")).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown JSON backend '{name}' (expected one of {', '.join(BACKENDS)})")
+    if name == "json":
+        return None
+    try:
+        import orjson
+    except ImportError:
+        if name == "orjson":
+            logger.warning("orjson is not installed, using the standard library json module")
+        return None
+    return orjson
+
+
+_orjson = _select_backend()
+
+
+def backend() -> str:
+    """Name of the active backend ('orjson' or 'json')."""
+    return "orjson" if _orjson is not None else "json"
+
+
+def use_backend(name: str) -> str:
+    """
+    Switch the backend at runtime (used by benchmarks).
+
+    Args:
+        name: 'auto', 'orjson' or 'json'
+
+    Returns:
+        The name of the backend that was active before
+    """
+    global _orjson
+    previous = backend()
+    _orjson = _select_backend(name)
+    return previous
+
+
+def loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+    """
+    Decode JSON from bytes, a memoryview or a string.
+
+    Raises:
+        json.JSONDecodeError: If the data is not valid JSON (orjson's error is a subclass)
+    """
+    if _orjson is not None:
+        try:
+            return _orjson.loads(data)
+        except _orjson.JSONDecodeError:
+            # orjson rejects NaN/Infinity, which the standard library accepts
+            pass
+    if isinstance(data, (memoryview, bytearray)):
+        data = bytes(data)
+    return json.loads(data)
+
+
+def dumpb(obj: Any, indent: bool = False, sort_keys: bool = False,
+          default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """
+    Encode an object as UTF-8 JSON bytes.
+
+    Args:
+        obj: Object to encode
+        indent: Indent with two spaces (compact otherwise)
+        sort_keys: Sort object keys
+        default: Called for objects that are not JSON serializable (e.g. ``str``)
+    """
+    if _orjson is not None:
+        option = _orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= _orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= _orjson.OPT_SORT_KEYS
+        if default is not None:
+            # Let ``default`` format datetimes, as the standard library would
+            option |= _orjson.OPT_PASSTHROUGH_DATETIME
+        try:
+            return _orjson.dumps(obj, default=default, option=option)
+        except TypeError:
+            # Integers beyond 64 bits and other values orjson does not support
+            pass
+    return dumps_stdlib(obj, indent, sort_keys, default).encode("utf-8")
+
+
+def dumps(obj: Any, indent: bool = False, sort_keys: bool = False,
+          default: Optional[Callable[[Any], Any]] = None) -> str:
+    """Encode an object as a JSON string (see dumpb)."""
+    if _orjson is None:
+        return dumps_stdlib(obj, indent, sort_keys, default)
+    return dumpb(obj, indent, sort_keys, default).decode("utf-8")
+
+
+def dumps_stdlib(obj: Any, indent: bool = False, sort_keys: bool = False,
+                 default: Optional[Callable[[Any], Any]] = None) -> str:
+    """Standard library encoding with the same output format as orjson."""
+    if indent:
+        return json.dumps(obj, ensure_ascii=False, indent=2, sort_keys=sort_keys, default=default)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), sort_keys=sort_keys, default=default)
+
+
+def load_file(path: Union[str, Path]) -> Any:
+    """
+    Decode a JSON file.
+
+    With orjson, files of MMAP_MIN_BYTES or more are parsed from a read-only
+    memory map, so the raw text never has to be copied into a Python object.
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if _orjson is None or size < MMAP_MIN_BYTES:
+            return loads(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                return loads(view)
+            finally:
+                view.release()
+
+
+def dump_file(obj: Any, path: Union[str, Path], indent: bool = False, sort_keys: bool = False,
+              default: Optional[Callable[[Any], Any]] = None) -> None:
+    """Encode an object into a JSON file (UTF-8)."""
+    with open(path, "wb") as f:
+        f.write(dumpb(obj, indent, sort_keys, default))
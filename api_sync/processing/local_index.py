@@ -0,0 +1,473 @@
+"""
+Local indexes for raw JSON sync data.
+
+Both indexes live in one small SQLite database next to the raw JSON timestamp
+directories:
+
+- SyncSummaryIndex holds one row per directory/module file (record count,
+  line-item count, ID range, max last_modified_time). raw_data_handler writes
+  it on every save, so "is there data?" checks are lookups instead of parsing
+  whole JSON files. Files saved before the index existed are summarized once
+  on first lookup.
+- LocalRecordIndex maps every detailed record of a line-item module to its
+  last_modified_time, a content hash and the directory holding the newest copy,
+  and keeps that copy compressed in the row. The API client uses it to skip
+  detail calls for headers that have not changed since they were last saved and
+  reuses the stored record, so no module file is read while fetching.
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import zlib
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+try:
+    from ..utils import is_timestamp_dir
+except ImportError:
+    from utils import is_timestamp_dir
+
+from . import raw_store, json_codec
+
+logger = logging.getLogger(__name__)
+
+# Index database, stored in the raw JSON base directory (not inside a timestamp directory)
+INDEX_FILENAME = ".sync_index.db"
+
+# ID fields that don't follow the "<singular module>_id" convention
+MODULE_ID_FIELDS = {
+    'customerpayments': 'payment_id',
+    'vendorpayments': 'payment_id'
+}
+
+
+def module_id_field(module_name: str) -> str:
+    """
+    Return the record ID field for a module file name.
+
+    Args:
+        module_name: Module or file name (e.g. 'invoices', 'invoices_line_items').
+
+    Returns:
+        ID field name (e.g. 'invoice_id', 'line_item_id').
+    """
+    if module_name.endswith('_line_items'):
+        return 'line_item_id'
+    return MODULE_ID_FIELDS.get(module_name, f"{module_name.rstrip('s')}_id")
+
+
+def _connect(db_path: Path, check_same_thread: bool = True) -> sqlite3.Connection:
+    """Open the index database, creating its tables if needed."""
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(db_path), timeout=30, check_same_thread=check_same_thread)
+    _create_tables(conn)
+    return conn
+
+
+def _connect_read_only(db_path: Path) -> Optional[sqlite3.Connection]:
+    """Open an existing index database read-only (None if there is none; nothing is created)."""
+    if not db_path.is_file():
+        return None
+    return sqlite3.connect(f"{db_path.resolve().as_uri()}?mode=ro", uri=True, timeout=30)
+
+
+def _create_tables(conn: sqlite3.Connection) -> None:
+    """Create the index tables if needed."""
+    with conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS record_versions (
+                module TEXT NOT NULL,
+                record_id TEXT NOT NULL,
+                last_modified_time TEXT,
+                content_hash TEXT NOT NULL,
+                timestamp_dir TEXT NOT NULL,
+                data BLOB,
+                PRIMARY KEY (module, record_id)
+            )
+        """)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(record_versions)")}
+        if "data" not in columns:
+            # Indexes written before records were stored in the row: index every directory again
+            conn.execute("ALTER TABLE record_versions ADD COLUMN data BLOB")
+            conn.execute("DELETE FROM record_versions")
+            conn.execute("DROP TABLE IF EXISTS indexed_dirs")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS indexed_dirs (
+                module TEXT NOT NULL,
+                timestamp_dir TEXT NOT NULL,
+                PRIMARY KEY (module, timestamp_dir)
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS module_files (
+                timestamp_dir TEXT NOT NULL,
+                module TEXT NOT NULL,
+                record_count INTEGER NOT NULL,
+                line_item_count INTEGER NOT NULL,
+                records_with_line_items INTEGER NOT NULL,
+                min_id TEXT,
+                max_id TEXT,
+                max_last_modified_time TEXT,
+                file_size INTEGER,
+                file_mtime REAL,
+                PRIMARY KEY (timestamp_dir, module)
+            )
+        """)
+
+
+class ModuleSummary:
+    """
+    Running summary of the records written to one module file.
+
+    Records can be added page by page, so the summary is built while streaming.
+    """
+
+    FIELDS = ("record_count", "line_item_count", "records_with_line_items",
+              "min_id", "max_id", "max_last_modified_time")
+
+    def __init__(self, module_name: str):
+        self.module_name = module_name
+        self.id_field = module_id_field(module_name)
+        self.is_line_item_file = module_name.endswith('_line_items')
+        self.record_count = 0
+        self.line_item_count = 0
+        self.records_with_line_items = 0
+        self.min_id = None
+        self.max_id = None
+        self.max_last_modified_time = None
+
+    def add(self, records: List[Dict[str, Any]]) -> None:
+        """Fold a page of records into the summary."""
+        for record in records:
+            self.record_count += 1
+            if not isinstance(record, dict):
+                continue
+            line_items = record.get('line_items')
+            if self.is_line_item_file:
+                self.line_item_count += 1
+            elif isinstance(line_items, list) and line_items:
+                self.records_with_line_items += 1
+                self.line_item_count += len(line_items)
+            record_id = record.get(self.id_field)
+            if record_id is not None:
+                record_id = str(record_id)
+                # Zoho IDs are fixed-width numeric strings, so text order is numeric order
+                if self.min_id is None or record_id < self.min_id:
+                    self.min_id = record_id
+                if self.max_id is None or record_id > self.max_id:
+                    self.max_id = record_id
+            modified = record.get('last_modified_time')
+            if modified and (self.max_last_modified_time is None or modified > self.max_last_modified_time):
+                self.max_last_modified_time = modified
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+
+class SyncSummaryIndex:
+    """
+    Per directory/module summaries of saved raw JSON files.
+
+    Rows are validated against the file's size and mtime on lookup, so a row
+    can never describe a file that has since been rewritten; stale or missing
+    rows are rebuilt by reading the file once.
+
+    A read-only index (status and report commands) never creates or changes the
+    database: stale or missing rows are still computed from the file, but not stored.
+    """
+
+    def __init__(self, json_base_dir: str = "data/raw_json", db_path: Optional[str] = None,
+                 read_only: bool = False):
+        """
+        Initialize the index.
+
+        Args:
+            json_base_dir: Base directory containing the timestamped raw JSON directories.
+            db_path: Index database path (defaults to <json_base_dir>/.sync_index.db).
+            read_only: Only read an existing database, never create or write it.
+        """
+        self.json_base_dir = Path(json_base_dir)
+        self.db_path = Path(db_path) if db_path else self.json_base_dir / INDEX_FILENAME
+        self.read_only = read_only
+
+    def _query(self, sql: str, params: Tuple) -> List[Tuple]:
+        """Run a lookup; a read-only index without a database (or without the table) has no rows."""
+        if not self.read_only:
+            conn = _connect(self.db_path)
+        else:
+            conn = _connect_read_only(self.db_path)
+            if conn is None:
+                return []
+        try:
+            return conn.execute(sql, params).fetchall()
+        except sqlite3.OperationalError:
+            if not self.read_only:
+                raise
+            return []
+        finally:
+            conn.close()
+
+    def record(self, timestamp_dir: str, module_name: str, summary: ModuleSummary,
+               file_path: Optional[Path] = None) -> None:
+        """
+        Store the summary of a saved module file.
+
+        Args:
+            timestamp_dir: Directory name the file will be read from (the final, non-.tmp name).
+            module_name: Module file name (e.g. 'invoices_line_items').
+            summary: Summary of the records written.
+            file_path: Written file or NDJSON directory (its size and mtime validate the row later).
+        """
+        file_size, file_mtime = None, None
+        if file_path is not None and file_path.exists():
+            file_size, file_mtime = raw_store.storage_stat(file_path)
+        row = summary.as_dict()
+        conn = _connect(self.db_path)
+        try:
+            with conn:
+                conn.execute("""
+                    INSERT OR REPLACE INTO module_files (timestamp_dir, module, record_count, line_item_count,
+                        records_with_line_items, min_id, max_id, max_last_modified_time, file_size, file_mtime)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (timestamp_dir, module_name, row["record_count"], row["line_item_count"],
+                      row["records_with_line_items"], row["min_id"], row["max_id"],
+                      row["max_last_modified_time"], file_size, file_mtime))
+        finally:
+            conn.close()
+
+    def discard(self, timestamp_dir: str) -> None:
+        """Remove all summaries for a directory (e.g. a failed sync that was cleaned up)."""
+        if not self.db_path.exists():
+            return
+        conn = _connect(self.db_path)
+        try:
+            with conn:
+                conn.execute("DELETE FROM module_files WHERE timestamp_dir = ?", (timestamp_dir,))
+        finally:
+            conn.close()
+
+    def summaries(self, timestamp_dir: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Stored summaries of all modules of a directory, as recorded (not validated against the files).
+
+        Returns:
+            Dictionary mapping module name -> summary
+        """
+        if not self.db_path.exists():
+            return {}
+        rows = self._query(f"""
+            SELECT module, {", ".join(ModuleSummary.FIELDS)} FROM module_files WHERE timestamp_dir = ?
+        """, (timestamp_dir,))
+        return {row[0]: dict(zip(ModuleSummary.FIELDS, row[1:])) for row in rows}
+
+    def get(self, timestamp_dir: str, module_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Summary of a module saved in ``<json_base_dir>/<timestamp_dir>`` (either storage format).
+
+        Args:
+            timestamp_dir: Directory name under the base directory.
+            module_name: Module file name (e.g. 'invoices', 'invoices_line_items').
+
+        Returns:
+            Dictionary with record_count, line_item_count, records_with_line_items,
+            min_id, max_id and max_last_modified_time, or None if the file does not exist.
+        """
+        file_path = raw_store.find_module_path(self.json_base_dir / timestamp_dir, module_name)
+        if file_path is None:
+            return None
+        try:
+            file_size, file_mtime = raw_store.storage_stat(file_path)
+        except OSError:
+            return None
+
+        rows = self._query(f"""
+            SELECT {", ".join(ModuleSummary.FIELDS)}, file_size, file_mtime FROM module_files
+            WHERE timestamp_dir = ? AND module = ?
+        """, (timestamp_dir, module_name))
+        row = rows[0] if rows else None
+
+        if row and row[-2] == file_size and row[-1] == file_mtime:
+            return dict(zip(ModuleSummary.FIELDS, row[:-2]))
+
+        # Not indexed yet (saved before the index existed, or rewritten): summarize once
+        summary = ModuleSummary(module_name)
+        try:
+            summary.add(list(raw_store.iter_records(file_path)))
+        except Exception as e:
+            logger.warning(f"Could not summarize {file_path}: {e}")
+            return None
+        if not self.read_only:
+            self.record(timestamp_dir, module_name, summary, file_path)
+        logger.debug(f"📇 Indexed {file_path}: {summary.record_count} records")
+        return summary.as_dict()
+
+
+def record_content_hash(record: Dict[str, Any]) -> str:
+    """
+    Stable hash of a record's content (key order independent).
+
+    Args:
+        record: A record as returned by the API.
+
+    Returns:
+        Hex SHA-256 digest of the canonical JSON encoding.
+    """
+    canonical = json_codec.dumpb(record, sort_keys=True)
+    return hashlib.sha256(canonical).hexdigest()
+
+
+class LocalRecordIndex:
+    """
+    SQLite-backed lookup of record_id -> (last_modified_time, content hash, timestamp dir).
+
+    Only finalized timestamp directories are indexed, each one once per module.
+    Newer directories win, so the index always points at the latest saved copy,
+    which is stored zlib-compressed in the same row.
+    """
+
+    def __init__(self, json_base_dir: str = "data/raw_json", db_path: Optional[str] = None):
+        """
+        Initialize the index.
+
+        Args:
+            json_base_dir: Base directory containing the timestamped raw JSON directories.
+            db_path: Index database path (defaults to <json_base_dir>/.sync_index.db).
+        """
+        self.json_base_dir = Path(json_base_dir)
+        self.db_path = Path(db_path) if db_path else self.json_base_dir / INDEX_FILENAME
+        self._lock = threading.Lock()
+        self._refreshed_modules = set()
+        self._conn = _connect(self.db_path, check_same_thread=False)
+
+    def close(self) -> None:
+        """Close the index database."""
+        self._conn.close()
+
+    def discard(self, timestamp_dir: str) -> None:
+        """Forget records saved in a directory that was deleted (e.g. by retention cleanup)."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM record_versions WHERE timestamp_dir = ?", (timestamp_dir,))
+            self._conn.execute("DELETE FROM indexed_dirs WHERE timestamp_dir = ?", (timestamp_dir,))
+
+    # ------------------------------------------------------------------
+    # Indexing
+    # ------------------------------------------------------------------
+
+    def refresh(self, module_name: str, id_field: str) -> int:
+        """
+        Index detailed records from timestamp directories not yet indexed for a module.
+
+        Args:
+            module_name: Module to index (e.g. 'invoices').
+            id_field: Record ID field of the module (e.g. 'invoice_id').
+
+        Returns:
+            Number of directories newly indexed.
+        """
+        if not self.json_base_dir.exists():
+            return 0
+
+        with self._lock:
+            indexed = {row[0] for row in self._conn.execute(
+                "SELECT timestamp_dir FROM indexed_dirs WHERE module = ?", (module_name,))}
+            new_dirs = sorted(d.name for d in self.json_base_dir.iterdir()
+                              if d.is_dir() and is_timestamp_dir(d.name) and d.name not in indexed)
+
+            # Oldest first, so newer copies of a record replace older ones
+            for timestamp_dir in new_dirs:
+                rows = []
+                module_file = raw_store.find_module_path(self.json_base_dir / timestamp_dir, module_name)
+                if module_file is not None:
+                    try:
+                        for record in raw_store.iter_records(module_file):
+                            # Only detailed records carry line items and can stand in for a detail call
+                            if not isinstance(record, dict) or 'line_items' not in record or not record.get(id_field):
+                                continue
+                            encoded = json_codec.dumpb(record, sort_keys=True)
+                            rows.append((module_name, str(record[id_field]), record.get('last_modified_time'),
+                                         hashlib.sha256(encoded).hexdigest(), timestamp_dir, zlib.compress(encoded)))
+                    except Exception as e:
+                        logger.warning(f"Could not index {module_file}: {e}")
+                        continue
+
+                with self._conn:
+                    self._conn.executemany("""
+                        INSERT INTO record_versions (module, record_id, last_modified_time, content_hash, timestamp_dir, data)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                        ON CONFLICT (module, record_id) DO UPDATE SET
+                            last_modified_time = excluded.last_modified_time,
+                            content_hash = excluded.content_hash,
+                            timestamp_dir = excluded.timestamp_dir,
+                            data = excluded.data
+                        WHERE excluded.timestamp_dir >= record_versions.timestamp_dir
+                    """, rows)
+                    self._conn.execute("INSERT OR IGNORE INTO indexed_dirs (module, timestamp_dir) VALUES (?, ?)",
+                                       (module_name, timestamp_dir))
+
+            self._refreshed_modules.add(module_name)
+
+        if new_dirs:
+            logger.info(f"📇 LOCAL INDEX: Indexed {len(new_dirs)} new {module_name} directories")
+        return len(new_dirs)
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def lookup(self, module_name: str, record_ids: List[str]) -> Dict[str, Tuple[Optional[str], str, str]]:
+        """
+        Look up the saved version of records.
+
+        Args:
+            module_name: Module of the records.
+            record_ids: IDs to look up.
+
+        Returns:
+            Mapping of record_id -> (last_modified_time, content_hash, timestamp_dir) for known IDs.
+        """
+        found = {}
+        ids = [str(record_id) for record_id in record_ids]
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                for record_id, modified, content_hash, timestamp_dir in self._conn.execute(
+                        f"SELECT record_id, last_modified_time, content_hash, timestamp_dir FROM record_versions "
+                        f"WHERE module = ? AND record_id IN ({placeholders})", [module_name] + chunk):
+                    found[record_id] = (modified, content_hash, timestamp_dir)
+        return found
+
+    def find_unchanged(self, module_name: str, headers: List[Dict[str, Any]], id_field: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Return saved detailed records for headers whose last_modified_time is unchanged.
+
+        The records come from the index rows in one query per 500 headers, so no
+        saved module file is read no matter how many directories they were saved in.
+
+        Args:
+            module_name: Module of the headers (e.g. 'invoices').
+            headers: Header records from the list endpoint.
+            id_field: Record ID field of the module.
+
+        Returns:
+            Mapping of record_id -> saved detailed record.
+        """
+        if module_name not in self._refreshed_modules:
+            self.refresh(module_name, id_field)
+
+        modified_by_id = {str(h[id_field]): h.get('last_modified_time') for h in headers if h.get(id_field)}
+        ids = list(modified_by_id)
+        unchanged = {}
+        with self._lock:
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                for record_id, modified, data in self._conn.execute(
+                        f"SELECT record_id, last_modified_time, data FROM record_versions "
+                        f"WHERE module = ? AND record_id IN ({placeholders})", [module_name] + chunk):
+                    if data is not None and modified and modified == modified_by_id[record_id]:
+                        unchanged[record_id] = json_codec.loads(zlib.decompress(data))
+        return unchanged
@@ -1,36 +1,61 @@
 import os
-import json
+import shutil
 import logging
+import time
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime
 
+from .local_index import ModuleSummary, SyncSummaryIndex
+from .sync_catalog import SyncCatalog, record_sync, STATUS_FINALIZED, STATUS_FAILED
+from . import raw_store, record_store, json_codec
+
 logger = logging.getLogger(__name__)
 
-def _create_sync_metadata(output_dir: Path, module_name: str, record_count: int, is_temp: bool = False):
+# Attempts at cataloguing a finalized sync (the index database may be locked briefly)
+CATALOG_ATTEMPTS = 3
+
+def _create_sync_metadata(output_dir: Path, module_name: str, record_count: int, is_temp: bool = False,
+                          summary: Optional[ModuleSummary] = None, file_path: Optional[Path] = None):
     """
     Creates sync metadata file to track sync completion and results.
     
+    Besides the record count it describes the saved file (name, byte size, mtime
+    and checksum), so readers can take the counts from here instead of parsing the
+    file as long as it is unchanged (see read_module_counts()).
+    
     Args:
         output_dir: Directory where metadata should be saved
         module_name: Name of the module that was synced
         record_count: Number of records found (0 for empty results)
         is_temp: Whether this is in a temporary directory (sync in progress)
+        summary: Summary of the written records (line-item counts; None if unknown after a resume)
+        file_path: The written module file, NDJSON directory or manifest
     """
     try:
+        is_line_item_file = module_name.endswith('_line_items')
         metadata = {
             "sync_timestamp": datetime.now().isoformat(),
             "module": module_name,
             "records_found": record_count,
+            "header_count": 0 if is_line_item_file else record_count,
+            "line_item_count": record_count if is_line_item_file else (summary.line_item_count if summary else None),
             "sync_completed": not is_temp,  # Only true for finalized syncs
             "is_temporary": is_temp,
             "has_data": record_count > 0
         }
+        if file_path is not None and file_path.exists():
+            file_size, file_mtime = raw_store.storage_stat(file_path)
+            metadata.update({
+                "file": file_path.name,
+                "file_size": file_size,
+                "file_mtime": file_mtime,
+                "checksum": raw_store.storage_checksum(file_path)
+            })
         
         metadata_file = output_dir / f"sync_metadata_{module_name}.json"
         
-        with open(metadata_file, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, ensure_ascii=False, indent=2)
+        json_codec.dump_file(metadata, metadata_file, indent=True)
             
         logger.debug(f"Created sync metadata: {metadata_file} (temp: {is_temp})")
         
@@ -38,7 +63,22 @@ def _create_sync_metadata(output_dir: Path, module_name: str, record_count: int,
         logger.warning(f"Failed to create sync metadata for {module_name}: {e}")
         # Don't fail the sync if metadata creation fails
 
-def save_raw_json_temp(data: List[Dict[str, Any]], module_name: str, run_timestamp_str: str, output_base_dir: str = "data/raw_json"):
+def _index_module_file(output_base_dir: str, run_timestamp_str: str, summary: ModuleSummary,
+                       file_path: Optional[Path] = None):
+    """
+    Records a saved module file in the sync summary index.
+    
+    The row is keyed by the final timestamp directory; it only becomes visible once
+    finalize_sync_timestamp() has moved the file there.
+    """
+    try:
+        SyncSummaryIndex(output_base_dir).record(run_timestamp_str, summary.module_name, summary, file_path)
+    except Exception as e:
+        logger.warning(f"Failed to index {summary.module_name} for {run_timestamp_str}: {e}")
+        # Lookups summarize unindexed files themselves, so the sync can continue
+
+def save_raw_json_temp(data: List[Dict[str, Any]], module_name: str, run_timestamp_str: str, output_base_dir: str = "data/raw_json",
+                       storage_format: Optional[str] = None, chunk_records: int = raw_store.DEFAULT_CHUNK_RECORDS):
     """
     Saves raw data to a TEMPORARY directory during sync.
     
@@ -50,6 +90,8 @@ def save_raw_json_temp(data: List[Dict[str, Any]], module_name: str, run_timesta
         module_name: The name of the Zoho module (e.g., 'invoices').
         run_timestamp_str: A string representing the current sync run's start time.
         output_base_dir: Base directory for JSON output (default: data/raw_json)
+        storage_format: 'json', 'ndjson.gz', 'ndjson.zst' or 'cas' (default: API_SYNC_RAW_FORMAT or 'json')
+        chunk_records: Records per part file for the NDJSON formats
         
     Returns:
         str: The temporary directory path that was created
@@ -67,22 +109,26 @@ def save_raw_json_temp(data: List[Dict[str, Any]], module_name: str, run_timesta
             logger.error(f"Failed to create temporary directory '{output_dir}': {dir_error}")
             return temp_dir_name
 
-        # Create sync metadata in temp directory
-        _create_sync_metadata(output_dir, module_name, len(data or []), is_temp=True)
-
         # Only save data file if there's actual data
         if data:
-            file_path = output_dir / f"{module_name}.json"
+            storage_format = raw_store.resolve_format(storage_format)
+            file_path = raw_store.module_path(output_dir, module_name, storage_format)
             logger.info(f"Saving {len(data)} raw records for '{module_name}' to temporary location: {file_path}")
 
             try:
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, ensure_ascii=False, indent=2)
+                raw_store.write_records(file_path, data, storage_format, chunk_records)
                 logger.info(f"Raw JSON saved for '{module_name}' to temporary directory")
+                summary = ModuleSummary(module_name)
+                summary.add(data)
+                _index_module_file(output_base_dir, run_timestamp_str, summary, file_path)
+                # Create sync metadata in temp directory (describes the file just written)
+                _create_sync_metadata(output_dir, module_name, len(data), is_temp=True,
+                                      summary=summary, file_path=file_path)
             except (IOError, OSError) as file_error:
                 logger.error(f"Could not write temporary file '{file_path}': {file_error}")
                 return temp_dir_name
         else:
+            _create_sync_metadata(output_dir, module_name, 0, is_temp=True)
             logger.info(f"No raw data for module '{module_name}', but temporary directory created.")
 
         return temp_dir_name
@@ -91,12 +137,334 @@ def save_raw_json_temp(data: List[Dict[str, Any]], module_name: str, run_timesta
         logger.error(f"Could not create temporary directory for '{module_name}': {e}")
         return f"{run_timestamp_str}.tmp"
 
-def save_raw_json(data: List[Dict[str, Any]], module_name: str, run_timestamp_str: str, output_base_dir: str = "data/raw_json"):
+def save_raw_json(data: List[Dict[str, Any]], module_name: str, run_timestamp_str: str, output_base_dir: str = "data/raw_json",
+                  storage_format: Optional[str] = None):
     """
     Legacy function for backward compatibility. 
     Now uses temporary storage to prevent premature timestamp advancement.
     """
-    return save_raw_json_temp(data, module_name, run_timestamp_str, output_base_dir)
+    return save_raw_json_temp(data, module_name, run_timestamp_str, output_base_dir, storage_format)
+
+class RawJsonPageWriter:
+    """
+    Streams pages of records into a module file in the TEMPORARY sync directory.
+    
+    Each page is appended to the JSON array as it arrives, so memory stays bounded
+    by the page size. Data goes to a ``.partial`` file that is renamed to
+    ``{module}.json`` only when the writer is closed successfully; the sync
+    directory still only becomes official through finalize_sync_timestamp().
+    With an NDJSON storage format the pages go to compressed part files in a
+    ``{module}.ndjson.partial`` directory instead (see raw_store); with ``cas``
+    the records go to the record store and their hashes to a manifest.
+    
+    A writer can be reopened on an interrupted file with the state returned by
+    ``checkpoint_state()``: anything written after that checkpoint is truncated
+    and new pages are appended to the existing records.
+    
+    Usage:
+        with RawJsonPageWriter('invoices', run_timestamp) as writer:
+            for page in client.iter_module_pages('invoices'):
+                writer.write_page(page)
+    """
+    
+    def __init__(self, module_name: str, run_timestamp_str: str, output_base_dir: str = "data/raw_json",
+                 resume_state: Optional[Dict[str, Any]] = None, storage_format: Optional[str] = None,
+                 chunk_records: int = raw_store.DEFAULT_CHUNK_RECORDS):
+        """
+        Args:
+            module_name: The name of the Zoho module (e.g., 'invoices').
+            run_timestamp_str: A string representing the current sync run's start time.
+            output_base_dir: Base directory for JSON output (default: data/raw_json)
+            resume_state: State from a previous ``checkpoint_state()`` to continue from.
+            storage_format: 'json', 'ndjson.gz', 'ndjson.zst' or 'cas' (default: API_SYNC_RAW_FORMAT or 'json').
+                A resumed file keeps the format it was started with.
+            chunk_records: Records per part file for the NDJSON formats.
+        """
+        if resume_state and resume_state.get("records"):
+            storage_format = resume_state.get("format", raw_store.FORMAT_JSON)
+        self.storage_format = raw_store.resolve_format(storage_format)
+        self.chunk_records = chunk_records
+        self.module_name = module_name
+        self.run_timestamp_str = run_timestamp_str
+        self.output_base_dir = output_base_dir
+        self.temp_dir_name = f"{run_timestamp_str}.tmp"
+        self.output_dir = Path(output_base_dir) / self.temp_dir_name
+        self.file_path = raw_store.module_path(self.output_dir, module_name, self.storage_format)
+        self.partial_path = self.file_path.with_name(self.file_path.name + ".partial")
+        self.record_count = 0
+        self.page_count = 0
+        self.closed = False
+        self._file = None
+        # NdjsonPartWriter for the NDJSON formats (created on the first page)
+        self._parts = None
+        # Built while streaming; None after a resume, when earlier records were not seen
+        self.summary = ModuleSummary(module_name)
+        
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        if resume_state and resume_state.get("records"):
+            self._reopen(resume_state)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+    
+    def _reopen(self, resume_state: Dict[str, Any]):
+        """Reopen the partial file at the checkpointed offset."""
+        if not self.partial_path.exists() and self.file_path.exists():
+            # The previous run closed this file but stopped before the sync was finalized
+            os.replace(self.file_path, self.partial_path)
+        if not self.partial_path.exists():
+            logger.warning(f"No partial output to resume for '{self.module_name}', starting a new file")
+            return
+        
+        if self.storage_format == raw_store.FORMAT_JSON:
+            self._file = open(self.partial_path, 'r+b')
+            self._file.truncate(resume_state["offset"])
+            self._file.seek(resume_state["offset"])
+        else:
+            self._parts = self._new_part_writer(resume_state)
+        self.record_count = resume_state["records"]
+        self.page_count = resume_state.get("pages", 0)
+        self.summary = None
+        logger.info(f"Resuming '{self.module_name}' output after {self.record_count} records")
+    
+    def _new_part_writer(self, resume_state: Optional[Dict[str, Any]] = None):
+        if self.storage_format == raw_store.FORMAT_CAS:
+            return record_store.ManifestWriter(self.partial_path, record_store.store_path_for(self.output_base_dir),
+                                               resume_state)
+        return raw_store.NdjsonPartWriter(self.partial_path, self.storage_format.rsplit('.', 1)[1],
+                                          self.chunk_records, resume_state)
+    
+    def write_page(self, records: List[Dict[str, Any]]) -> int:
+        """
+        Append one page of records to the module file.
+        
+        Args:
+            records: Records from a single API page.
+            
+        Returns:
+            int: Number of records written.
+        """
+        if self.closed:
+            raise ValueError(f"Writer for '{self.module_name}' is already closed")
+        if not records:
+            return 0
+        
+        if self.storage_format != raw_store.FORMAT_JSON:
+            if self._parts is None:
+                self._parts = self._new_part_writer()
+            self._parts.write(records)
+            self.record_count += len(records)
+        else:
+            if self._file is None:
+                # Only create a data file once there is actual data
+                self._file = open(self.partial_path, 'wb')
+                self._file.write(b'[\n')
+            
+            for record in records:
+                if self.record_count:
+                    self._file.write(b',\n')
+                self._file.write(json_codec.dumpb(record, indent=True))
+                self.record_count += 1
+        self.page_count += 1
+        if self.summary is not None:
+            self.summary.add(records)
+        
+        logger.debug(f"Appended page {self.page_count} ({len(records)} records) to {self.partial_path}")
+        return len(records)
+    
+    def checkpoint_state(self) -> Dict[str, Any]:
+        """
+        Flush written records to disk and describe the resumable position.
+        
+        Returns:
+            dict: Record count, page count, storage format and byte offset of the end of
+            the last record (for NDJSON, the offset within the current part file).
+        """
+        if self._parts is not None:
+            return dict(self._parts.checkpoint_state(), records=self.record_count, pages=self.page_count,
+                        format=self.storage_format)
+        if self._file is None:
+            return {"records": 0, "pages": 0, "offset": 0}
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return {"records": self.record_count, "pages": self.page_count, "offset": self._file.tell()}
+    
+    def close(self) -> int:
+        """
+        Complete the JSON array, move it into place and write the sync metadata.
+        
+        Returns:
+            int: Total number of records written.
+        """
+        if self.closed:
+            return self.record_count
+        
+        if self._file is not None or self._parts is not None:
+            if self._parts is not None:
+                self._parts.close()
+                self._parts = None
+            else:
+                self._file.write(b'\n]\n')
+                self._file.close()
+                self._file = None
+            os.replace(self.partial_path, self.file_path)
+            logger.info(f"Raw JSON streamed for '{self.module_name}': {self.record_count} records in {self.page_count} pages")
+            if self.summary is not None:
+                _index_module_file(self.output_base_dir, self.run_timestamp_str, self.summary, self.file_path)
+        else:
+            logger.info(f"No raw data for module '{self.module_name}', but temporary directory created.")
+        
+        _create_sync_metadata(self.output_dir, self.module_name, self.record_count, is_temp=True,
+                              summary=self.summary, file_path=self.file_path if self.record_count else None)
+        self.closed = True
+        return self.record_count
+    
+    def abort(self, keep_partial: bool = False):
+        """
+        Stop writing without completing the file (no metadata is written).
+        
+        Args:
+            keep_partial: Keep the partial file so a later run can resume from a checkpoint.
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._parts is not None:
+            self._parts.abort()
+            self._parts = None
+        if not keep_partial:
+            if self.partial_path.is_dir():
+                shutil.rmtree(self.partial_path, ignore_errors=True)
+            else:
+                try:
+                    self.partial_path.unlink()
+                except FileNotFoundError:
+                    pass
+        self.closed = True
+
+class SyncCheckpoint:
+    """
+    Per-module resume checkpoint stored inside the TEMPORARY sync directory.
+    
+    Records the last list page up to which every page is complete, the IDs whose
+    detail records are already written, and the resumable position of each output
+    file, so an interrupted sync can continue instead of starting from page 1. A
+    page left open (a detail record is missing) holds ``last_completed_page``
+    back even when later pages complete, so a resume starts at the open page;
+    ``fetched_detail_ids`` keeps the records already written from being fetched
+    again. The file is removed before the directory is finalized.
+    """
+    
+    def __init__(self, module_name: str, run_timestamp_str: str, output_base_dir: str = "data/raw_json",
+                 since_timestamp: Optional[str] = None):
+        """
+        Args:
+            module_name: The name of the Zoho module (e.g., 'invoices').
+            run_timestamp_str: The timestamp string of the sync run being checkpointed.
+            output_base_dir: Base directory for JSON output (default: data/raw_json)
+            since_timestamp: Incremental cutoff of the run (a resumed run must reuse it).
+        """
+        self.module_name = module_name
+        self.run_timestamp = run_timestamp_str
+        self.since_timestamp = since_timestamp
+        self.output_dir = Path(output_base_dir) / f"{run_timestamp_str}.tmp"
+        self.path = self.output_dir / f"sync_checkpoint_{module_name}.json"
+        self.last_completed_page = 0
+        # Completed pages after an open one; they count once the open page completes
+        self.completed_pages = set()
+        self.fetched_detail_ids = set()
+        self.outputs: Dict[str, Dict[str, Any]] = {}
+    
+    @classmethod
+    def load(cls, module_name: str, run_timestamp_str: str, output_base_dir: str = "data/raw_json") -> Optional["SyncCheckpoint"]:
+        """Load the checkpoint for a module from a temporary sync directory, if present."""
+        checkpoint = cls(module_name, run_timestamp_str, output_base_dir)
+        if not checkpoint.path.exists():
+            return None
+        try:
+            data = json_codec.load_file(checkpoint.path)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable checkpoint {checkpoint.path}: {e}")
+            return None
+        
+        checkpoint.since_timestamp = data.get("since_timestamp")
+        checkpoint.last_completed_page = data.get("last_completed_page", 0)
+        checkpoint.completed_pages = set(data.get("completed_pages", []))
+        checkpoint.fetched_detail_ids = set(data.get("fetched_detail_ids", []))
+        checkpoint.outputs = data.get("outputs", {})
+        return checkpoint
+    
+    @classmethod
+    def find_latest(cls, module_name: str, output_base_dir: str = "data/raw_json") -> Optional["SyncCheckpoint"]:
+        """
+        Find the most recent interrupted sync of a module that can be resumed.
+        
+        Returns:
+            The checkpoint from the newest temporary directory that has one, or None.
+        """
+        base_path = Path(output_base_dir)
+        if not base_path.exists():
+            return None
+        temp_dirs = sorted((d.name for d in base_path.iterdir() if d.is_dir() and d.name.endswith('.tmp')), reverse=True)
+        for temp_dir_name in temp_dirs:
+            checkpoint = cls.load(module_name, temp_dir_name[:-len('.tmp')], output_base_dir)
+            if checkpoint:
+                return checkpoint
+        return None
+    
+    @property
+    def has_progress(self) -> bool:
+        """True if anything has been checkpointed for this module."""
+        return self.last_completed_page > 0 or bool(self.fetched_detail_ids)
+    
+    def save(self, writers: List[RawJsonPageWriter], page: Optional[int] = None,
+             detail_ids: Optional[List[str]] = None):
+        """
+        Flush the writers and atomically persist the checkpoint.
+        
+        Args:
+            writers: Output writers whose positions are recorded.
+            page: List page that has now been fully written, if any.
+            detail_ids: IDs of detail records that have just been written.
+        """
+        if page is not None and page > self.last_completed_page:
+            self.completed_pages.add(page)
+            while self.last_completed_page + 1 in self.completed_pages:
+                self.last_completed_page += 1
+                self.completed_pages.discard(self.last_completed_page)
+        if detail_ids:
+            self.fetched_detail_ids.update(detail_ids)
+        for writer in writers:
+            self.outputs[writer.module_name] = writer.checkpoint_state()
+        
+        data = {
+            "module": self.module_name,
+            "run_timestamp": self.run_timestamp,
+            "since_timestamp": self.since_timestamp,
+            "updated_at": datetime.now().isoformat(),
+            "last_completed_page": self.last_completed_page,
+            "completed_pages": sorted(self.completed_pages),
+            "fetched_detail_ids": sorted(self.fetched_detail_ids),
+            "outputs": self.outputs
+        }
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_suffix('.json.tmp')
+        json_codec.dump_file(data, temp_path)
+        os.replace(temp_path, self.path)
+    
+    def clear(self):
+        """Remove the checkpoint file once the module has completed."""
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
 
 def finalize_sync_timestamp(run_timestamp_str: str, output_base_dir: str = "data/raw_json"):
     """
@@ -124,6 +492,21 @@ def finalize_sync_timestamp(run_timestamp_str: str, output_base_dir: str = "data
         temp_path.rename(final_path)
         logger.info(f"✅ Sync finalized: {temp_dir_name} → {run_timestamp_str}")
         
+        # The sync is final once renamed, but the catalog scans the disk only once:
+        # a directory missing from it is invisible to latest-sync lookups until
+        # the catalog is rebuilt
+        for attempt in range(1, CATALOG_ATTEMPTS + 1):
+            try:
+                record_sync(output_base_dir, run_timestamp_str, STATUS_FINALIZED)
+                break
+            except Exception as e:
+                if attempt == CATALOG_ATTEMPTS:
+                    logger.error(f"Could not catalog sync {run_timestamp_str}: {e}; "
+                                 f"run 'python -m api_sync catalog --rebuild' to add it")
+                else:
+                    logger.warning(f"Could not catalog sync {run_timestamp_str} ({e}); retrying")
+                    time.sleep(attempt)
+        
         return True
         
     except Exception as e:
@@ -145,17 +528,80 @@ def cleanup_failed_sync(run_timestamp_str: str, output_base_dir: str = "data/raw
         temp_path = Path(output_base_dir) / temp_dir_name
         
         if temp_path.exists():
-            import shutil
             shutil.rmtree(temp_path)
             logger.info(f"🧹 Cleaned up failed sync directory: {temp_dir_name}")
         
+        SyncSummaryIndex(output_base_dir).discard(run_timestamp_str)
+        record_sync(output_base_dir, run_timestamp_str, STATUS_FAILED)
+        
     except Exception as e:
         logger.warning(f"Failed to cleanup temporary directory: {e}")
 
+def read_module_counts(module_name: str, timestamp_dir: str, data_base_dir: str = "data/raw_json") -> Optional[Dict[str, Any]]:
+    """
+    Record counts of a saved module from its sync metadata, if the metadata still describes the file.
+    
+    The metadata is trusted only when the file it names exists with the recorded
+    byte size and mtime (two stats, the same check as the sync summary index). Only a
+    file whose mtime changed (copied or touched) is read once to compare its checksum.
+    
+    Args:
+        module_name: Module file name (e.g. 'invoices', 'invoices_line_items')
+        timestamp_dir: The timestamp directory name
+        data_base_dir: Base directory for JSON data
+        
+    Returns:
+        Dictionary with records_found, header_count and line_item_count (None if unknown),
+        or None if there is no metadata or it does not match the file
+    """
+    directory = Path(data_base_dir) / timestamp_dir
+    try:
+        metadata = json_codec.load_file(directory / f"sync_metadata_{module_name}.json")
+    except (OSError, ValueError):
+        return None
+    if not isinstance(metadata, dict) or not metadata.get("checksum") or not metadata.get("file"):
+        return None
+    file_path = directory / metadata["file"]
+    try:
+        file_size, file_mtime = raw_store.storage_stat(file_path)
+        if file_size != metadata.get("file_size") or (
+                file_mtime != metadata.get("file_mtime")
+                and raw_store.storage_checksum(file_path) != metadata["checksum"]):
+            logger.debug(f"Sync metadata of {file_path} is stale, ignoring it")
+            return None
+    except OSError:
+        return None
+    return {key: metadata.get(key) for key in ("records_found", "header_count", "line_item_count")}
+
+def count_module_records(module_name: str, timestamp_dir: str, data_base_dir: str = "data/raw_json") -> int:
+    """
+    Number of records saved for a module, without parsing the data file.
+    
+    Uses the sync metadata while it matches the file, otherwise counts the
+    records in the raw bytes (raw_store.count_records).
+    
+    Returns:
+        Record count (0 if the module was not saved in the directory)
+    """
+    counts = read_module_counts(module_name, timestamp_dir, data_base_dir)
+    if counts is not None:
+        return counts["records_found"] or 0
+    file_path = raw_store.find_module_path(Path(data_base_dir) / timestamp_dir, module_name)
+    if file_path is None:
+        return 0
+    try:
+        return raw_store.count_records(file_path)
+    except Exception as e:
+        logger.warning(f"Could not count records in {file_path}: {e}")
+        return 0
+
 def load_raw_json(module_name: str, timestamp_dir: str, data_base_dir: str = "data/raw_json") -> List[Dict[str, Any]]:
     """
     Loads raw JSON data from a timestamped directory.
     
+    Reads both storage formats: a ``{module}.json`` array or a ``{module}.ndjson``
+    directory of compressed parts (decoded in parallel).
+    
     Args:
         module_name: The name of the Zoho module (e.g., 'invoices').
         timestamp_dir: The timestamp directory name.
@@ -165,14 +611,13 @@ def load_raw_json(module_name: str, timestamp_dir: str, data_base_dir: str = "da
         List of records from the JSON file, or empty list if file not found.
     """
     try:
-        file_path = Path(data_base_dir) / timestamp_dir / f"{module_name}.json"
+        file_path = raw_store.find_module_path(Path(data_base_dir) / timestamp_dir, module_name)
         
-        if not file_path.exists():
-            logger.warning(f"JSON file not found: {file_path}")
+        if file_path is None:
+            logger.warning(f"JSON file not found: {Path(data_base_dir) / timestamp_dir / f'{module_name}.json'}")
             return []
         
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = raw_store.load_records(file_path, max_workers=4)
             
         logger.info(f"Loaded {len(data)} records for '{module_name}' from {file_path}")
         return data
@@ -197,16 +642,13 @@ def get_latest_timestamp_dir(data_base_dir: str = "data/raw_json") -> str:
             logger.warning(f"Base directory does not exist: {base_path}")
             return ""
         
-        # Get all directories that match timestamp pattern
-        timestamp_dirs = [d.name for d in base_path.iterdir() 
-                         if d.is_dir() and len(d.name) >= 19]  # YYYY-MM-DD_HH-MM-SS format
-        
-        if not timestamp_dirs:
+        # Latest finalized directory from the sync catalog (in-progress .tmp directories are not listed)
+        entry = SyncCatalog(base_path).latest()
+        if entry is None:
             logger.warning(f"No timestamp directories found in {base_path}")
             return ""
         
-        # Sort and get the latest
-        latest = sorted(timestamp_dirs)[-1]
+        latest = entry["timestamp_dir"]
         logger.info(f"Latest timestamp directory: {latest}")
         return latest
         
@@ -0,0 +1,605 @@
+"""
+Raw module storage formats.
+
+A module's raw records are saved in a timestamp directory in one of these layouts:
+
+- ``json`` (default): ``{module}.json``, a single JSON array.
+- ``ndjson.gz`` / ``ndjson.zst``: a ``{module}.ndjson/`` directory of compressed
+  newline-delimited JSON part files (``part-00000.ndjson.gz``, ...), each holding
+  at most ``chunk_records`` records.
+- ``cas``: a ``{module}.manifest`` file of record hashes pointing into the
+  content-addressed record store shared by all runs (see record_store).
+
+NDJSON parts are several times smaller than the indented JSON arrays, can be read
+record by record without parsing the whole file first, and independent parts can
+be decoded in parallel. The readers below accept either layout, so callers only
+need the path returned by ``find_module_path()`` or ``list_module_paths()``.
+
+Zstandard compression needs the optional ``zstandard`` package; without it,
+``ndjson.zst`` falls back to gzip when writing.
+"""
+
+import gzip
+import itertools
+import json
+import logging
+import mmap
+import os
+import re
+import shutil
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from . import json_codec, record_store
+
+logger = logging.getLogger(__name__)
+
+FORMAT_JSON = "json"
+FORMAT_NDJSON_GZ = "ndjson.gz"
+FORMAT_NDJSON_ZST = "ndjson.zst"
+FORMAT_CAS = "cas"
+RAW_FORMATS = (FORMAT_JSON, FORMAT_NDJSON_GZ, FORMAT_NDJSON_ZST, FORMAT_CAS)
+
+# Environment variable selecting the format when callers don't pass one
+RAW_FORMAT_ENV = "API_SYNC_RAW_FORMAT"
+
+NDJSON_DIR_SUFFIX = ".ndjson"
+PART_PREFIX = "part-"
+DEFAULT_CHUNK_RECORDS = 5000
+
+# Files in a timestamp (or snapshot) directory that are bookkeeping, not module data
+NON_MODULE_PREFIXES = ("sync_metadata_", "sync_checkpoint_", "sync_verification_", "snapshot_")
+
+READ_CHUNK_SIZE = 1024 * 1024
+
+# Bytes scanned per step when counting records in a memory-mapped JSON array
+COUNT_CHUNK_SIZE = 16 * 1024 * 1024
+
+
+def _import_zstandard():
+    """Import zstandard lazily; it is only needed for .zst parts."""
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError(
+            "Zstandard-compressed raw data requires the zstandard package. "
+            "Install it with 'pip install zstandard' or use API_SYNC_RAW_FORMAT=ndjson.gz."
+        ) from e
+    return zstandard
+
+
+def default_format() -> str:
+    """The storage format selected by API_SYNC_RAW_FORMAT (``json`` if unset)."""
+    return os.getenv(RAW_FORMAT_ENV, FORMAT_JSON).lower()
+
+
+def resolve_format(storage_format: Optional[str]) -> str:
+    """
+    Validate a storage format for writing.
+
+    Args:
+        storage_format: One of RAW_FORMATS, or None for default_format()
+
+    Returns:
+        The format to write (``ndjson.zst`` becomes ``ndjson.gz`` if zstandard is missing)
+
+    Raises:
+        ValueError: If the format is unknown
+    """
+    storage_format = (storage_format or default_format()).lower()
+    if storage_format not in RAW_FORMATS:
+        raise ValueError(f"Unknown raw storage format '{storage_format}' (expected one of {', '.join(RAW_FORMATS)})")
+    if storage_format == FORMAT_NDJSON_ZST:
+        try:
+            _import_zstandard()
+        except ImportError:
+            logger.warning("zstandard is not installed, writing gzip-compressed NDJSON instead")
+            return FORMAT_NDJSON_GZ
+    return storage_format
+
+
+def module_path(directory: Path, module_name: str, storage_format: str) -> Path:
+    """Where a module is stored in ``directory`` for the given format."""
+    if storage_format == FORMAT_JSON:
+        return Path(directory) / f"{module_name}.json"
+    if storage_format == FORMAT_CAS:
+        return Path(directory) / f"{module_name}{record_store.MANIFEST_SUFFIX}"
+    return Path(directory) / f"{module_name}{NDJSON_DIR_SUFFIX}"
+
+
+def module_name_for_path(path: Path) -> str:
+    """Module name of a storage path (``invoices.json``, ``.ndjson`` and ``.manifest`` -> ``invoices``)."""
+    return Path(path).name.rsplit(".", 1)[0]
+
+
+def is_module_path(path: Path) -> bool:
+    """True for a module's JSON file, NDJSON directory or manifest (not metadata, checkpoints or partial output)."""
+    path = Path(path)
+    if path.name.startswith(NON_MODULE_PREFIXES):
+        return False
+    if path.suffix in (".json", record_store.MANIFEST_SUFFIX):
+        return path.is_file()
+    return path.suffix == NDJSON_DIR_SUFFIX and path.is_dir()
+
+
+def find_module_path(directory: Path, module_name: str) -> Optional[Path]:
+    """
+    Locate a module's data in a timestamp directory.
+
+    Returns:
+        The ``.json`` file, ``.ndjson`` directory or ``.manifest``, or None if the module was not saved there
+    """
+    json_file = Path(directory) / f"{module_name}.json"
+    if json_file.is_file():
+        return json_file
+    ndjson_dir = Path(directory) / f"{module_name}{NDJSON_DIR_SUFFIX}"
+    if ndjson_dir.is_dir():
+        return ndjson_dir
+    manifest = Path(directory) / f"{module_name}{record_store.MANIFEST_SUFFIX}"
+    if manifest.is_file():
+        return manifest
+    return None
+
+
+def list_module_paths(directory: Path) -> Dict[str, Path]:
+    """
+    All modules saved in a directory, in either format.
+
+    Returns:
+        Dictionary mapping module name -> storage path, sorted by module name
+    """
+    directory = Path(directory)
+    if not directory.is_dir():
+        return {}
+    modules = {}
+    for path in sorted(directory.iterdir()):
+        if is_module_path(path):
+            # A module is only ever saved in one format per directory; prefer JSON if both exist
+            modules.setdefault(module_name_for_path(path), path)
+    return modules
+
+
+def part_paths(path: Path) -> List[Path]:
+    """The part files of an NDJSON module directory, in write order ([path] for a single file)."""
+    path = Path(path)
+    if not path.is_dir():
+        return [path]
+    return sorted(p for p in path.iterdir()
+                  if p.name.startswith(PART_PREFIX) and p.suffix in (".gz", ".zst"))
+
+
+def storage_stat(path: Path) -> Tuple[int, float]:
+    """
+    Size and modification time of a module's storage (summed over NDJSON parts).
+
+    Raises:
+        OSError: If the path does not exist
+    """
+    path = Path(path)
+    if not path.is_dir():
+        stat = path.stat()
+        return stat.st_size, stat.st_mtime
+    sizes, mtimes = [], []
+    for part in part_paths(path):
+        stat = part.stat()
+        sizes.append(stat.st_size)
+        mtimes.append(stat.st_mtime)
+    if not mtimes:
+        return 0, path.stat().st_mtime
+    return sum(sizes), max(mtimes)
+
+
+def storage_checksum(path: Path) -> str:
+    """
+    CRC-32 of a module's stored bytes (NDJSON parts in order), as ``crc32:<hex>``.
+
+    Raises:
+        OSError: If the path does not exist
+    """
+    checksum = 0
+    for part in part_paths(path):
+        with open(part, "rb") as f:
+            while True:
+                chunk = f.read(COUNT_CHUNK_SIZE)
+                if not chunk:
+                    break
+                checksum = zlib.crc32(chunk, checksum)
+    return f"crc32:{checksum:08x}"
+
+
+def _json_array_layout(mm: mmap.mmap) -> Optional[Tuple[int, bytes]]:
+    """
+    Offset of the first record and the record-start pattern of an indented JSON array.
+
+    Raw files are written indented: each top-level record starts on its own line
+    with the same prefix ("{" for streamed files, "  {" for whole-array dumps),
+    while nested objects are indented deeper or follow a key on the same line.
+    JSON strings cannot contain raw newlines, so newline+prefix+"{" marks exactly
+    the record starts.
+
+    Returns:
+        (offset, pattern), (-1, b"") for an empty array, or None if the file is
+        not an indented array of objects
+    """
+    start = mm.find(b"[")
+    if start < 0 or mm[:start].strip():
+        return None
+    first = mm.find(b"{", start)
+    if first < 0:
+        # No objects at all: "[]" or an empty streamed array
+        return (-1, b"") if not mm[start + 1:].strip(b" \r\n\t]") else None
+    gap = mm[start + 1:first]
+    if b"\n" not in gap or gap.strip(b" \r\n\t"):
+        return None
+    return first, b"\n" + gap.rsplit(b"\n", 1)[1] + b"{"
+
+
+def _count_json_array_records(path: Path) -> Optional[int]:
+    """
+    Count the objects of a JSON array file by scanning its bytes, or None if the layout is unknown.
+
+    Counts the record-start pattern of _json_array_layout() without decoding anything.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            layout = _json_array_layout(mm)
+            if layout is None:
+                return None
+            first, pattern = layout
+            if first < 0:
+                return 0
+            # An element that is not an object starts a line at the record indent too
+            if re.search(b"\n" + re.escape(pattern[1:-1]) + rb"[^\s{}\]]", mm):
+                return None
+            count, offset, overlap = 0, 0, len(pattern) - 1
+            while offset < len(mm):
+                # Overlap chunks so a pattern split across the boundary is seen exactly once
+                count += mm[max(0, offset - overlap):offset + COUNT_CHUNK_SIZE].count(pattern)
+                offset += COUNT_CHUNK_SIZE
+            return count
+
+
+def _iter_indented_array(path: Path, f, first: int, pattern: bytes) -> Iterator[Dict[str, Any]]:
+    """Decode the records of an indented JSON array one by one, splitting the file at the record starts."""
+    if first < 0:
+        return
+    # Every piece between two record starts is one record without its opening brace
+    f.seek(first + 1)
+    pending = b""
+    while True:
+        chunk = f.read(READ_CHUNK_SIZE)
+        pieces = (pending + chunk).split(pattern)
+        pending = pieces.pop()
+        for piece in pieces:
+            raw = piece.rstrip()
+            if not raw.endswith(b","):
+                raise ValueError(f"Missing ',' between records in {path}")
+            yield json_codec.loads(b"{" + raw[:-1])
+        if not chunk:
+            break
+    raw = pending.rstrip()
+    if not raw.endswith(b"]"):
+        raise ValueError(f"Unterminated JSON array in {path}")
+    yield json_codec.loads(b"{" + raw[:-1].rstrip())
+
+
+def _iter_json_array_incremental(path: Path) -> Iterator[Any]:
+    """Decode the elements of a JSON array in any layout from a sliding text window."""
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8-sig") as f:
+        buffer, position, eof, started = "", 0, False, False
+        while True:
+            while position < len(buffer) and (buffer[position].isspace() or (started and buffer[position] == ",")):
+                position += 1
+            if position < len(buffer) and not started:
+                if buffer[position] != "[":
+                    raise ValueError(f"Expected a JSON array in {path}")
+                started = True
+                position += 1
+                continue
+            if position < len(buffer) and buffer[position] == "]":
+                return
+            if position < len(buffer):
+                try:
+                    element, end = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    end = None
+                # An element ending at the window edge (e.g. a number) may continue in the next chunk
+                if end is not None and (end < len(buffer) or eof):
+                    yield element
+                    position = end
+                    continue
+            elif eof:
+                raise ValueError(f"Unterminated JSON array in {path}")
+            chunk = f.read(READ_CHUNK_SIZE)
+            buffer, position, eof = buffer[position:] + chunk, 0, not chunk
+
+
+def iter_json_array(path: Path) -> Iterator[Any]:
+    """
+    Yield the elements of a JSON array file one at a time.
+
+    Indented raw files are split at their record starts and each record is
+    decoded on its own (with the json_codec backend); other layouts, and arrays
+    whose split turns out not to be one object per piece (e.g. an element that
+    is not an object), are decoded incrementally. Either way memory use does not
+    depend on the file size.
+
+    Raises:
+        ValueError: If the file does not hold a JSON array
+    """
+    path = Path(path)
+    with open(path, "rb") as f:
+        layout = None
+        if os.fstat(f.fileno()).st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                layout = _json_array_layout(mm)
+        yielded = 0
+        if layout is not None:
+            try:
+                # Plain reads rather than the map, so pages already decoded are not kept resident
+                for record in _iter_indented_array(path, f, *layout):
+                    yield record
+                    yielded += 1
+                return
+            except ValueError as e:
+                logger.debug(f"Record split of {path} failed after {yielded} records ({e}), decoding incrementally")
+    # The records yielded so far are the array's first elements
+    yield from itertools.islice(_iter_json_array_incremental(path), yielded, None)
+
+
+def count_records(path: Path) -> int:
+    """
+    Number of records of a module without decoding them into Python objects.
+
+    JSON arrays are scanned via mmap, NDJSON parts are decompressed and their
+    lines counted, manifests have one fixed-width line per record. A JSON file in
+    an unrecognized layout (e.g. not indented) is parsed instead.
+
+    Args:
+        path: A ``.json`` array file, an ``.ndjson`` directory or a ``.manifest``
+    """
+    path = Path(path)
+    if path.suffix == record_store.MANIFEST_SUFFIX:
+        return path.stat().st_size // record_store.HASH_LINE_BYTES
+    if path.is_dir() or path.suffix in (".gz", ".zst"):
+        count = 0
+        for part in part_paths(path):
+            with _open_part(part) as stream:
+                last = b"\n"
+                while True:
+                    chunk = stream.read(READ_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    count += chunk.count(b"\n")
+                    last = chunk[-1:]
+                if last != b"\n":
+                    count += 1
+        return count
+    count = _count_json_array_records(path)
+    if count is None:
+        logger.debug(f"Unrecognized JSON layout in {path}, parsing it to count records")
+        count = len(load_records(path))
+    return count
+
+
+def _open_part(part: Path):
+    """Binary stream of a part's decompressed NDJSON (all gzip members / zstd frames)."""
+    if part.suffix == ".zst":
+        zstandard = _import_zstandard()
+        return zstandard.ZstdDecompressor().stream_reader(open(part, "rb"), read_across_frames=True, closefd=True)
+    return gzip.open(part, "rb")
+
+
+def iter_part_records(part: Path) -> Iterator[Dict[str, Any]]:
+    """Yield the records of one NDJSON part file."""
+    with _open_part(Path(part)) as stream:
+        pending = b""
+        while True:
+            chunk = stream.read(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            lines = (pending + chunk).split(b"\n")
+            pending = lines.pop()
+            for line in lines:
+                if line.strip():
+                    yield json_codec.loads(line)
+        if pending.strip():
+            yield json_codec.loads(pending)
+
+
+def iter_records(path: Path) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the records of a module stored at ``path``.
+
+    Args:
+        path: A ``.json`` array file, an ``.ndjson`` directory, a single part file or a ``.manifest``
+
+    Raises:
+        ValueError: If a JSON file does not hold an array, or a manifest's records are not in the store
+    """
+    path = Path(path)
+    if path.suffix == record_store.MANIFEST_SUFFIX:
+        yield from record_store.iter_manifest_records(path)
+        return
+    if path.is_dir() or path.suffix in (".gz", ".zst"):
+        for part in part_paths(path):
+            yield from iter_part_records(part)
+        return
+
+    yield from iter_json_array(path)
+
+
+def load_records(path: Path, max_workers: int = 1) -> List[Dict[str, Any]]:
+    """
+    Load all records of a module stored at ``path``.
+
+    Args:
+        path: A ``.json`` array file, an ``.ndjson`` directory or a ``.manifest``
+        max_workers: Threads decoding NDJSON parts concurrently (record order is kept)
+
+    Returns:
+        List of records
+    """
+    parts = part_paths(path)
+    if max_workers <= 1 or len(parts) <= 1:
+        return list(iter_records(path))
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(parts)), thread_name_prefix="raw-read") as executor:
+        records = []
+        for part_records in executor.map(lambda part: list(iter_part_records(part)), parts):
+            records.extend(part_records)
+    return records
+
+
+def _compressor(compression: str, raw_file):
+    """A writable stream that compresses into ``raw_file``; closing it ends one gzip member / zstd frame."""
+    if compression == "zst":
+        zstandard = _import_zstandard()
+        return zstandard.ZstdCompressor(level=3).stream_writer(raw_file, closefd=False)
+    return gzip.GzipFile(fileobj=raw_file, mode="wb", compresslevel=6, mtime=0)
+
+
+class NdjsonPartWriter:
+    """
+    Appends records to compressed NDJSON part files in a module directory.
+
+    A new part starts every ``chunk_records`` records. ``checkpoint_state()``
+    ends the current gzip member (or zstd frame) and reports the byte offset
+    of the current part, so an interrupted write can be reopened and truncated
+    at that point; multi-member parts read back as one stream.
+    """
+
+    def __init__(self, directory: Path, compression: str = "gz", chunk_records: int = DEFAULT_CHUNK_RECORDS,
+                 resume_state: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            directory: The ``.ndjson`` module directory to write into (created on first write).
+            compression: ``gz`` or ``zst``.
+            chunk_records: Maximum records per part file.
+            resume_state: State from a previous ``checkpoint_state()`` to continue from.
+
+        Raises:
+            ValueError: If the compression is unknown
+            ImportError: If ``zst`` is requested without the zstandard package
+        """
+        if compression not in ("gz", "zst"):
+            raise ValueError(f"Unknown NDJSON compression '{compression}' (expected gz or zst)")
+        if compression == "zst":
+            # Fail before any part file is created
+            _import_zstandard()
+        self.directory = Path(directory)
+        self.compression = compression
+        self.chunk_records = max(1, chunk_records)
+        self.record_count = 0
+        self._part_index = 0
+        self._part_records = 0
+        self._raw = None
+        self._stream = None
+        if resume_state:
+            self._reopen(resume_state)
+
+    def _part_path(self, index: int) -> Path:
+        return self.directory / f"{PART_PREFIX}{index:05d}.ndjson.{self.compression}"
+
+    def _reopen(self, resume_state: Dict[str, Any]):
+        """Drop everything written after the checkpoint."""
+        self._part_index = resume_state.get("part", 0)
+        self._part_records = resume_state.get("part_records", 0)
+        self.record_count = resume_state.get("records", 0)
+        for part in part_paths(self.directory) if self.directory.is_dir() else []:
+            if int(part.name[len(PART_PREFIX):].split(".", 1)[0]) > self._part_index:
+                part.unlink()
+        current = self._part_path(self._part_index)
+        if current.exists():
+            with open(current, "r+b") as f:
+                f.truncate(resume_state.get("offset", 0))
+
+    def write(self, records: List[Dict[str, Any]]) -> int:
+        """Append records, starting new parts as they fill up."""
+        for record in records:
+            if self._stream is None:
+                if self._raw is None:
+                    self.directory.mkdir(parents=True, exist_ok=True)
+                    self._raw = open(self._part_path(self._part_index), "ab")
+                self._stream = _compressor(self.compression, self._raw)
+            self._stream.write(json_codec.dumpb(record) + b"\n")
+            self.record_count += 1
+            self._part_records += 1
+            if self._part_records >= self.chunk_records:
+                self._finish_part()
+        return len(records)
+
+    def _end_stream(self):
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+
+    def _finish_part(self):
+        self._end_stream()
+        if self._raw is not None:
+            self._raw.close()
+            self._raw = None
+        self._part_index += 1
+        self._part_records = 0
+
+    def checkpoint_state(self) -> Dict[str, Any]:
+        """
+        Flush written records to disk and describe the resumable position.
+
+        Returns:
+            dict: Record count, current part index, records in that part and its byte offset.
+        """
+        self._end_stream()
+        offset = 0
+        if self._raw is not None:
+            self._raw.flush()
+            os.fsync(self._raw.fileno())
+            offset = self._raw.tell()
+        return {"records": self.record_count, "part": self._part_index,
+                "part_records": self._part_records, "offset": offset}
+
+    def close(self) -> int:
+        """Finish the last part. Returns the total number of records written."""
+        self._end_stream()
+        if self._raw is not None:
+            self._raw.close()
+            self._raw = None
+        return self.record_count
+
+    def abort(self):
+        """Close the files without finishing the current part (it is truncated on resume)."""
+        self._stream = None
+        if self._raw is not None:
+            self._raw.close()
+            self._raw = None
+
+
+def write_records(path: Path, records: List[Dict[str, Any]], storage_format: str,
+                  chunk_records: int = DEFAULT_CHUNK_RECORDS) -> None:
+    """
+    Write a complete module to ``path`` (as returned by module_path()).
+
+    Args:
+        path: Target ``.json`` file, ``.ndjson`` directory or ``.manifest``
+        records: Records to save
+        storage_format: One of RAW_FORMATS
+        chunk_records: Maximum records per NDJSON part
+    """
+    path = Path(path)
+    if storage_format == FORMAT_JSON:
+        json_codec.dump_file(records, path, indent=True)
+        return
+    if storage_format == FORMAT_CAS:
+        record_store.write_manifest(path, records)
+        return
+    if path.exists():
+        shutil.rmtree(path)
+    writer = NdjsonPartWriter(path, storage_format.rsplit(".", 1)[1], chunk_records)
+    writer.write(records)
+    writer.close()
@@ -0,0 +1,455 @@
+"""
+Content-addressed record store.
+
+Incremental runs and sync sessions keep saving records that are byte-identical
+to the copies in earlier directories. With the ``cas`` storage format each record
+is stored once, keyed by the SHA-256 of its JSON encoding, in a SQLite store
+(``.record_store.db``), and a module in a timestamp directory is only a
+``{module}.manifest`` file listing its record hashes in order, one per line.
+
+The store lives in the raw JSON base directory; sync sessions
+(``sync_session_*/raw_json``) share one store in the sessions root. Readers find
+it by walking up from the manifest, so ``raw_store.iter_records()`` and
+``load_records()`` return the same records for a manifest as for the JSON file
+it replaces.
+
+``collect_garbage()`` deletes timestamp directories and sync sessions beyond a
+retention count, optionally converts the remaining module files to manifests,
+and removes records that no manifest references any more.
+"""
+
+import hashlib
+import logging
+import shutil
+import sqlite3
+import threading
+import zlib
+from pathlib import Path
+from typing import Dict, Any, Iterable, Iterator, List, Optional
+
+try:
+    from ..utils import is_timestamp_dir
+except ImportError:
+    from utils import is_timestamp_dir
+
+from . import json_codec
+
+logger = logging.getLogger(__name__)
+
+RECORD_STORE_FILE = ".record_store.db"
+MANIFEST_SUFFIX = ".manifest"
+
+# A manifest line is a hex SHA-256 digest and a newline
+HASH_LINE_BYTES = 65
+
+SESSION_PREFIX = "sync_session_"
+
+# Stay well below SQLite's bound-parameter limit
+LOOKUP_BATCH = 500
+
+
+def record_hash(encoded: bytes) -> str:
+    """Content address of an encoded record."""
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def find_record_store(directory: Path) -> Optional[Path]:
+    """
+    Find the record store serving a directory (the directory itself or its nearest parent that has one).
+    """
+    directory = Path(directory).resolve()
+    for candidate in [directory] + list(directory.parents):
+        store_path = candidate / RECORD_STORE_FILE
+        if store_path.is_file():
+            return store_path
+    return None
+
+
+def store_path_for(output_base_dir: Path) -> Path:
+    """
+    The record store new manifests under ``output_base_dir`` should use.
+
+    An existing store in the directory or one of its parents is reused. Otherwise the
+    store is created in the base directory, or in the sessions root for the
+    ``raw_json`` directory of a sync session, so all sessions share it.
+    """
+    output_base_dir = Path(output_base_dir)
+    existing = find_record_store(output_base_dir)
+    if existing is not None:
+        return existing
+    resolved = output_base_dir.resolve()
+    if resolved.parent.name.startswith(SESSION_PREFIX):
+        return resolved.parent.parent / RECORD_STORE_FILE
+    return output_base_dir / RECORD_STORE_FILE
+
+
+class RecordStore:
+    """
+    SQLite table of zlib-compressed records keyed by content hash.
+
+    Writes are idempotent (a record that is already stored is skipped), so
+    concurrent module writers and resumed runs can put the same records again.
+    """
+
+    def __init__(self, db_path: Path):
+        """
+        Open (or create) a record store.
+
+        Args:
+            db_path: Path of the store database
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS records (
+                    hash TEXT PRIMARY KEY,
+                    data BLOB NOT NULL,
+                    size INTEGER NOT NULL
+                ) WITHOUT ROWID
+            """)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def put_many(self, records: List[Dict[str, Any]]) -> List[str]:
+        """
+        Store records and return their hashes in the same order.
+        """
+        hashes, rows = [], []
+        for record in records:
+            encoded = json_codec.dumpb(record)
+            digest = record_hash(encoded)
+            hashes.append(digest)
+            rows.append((digest, zlib.compress(encoded), len(encoded)))
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR IGNORE INTO records (hash, data, size) VALUES (?, ?, ?)", rows)
+        return hashes
+
+    def get_many(self, hashes: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch records by hash.
+
+        Returns:
+            Mapping of hash -> record for the hashes that are stored
+        """
+        found = {}
+        unique = list(dict.fromkeys(hashes))
+        with self._lock:
+            for start in range(0, len(unique), LOOKUP_BATCH):
+                chunk = unique[start:start + LOOKUP_BATCH]
+                placeholders = ",".join("?" * len(chunk))
+                for digest, data in self._conn.execute(
+                        f"SELECT hash, data FROM records WHERE hash IN ({placeholders})", chunk):
+                    found[digest] = json_codec.loads(zlib.decompress(data))
+        return found
+
+    def iter_records(self, hashes: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the records for a sequence of hashes, in order.
+
+        Raises:
+            ValueError: If a hash is not in the store
+        """
+        batch = []
+        for digest in hashes:
+            batch.append(digest)
+            if len(batch) >= LOOKUP_BATCH:
+                yield from self._resolve(batch)
+                batch = []
+        if batch:
+            yield from self._resolve(batch)
+
+    def _resolve(self, hashes: List[str]) -> Iterator[Dict[str, Any]]:
+        found = self.get_many(hashes)
+        for digest in hashes:
+            if digest not in found:
+                raise ValueError(f"Record {digest} is missing from {self.db_path}")
+            yield found[digest]
+
+    def remove_unreferenced(self, referenced: Iterable[str]) -> int:
+        """
+        Delete records no manifest refers to.
+
+        Returns:
+            Number of records deleted
+        """
+        with self._lock, self._conn:
+            self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS referenced (hash TEXT PRIMARY KEY) WITHOUT ROWID")
+            self._conn.execute("DELETE FROM referenced")
+            self._conn.executemany("INSERT OR IGNORE INTO referenced (hash) VALUES (?)",
+                                   ((digest,) for digest in referenced))
+            deleted = self._conn.execute(
+                "DELETE FROM records WHERE hash NOT IN (SELECT hash FROM referenced)").rowcount
+            self._conn.execute("DELETE FROM referenced")
+        return deleted
+
+    def stats(self) -> Dict[str, Any]:
+        """Number of stored records and their total uncompressed size."""
+        with self._lock:
+            count, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM records").fetchone()
+        return {"records": count, "bytes": size}
+
+    def compact(self) -> None:
+        """Return the space of deleted records to the file system."""
+        with self._lock:
+            self._conn.execute("VACUUM")
+
+
+def read_manifest(path: Path) -> List[str]:
+    """The record hashes listed in a manifest, in order."""
+    with open(path, "r", encoding="ascii") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def iter_manifest_records(path: Path) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the records of a manifest from the store that serves it.
+
+    Raises:
+        ValueError: If no store is found or a record is missing from it
+    """
+    path = Path(path)
+    store_path = find_record_store(path.parent)
+    if store_path is None:
+        raise ValueError(f"No {RECORD_STORE_FILE} found for {path}")
+    store = RecordStore(store_path)
+    try:
+        yield from store.iter_records(read_manifest(path))
+    finally:
+        store.close()
+
+
+class ManifestWriter:
+    """
+    Stores records in the record store and appends their hashes to a manifest.
+
+    Every manifest line has the same length, so the resumable position is
+    simply ``records * HASH_LINE_BYTES``. Records are committed to the store
+    before their hashes are written, so a manifest never refers to a record
+    that is not stored.
+    """
+
+    def __init__(self, path: Path, store_path: Path, resume_state: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            path: Manifest file to write (usually a ``.partial`` path).
+            store_path: Record store receiving the records (opened until the writer is closed).
+            resume_state: State from a previous ``checkpoint_state()`` to continue from.
+        """
+        self.path = Path(path)
+        self.store = RecordStore(store_path)
+        self.record_count = 0
+        self._file = None
+        if resume_state:
+            self.record_count = resume_state.get("records", 0)
+            self._file = open(self.path, "r+b") if self.path.exists() else open(self.path, "wb")
+            self._file.truncate(self.record_count * HASH_LINE_BYTES)
+            self._file.seek(self.record_count * HASH_LINE_BYTES)
+
+    def write(self, records: List[Dict[str, Any]]) -> int:
+        """Store records and append their hashes to the manifest."""
+        hashes = self.store.put_many(records)
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "wb")
+        self._file.write("".join(f"{digest}\n" for digest in hashes).encode("ascii"))
+        self.record_count += len(hashes)
+        return len(hashes)
+
+    def checkpoint_state(self) -> Dict[str, Any]:
+        """
+        Flush the manifest and describe the resumable position.
+
+        Returns:
+            dict: Record count and byte offset of the manifest.
+        """
+        if self._file is not None:
+            self._file.flush()
+        return {"records": self.record_count, "offset": self.record_count * HASH_LINE_BYTES}
+
+    def close(self) -> int:
+        """Close the manifest and the store. Returns the total number of records written."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+        return self.record_count
+
+    def abort(self):
+        """Close the manifest without further writes (it is truncated on resume)."""
+        self.close()
+
+
+def write_manifest(path: Path, records: List[Dict[str, Any]], store_path: Optional[Path] = None) -> None:
+    """
+    Write a complete module as a manifest.
+
+    Args:
+        path: Target ``{module}.manifest`` file
+        records: Records to save
+        store_path: Record store to use (default: store_path_for() the timestamp directory's parent)
+    """
+    path = Path(path)
+    partial_path = path.with_name(path.name + ".partial")
+    writer = ManifestWriter(partial_path, store_path or store_path_for(path.parent.parent))
+    try:
+        writer.write(records)
+    finally:
+        writer.close()
+    partial_path.replace(path)
+
+
+# ----------------------------------------------------------------------
+# Deduplication and garbage collection
+# ----------------------------------------------------------------------
+
+def _timestamp_dirs(base_dir: Path) -> List[Path]:
+    """Finalized timestamp directories, oldest first."""
+    return sorted((d for d in base_dir.iterdir() if d.is_dir() and is_timestamp_dir(d.name)), key=lambda d: d.name)
+
+
+def _session_dirs(base_dir: Path) -> List[Path]:
+    """Sync session directories, oldest first."""
+    return sorted((d for d in base_dir.iterdir() if d.is_dir() and d.name.startswith(SESSION_PREFIX)),
+                  key=lambda d: d.name)
+
+
+def dedupe_directory(timestamp_dir: Path, store_path: Path) -> Dict[str, int]:
+    """
+    Replace the module files of a timestamp directory with manifests.
+
+    Args:
+        timestamp_dir: Finalized timestamp directory
+        store_path: Record store receiving the records
+
+    Returns:
+        Number of modules converted and bytes of module files removed
+    """
+    from . import raw_store
+
+    converted, freed = 0, 0
+    for module_name, path in raw_store.list_module_paths(timestamp_dir).items():
+        if path.suffix == MANIFEST_SUFFIX:
+            continue
+        size = raw_store.storage_stat(path)[0]
+        manifest_path = Path(timestamp_dir) / f"{module_name}{MANIFEST_SUFFIX}"
+        partial_path = manifest_path.with_name(manifest_path.name + ".partial")
+        writer = ManifestWriter(partial_path, store_path)
+        try:
+            batch = []
+            for record in raw_store.iter_records(path):
+                batch.append(record)
+                if len(batch) >= raw_store.DEFAULT_CHUNK_RECORDS:
+                    writer.write(batch)
+                    batch = []
+            if batch:
+                writer.write(batch)
+            writer.close()
+        except Exception as e:
+            writer.abort()
+            partial_path.unlink(missing_ok=True)
+            logger.warning(f"Could not deduplicate {path}: {e}")
+            continue
+        partial_path.replace(manifest_path)
+        if path.is_dir():
+            shutil.rmtree(path)
+        else:
+            path.unlink()
+        converted += 1
+        freed += size
+    return {"modules": converted, "bytes": freed}
+
+
+def _discard_index_rows(base_dir: Path, timestamp_dir: str) -> None:
+    """Drop summary and record-version rows of a deleted timestamp directory and catalog the deletion."""
+    from .local_index import SyncSummaryIndex, LocalRecordIndex
+    from .sync_catalog import record_sync, STATUS_DELETED
+
+    SyncSummaryIndex(base_dir).discard(timestamp_dir)
+    record_sync(base_dir, timestamp_dir, STATUS_DELETED)
+    index = LocalRecordIndex(base_dir)
+    try:
+        index.discard(timestamp_dir)
+    finally:
+        index.close()
+
+
+def collect_garbage(base_dir: Path, keep: int, dedupe: bool = False, dry_run: bool = False) -> Dict[str, Any]:
+    """
+    Enforce the retention count and remove unreferenced records from the store.
+
+    In a raw JSON base directory the newest ``keep`` finalized timestamp
+    directories are kept; in a sessions root the newest ``keep`` sync sessions.
+    Temporary (``.tmp``) directories are never deleted, so interrupted syncs can
+    still be resumed. Expiring timestamp directories are first compacted into the
+    latest-state snapshot (see snapshot.py), so no record version is lost.
+
+    Args:
+        base_dir: Raw JSON base directory or sync sessions root
+        keep: Number of timestamp directories / sessions to keep (at least 1)
+        dedupe: Also convert module files in the kept directories to manifests
+        dry_run: Only report what would be deleted
+
+    Returns:
+        Deleted directories, deduplicated modules, removed records and freed bytes
+    """
+    base_dir = Path(base_dir)
+    keep = max(1, keep)
+    result = {"base_dir": str(base_dir), "keep": keep, "dry_run": dry_run, "deleted_dirs": [],
+              "deduplicated_modules": 0, "freed_bytes": 0, "removed_records": 0}
+    if not base_dir.is_dir():
+        return result
+
+    timestamp_dirs, sessions = _timestamp_dirs(base_dir), _session_dirs(base_dir)
+    expired = timestamp_dirs[:-keep] + sessions[:-keep]
+    if not dry_run and len(timestamp_dirs) > keep:
+        from .snapshot import ConsolidatedView
+        result["compaction"] = ConsolidatedView(base_dir).compact()
+    for directory in expired:
+        result["deleted_dirs"].append(directory.name)
+        result["freed_bytes"] += sum(f.stat().st_size for f in directory.rglob("*") if f.is_file())
+        if dry_run:
+            continue
+        shutil.rmtree(directory)
+        if directory in timestamp_dirs:
+            _discard_index_rows(base_dir, directory.name)
+        else:
+            from .sync_catalog import SyncCatalog
+            SyncCatalog(base_dir).discard_base(f"{directory.name}/raw_json")
+        logger.info(f"🗑️  Deleted {directory} (retention: keep {keep})")
+
+    if dry_run:
+        return result
+
+    store_path = base_dir / RECORD_STORE_FILE
+    if dedupe:
+        kept = timestamp_dirs[-keep:] + [d for session in sessions[-keep:] if (session / "raw_json").is_dir()
+                                         for d in _timestamp_dirs(session / "raw_json")]
+        for timestamp_dir in kept:
+            deduped = dedupe_directory(timestamp_dir, store_path)
+            result["deduplicated_modules"] += deduped["modules"]
+            result["freed_bytes"] += deduped["bytes"]
+
+    if store_path.is_file():
+        referenced = set()
+        for manifest in list(base_dir.rglob(f"*{MANIFEST_SUFFIX}")) + list(base_dir.rglob(f"*{MANIFEST_SUFFIX}.partial")):
+            # A manifest below a nested store belongs to that store
+            if find_record_store(manifest.parent) == store_path.resolve():
+                referenced.update(read_manifest(manifest))
+        store = RecordStore(store_path)
+        try:
+            result["removed_records"] = store.remove_unreferenced(referenced)
+            if result["removed_records"]:
+                store.compact()
+            result["store"] = store.stats()
+        finally:
+            store.close()
+    return result
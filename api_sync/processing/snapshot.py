@@ -0,0 +1,359 @@
+"""
+Latest-state snapshot of the raw JSON history.
+
+Every sync run adds a timestamp directory holding the records that changed
+since the previous run. Instead of walking all of them, readers use a
+ConsolidatedView: one ``snapshot/`` directory with the newest version of every
+record per module (written by compaction), plus the few timestamp directories
+finalized after it (the deltas). Records are merged by module ID field, later
+directories winning unless their ``last_modified_time`` is older.
+
+Line items are merged per parent record instead: when a directory holds the
+detailed parent record (or any of its line items), its line items replace the
+parent's whole line item set, so items removed from a document upstream drop
+out. Deleted records themselves are not handled: incremental syncs only list
+records modified since the last run and Zoho reports no deletions, so a record
+deleted in Zoho stays in the latest state (and its line items with it).
+
+Compaction folds the current deltas into a new snapshot, which replaces the
+old one with a directory rename, so readers see either the old or the new
+snapshot. The timestamp directories themselves are left in place; retention
+cleanup (record_store.collect_garbage) removes them.
+"""
+
+import logging
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Set, Tuple
+
+try:
+    from ..utils import is_timestamp_dir
+except ImportError:
+    from utils import is_timestamp_dir
+
+from . import raw_store, json_codec
+from .local_index import module_id_field, record_content_hash
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_DIR = "snapshot"
+STATE_FILE = "snapshot_state.json"
+
+# Re-compact once this many sync directories were finalized after the snapshot
+DEFAULT_COMPACTION_THRESHOLD = 20
+
+LINE_ITEMS_SUFFIX = "_line_items"
+
+# Parent reference added to every line item by ZohoRecordHelpers._extract_line_items
+LINE_ITEM_PARENT_FIELD = "parent_id"
+
+# Fields of a detailed parent record holding its line items (as in ZohoRecordHelpers._extract_line_items)
+LINE_ITEM_LIST_FIELDS = ("line_items", "invoice_items", "bill_items", "items")
+
+
+def _merge_key(record: Dict[str, Any], id_field: str) -> str:
+    record_id = record.get(id_field)
+    return f"id:{record_id}" if record_id else f"content:{record_content_hash(record)}"
+
+
+def _is_older(record: Dict[str, Any], existing: Dict[str, Any]) -> bool:
+    new_modified, old_modified = record.get("last_modified_time"), existing.get("last_modified_time")
+    return bool(new_modified and old_modified and new_modified < old_modified)
+
+
+def merge_records(sources: Iterable[Iterable[Dict[str, Any]]], id_field: str) -> List[Dict[str, Any]]:
+    """
+    Merge record lists (oldest source first) into the newest version per ID.
+
+    Records without an ID are kept once per distinct content.
+
+    Args:
+        sources: Record iterables, oldest first
+        id_field: ID field of the module
+
+    Returns:
+        Merged records, in first-seen order
+    """
+    merged: Dict[str, Dict[str, Any]] = {}
+    for records in sources:
+        for record in records:
+            if not isinstance(record, dict):
+                continue
+            key = _merge_key(record, id_field)
+            existing = merged.get(key)
+            if existing is not None and _is_older(record, existing):
+                continue
+            merged[key] = record
+    return list(merged.values())
+
+
+def merge_line_items(sources: Iterable[Tuple[Iterable[Dict[str, Any]], Set[str]]], id_field: str,
+                     parent_field: str = LINE_ITEM_PARENT_FIELD) -> List[Dict[str, Any]]:
+    """
+    Merge line item lists (oldest source first), replacing line item sets per parent.
+
+    Every parent with line items in a source, or listed in the source's
+    refreshed parents, loses the line items of all older sources. Line items
+    without a parent reference are merged by ID like ``merge_records``.
+
+    Args:
+        sources: (line items, IDs of the parents re-fetched in detail) per source, oldest first
+        id_field: ID field of the line items
+        parent_field: Field holding the parent record ID
+
+    Returns:
+        Merged line items, in first-seen order
+    """
+    merged: Dict[str, Dict[str, Any]] = {}
+    keys_by_parent: Dict[str, Set[str]] = {}
+    for records, refreshed_parents in sources:
+        records = [record for record in records if isinstance(record, dict)]
+        replaced = set(refreshed_parents)
+        replaced.update(str(record[parent_field]) for record in records if record.get(parent_field))
+        for parent in replaced:
+            for key in keys_by_parent.pop(parent, ()):
+                merged.pop(key, None)
+
+        for record in records:
+            key = _merge_key(record, id_field)
+            parent = record.get(parent_field)
+            if parent:
+                keys_by_parent.setdefault(str(parent), set()).add(key)
+            else:
+                existing = merged.get(key)
+                if existing is not None and _is_older(record, existing):
+                    continue
+            merged[key] = record
+    return list(merged.values())
+
+
+class ConsolidatedView:
+    """
+    Snapshot plus deltas of a raw JSON base directory.
+    """
+
+    def __init__(self, json_base_dir: str = "data/raw_json"):
+        """
+        Args:
+            json_base_dir: Base directory containing the timestamped raw JSON directories
+        """
+        self.json_base_dir = Path(json_base_dir)
+        self.snapshot_dir = self.json_base_dir / SNAPSHOT_DIR
+        self._recover()
+
+    def _recover(self) -> None:
+        """Put back the previous snapshot if a compaction stopped between its two renames."""
+        previous = self.json_base_dir / f"{SNAPSHOT_DIR}.old"
+        if previous.is_dir() and not self.snapshot_dir.exists():
+            os.replace(previous, self.snapshot_dir)
+            logger.warning(f"Restored snapshot from interrupted compaction in {self.json_base_dir}")
+
+    def state(self) -> Dict[str, Any]:
+        """The snapshot state ({} if there is no snapshot yet)."""
+        try:
+            return json_codec.load_file(self.snapshot_dir / STATE_FILE)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable snapshot state in {self.snapshot_dir}: {e}")
+            return {}
+
+    def has_snapshot(self) -> bool:
+        return bool(self.state().get("compacted_through"))
+
+    def delta_dirs(self) -> List[Path]:
+        """Finalized timestamp directories newer than the snapshot, oldest first."""
+        if not self.json_base_dir.is_dir():
+            return []
+        compacted_through = self.state().get("compacted_through") or ""
+        return sorted((d for d in self.json_base_dir.iterdir()
+                       if d.is_dir() and is_timestamp_dir(d.name) and d.name > compacted_through),
+                      key=lambda d: d.name)
+
+    def modules(self) -> List[str]:
+        """Modules present in the snapshot or any delta."""
+        modules = set(raw_store.list_module_paths(self.snapshot_dir))
+        for delta in self.delta_dirs():
+            modules.update(raw_store.list_module_paths(delta))
+        return sorted(modules)
+
+    def module_sources(self, module_name: str) -> List[Path]:
+        """Storage paths holding a module: the snapshot first, then deltas oldest first."""
+        sources = []
+        for directory in [self.snapshot_dir] + self.delta_dirs():
+            path = raw_store.find_module_path(directory, module_name) if directory.is_dir() else None
+            if path is not None:
+                sources.append(path)
+        return sources
+
+    def refreshed_parents(self, directory: Path, module_name: str) -> Set[str]:
+        """
+        IDs of the parents whose detailed record (with its line item list) is saved in a directory.
+
+        Args:
+            directory: Snapshot or timestamp directory
+            module_name: Line item module (e.g. 'invoices_line_items')
+
+        Returns:
+            Parent IDs as strings (empty for other modules)
+        """
+        if not module_name.endswith(LINE_ITEMS_SUFFIX):
+            return set()
+        parent_module = module_name[:-len(LINE_ITEMS_SUFFIX)]
+        path = raw_store.find_module_path(directory, parent_module) if directory.is_dir() else None
+        if path is None:
+            return set()
+        id_field = module_id_field(parent_module)
+        return {str(record[id_field]) for record in raw_store.iter_records(path)
+                if isinstance(record, dict) and record.get(id_field)
+                and any(isinstance(record.get(field), list) for field in LINE_ITEM_LIST_FIELDS)}
+
+    def _merge_sources(self, module_name: str, sources: List[Path]) -> List[Dict[str, Any]]:
+        """Merge the storage paths of a module, oldest first."""
+        id_field = module_id_field(module_name)
+        if module_name.endswith(LINE_ITEMS_SUFFIX):
+            # Nothing is older than the first source, so its parents need no lookup
+            return merge_line_items(((raw_store.iter_records(path),
+                                      self.refreshed_parents(path.parent, module_name) if index else set())
+                                     for index, path in enumerate(sources)), id_field)
+        return merge_records((raw_store.iter_records(path) for path in sources), id_field)
+
+    def load_module(self, module_name: str) -> List[Dict[str, Any]]:
+        """
+        Latest state of a module: snapshot records updated by the deltas.
+
+        Returns:
+            Records (empty if the module was never saved)
+        """
+        sources = self.module_sources(module_name)
+        if len(sources) == 1:
+            return raw_store.load_records(sources[0], max_workers=4)
+        return self._merge_sources(module_name, sources)
+
+    def iter_module(self, module_name: str) -> Iterator[Dict[str, Any]]:
+        """
+        Stream the latest state of a module.
+
+        Only the deltas are held in memory (merged by ID); the snapshot, which
+        holds most of the records, is read record by record. Records come in
+        snapshot order, followed by the records that only exist in the deltas
+        (for line items: followed by the line items of the parents the deltas
+        replaced).
+        """
+        sources = self.module_sources(module_name)
+        if not sources:
+            return
+        if sources[0].parent != self.snapshot_dir or len(sources) == 1:
+            if len(sources) == 1:
+                yield from raw_store.iter_records(sources[0])
+            else:
+                yield from self._merge_sources(module_name, sources)
+            return
+
+        id_field = module_id_field(module_name)
+        if module_name.endswith(LINE_ITEMS_SUFFIX):
+            replaced = set()
+            for path in sources[1:]:
+                replaced |= self.refreshed_parents(path.parent, module_name)
+            delta_items = self._merge_sources(module_name, sources[1:])
+            replaced.update(str(item[LINE_ITEM_PARENT_FIELD]) for item in delta_items
+                            if item.get(LINE_ITEM_PARENT_FIELD))
+            orphans = {_merge_key(item, id_field): item for item in delta_items
+                       if not item.get(LINE_ITEM_PARENT_FIELD)}
+            for record in raw_store.iter_records(sources[0]):
+                if not isinstance(record, dict):
+                    continue
+                parent = record.get(LINE_ITEM_PARENT_FIELD)
+                if parent and str(parent) in replaced:
+                    continue
+                if not parent and _merge_key(record, id_field) in orphans:
+                    continue
+                yield record
+            yield from delta_items
+            return
+
+        changed = {_merge_key(record, id_field): record
+                   for record in self._merge_sources(module_name, sources[1:])}
+        for record in raw_store.iter_records(sources[0]):
+            if not isinstance(record, dict):
+                continue
+            if not changed:
+                yield record
+                continue
+            newer = changed.pop(_merge_key(record, id_field), None)
+            yield record if newer is None or _is_older(newer, record) else newer
+        yield from changed.values()
+
+    def count(self, module_name: str) -> int:
+        """Number of records in the latest state of a module."""
+        sources = self.module_sources(module_name)
+        compacted = self.state().get("modules", {})
+        if len(sources) == 1 and sources[0].parent == self.snapshot_dir and module_name in compacted:
+            # No delta touched the module since compaction: the state file has the count
+            return compacted[module_name]
+        return len(self.load_module(module_name))
+
+    def describe(self) -> str:
+        """Short description of the sources, e.g. 'snapshot + 2 deltas'."""
+        deltas = len(self.delta_dirs())
+        if not self.has_snapshot():
+            return f"{deltas} sync directories (no snapshot)"
+        return f"{SNAPSHOT_DIR} + {deltas} delta{'s' if deltas != 1 else ''}"
+
+    def needs_compaction(self, threshold: int = DEFAULT_COMPACTION_THRESHOLD) -> bool:
+        """True if there is no snapshot yet, or ``threshold`` or more deltas have accumulated."""
+        deltas = len(self.delta_dirs())
+        if not deltas:
+            return False
+        return not self.has_snapshot() or deltas >= threshold
+
+    def compact(self, storage_format: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Fold all deltas into a new snapshot.
+
+        Args:
+            storage_format: Format of the snapshot module files (default: API_SYNC_RAW_FORMAT or 'json')
+
+        Returns:
+            Summary with the merged directories and per-module record counts
+        """
+        deltas = self.delta_dirs()
+        previous_state = self.state()
+        if not deltas:
+            return {"compacted": False, "reason": "no deltas", "compacted_through": previous_state.get("compacted_through")}
+
+        storage_format = raw_store.resolve_format(storage_format)
+        new_dir = self.json_base_dir / f"{SNAPSHOT_DIR}.new"
+        if new_dir.exists():
+            shutil.rmtree(new_dir)
+        new_dir.mkdir(parents=True)
+
+        module_counts = {}
+        for module_name in self.modules():
+            records = self.load_module(module_name)
+            raw_store.write_records(raw_store.module_path(new_dir, module_name, storage_format), records, storage_format)
+            module_counts[module_name] = len(records)
+
+        state = {
+            "compacted_through": deltas[-1].name,
+            "compacted_at": datetime.now().isoformat(),
+            "merged_dirs": previous_state.get("merged_dirs", 0) + len(deltas),
+            "storage_format": storage_format,
+            "modules": module_counts
+        }
+        json_codec.dump_file(state, new_dir / STATE_FILE, indent=True)
+
+        # Swap in the new snapshot; _recover() handles a stop between the renames
+        previous = self.json_base_dir / f"{SNAPSHOT_DIR}.old"
+        if previous.exists():
+            shutil.rmtree(previous)
+        if self.snapshot_dir.exists():
+            os.replace(self.snapshot_dir, previous)
+        os.replace(new_dir, self.snapshot_dir)
+        shutil.rmtree(previous, ignore_errors=True)
+
+        logger.info(f"🗜️  Compacted {len(deltas)} sync directories into {self.snapshot_dir} "
+                    f"({sum(module_counts.values())} records in {len(module_counts)} modules)")
+        return dict(state, compacted=True, deltas_merged=len(deltas))
@@ -0,0 +1,283 @@
+"""
+Append-only catalog of finalized syncs.
+
+Finding the latest sync used to mean listing the raw JSON base directory and
+parsing every directory name (and, for sessions, globbing inside each one). The
+catalog is a table in the base directory's index database (``.sync_index.db``)
+with one row per event: ``finalized`` when finalize_sync_timestamp() renames a
+``.tmp`` directory, ``failed`` when a sync is cleaned up, ``deleted`` when
+retention removes a directory. The newest row of a directory decides its state,
+so rows are only ever appended.
+
+A sessions root (``data/sync_sessions``) has its own catalog listing the syncs
+of all its sessions (``base`` = ``sync_session_<ts>/raw_json``), so the latest
+session with data is found without opening the sessions.
+
+Directories finalized before the catalog existed are added by a one-time scan
+the first time a catalog is opened; ``rebuild()`` repeats it. A read-only
+catalog (status and report commands) never creates the database: without a
+scanned catalog on disk it scans into an in-memory one.
+"""
+
+import logging
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+try:
+    from ..utils import is_timestamp_dir
+except ImportError:
+    from utils import is_timestamp_dir
+
+from . import raw_store, json_codec
+from .local_index import INDEX_FILENAME, SyncSummaryIndex, _connect as _connect_index, _connect_read_only
+from .record_store import SESSION_PREFIX
+
+logger = logging.getLogger(__name__)
+
+STATUS_FINALIZED = "finalized"
+STATUS_FAILED = "failed"
+STATUS_DELETED = "deleted"
+
+SESSION_RAW_JSON = "raw_json"
+
+_COLUMNS = ("seq", "base", "timestamp_dir", "status", "modules", "record_count", "line_item_count", "recorded_at")
+
+
+def _connect(db_path: Path) -> sqlite3.Connection:
+    """Open the index database with the catalog tables."""
+    conn = _connect_index(db_path)
+    _create_tables(conn)
+    return conn
+
+
+def _create_tables(conn: sqlite3.Connection) -> None:
+    """Create the catalog tables if needed."""
+    with conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS sync_catalog (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                base TEXT NOT NULL,
+                timestamp_dir TEXT NOT NULL,
+                status TEXT NOT NULL,
+                modules TEXT,
+                record_count INTEGER,
+                line_item_count INTEGER,
+                recorded_at TEXT NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS sync_catalog_dirs ON sync_catalog (base, timestamp_dir, seq)")
+        conn.execute("CREATE TABLE IF NOT EXISTS catalog_meta (key TEXT PRIMARY KEY, value TEXT)")
+
+
+def session_base(output_base_dir: Path) -> Optional[Path]:
+    """The sessions root of a ``<root>/sync_session_<ts>/raw_json`` directory, else None."""
+    output_base_dir = Path(output_base_dir)
+    if output_base_dir.name == SESSION_RAW_JSON and output_base_dir.parent.name.startswith(SESSION_PREFIX):
+        return output_base_dir.parent.parent
+    return None
+
+
+class SyncCatalog:
+    """
+    Catalog of the syncs below a raw JSON base directory or a sessions root.
+    """
+
+    def __init__(self, root_dir: str = "data/raw_json", db_path: Optional[str] = None,
+                 read_only: bool = False):
+        """
+        Args:
+            root_dir: Raw JSON base directory or sync sessions root
+            db_path: Index database path (defaults to <root_dir>/.sync_index.db)
+            read_only: Only read an existing database, never create or write it
+        """
+        self.root_dir = Path(root_dir)
+        self.db_path = Path(db_path) if db_path else self.root_dir / INDEX_FILENAME
+        self.read_only = read_only
+
+    def _open(self) -> sqlite3.Connection:
+        if self.read_only:
+            return self._open_read_only()
+        conn = _connect(self.db_path)
+        try:
+            self._backfill(conn)
+        except Exception:
+            conn.close()
+            raise
+        return conn
+
+    def _open_read_only(self) -> sqlite3.Connection:
+        """The catalog on disk if it was scanned, else a scan into an in-memory catalog."""
+        conn = _connect_read_only(self.db_path)
+        if conn is not None:
+            try:
+                if conn.execute("SELECT 1 FROM catalog_meta WHERE key = 'backfilled'").fetchone():
+                    return conn
+            except sqlite3.OperationalError:
+                pass
+            conn.close()
+        conn = sqlite3.connect(":memory:")
+        _create_tables(conn)
+        self._backfill(conn)
+        return conn
+
+    def _backfill(self, conn: sqlite3.Connection) -> None:
+        """Catalog the directories that exist on disk, once per database."""
+        if conn.execute("SELECT 1 FROM catalog_meta WHERE key = 'backfilled'").fetchone():
+            return
+        with conn:
+            # Inserting the marker takes the write lock, so only one process scans
+            if conn.execute("INSERT OR IGNORE INTO catalog_meta VALUES ('backfilled', ?)",
+                            (datetime.now().isoformat(),)).rowcount == 0:
+                return
+            rows = []
+            bases = [("", self.root_dir)]
+            if self.root_dir.is_dir():
+                bases += [(f"{d.name}/{SESSION_RAW_JSON}", d / SESSION_RAW_JSON)
+                          for d in sorted(self.root_dir.iterdir())
+                          if d.is_dir() and d.name.startswith(SESSION_PREFIX)]
+            for base, directory in bases:
+                if not directory.is_dir():
+                    continue
+                for timestamp_dir in sorted(d for d in directory.iterdir() if d.is_dir() and is_timestamp_dir(d.name)):
+                    modules = {name: path.name for name, path in raw_store.list_module_paths(timestamp_dir).items()}
+                    rows.append((base, timestamp_dir.name, STATUS_FINALIZED, json_codec.dumps(modules),
+                                 None, None, datetime.now().isoformat()))
+            conn.executemany("""
+                INSERT INTO sync_catalog (base, timestamp_dir, status, modules, record_count, line_item_count, recorded_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+        if rows:
+            logger.info(f"📒 Catalogued {len(rows)} existing sync directories in {self.root_dir}")
+
+    def append(self, timestamp_dir: str, status: str, base: str = "",
+               modules: Optional[Dict[str, str]] = None, record_count: Optional[int] = None,
+               line_item_count: Optional[int] = None) -> None:
+        """
+        Append a catalog row.
+
+        Args:
+            timestamp_dir: Directory name (YYYY-MM-DD_HH-MM-SS)
+            status: STATUS_FINALIZED, STATUS_FAILED or STATUS_DELETED
+            base: Raw JSON base relative to root_dir ('' for root_dir itself)
+            modules: Module name -> file or directory name in the timestamp directory
+            record_count: Records saved in the directory
+            line_item_count: Line items saved in the directory
+        """
+        if self.read_only:
+            raise ValueError(f"Sync catalog of {self.root_dir} is read-only")
+        conn = self._open()
+        try:
+            with conn:
+                conn.execute("""
+                    INSERT INTO sync_catalog (base, timestamp_dir, status, modules, record_count, line_item_count, recorded_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, (base, timestamp_dir, status, json_codec.dumps(modules) if modules is not None else None,
+                      record_count, line_item_count, datetime.now().isoformat()))
+        finally:
+            conn.close()
+
+    def entries(self, base: Optional[str] = "", limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Finalized directories that were not deleted since, newest first.
+
+        Args:
+            base: Raw JSON base relative to root_dir ('' for root_dir itself, None for all bases)
+            limit: Maximum number of entries
+
+        Returns:
+            Entries with base, timestamp_dir, modules, record_count, line_item_count, recorded_at and path
+        """
+        where, params = ("", []) if base is None else ("WHERE base = ?", [base])
+        conn = self._open()
+        try:
+            rows = conn.execute(f"""
+                SELECT {", ".join("c." + column for column in _COLUMNS)} FROM sync_catalog c
+                JOIN (SELECT MAX(seq) AS seq FROM sync_catalog {where} GROUP BY base, timestamp_dir) latest
+                    ON c.seq = latest.seq
+                WHERE c.status = ?
+                ORDER BY c.timestamp_dir DESC, c.base DESC
+                {"LIMIT " + str(int(limit)) if limit else ""}
+            """, params + [STATUS_FINALIZED]).fetchall()
+        finally:
+            conn.close()
+
+        entries = []
+        for row in rows:
+            entry = dict(zip(_COLUMNS, row))
+            entry["modules"] = json_codec.loads(entry["modules"]) if entry["modules"] else {}
+            entry["path"] = str(self.root_dir / entry["base"] / entry["timestamp_dir"])
+            entries.append(entry)
+        return entries
+
+    def latest(self, base: str = "") -> Optional[Dict[str, Any]]:
+        """
+        The newest finalized directory that still exists (far-future test directories are ignored).
+
+        A directory removed outside of cleanup is marked deleted when found missing
+        (a read-only catalog only skips it).
+        """
+        for entry in self.entries(base):
+            if entry["timestamp_dir"] >= "9999":
+                continue
+            if Path(entry["path"]).is_dir():
+                return entry
+            if self.read_only:
+                continue
+            logger.info(f"📒 Catalogued sync directory is gone, marking it deleted: {entry['path']}")
+            self.append(entry["timestamp_dir"], STATUS_DELETED, entry["base"])
+        return None
+
+    def discard_base(self, base: str) -> None:
+        """Mark every directory of a base deleted (e.g. a sync session removed by retention)."""
+        for entry in self.entries(base):
+            self.append(entry["timestamp_dir"], STATUS_DELETED, base)
+
+    def rebuild(self) -> None:
+        """Drop the catalog and scan the directories on disk again."""
+        conn = _connect(self.db_path)
+        try:
+            with conn:
+                conn.execute("DELETE FROM sync_catalog")
+                conn.execute("DELETE FROM catalog_meta WHERE key = 'backfilled'")
+            self._backfill(conn)
+        finally:
+            conn.close()
+
+
+def record_sync(output_base_dir: str, timestamp_dir: str, status: str) -> None:
+    """
+    Catalog a sync event in its base directory and, for a session, in the sessions root.
+
+    A finalized row lists the directory's modules and the record counts of the
+    sync summary index, so lookups never have to open the directory.
+
+    Args:
+        output_base_dir: Raw JSON base directory of the sync
+        timestamp_dir: Directory name (the final, non-.tmp name)
+        status: STATUS_FINALIZED, STATUS_FAILED or STATUS_DELETED
+    """
+    output_base_dir = Path(output_base_dir)
+    details = {}
+    if status == STATUS_FINALIZED:
+        summaries = SyncSummaryIndex(output_base_dir).summaries(timestamp_dir)
+        record_count, line_item_count = 0, 0
+        for name, summary in summaries.items():
+            if name.endswith("_line_items"):
+                continue
+            record_count += summary["record_count"]
+            # Line items are either embedded in the headers or saved as a separate module file
+            line_items_file = summaries.get(f"{name}_line_items")
+            line_item_count += line_items_file["record_count"] if line_items_file else summary["line_item_count"]
+        details = {
+            "modules": {name: path.name for name, path in raw_store.list_module_paths(output_base_dir / timestamp_dir).items()},
+            "record_count": record_count,
+            "line_item_count": line_item_count
+        }
+
+    SyncCatalog(output_base_dir).append(timestamp_dir, status, **details)
+    sessions_root = session_base(output_base_dir)
+    if sessions_root is not None:
+        base = f"{output_base_dir.parent.name}/{SESSION_RAW_JSON}"
+        SyncCatalog(sessions_root).append(timestamp_dir, status, base=base, **details)
@@ -9,7 +9,9 @@ or applications without requiring direct CLI usage.
 import logging
 import os
 import sys
-from datetime import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Union, Tuple
 import json
 from pathlib import Path
@@ -31,24 +33,39 @@ if is_running_from_api_sync_dir:
     
     try:
         # Try relative imports first
-        from core import auth, client, secrets
-        from processing import raw_data_handler
+        from core import auth, secrets
+        from core.rate_limiter import TokenBucketRateLimiter
+        from core.quota import QuotaLedger
+        from core.detail_cache import DetailRecordCache
+        from processing import raw_data_handler, raw_store, record_store, snapshot
+        from common import dates as date_parsing
+        from processing.local_index import LocalRecordIndex
         from verification import api_local_verifier
         from utils import get_latest_sync_timestamp, ensure_zoho_timestamp_format
         from config import validate_module, get_config, get_supported_modules, get_fetchable_modules
         import config
     except ImportError:
         # Fallback to absolute imports if relative fails
-        from api_sync.core import auth, client, secrets
-        from api_sync.processing import raw_data_handler
+        from api_sync.core import auth, secrets
+        from api_sync.core.rate_limiter import TokenBucketRateLimiter
+        from api_sync.core.quota import QuotaLedger
+        from api_sync.core.detail_cache import DetailRecordCache
+        from api_sync.processing import raw_data_handler, raw_store, record_store, snapshot
+        from common import dates as date_parsing
+        from api_sync.processing.local_index import LocalRecordIndex
         from api_sync.verification import api_local_verifier
         from api_sync.utils import get_latest_sync_timestamp, ensure_zoho_timestamp_format
         from api_sync.config import validate_module, get_config, get_supported_modules, get_fetchable_modules
         from api_sync import config
 else:
     # When imported as a module, use absolute imports
-    from api_sync.core import auth, client, secrets
-    from api_sync.processing import raw_data_handler
+    from api_sync.core import auth, secrets
+    from api_sync.core.rate_limiter import TokenBucketRateLimiter
+    from api_sync.core.quota import QuotaLedger
+    from api_sync.core.detail_cache import DetailRecordCache
+    from api_sync.processing import raw_data_handler, raw_store, record_store, snapshot
+    from common import dates as date_parsing
+    from api_sync.processing.local_index import LocalRecordIndex
     from api_sync.verification import api_local_verifier
     from api_sync.utils import get_latest_sync_timestamp, ensure_zoho_timestamp_format
     from api_sync.config import validate_module, get_config, get_supported_modules, get_fetchable_modules
@@ -74,12 +91,19 @@ class ApiSyncRunner:
     called from other modules or scripts.
     """
     
-    def __init__(self, log_level: str = "INFO"):
+    # Run timestamps handed out in this process (modules started in the same second
+    # must not share a temporary directory)
+    _run_timestamp_lock = threading.Lock()
+    _issued_run_timestamps = set()
+    
+    def __init__(self, log_level: str = "INFO", api_client=None):
         """
         Initialize the runner with configuration.
         
         Args:
             log_level: Logging level (DEBUG, INFO, WARNING, ERROR)
+            api_client: Pre-built API client (e.g. pointed at a mock server). When given,
+                        credentials are not loaded and no token is requested.
         """
         setup_logging(log_level)
         
@@ -91,7 +115,14 @@ class ApiSyncRunner:
         self.api_client = None
         self.zoho_credentials = None
         self.organization_id = None
-        self._initialize_client()
+        self.quota_ledger = None
+        self.token_provider = None
+        if api_client is not None:
+            self.api_client = api_client
+            self.organization_id = getattr(api_client, "organization_id", None)
+            self.quota_ledger = getattr(api_client, "quota_ledger", None)
+        else:
+            self._initialize_client()
         
     def get_available_modules(self) -> List[str]:
         """
@@ -160,14 +191,13 @@ class ApiSyncRunner:
         
         try:
             try:
-                from api_sync.utils import is_timestamp_dir, dir_to_iso_timestamp
-                from api_sync.processing import raw_data_handler
+                from api_sync.utils import dir_to_iso_timestamp
+                from api_sync.processing.sync_catalog import SyncCatalog
             except ImportError:
-                from utils import is_timestamp_dir, dir_to_iso_timestamp
-                from processing import raw_data_handler
+                from utils import dir_to_iso_timestamp
+                from processing.sync_catalog import SyncCatalog
             import os
             
-            # Get all timestamp directories
             json_base_dir = self.config.json_base_dir
             
             # Make path relative to project root (parent of api_sync)
@@ -178,41 +208,15 @@ class ApiSyncRunner:
             if not os.path.exists(full_json_base_dir):
                 return []
             
-            dirs = []
-            for item in os.listdir(full_json_base_dir):
-                item_path = os.path.join(full_json_base_dir, item)
-                if os.path.isdir(item_path) and is_timestamp_dir(item):
-                    dirs.append(item)
-            
-            # Sort by timestamp (newest first)
-            dirs.sort(reverse=True)
-            
-            # Process each directory
-            for dir_name in dirs:
-                dir_path = os.path.join(full_json_base_dir, dir_name)
-                modules = []
-                
-                # Get module information
-                for filename in os.listdir(dir_path):
-                    if filename.endswith('.json'):
-                        module_name = os.path.splitext(filename)[0]
-                        file_path = os.path.join(dir_path, filename)
-                        try:
-                            modules.append({
-                                "name": module_name,
-                                "path": file_path
-                            })
-                        except:
-                            modules.append({
-                                "name": module_name,
-                                "error": "Could not load data"
-                            })
-                
-                # Add to history
+            # The sync catalog lists finalized directories and their modules (newest first)
+            for entry in SyncCatalog(full_json_base_dir, read_only=True).entries():
                 history.append({
-                    "timestamp": dir_name,
-                    "iso_timestamp": dir_to_iso_timestamp(dir_name),
-                    "modules": modules
+                    "timestamp": entry["timestamp_dir"],
+                    "iso_timestamp": dir_to_iso_timestamp(entry["timestamp_dir"]),
+                    "modules": [{"name": module_name, "path": os.path.join(entry["path"], file_name)}
+                                for module_name, file_name in entry["modules"].items()],
+                    "record_count": entry["record_count"],
+                    "line_item_count": entry["line_item_count"]
                 })
         
         except Exception as e:
@@ -234,8 +238,9 @@ class ApiSyncRunner:
                 logger.error("Failed to retrieve Zoho credentials")
                 return False
                 
-            # Get access token
-            access_token = auth.get_access_token(self.zoho_credentials)
+            # Get access token (cached across runs; renewed before expiry and on 401)
+            self.token_provider = auth.AccessTokenProvider(self.zoho_credentials)
+            access_token = self.token_provider.get_token()
             if not access_token:
                 logger.error("Failed to obtain access token")
                 return False
@@ -254,32 +259,85 @@ class ApiSyncRunner:
             logger.info(f"Using organization ID: {self.organization_id}")
             
             # Initialize API client
-            self.api_client = client.ZohoClient(
-                access_token=access_token,
-                organization_id=self.organization_id,
-                api_base_url=self.config.api_base_url
-            )
+            self.api_client = self._create_api_client(access_token)
             
-            logger.info("API client initialized successfully")
+            logger.info(f"API client initialized successfully ({self.config.fetch_engine} engine)")
             return True
             
         except Exception as e:
             logger.error(f"Error initializing API client: {str(e)}")
             return False
     
+    def _create_api_client(self, access_token: str):
+        """
+        Create the API client for the configured fetch engine.
+        
+        The async engine is wrapped in AsyncZohoClientAdapter, which exposes the
+        same blocking methods as ZohoClient, so fetch_data works with either engine.
+        
+        Args:
+            access_token: The active OAuth2 access token
+            
+        Returns:
+            ZohoClient or AsyncZohoClientAdapter instance
+        """
+        self.quota_ledger = QuotaLedger(
+            self.config.quota_ledger_file,
+            self.organization_id,
+            daily_limit=self.config.daily_call_limit
+        )
+        
+        client_kwargs = dict(
+            access_token=access_token,
+            token_provider=self.token_provider,
+            organization_id=self.organization_id,
+            api_base_url=self.config.api_base_url,
+            rate_limiter=TokenBucketRateLimiter(self.config.requests_per_minute),
+            detail_concurrency=self.config.detail_fetch_concurrency,
+            quota_ledger=self.quota_ledger,
+            # Lets detail fetches skip headers already saved at the same last_modified_time
+            record_index=LocalRecordIndex(self.config.json_base_dir) if self.config.reuse_unchanged_details else None,
+            detail_cache=DetailRecordCache(
+                self.config.detail_cache_file,
+                max_bytes=self.config.detail_cache_max_mb * 1024 * 1024,
+                bypass=self.config.detail_cache_bypass
+            ) if self.config.detail_cache_enabled else None
+        )
+        
+        if self.config.fetch_engine == "async":
+            try:
+                from api_sync.core.async_client import AsyncZohoClientAdapter
+            except ImportError:
+                from core.async_client import AsyncZohoClientAdapter
+            return AsyncZohoClientAdapter(max_connections=self.config.async_max_connections, **client_kwargs)
+        
+        # Imported here so that loading the runner (e.g. from global_runner) does not import requests
+        try:
+            from api_sync.core.client import ZohoClient
+        except ImportError:
+            from core.client import ZohoClient
+        return ZohoClient(**client_kwargs)
+    
     def fetch_data(self, 
                   module_name: str, 
                   since_timestamp: Optional[str] = None,
                   full_sync: bool = False,
-                  output_dir: Optional[str] = None) -> Dict[str, Any]:
+                  output_dir: Optional[str] = None,
+                  resume: bool = False) -> Dict[str, Any]:
         """
         Fetch data from a specific Zoho module.
         
+        Progress is checkpointed in the temporary sync directory after every
+        written batch. If the fetch fails part way, that directory is kept, and
+        a later call with resume=True continues from the checkpoint (same run
+        timestamp and cutoff) and appends to the partial output.
+        
         Args:
             module_name: The Zoho module to fetch data from
             since_timestamp: Optional ISO timestamp to fetch data modified since
             full_sync: If True, ignore latest sync timestamp and fetch all data
             output_dir: Custom output directory (uses default if None)
+            resume: If True, continue the latest interrupted sync of this module
             
         Returns:
             Dictionary with fetch results and metadata
@@ -291,109 +349,122 @@ class ApiSyncRunner:
             return {"success": False, "error": f"Invalid module: {module_name}"}
             
         try:
-            # Create timestamp for this run
-            run_timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
-            
-            # Determine the since timestamp
-            fetch_since = since_timestamp
-            if not fetch_since and not full_sync:
-                latest_sync = get_latest_sync_timestamp(self.config.json_base_dir)
-                if latest_sync:
-                    fetch_since = latest_sync
-                    logger.info(f"Using latest sync timestamp: {fetch_since}")
-            
             # Set output directory
             json_base_dir = output_dir or self.config.json_base_dir
             
-            # Get the data based on module type
-            if module_name in ['invoices', 'bills', 'salesorders', 'purchaseorders', 'creditnotes']:
+            checkpoint = None
+            if resume:
+                checkpoint = raw_data_handler.SyncCheckpoint.find_latest(module_name, json_base_dir)
+                if checkpoint:
+                    logger.info(f"♻️ RESUME: Continuing {module_name} sync {checkpoint.run_timestamp} after page "
+                                f"{checkpoint.last_completed_page} ({len(checkpoint.fetched_detail_ids)} details already fetched)")
+                    print(f"[RESUME] {module_name}: continuing sync {checkpoint.run_timestamp} from page {checkpoint.last_completed_page + 1}")
+                else:
+                    logger.info(f"No interrupted {module_name} sync found, starting a new one")
+            
+            resumed = checkpoint is not None
+            if resumed:
+                # A resumed run keeps its original directory and cutoff
+                run_timestamp = checkpoint.run_timestamp
+                fetch_since = checkpoint.since_timestamp
+            else:
+                # Create timestamp for this run
+                run_timestamp = self._new_run_timestamp(json_base_dir)
+                
+                # Determine the since timestamp
+                fetch_since = since_timestamp
+                if not fetch_since and not full_sync:
+                    latest_sync = get_latest_sync_timestamp(self.config.json_base_dir)
+                    if latest_sync:
+                        fetch_since = latest_sync
+                        logger.info(f"Using latest sync timestamp: {fetch_since}")
+                checkpoint = raw_data_handler.SyncCheckpoint(module_name, run_timestamp, json_base_dir, fetch_since)
+            
+            has_line_items = module_name in ['invoices', 'bills', 'salesorders', 'purchaseorders', 'creditnotes']
+            if has_line_items:
                 # These modules have line items to fetch
                 logger.info(f"Fetching {module_name} with line items...")
-                
-                try:
-                    result = self.api_client.get_data_for_module_with_line_items(
-                        module_name, 
-                        since_timestamp=fetch_since
-                    )
-                    
-                    # Save to temporary directories during sync
-                    headers = result.get('headers', [])
-                    raw_data_handler.save_raw_json_temp(
-                        headers, 
-                        module_name, 
-                        run_timestamp, 
-                        json_base_dir
-                    )
-                        
-                    line_items = result.get('line_items', [])
-                    raw_data_handler.save_raw_json_temp(
-                        line_items, 
-                        f"{module_name}_line_items", 
-                        run_timestamp, 
-                        json_base_dir
-                    )
-                    
-                    # ONLY finalize timestamp if entire sync succeeds
-                    finalized = raw_data_handler.finalize_sync_timestamp(run_timestamp, json_base_dir)
-                    if not finalized:
-                        logger.warning("Failed to finalize sync timestamp")
-                        
-                    record_count = len(headers)
-                    line_item_count = len(line_items)
-                    
-                    return {
-                        "success": True,
-                        "module": module_name,
-                        "record_count": record_count,
-                        "line_item_count": line_item_count,
-                        "timestamp": run_timestamp,
-                        "since": fetch_since,
-                        "output_dir": os.path.join(json_base_dir, run_timestamp),
-                        "finalized": finalized
-                    }
-                    
-                except Exception as e:
-                    # Clean up temporary directory on failure
-                    raw_data_handler.cleanup_failed_sync(run_timestamp, json_base_dir)
-                    raise e
-                
             else:
                 # Regular modules without line items
                 logger.info(f"Fetching {module_name}...")
-                
-                try:
-                    records = self.api_client.get_data_for_module(
-                        module_name, 
-                        since_timestamp=fetch_since
+            
+            writers = []
+            try:
+                # Stream each batch into the temporary directory, checkpointing as it lands
+                header_writer = raw_data_handler.RawJsonPageWriter(
+                    module_name, run_timestamp, json_base_dir,
+                    resume_state=checkpoint.outputs.get(module_name),
+                    storage_format=self.config.raw_storage_format,
+                    chunk_records=self.config.raw_chunk_records
+                )
+                writers.append(header_writer)
+                if has_line_items:
+                    line_items_name = f"{module_name}_line_items"
+                    line_item_writer = raw_data_handler.RawJsonPageWriter(
+                        line_items_name, run_timestamp, json_base_dir,
+                        resume_state=checkpoint.outputs.get(line_items_name),
+                        storage_format=self.config.raw_storage_format,
+                        chunk_records=self.config.raw_chunk_records
                     )
+                    writers.append(line_item_writer)
+                
+                id_field = self.api_client.MODULES_WITH_LINE_ITEMS.get(module_name)
+                for batch in self.api_client.iter_data_with_line_items(
+                    module_name, 
+                    since_timestamp=fetch_since,
+                    start_page=checkpoint.last_completed_page + 1,
+                    skip_ids=checkpoint.fetched_detail_ids
+                ):
+                    headers = batch.get('headers', [])
+                    header_writer.write_page(headers)
+                    if has_line_items:
+                        line_item_writer.write_page(batch.get('line_items', []))
                     
-                    # Save to temporary directory during sync
-                    raw_data_handler.save_raw_json_temp(
-                        records, 
-                        module_name, 
-                        run_timestamp, 
-                        json_base_dir
+                    checkpoint.save(
+                        writers,
+                        page=batch['page'] if batch.get('page_complete') else None,
+                        detail_ids=[record[id_field] for record in headers if record.get(id_field)] if id_field else None
                     )
-                    
-                    # ONLY finalize timestamp if entire sync succeeds
-                    finalized = raw_data_handler.finalize_sync_timestamp(run_timestamp, json_base_dir)
-                    if not finalized:
-                        logger.warning("Failed to finalize sync timestamp")
-                    
-                    return {
-                        "success": True,
-                        "module": module_name,
-                        "record_count": len(records),
-                        "timestamp": run_timestamp,
-                        "since": fetch_since,
-                        "output_dir": os.path.join(json_base_dir, run_timestamp),
-                        "finalized": finalized
-                    }
-                    
-                except Exception as e:
+                
+                for writer in writers:
+                    writer.close()
+                
+            except Exception as e:
+                if checkpoint.has_progress:
+                    # Keep the temporary directory so the sync can be resumed
+                    for writer in writers:
+                        writer.abort(keep_partial=True)
+                    logger.warning(f"Sync of {module_name} interrupted after page {checkpoint.last_completed_page}; "
+                                   f"run with resume to continue {run_timestamp}")
+                else:
                     # Clean up temporary directory on failure
+                    for writer in writers:
+                        writer.abort()
                     raw_data_handler.cleanup_failed_sync(run_timestamp, json_base_dir)
-                    raise e
+                raise e
+            
+            # The module completed; the checkpoint is not part of the finalized data
+            checkpoint.clear()
+            
+            # ONLY finalize timestamp if entire sync succeeds
+            finalized = raw_data_handler.finalize_sync_timestamp(run_timestamp, json_base_dir)
+            if not finalized:
+                logger.warning("Failed to finalize sync timestamp")
+            
+            result = {
+                "success": True,
+                "module": module_name,
+                "record_count": header_writer.record_count,
+                "timestamp": run_timestamp,
+                "since": fetch_since,
+                "output_dir": os.path.join(json_base_dir, run_timestamp),
+                "finalized": finalized
+            }
+            if has_line_items:
+                result["line_item_count"] = line_item_writer.record_count
+            if resume:
+                result["resumed"] = resumed
+            return result
                 
         except Exception as e:
             logger.error(f"Error fetching data for {module_name}: {str(e)}")
@@ -425,15 +496,17 @@ class ApiSyncRunner:
                 # Quick verification using existing session data
                 try:
                     from api_sync.verification.simultaneous_verifier import load_session_verification
+                    from api_sync.utils import is_timestamp_dir
                 except ImportError:
                     from verification.simultaneous_verifier import load_session_verification
+                    from utils import is_timestamp_dir
                 
                 session_dir = timestamp_dir
                 if not session_dir:
                     # Find the latest session directory
                     base_dir = Path(self.config.json_base_dir)
                     if base_dir.exists():
-                        dirs = [d.name for d in base_dir.iterdir() if d.is_dir()]
+                        dirs = [d.name for d in base_dir.iterdir() if d.is_dir() and is_timestamp_dir(d.name)]
                         if dirs:
                             session_dir = sorted(dirs)[-1]
                             logger.info(f"Using latest session: {session_dir}")
@@ -513,19 +586,183 @@ class ApiSyncRunner:
             logger.error(f"Error during verification: {str(e)}")
             return {"success": False, "error": str(e)}
     
+    def get_quota_status(self) -> Dict[str, Any]:
+        """
+        Get today's API quota usage for the organization.
+        
+        Returns:
+            Dictionary with calls made, limit, remaining budget and per-module usage
+        """
+        if not self.quota_ledger:
+            return {"error": "Quota ledger not initialized"}
+        return self.quota_ledger.get_status()
+    
+    def get_remaining_quota(self) -> Optional[int]:
+        """
+        Get the number of API calls left today, or None if unknown.
+        """
+        return self.quota_ledger.remaining_budget() if self.quota_ledger else None
+    
+    def cleanup_storage(self, keep: Optional[int] = None, dedupe: bool = False, dry_run: bool = False,
+                        sessions_dir: str = "data/sync_sessions") -> Dict[str, Any]:
+        """
+        Enforce the retention setting on stored sync data and garbage-collect the record store.
+        
+        Deletes timestamp directories (and sync sessions) beyond the newest ``keep``,
+        after compacting them into the latest-state snapshot, optionally converts the kept module files into record store manifests, and
+        removes stored records no manifest refers to. Do not run it while a sync is
+        writing to the same directories.
+        
+        Args:
+            keep: Directories/sessions to keep (default: config.max_sessions_to_keep)
+            dedupe: Convert kept module files into manifests
+            dry_run: Only report what would be deleted
+            sessions_dir: Sync sessions root, cleaned as well if it exists
+            
+        Returns:
+            Dictionary with one garbage-collection result per base directory
+        """
+        keep = keep or self.config.max_sessions_to_keep
+        results = []
+        for base_dir in [self.config.json_base_dir, sessions_dir]:
+            if Path(base_dir).is_dir():
+                result = record_store.collect_garbage(base_dir, keep, dedupe=dedupe, dry_run=dry_run)
+                logger.info(f"🧹 Cleanup of {base_dir}: {len(result['deleted_dirs'])} directories deleted, "
+                            f"{result['deduplicated_modules']} modules deduplicated, "
+                            f"{result['removed_records']} stored records removed")
+                results.append(result)
+        return {"success": True, "keep": keep, "dry_run": dry_run, "results": results}
+    
+    def compact_storage(self, json_base_dir: Optional[str] = None,
+                        storage_format: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Merge the finalized sync directories into the latest-state snapshot.
+        
+        Readers (ApiLocalVerifier, JSONDataPopulator) then load one snapshot file
+        per module plus the directories synced after it, instead of every past sync.
+        
+        Args:
+            json_base_dir: Raw JSON base directory (default: config.json_base_dir)
+            storage_format: Snapshot file format (default: config.raw_storage_format)
+            
+        Returns:
+            Compaction summary (compacted_through, per-module record counts)
+        """
+        view = snapshot.ConsolidatedView(json_base_dir or self.config.json_base_dir)
+        return view.compact(storage_format=storage_format or self.config.raw_storage_format)
+    
+    def _auto_compact(self, json_base_dir: str) -> Optional[Dict[str, Any]]:
+        """
+        Compact after a sync once compaction_threshold new directories have piled up.
+        
+        A failure is logged and does not fail the sync; the deltas stay readable.
+        """
+        threshold = self.config.compaction_threshold
+        if threshold <= 0:
+            return None
+        try:
+            view = snapshot.ConsolidatedView(json_base_dir)
+            if not view.needs_compaction(threshold):
+                return None
+            return view.compact(storage_format=self.config.raw_storage_format)
+        except Exception as e:
+            logger.warning(f"⚠️ Snapshot compaction of {json_base_dir} failed: {e}")
+            return {"compacted": False, "error": str(e)}
+    
+    def _order_modules_by_priority(self, modules: List[str]) -> List[str]:
+        """
+        Order modules by the configured module_priority (unlisted modules go last).
+        """
+        priority = {name: index for index, name in enumerate(self.config.module_priority or [])}
+        return sorted(modules, key=lambda name: priority.get(name, len(priority)))
+    
+    def _new_run_timestamp(self, json_base_dir: str) -> str:
+        """
+        Create a run timestamp that no other sync in this process or on disk uses.
+        
+        On a collision the timestamp moves back a second rather than forward: it is
+        later used as an incremental cutoff, and an earlier cutoff only refetches.
+        """
+        run_time = datetime.now()
+        with self._run_timestamp_lock:
+            while True:
+                run_timestamp = run_time.strftime('%Y-%m-%d_%H-%M-%S')
+                base = Path(json_base_dir)
+                if (run_timestamp not in self._issued_run_timestamps
+                        and not (base / run_timestamp).exists()
+                        and not (base / f"{run_timestamp}.tmp").exists()):
+                    self._issued_run_timestamps.add(run_timestamp)
+                    return run_timestamp
+                run_time -= timedelta(seconds=1)
+    
+    def _quota_skip_result(self, module_name: str, respect_quota: bool) -> Optional[Dict[str, Any]]:
+        """
+        Return a skipped-module result if the daily budget is below the reserve, else None.
+        """
+        remaining = self.get_remaining_quota()
+        if respect_quota and remaining is not None and remaining < self.config.quota_reserve_calls:
+            logger.warning(f"Skipping {module_name}: only {remaining} API calls left today "
+                           f"(reserve {self.config.quota_reserve_calls})")
+            return {
+                "success": False,
+                "module": module_name,
+                "skipped": True,
+                "error": f"Daily API quota nearly exhausted ({remaining} calls left)"
+            }
+        return None
+    
+    def _fetch_modules_parallel(self, modules: List[str], respect_quota: bool,
+                                **fetch_kwargs) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch modules concurrently on a thread pool.
+        
+        All modules share self.api_client, so its rate limiter is the single request
+        budget; the pool only bounds how many modules are in flight. Modules are
+        submitted in priority order, and the quota check runs when a module starts.
+        
+        Returns:
+            Results keyed by module name, in the order of ``modules``
+        """
+        def fetch_module(module_name: str) -> Dict[str, Any]:
+            skipped = self._quota_skip_result(module_name, respect_quota)
+            if skipped:
+                return skipped
+            logger.info(f"Fetching module: {module_name}")
+            return self.fetch_data(module_name=module_name, **fetch_kwargs)
+        
+        workers = max(1, min(self.config.max_parallel_modules, len(modules)))
+        logger.info(f"🔀 Fetching {len(modules)} modules in parallel ({workers} at a time)")
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="module-fetch") as executor:
+            futures = {name: executor.submit(fetch_module, name) for name in modules}
+            return {name: futures[name].result() for name in modules}
+    
     def fetch_all_modules(self, 
                          since_timestamp: Optional[str] = None,
                          full_sync: bool = False,
                          output_dir: Optional[str] = None,
-                         include_excluded: bool = False) -> Dict[str, Any]:
+                         include_excluded: bool = False,
+                         respect_quota: bool = True,
+                         resume: bool = False,
+                         parallel: Optional[bool] = None) -> Dict[str, Any]:
         """
         Fetch data from all supported modules (filtered by configuration).
         
+        Modules are fetched in the configured priority order. When respect_quota
+        is set, modules are skipped once the daily API budget drops below the
+        configured reserve, so the remaining quota is not exhausted mid-module.
+        
+        In parallel mode up to max_parallel_modules modules run at once under the
+        client's shared rate limit, so the sync takes about as long as its
+        slowest module instead of the sum of all of them.
+        
         Args:
             since_timestamp: Optional ISO timestamp to fetch data modified since
             full_sync: If True, ignore latest sync timestamp and fetch all data
             output_dir: Custom output directory (uses default if None)
             include_excluded: If True, include modules that are excluded by default
+            respect_quota: If True, stop starting new modules when the daily budget runs low
+            resume: If True, continue interrupted module syncs from their checkpoints
+            parallel: Fetch modules concurrently (defaults to config parallel_modules)
             
         Returns:
             Dictionary with fetch results for all modules
@@ -534,41 +771,69 @@ class ApiSyncRunner:
             modules = config.get_supported_modules()
         else:
             modules = config.get_fetchable_modules()
+        modules = self._order_modules_by_priority(list(modules))
             
         results = {}
         run_timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
         
-        logger.info(f"Fetching {len(modules)} modules: {list(modules.keys())}")
+        logger.info(f"Fetching {len(modules)} modules: {modules}")
         if not include_excluded and self.config.excluded_modules:
             logger.info(f"Excluded modules: {self.config.excluded_modules}")
         
-        for module_name in modules:
-            logger.info(f"Fetching module: {module_name}")
-            result = self.fetch_data(
-                module_name=module_name,
-                since_timestamp=since_timestamp,
-                full_sync=full_sync,
-                output_dir=output_dir
-            )
-            results[module_name] = result
+        # Resolve the incremental cutoff once: a module finalized during this run
+        # must not become the cutoff for the modules fetched after it
+        if not since_timestamp and not full_sync:
+            since_timestamp = get_latest_sync_timestamp(self.config.json_base_dir)
+            if since_timestamp:
+                logger.info(f"Using latest sync timestamp for all modules: {since_timestamp}")
+        
+        fetch_kwargs = dict(
+            since_timestamp=since_timestamp,
+            full_sync=full_sync,
+            output_dir=output_dir,
+            resume=resume
+        )
+        
+        if parallel is None:
+            parallel = self.config.parallel_modules
+        if parallel and len(modules) > 1:
+            results = self._fetch_modules_parallel(modules, respect_quota, **fetch_kwargs)
+        else:
+            for module_name in modules:
+                skipped = self._quota_skip_result(module_name, respect_quota)
+                if skipped:
+                    results[module_name] = skipped
+                    continue
+                
+                logger.info(f"Fetching module: {module_name}")
+                results[module_name] = self.fetch_data(module_name=module_name, **fetch_kwargs)
             
         # Collect summary information
         total_records = sum(r.get("record_count", 0) for r in results.values() if r.get("success", False))
         total_line_items = sum(r.get("line_item_count", 0) for r in results.values() if r.get("success", False))
         failed_modules = [m for m, r in results.items() if not r.get("success", False)]
+        skipped_modules = [m for m, r in results.items() if r.get("skipped", False)]
+        if self.quota_ledger:
+            self.quota_ledger.flush()
         
+        # Injected or legacy clients may not have a detail cache
+        detail_cache_stats = getattr(self.api_client, "get_detail_cache_stats", None)
         summary = {
             "success": len(failed_modules) == 0,
             "modules_processed": len(modules),
             "modules_succeeded": len(modules) - len(failed_modules),
             "modules_failed": len(failed_modules),
             "failed_modules": failed_modules,
+            "skipped_modules": skipped_modules,
+            "quota_remaining": self.get_remaining_quota(),
+            "detail_cache": detail_cache_stats() if detail_cache_stats else None,
             "total_records": total_records,
             "total_line_items": total_line_items,
             "timestamp": run_timestamp,
             "since": since_timestamp,
             "output_dir": os.path.join(output_dir or self.config.json_base_dir, run_timestamp)
         }
+        summary["compaction"] = self._auto_compact(output_dir or self.config.json_base_dir)
         
         return {
             "summary": summary,
@@ -603,10 +868,10 @@ class ApiSyncRunner:
             if not os.path.exists(latest_path):
                 return {"success": False, "error": f"Latest directory not found: {latest_path}"}
             
-            # Get all JSON files
-            json_files = [f for f in os.listdir(latest_path) if f.endswith('.json')]
+            # Get all module files (JSON arrays or NDJSON directories)
+            module_paths = raw_store.list_module_paths(Path(latest_path))
             
-            if not json_files:
+            if not module_paths:
                 return {"success": False, "error": "No JSON files found in latest directory"}
             
             results = {}
@@ -614,15 +879,11 @@ class ApiSyncRunner:
             total_line_items = 0
             
             # Analyze each file
-            for json_file in sorted(json_files):
-                module_name = os.path.splitext(json_file)[0]
-                file_path = os.path.join(latest_path, json_file)
-                
+            for module_name, file_path in module_paths.items():
                 try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        
-                    if not isinstance(data, list):
+                    try:
+                        data = raw_store.load_records(file_path)
+                    except ValueError:
                         results[module_name] = {"error": "File does not contain a list"}
                         continue
                         
@@ -637,17 +898,10 @@ class ApiSyncRunner:
                             date_fields = ['last_modified_time', 'created_time', 'date', 'invoice_date', 'bill_date']
                             for field in date_fields:
                                 if field in record and record[field]:
-                                    try:
-                                        # Handle different date formats
-                                        date_str = record[field]
-                                        if 'T' in date_str:
-                                            date_obj = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-                                        else:
-                                            date_obj = datetime.strptime(date_str, '%Y-%m-%d')
+                                    date_obj = date_parsing.parse_date(record[field])
+                                    if date_obj:
                                         dates.append(date_obj)
                                         break
-                                    except Exception:
-                                        continue
                     
                     analysis = {
                         "total_records": record_count,
@@ -844,7 +1098,7 @@ def run_tests():
                 if timestamp_dirs:
                     # Check the latest directory for data
                     latest_dir = sorted(timestamp_dirs, key=lambda x: x.name)[-1]
-                    json_files = list(latest_dir.glob("*.json"))
+                    json_files = list(raw_store.list_module_paths(latest_dir).values())
                     
                     print(f"✅ Latest directory: {latest_dir.name}")
                     print(f"✅ JSON files in latest: {len(json_files)}")
@@ -853,11 +1107,7 @@ def run_tests():
                     total_records = 0
                     for json_file in json_files:
                         try:
-                            import json
-                            with open(json_file, 'r') as f:
-                                data = json.load(f)
-                            if isinstance(data, list):
-                                total_records += len(data)
+                            total_records += sum(1 for _ in raw_store.iter_records(json_file))
                         except:
                             pass
                     
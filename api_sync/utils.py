@@ -74,6 +74,14 @@ def dir_to_iso_timestamp(dirname: str) -> str:
     iso_timestamp = f"{year}-{month}-{day}T{hour}:{minute}:{second}Z"
     return iso_timestamp
 
+def _sync_catalog(json_base_dir, read_only: bool = False):
+    """The sync catalog of a raw JSON base directory (imported lazily; utils is imported by processing)."""
+    try:
+        from .processing.sync_catalog import SyncCatalog
+    except ImportError:
+        from processing.sync_catalog import SyncCatalog
+    return SyncCatalog(json_base_dir, read_only=read_only)
+
 def get_latest_timestamp_dir(base_dir: str = None) -> Optional[str]:
     """
     Find the latest timestamp directory in the JSON base directory.
@@ -102,18 +110,10 @@ def get_latest_timestamp_dir(base_dir: str = None) -> Optional[str]:
     if not os.path.exists(full_base_dir):
         return None
     
-    timestamp_dirs = []
-    for item in os.listdir(full_base_dir):
-        item_path = os.path.join(full_base_dir, item)
-        if os.path.isdir(item_path) and is_timestamp_dir(item):
-            timestamp_dirs.append(item)
-    
-    if not timestamp_dirs:
-        return None
-    
-    # Sort directories by timestamp (newest first)
-    timestamp_dirs.sort(reverse=True)
-    return timestamp_dirs[0]
+    # Indexed read of the sync catalog instead of listing every directory (only used by
+    # status and verification reports, so the catalog is never created here)
+    entry = _sync_catalog(full_base_dir, read_only=True).latest()
+    return entry["timestamp_dir"] if entry else None
 
 def convert_to_zoho_timestamp(iso_timestamp: str) -> str:
     """
@@ -153,8 +153,8 @@ def get_latest_sync_timestamp(json_base_dir: str = None) -> Optional[str]:
     """
     Auto-detect the latest sync timestamp from raw JSON directories.
     
-    Looks for timestamped directories (YYYY-MM-DD_HH-MM-SS) and finds
-    the most recent one to determine the last sync time.
+    Reads the most recent finalized timestamped directory (YYYY-MM-DD_HH-MM-SS)
+    from the sync catalog to determine the last sync time.
     
     Excludes test directories (TEST_, CONSOLIDATED_, or year 9999)
     
@@ -185,43 +185,12 @@ def get_latest_sync_timestamp(json_base_dir: str = None) -> Optional[str]:
             logger.warning(f"JSON base directory not found: {json_path}")
             return None
         
-        # Pattern to match timestamped directories: YYYY-MM-DD_HH-MM-SS
-        timestamp_pattern = re.compile(r'(\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2})')
+        # Catalog entries are finalized timestamp directories only (no TEST_/CONSOLIDATED_/.tmp)
+        entry = _sync_catalog(json_path).latest()
         
-        latest_timestamp = None
-        latest_datetime = None
-        
-        for item in json_path.iterdir():
-            if item.is_dir():
-                # Skip test directories, temporary directories, and far-future dates
-                if (item.name.startswith('TEST_') or 
-                    item.name.startswith('CONSOLIDATED_') or
-                    item.name.startswith('9999-') or
-                    item.name.endswith('.tmp')):
-                    logger.debug(f"Skipping test/special/temporary directory: {item.name}")
-                    continue
-                
-                match = timestamp_pattern.search(item.name)
-                if match:
-                    timestamp_str = match.group(1)
-                    try:
-                        # Convert to datetime for comparison
-                        dt = datetime.strptime(timestamp_str, '%Y-%m-%d_%H-%M-%S')
-                        
-                        # Skip far-future dates (likely test data)
-                        if dt.year >= 9999:
-                            logger.debug(f"Skipping far-future timestamp: {timestamp_str}")
-                            continue
-                        
-                        if latest_datetime is None or dt > latest_datetime:
-                            latest_datetime = dt
-                            latest_timestamp = timestamp_str
-                            
-                    except ValueError:
-                        logger.debug(f"Skipping invalid timestamp format: {timestamp_str}")
-                        continue
-        
-        if latest_timestamp:
+        if entry:
+            latest_timestamp = entry["timestamp_dir"]
+            latest_datetime = datetime.strptime(latest_timestamp, '%Y-%m-%d_%H-%M-%S')
             # Convert to ISO format for API use
             iso_timestamp = latest_datetime.isoformat() + '+00:00'
             logger.info(f"Latest sync detected: {latest_timestamp} -> {iso_timestamp}")
@@ -249,11 +218,7 @@ def get_sync_info(json_base_dir: str = "data/raw_json") -> Tuple[Optional[str],
         if not json_path.exists():
             return None, 0
         
-        timestamp_pattern = re.compile(r'(\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2})')
-        directories = [
-            item for item in json_path.iterdir() 
-            if item.is_dir() and timestamp_pattern.search(item.name)
-        ]
+        directories = _sync_catalog(json_path).entries()
         
         latest_timestamp = get_latest_sync_timestamp(json_base_dir)
         return latest_timestamp, len(directories)
@@ -390,23 +355,19 @@ def _check_path_for_module_data(base_path: Path, modules_to_check: list) -> bool
     """Check if a path contains any data for the specified modules."""
     if not base_path.exists():
         return False
+    
+    from .processing.local_index import SyncSummaryIndex
+    summaries = SyncSummaryIndex(base_path)
         
     # Look for timestamp directories
     for timestamp_dir in base_path.iterdir():
         if timestamp_dir.is_dir() and is_timestamp_dir(timestamp_dir.name):
-            # Check if any of our modules have data files
+            # Check if any of our modules have data files (record counts come from the summary index)
             for module in modules_to_check:
-                module_file = timestamp_dir / f"{module}.json"
-                if module_file.exists():
-                    try:
-                        import json
-                        with open(module_file, 'r') as f:
-                            data = json.load(f)
-                            if isinstance(data, list) and len(data) > 0:
-                                logger.debug(f"Found {len(data)} records for {module} in {timestamp_dir.name}")
-                                return True
-                    except:
-                        continue
+                summary = summaries.get(timestamp_dir.name, module)
+                if summary and summary["record_count"] > 0:
+                    logger.debug(f"Found {summary['record_count']} records for {module} in {timestamp_dir.name}")
+                    return True
     
     return False
 
@@ -416,45 +377,26 @@ def _check_comprehensive_data_for_module(module: str, json_base_dir: str, org_id
     
     This is only used when no existing sync data is found.
     """
+    from .processing.local_index import SyncSummaryIndex
+    
     # Check timestamped directories first (highest priority)
     timestamped_path = Path(json_base_dir) / org_id / "timestamped"
     if timestamped_path.exists():
+        summaries = SyncSummaryIndex(timestamped_path)
         for sync_dir in sorted(timestamped_path.iterdir(), reverse=True):
             if sync_dir.is_dir() and is_timestamp_dir(sync_dir.name):
-                module_file = sync_dir / f"{module}.json"
-                if module_file.exists():
-                    try:
-                        import json
-                        with open(module_file, 'r') as f:
-                            data = json.load(f)
-                            # Check if this is comprehensive data (has bulk records with line items)
-                            if isinstance(data, list) and len(data) > 0:
-                                # Check if records have line items populated
-                                sample_record = data[0]
-                                if isinstance(sample_record, dict) and 'line_items' in sample_record:
-                                    line_items = sample_record.get('line_items', [])
-                                    if isinstance(line_items, list) and len(line_items) > 0:
-                                        logger.info(f"✅ Found comprehensive data for {module} in {sync_dir.name}")
-                                        return True
-                    except Exception as e:
-                        logger.warning(f"Error checking {module_file}: {e}")
-                        continue
+                # Comprehensive data = bulk records with line items populated
+                summary = summaries.get(sync_dir.name, module)
+                if summary and summary["records_with_line_items"] > 0:
+                    logger.info(f"✅ Found comprehensive data for {module} in {sync_dir.name}")
+                    return True
     
     # Check consolidated directory if not found in timestamped
-    consolidated_path = Path(json_base_dir) / org_id / "consolidated" / f"{module}.json"
-    if consolidated_path.exists():
-        try:
-            import json
-            with open(consolidated_path, 'r') as f:
-                data = json.load(f)
-                if isinstance(data, list) and len(data) > 0:
-                    sample_record = data[0]
-                    if isinstance(sample_record, dict) and 'line_items' in sample_record:
-                        line_items = sample_record.get('line_items', [])
-                        if isinstance(line_items, list) and len(line_items) > 0:
-                            logger.info(f"✅ Found comprehensive data for {module} in consolidated")
-                            return True
-        except Exception as e:
-            logger.warning(f"Error checking consolidated {module}: {e}")
+    org_path = Path(json_base_dir) / org_id
+    if (org_path / "consolidated" / f"{module}.json").exists():
+        summary = SyncSummaryIndex(org_path).get("consolidated", module)
+        if summary and summary["records_with_line_items"] > 0:
+            logger.info(f"✅ Found comprehensive data for {module} in consolidated")
+            return True
     
     return False
@@ -1,5 +1,22 @@
 """Verification modules for API data."""
 
-from .api_local_verifier import ApiLocalVerifier, verify_latest_data
+import importlib
+
+# api_local_verifier needs the API client; import it only when it is used so the
+# offline simultaneous_verifier (verify --quick) loads without network libraries
+_LAZY_ATTRIBUTES = {
+    'ApiLocalVerifier': '.api_local_verifier',
+    'verify_latest_data': '.api_local_verifier'
+}
 
 __all__ = ['ApiLocalVerifier', 'verify_latest_data']
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -2,17 +2,18 @@
 API vs Local Data Verification Module
 
 Compares data counts between Zoho API and local JSON files to verify completeness.
+Without a specific directory, local counts come from the compacted snapshot plus
+the sync directories written after it (see processing/snapshot.py).
 """
 
-import json
 import logging
 import re
 from pathlib import Path
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 
-from ..core import auth, secrets, client
-from ..processing import raw_data_handler
+from ..processing import raw_data_handler, raw_store
+from ..processing.snapshot import ConsolidatedView
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +41,9 @@ class ApiLocalVerifier:
             True if successful, False otherwise
         """
         try:
+            # The API stack (requests, Secret Manager) is only needed once a client is created
+            from ..core import auth, secrets, client
+            
             logger.info("Initializing Zoho API client...")
             
             # Get credentials
@@ -142,7 +146,7 @@ class ApiLocalVerifier:
     
     def _get_available_modules(self, timestamp_dir: str) -> List[str]:
         """
-        Get list of available modules (JSON files) in the timestamp directory.
+        Get list of available modules (JSON files or NDJSON directories) in the timestamp directory.
         
         Args:
             timestamp_dir: Timestamp directory name
@@ -152,8 +156,7 @@ class ApiLocalVerifier:
         """
         try:
             dir_path = Path(self.json_base_dir) / timestamp_dir
-            json_files = list(dir_path.glob("*.json"))
-            modules = [f.stem for f in json_files]
+            modules = list(raw_store.list_module_paths(dir_path))
             
             logger.info(f"Found {len(modules)} modules: {modules}")
             return modules
@@ -186,12 +189,19 @@ class ApiLocalVerifier:
         }
         
         try:
+            view = ConsolidatedView(self.json_base_dir)
+            use_snapshot = not timestamp_dir and view.has_snapshot()
+            
             # Get local count - search all directories if timestamp_dir not specified
             if timestamp_dir:
-                # Use specific directory
-                local_data = raw_data_handler.load_raw_json(module, timestamp_dir, self.json_base_dir)
-                result["local_count"] = len(local_data) if local_data else 0
+                # Use specific directory (counts come from the sync metadata or a byte scan, not a parse)
+                result["local_count"] = raw_data_handler.count_module_records(module, timestamp_dir, self.json_base_dir)
                 result["source_dir"] = timestamp_dir
+            elif use_snapshot:
+                # Latest state = snapshot updated by the directories synced after it
+                result["local_count"] = view.count(module)
+                result["source_dir"] = view.describe()
+                logger.info(f"Module {module}: {result['local_count']} records in {result['source_dir']}")
             else:
                 # Search all directories for latest data
                 latest_dir, latest_count = self._find_latest_module_data(module)
@@ -208,7 +218,8 @@ class ApiLocalVerifier:
             
             # Get line item details for document modules
             if result["source_dir"]:
-                result["line_item_details"] = self._get_line_item_counts(module, result["source_dir"])
+                result["line_item_details"] = self._get_line_item_counts(
+                    module, result["source_dir"], view if use_snapshot else None)
             
             # Calculate difference - disabled since we removed API count
             result["difference"] = "N/A"  # Difference calculation disabled
@@ -244,30 +255,23 @@ class ApiLocalVerifier:
             Tuple of (timestamp_dir, record_count) for the latest data
         """
         base_path = Path(self.json_base_dir)
-        latest_timestamp = None
-        latest_count = 0
-        latest_dir = None
-        
-        # Search all timestamp directories
+        timestamp_dirs = []
         for dir_path in base_path.iterdir():
-            if dir_path.is_dir() and re.match(r'\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2}', dir_path.name):
-                json_file = dir_path / f"{module}.json"
-                if json_file.exists():
-                    # Parse timestamp from directory name
-                    try:
-                        dir_timestamp = datetime.strptime(dir_path.name, "%Y-%m-%d_%H-%M-%S")
-                        if latest_timestamp is None or dir_timestamp > latest_timestamp:
-                            # Load and count records
-                            data = raw_data_handler.load_raw_json(module, dir_path.name, self.json_base_dir)
-                            if data:  # Only update if we actually got data
-                                latest_timestamp = dir_timestamp
-                                latest_count = len(data)
-                                latest_dir = dir_path.name
-                                logger.debug(f"Found {module} in {dir_path.name}: {latest_count} records")
-                    except ValueError:
-                        continue  # Skip invalid directory names
-        
-        return latest_dir, latest_count
+            if dir_path.is_dir() and re.fullmatch(r'\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2}', dir_path.name):
+                try:
+                    timestamp_dirs.append((datetime.strptime(dir_path.name, "%Y-%m-%d_%H-%M-%S"), dir_path))
+                except ValueError:
+                    continue  # Skip invalid directory names
+        
+        # Newest first: only count files until one has data
+        for _, dir_path in sorted(timestamp_dirs, reverse=True):
+            if raw_store.find_module_path(dir_path, module) is not None:
+                count = raw_data_handler.count_module_records(module, dir_path.name, self.json_base_dir)
+                if count:
+                    logger.debug(f"Found {module} in {dir_path.name}: {count} records")
+                    return dir_path.name, count
+        
+        return None, 0
     
     def print_verification_report(self, results: Dict[str, Any]) -> None:
         """
@@ -395,13 +399,15 @@ class ApiLocalVerifier:
         
         return modules_needing_sync
     
-    def _get_line_item_counts(self, module: str, source_dir: str) -> Dict[str, int]:
+    def _get_line_item_counts(self, module: str, source_dir: str,
+                              view: Optional[ConsolidatedView] = None) -> Dict[str, int]:
         """
         Get line item counts for document modules.
         
         Args:
             module: Module name
             source_dir: Source directory containing the data
+            view: Count the snapshot plus deltas instead of source_dir
             
         Returns:
             Dictionary with header and line item counts
@@ -415,14 +421,17 @@ class ApiLocalVerifier:
             return result
             
         try:
+            if view is not None:
+                result["headers"] = view.count(module)
+                result["line_items"] = view.count(f"{module}_line_items")
+                return result
+            
             # Get header count
-            headers = raw_data_handler.load_raw_json(module, source_dir, self.json_base_dir)
-            result["headers"] = len(headers) if headers else 0
+            result["headers"] = raw_data_handler.count_module_records(module, source_dir, self.json_base_dir)
             
             # Get line items count
             line_items_module = f"{module}_line_items"
-            line_items = raw_data_handler.load_raw_json(line_items_module, source_dir, self.json_base_dir)
-            result["line_items"] = len(line_items) if line_items else 0
+            result["line_items"] = raw_data_handler.count_module_records(line_items_module, source_dir, self.json_base_dir)
             
             logger.debug(f"Module {module}: {result['headers']} headers, {result['line_items']} line items")
             
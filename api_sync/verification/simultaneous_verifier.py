@@ -5,14 +5,13 @@ Provides real-time verification during API sync operations, tracking progress
 and building verification reports without requiring separate API calls.
 """
 
-import json
 import logging
 import time
 from pathlib import Path
 from typing import Dict, Any, List, Tuple, Optional
 from datetime import datetime
 
-from ..processing import raw_data_handler
+from ..processing import raw_data_handler, json_codec
 
 logger = logging.getLogger(__name__)
 
@@ -245,8 +244,7 @@ class SimultaneousSyncVerifier:
             if session_data["end_time"]:
                 session_data["end_time"] = session_data["end_time"].isoformat()
                 
-            with open(session_file, 'w') as f:
-                json.dump(session_data, f, indent=2)
+            json_codec.dump_file(session_data, session_file, indent=True)
                 
             logger.info(f"Saved sync session data to {session_file}")
             
@@ -399,8 +397,7 @@ def load_session_verification(session_dir: str, json_base_dir: str = "data/raw_j
         if not session_file.exists():
             return {"error": f"No session data found in {session_dir}"}
             
-        with open(session_file, 'r') as f:
-            session_data = json.load(f)
+        session_data = json_codec.load_file(session_file)
             
         # Convert back to verification format
         modules_data = {}
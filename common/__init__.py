@@ -0,0 +1,7 @@
+"""
+Helpers shared by the sync packages (api_sync, json2db_sync, csv_db_rebuild, global_runner).
+
+Modules here depend on the standard library (and optional speedups) only and import
+no sync package, so any package can use them without pulling in another one. Code that
+also reads api_sync's raw files (json2db_sync) still imports api_sync.processing.
+"""
@@ -0,0 +1,286 @@
+"""
+Date parsing shared by the date filters and date range scans.
+
+One parser for the date strings found in Zoho records and in the database
+(``2025-07-12``, ``2025-07-12 10:30:00``, ``2025-07-12T10:30:00+0530``,
+``12/07/2025``, ...), replacing the per-module loops that tried every format
+for every value:
+
+- ISO 8601 strings (nearly all Zoho values) take a fast path through
+  ``datetime.fromisoformat``
+- other strings are tried against the caller's format list in order, so an
+  ambiguous value like 01/02/2025 always parses as the first matching format
+- results are kept in an LRU cache, since the same dates repeat across records
+
+Parsed values are always timezone-naive: an offset is dropped and the wall
+clock time kept, as the previous parsers did. Unparseable values give None.
+
+For whole batches (cutoff filtering, min/max ranges) ``on_or_after`` and
+``date_range`` parse the leading ``YYYY-MM-DD`` of every value at once as a
+pandas ``datetime64`` column when pandas is installed; only the values that
+are not ISO dates, or that fall on the boundary day, go through the scalar
+parser. Without pandas the batch functions use the cached scalar parser.
+
+Set API_SYNC_DATE_BACKEND=python to force the scalar path (``auto``, the
+default, uses pandas when available).
+"""
+
+import logging
+import os
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+BACKEND_ENV = "API_SYNC_DATE_BACKEND"
+BACKENDS = ("auto", "pandas", "python")
+
+# Formats tried (after the ISO fast path) by default. Ambiguous slash dates are
+# read day first, as the analyzer and the freshness check always did.
+DATE_FORMATS = (
+    '%Y-%m-%d',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%dT%H:%M:%S',
+    '%d-%m-%Y',
+    '%d/%m/%Y',
+    '%m/%d/%Y',
+)
+
+# Distinct (string, formats) results kept by the scalar parser
+CACHE_SIZE = 65536
+
+# Batches smaller than this are parsed value by value even when pandas is available
+VECTORIZE_MIN = 256
+
+
+class DateRange(NamedTuple):
+    """Earliest and latest date of a batch of values."""
+    earliest: Optional[datetime]
+    latest: Optional[datetime]
+    count: int  # values that parsed
+    earliest_value: Any = None  # the values as given, e.g. to report the stored text
+    latest_value: Any = None
+
+
+def _select_backend(name: Optional[str] = None):
+    """Return the pandas module for the requested backend, or None for the scalar path."""
+    name = (name or os.getenv(BACKEND_ENV, "auto")).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown date backend '{name}' (expected one of {', '.join(BACKENDS)})")
+    if name == "python":
+        return None
+    try:
+        import pandas
+    except ImportError:
+        if name == "pandas":
+            logger.warning("pandas is not installed, parsing date batches value by value")
+        return None
+    return pandas
+
+
+# pandas is imported on the first batch call; importing it is slow and most
+# callers only ever parse single values
+_pandas = None
+_backend_name: Optional[str] = None
+
+
+def _batch_backend():
+    global _pandas, _backend_name
+    if _backend_name is None:
+        _pandas = _select_backend()
+        _backend_name = "pandas" if _pandas is not None else "python"
+    return _pandas
+
+
+def backend() -> str:
+    """Name of the batch backend ('pandas' or 'python')."""
+    _batch_backend()
+    return _backend_name
+
+
+def use_backend(name: str) -> str:
+    """
+    Switch the batch backend at runtime (used by benchmarks).
+
+    Args:
+        name: 'auto', 'pandas' or 'python'
+
+    Returns:
+        The name of the backend that was active before
+    """
+    global _pandas, _backend_name
+    previous = backend()
+    _pandas = _select_backend(name)
+    _backend_name = "pandas" if _pandas is not None else "python"
+    return previous
+
+
+def _naive(value: datetime) -> datetime:
+    return value.replace(tzinfo=None) if value.tzinfo is not None else value
+
+
+def _parse_iso(text: str) -> Optional[datetime]:
+    """ISO 8601 date or date-time (any offset dropped), or None."""
+    if text[-1] in "Zz":
+        # fromisoformat only accepts 'Z' from Python 3.11
+        text = text[:-1] + "+00:00"
+    try:
+        return _naive(datetime.fromisoformat(text))
+    except ValueError:
+        return None
+
+
+def _strptime(text: str, fmt: str) -> Optional[datetime]:
+    try:
+        return datetime.strptime(text, fmt)
+    except ValueError:
+        return None
+
+
+def _parse_formats(text: str, formats: Tuple[str, ...]) -> Optional[datetime]:
+    """Parse with the first format of the list that matches."""
+    for fmt in formats:
+        parsed = _strptime(text, fmt)
+        if parsed is not None:
+            return parsed
+    return None
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _parse_text(text: str, formats: Tuple[str, ...]) -> Optional[datetime]:
+    if len(text) >= 10 and text[4] == '-' and text[7] == '-':
+        parsed = _parse_iso(text)
+        if parsed is not None:
+            return parsed
+    parsed = _parse_formats(text, formats)
+    if parsed is not None:
+        return parsed
+    # Offsets or fractions this Python's fromisoformat rejects, and trailing text:
+    # parse the date-time, then the date on its own
+    for length in (19, 10):
+        if len(text) > length:
+            head = text[:length]
+            parsed = _parse_iso(head) if head[4:5] == '-' else None
+            if parsed is None:
+                parsed = _parse_formats(head, formats)
+            if parsed is not None:
+                return parsed
+    return None
+
+
+def parse_date(value: Any, formats: Sequence[str] = DATE_FORMATS) -> Optional[datetime]:
+    """
+    Parse a date value into a timezone-naive datetime.
+
+    Args:
+        value: A date string, datetime or date (other values are converted with str)
+        formats: strptime formats to try after the ISO fast path, in order of preference
+
+    Returns:
+        The parsed datetime, or None for empty and unparseable values
+    """
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return _naive(value)
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    text = value.strip() if isinstance(value, str) else str(value).strip()
+    if not text or text.lower() in ('null', 'none'):
+        return None
+    return _parse_text(text, formats if type(formats) is tuple else tuple(formats))
+
+
+def cache_info():
+    """Hit/miss statistics of the scalar parser cache."""
+    return _parse_text.cache_info()
+
+
+def clear_cache() -> None:
+    """Empty the scalar parser cache."""
+    _parse_text.cache_clear()
+
+
+def _iso_days(values: Sequence[Any]):
+    """Leading YYYY-MM-DD of every value as a datetime64 Series (NaT where there is none)."""
+    pandas = _pandas
+    heads = pandas.Series([value[:10] if type(value) is str else None for value in values], dtype=object)
+    return pandas.to_datetime(heads, format='%Y-%m-%d', errors='coerce')
+
+
+def on_or_after(values: Sequence[Any], cutoff: datetime, formats: Sequence[str] = DATE_FORMATS) -> List[bool]:
+    """
+    Test a batch of date values against a cutoff.
+
+    Args:
+        values: Date values (None and unparseable values are never on or after the cutoff)
+        cutoff: Timezone-naive cutoff
+        formats: strptime formats for values that are not ISO dates
+
+    Returns:
+        One flag per value: True if it parses to a date-time on or after the cutoff
+    """
+    cutoff = _naive(cutoff)
+    if len(values) < VECTORIZE_MIN or _batch_backend() is None:
+        flags = []
+        for value in values:
+            parsed = parse_date(value, formats)
+            flags.append(parsed is not None and parsed >= cutoff)
+        return flags
+
+    days = _iso_days(values)
+    cutoff_day = _pandas.Timestamp(cutoff.date())
+    keep = (days >= cutoff_day).to_numpy(copy=True)  # NaT compares False
+    recheck = days.isna()
+    if cutoff.time() != datetime.min.time():
+        # Values on the cutoff day are decided by their time
+        recheck |= days == cutoff_day
+    for index in recheck.to_numpy().nonzero()[0]:
+        parsed = parse_date(values[index], formats)
+        keep[index] = parsed is not None and parsed >= cutoff
+    return keep.tolist()
+
+
+def date_range(values: Iterable[Any], formats: Sequence[str] = DATE_FORMATS) -> DateRange:
+    """
+    Earliest and latest date of a batch of values.
+
+    Args:
+        values: Date values (None and unparseable values are skipped)
+        formats: strptime formats for values that are not ISO dates
+
+    Returns:
+        DateRange with the earliest and latest datetimes, the number of values
+        that parsed and the original values the extremes came from
+    """
+    values = values if isinstance(values, (list, tuple)) else list(values)
+    earliest = latest = earliest_value = latest_value = None
+    count = 0
+
+    if len(values) < VECTORIZE_MIN or _batch_backend() is None:
+        candidates = range(len(values))
+    else:
+        # Only values on the first/last ISO day, and the non-ISO values, need a full parse
+        days = _iso_days(values)
+        parsed_days = days.notna()
+        count = int(parsed_days.sum())
+        candidates = days.isna()
+        if count:
+            candidates |= (days == days.min()) | (days == days.max())
+            # The boundary values are parsed again below and counted there
+            count -= int((candidates & parsed_days).sum())
+        candidates = candidates.to_numpy().nonzero()[0]
+
+    for index in candidates:
+        value = values[index]
+        parsed = parse_date(value, formats)
+        if parsed is None:
+            continue
+        count += 1
+        if earliest is None or parsed < earliest:
+            earliest, earliest_value = parsed, value
+        if latest is None or parsed > latest:
+            latest, latest_value = parsed, value
+
+    return DateRange(earliest, latest, count, earliest_value, latest_value)
@@ -9,8 +9,9 @@ from pathlib import Path
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 
-# Add current directory to path for imports
+# Add current directory (and the project root, for the shared common package) to path for imports
 sys.path.append(str(Path(__file__).parent))
+sys.path.append(str(Path(__file__).parent.parent))
 
 from runner_csv_db_rebuild import CSVDatabaseRebuildRunner
 
@@ -13,6 +13,9 @@ import os
 import re
 from typing import Dict, List, Optional, Any
 
+# Date parsing is shared with the other packages
+from common import dates
+
 
 class CSVDatabaseRebuildRunner:
     """
@@ -649,15 +652,14 @@ class CSVDatabaseRebuildRunner:
                 
                 if date_column:
                     try:
-                        # Get oldest date
-                        cursor.execute(f"SELECT MIN(`{date_column}`) FROM `{table_name}` WHERE `{date_column}` IS NOT NULL")
-                        oldest_result = cursor.fetchone()
-                        oldest_date = oldest_result[0] if oldest_result and oldest_result[0] else None
+                        # Oldest and latest date, compared as dates (MIN/MAX of the text
+                        # would order non-ISO dates such as 12/07/2025 as strings)
+                        cursor.execute(f"SELECT `{date_column}` FROM `{table_name}` WHERE `{date_column}` IS NOT NULL AND `{date_column}` != ''")
+                        date_range = dates.date_range([row[0] for row in cursor.fetchall()])
                         
-                        # Get latest date
-                        cursor.execute(f"SELECT MAX(`{date_column}`) FROM `{table_name}` WHERE `{date_column}` IS NOT NULL")
-                        latest_result = cursor.fetchone()
-                        latest_date = latest_result[0] if latest_result and latest_result[0] else None
+                        # Report the stored values, as before
+                        oldest_date = date_range.earliest_value
+                        latest_date = date_range.latest_value
                         
                     except Exception as date_error:
                         self._log(f"Warning: Could not extract date range from {table_name}.{date_column}: {str(date_error)}")
@@ -79,7 +79,8 @@ class GlobalSyncConfig:
                 "auto_backup_before_sync": True,
                 "verify_integrity_after_sync": True,
                 "cleanup_old_sessions": False,
-                "max_sessions_to_keep": 10
+                "max_sessions_to_keep": 10,
+                "deduplicate_raw_json": False
             },
             
             # Freshness monitoring configuration
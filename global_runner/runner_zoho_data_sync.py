@@ -17,6 +17,7 @@ import json
 sys.path.append(str(Path(__file__).parent.parent))
 
 from global_runner.config import GlobalSyncConfig
+from common import dates
 
 
 class GlobalSyncRunner:
@@ -25,6 +26,10 @@ class GlobalSyncRunner:
     Orchestrates api_sync, json2db_sync, and csv_db_rebuild packages.
     """
     
+    # Runner classes already imported in this process, keyed by package name.
+    # Executing a runner module again would re-import its whole dependency stack.
+    _runner_classes: Dict[str, Any] = {}
+    
     def __init__(self, config_file: Optional[str] = None, enable_logging: bool = True):
         """
         Initialize the global sync runner.
@@ -120,13 +125,16 @@ class GlobalSyncRunner:
             os.chdir(original_cwd)
     
     def _import_package_runner(self, package_name: str):
-        """Dynamically import a package runner"""
+        """Dynamically import a package runner (once per process)"""
         try:
             package_config = self.config.get_package_config(package_name)
             if not package_config or not self.config.is_package_enabled(package_name):
                 self._log(f"Package {package_name} is not enabled or configured", "warning")
                 return None
             
+            if package_name in GlobalSyncRunner._runner_classes:
+                return GlobalSyncRunner._runner_classes[package_name]
+            
             package_path = Path(package_config['path']).resolve()
             runner_module = package_config['runner_module']
             
@@ -160,6 +168,7 @@ class GlobalSyncRunner:
                     return None
                 
                 self._log(f"Successfully imported {runner_class_name} from {package_name}")
+                GlobalSyncRunner._runner_classes[package_name] = runner_class
                 return runner_class
             
             finally:
@@ -410,49 +419,10 @@ class GlobalSyncRunner:
     
     def _parse_date(self, date_str: str) -> datetime:
         """Parse date string in various formats, always returning timezone-naive datetime"""
-        date_formats = [
-            '%Y-%m-%d %H:%M:%S',
-            '%Y-%m-%d',
-            '%Y-%m-%dT%H:%M:%S',
-            '%Y-%m-%dT%H:%M:%SZ',
-            '%d/%m/%Y',
-            '%m/%d/%Y'
-        ]
-        
-        for fmt in date_formats:
-            try:
-                parsed_date = datetime.strptime(date_str, fmt)
-                # Convert to timezone-naive if needed
-                return parsed_date.replace(tzinfo=None) if parsed_date.tzinfo else parsed_date
-            except ValueError:
-                continue
-        
-        # Handle timezone format like +0600 by removing timezone info
-        if '+' in date_str and 'T' in date_str:
-            try:
-                # Remove timezone info and parse
-                date_part = date_str.split('+')[0]
-                return datetime.strptime(date_part, '%Y-%m-%dT%H:%M:%S')
-            except ValueError:
-                pass
-        
-        # Handle timezone format like -0600 by removing timezone info
-        if '-' in date_str and 'T' in date_str:
-            try:
-                # Remove timezone info and parse (split on last dash to avoid splitting date)
-                parts = date_str.rsplit('-', 1)
-                if len(parts) == 2 and parts[1].isdigit() and len(parts[1]) == 4:
-                    date_part = parts[0]
-                    return datetime.strptime(date_part, '%Y-%m-%dT%H:%M:%S')
-            except ValueError:
-                pass
-        
-        # If all fails, try to parse just the date part
-        date_part = date_str.split()[0] if ' ' in date_str else date_str
-        try:
-            return datetime.strptime(date_part, '%Y-%m-%d')
-        except ValueError:
+        parsed_date = dates.parse_date(date_str)
+        if parsed_date is None:
             raise ValueError(f"Could not parse date: {date_str}")
+        return parsed_date
     
     def run_full_sync(self, cutoff_days: Optional[int] = None) -> Dict[str, Any]:
         """
@@ -587,6 +557,20 @@ class GlobalSyncRunner:
                 results["stages_failed"].append("freshness_check")
                 self._log("Final freshness check failed", "warning")
             
+            # Stage 4: Retention cleanup, only once the new data has reached the database
+            if self.config.get('sync_pipeline.cleanup_old_sessions', False) and not results["stages_failed"]:
+                keep = self.config.get('sync_pipeline.max_sessions_to_keep', 10)
+                self._log(f"Stage 4: Cleaning up old sync data (keeping {keep} sessions)...")
+                try:
+                    results["cleanup_result"] = self._execute_in_package_directory(
+                        'api_sync', api_runner.cleanup_storage, keep=keep,
+                        dedupe=self.config.get('sync_pipeline.deduplicate_raw_json', False))
+                    results["stages_completed"].append("cleanup")
+                except Exception as e:
+                    # Old data is only kept longer; the sync itself succeeded
+                    results["cleanup_result"] = {"success": False, "error": str(e)}
+                    self._log(f"Cleanup of old sync data failed: {str(e)}", "warning")
+            
             # Calculate total time
             end_time = datetime.now()
             total_time = (end_time - start_time).total_seconds()
@@ -0,0 +1,266 @@
+"""
+Bulk Loader
+One tuned SQLite connection shared by all tables of a population run.
+
+The populator used to open a connection per table (plus one per schema lookup
+and one per population-tracking row), insert in executemany batches of 100
+and run with SQLite's defaults: a rollback journal and synchronous=FULL, so
+every commit waited for several fsyncs. The loader opens the database once,
+switches it to WAL with synchronous=NORMAL, a larger page cache and in-memory
+temp storage, inserts in batches of ``processing.batch_size`` and commits
+every ``processing.transaction_size`` rows (and at the end of each table).
+
+Rows can be written with ``INSERT OR REPLACE`` (``insert_rows``), which deletes
+and reinserts every row, or upserted on the table's Zoho ID (``upsert_rows``):
+new IDs are inserted, and existing rows are only updated when their content
+hash differs, so reloading unchanged records writes nothing.
+"""
+import logging
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Pragmas applied when the connection is opened. journal_mode=WAL is persistent
+# (it is stored in the database file); readers are not blocked by the loader.
+BULK_LOAD_PRAGMAS = (
+    ("journal_mode", "WAL"),
+    ("synchronous", "NORMAL"),
+    ("cache_size", -65536),  # negative = KiB, i.e. 64 MB
+    ("temp_store", "MEMORY"),
+)
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_TRANSACTION_SIZE = 50000
+
+# INSERT ... ON CONFLICT DO UPDATE needs SQLite 3.24
+UPSERT_MIN_SQLITE_VERSION = (3, 24, 0)
+
+
+def supports_upsert() -> bool:
+    """Whether the linked SQLite library supports INSERT ... ON CONFLICT DO UPDATE."""
+    return sqlite3.sqlite_version_info >= UPSERT_MIN_SQLITE_VERSION
+
+
+class BulkLoader:
+    """
+    Holds one connection for a population run and inserts rows in sized transactions.
+
+    Usage:
+        with BulkLoader(db_path, batch_size=1000) as loader:
+            loader.insert_rows("json_invoices", column_names, rows)
+    """
+
+    def __init__(self, db_path: str, batch_size: int = DEFAULT_BATCH_SIZE,
+                 transaction_size: int = DEFAULT_TRANSACTION_SIZE, timeout: int = 30,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            db_path: SQLite database path
+            batch_size: Rows per executemany call
+            transaction_size: Rows per committed transaction (rounded up to whole batches)
+            timeout: Seconds to wait for a locked database
+            logger: Logger for progress messages (defaults to this module's logger)
+        """
+        self.db_path = Path(db_path)
+        self.batch_size = max(1, int(batch_size or DEFAULT_BATCH_SIZE))
+        self.transaction_size = max(self.batch_size, int(transaction_size or DEFAULT_TRANSACTION_SIZE))
+        self.timeout = timeout
+        self.logger = logger or logging.getLogger(__name__)
+        self.conn: Optional[sqlite3.Connection] = None
+        self.rows_inserted = 0
+        self.transactions = 0
+
+    def open(self) -> "BulkLoader":
+        """Open the connection and apply the bulk-load pragmas."""
+        if self.conn is None:
+            self.conn = sqlite3.connect(str(self.db_path), timeout=self.timeout)
+            for name, value in BULK_LOAD_PRAGMAS:
+                self.conn.execute(f"PRAGMA {name}={value}")
+            self.logger.debug(f"Opened bulk loader connection to {self.db_path}")
+        return self
+
+    def close(self) -> None:
+        """Commit anything pending and close the connection."""
+        if self.conn is not None:
+            try:
+                self.conn.commit()
+            finally:
+                self.conn.close()
+                self.conn = None
+
+    def __enter__(self) -> "BulkLoader":
+        return self.open()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is not None and self.conn is not None:
+            self.conn.rollback()
+        self.close()
+
+    def execute(self, sql: str, parameters: Sequence = ()) -> sqlite3.Cursor:
+        """Run a statement on the shared connection (part of the current transaction)."""
+        return self.open().conn.execute(sql, parameters)
+
+    def commit(self) -> None:
+        if self.conn is not None:
+            self.conn.commit()
+            self.transactions += 1
+
+    def table_info(self, table_name: str) -> List[Tuple]:
+        """``PRAGMA table_info`` rows of a table (empty if it doesn't exist)."""
+        return self.execute(f"PRAGMA table_info({table_name})").fetchall()
+
+    def insert_rows(self, table_name: str, column_names: List[str], rows: Iterable[tuple],
+                    verb: str = "INSERT OR REPLACE") -> int:
+        """
+        Insert value tuples into a table.
+
+        Rows are consumed lazily, ``batch_size`` at a time, and committed every
+        ``transaction_size`` rows and once at the end. If an insert fails the
+        open transaction is rolled back (earlier transactions stay committed)
+        and the error is raised.
+
+        Args:
+            table_name: Target table
+            column_names: Columns, in the order of the values in each row
+            rows: Value tuples
+            verb: Statement verb, e.g. 'INSERT OR REPLACE' or 'INSERT OR IGNORE'
+
+        Returns:
+            Number of rows inserted
+        """
+        placeholders = ", ".join("?" for _ in column_names)
+        insert_sql = f"{verb} INTO {table_name} ({', '.join(column_names)}) VALUES ({placeholders})"
+        return self._execute_batches(table_name, insert_sql, rows)
+
+    def prepare_upsert(self, table_name: str, key_column: str, hash_column: str) -> Dict[str, Any]:
+        """
+        Get a table ready for upsert_rows: a content hash column and a unique index on the key.
+
+        Tables loaded before upserts existed can hold several rows per key
+        (INSERT OR REPLACE only replaced rows with the same surrogate ID). Those
+        duplicates are deleted, keeping the most recently inserted row per key,
+        before the index is created. The whole change runs in one transaction.
+
+        Args:
+            table_name: Target table
+            key_column: Column holding the record's Zoho ID
+            hash_column: Column holding the row's content hash (added if missing)
+
+        Returns:
+            Dictionary with 'ready' (False if the table has no such column or
+            SQLite is older than 3.24), the fallback 'reason' (None when ready)
+            and the number of 'duplicates_removed'
+        """
+        status = {'ready': False, 'reason': None, 'duplicates_removed': 0}
+        if not supports_upsert():
+            status['reason'] = f"SQLite {sqlite3.sqlite_version} has no upsert support"
+            return status
+        columns = {row[1] for row in self.table_info(table_name)}
+        if key_column not in columns:
+            status['reason'] = f"no {key_column} column"
+            return status
+
+        index_name = f"uq_{table_name}_{key_column}"
+        indexes = {row[1] for row in self.execute(f"PRAGMA index_list({table_name})").fetchall()}
+        if hash_column in columns and index_name in indexes:
+            status['ready'] = True
+            return status
+
+        conn = self.open().conn
+        self.commit()
+        try:
+            # Python's sqlite3 does not open a transaction for DDL, so open one explicitly
+            conn.execute("BEGIN")
+            if hash_column not in columns:
+                conn.execute(f"ALTER TABLE {table_name} ADD COLUMN {hash_column} TEXT")
+            status['duplicates_removed'] = conn.execute(f"""
+                DELETE FROM {table_name}
+                WHERE {key_column} IS NOT NULL AND rowid NOT IN (
+                    SELECT MAX(rowid) FROM {table_name} WHERE {key_column} IS NOT NULL GROUP BY {key_column}
+                )
+            """).rowcount
+            conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS {index_name} ON {table_name} ({key_column})")
+            self.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        if status['duplicates_removed']:
+            self.logger.warning(f"⚠️ Removed {status['duplicates_removed']} duplicate {key_column} rows from "
+                                f"{table_name} (kept the latest row per {key_column})")
+        status['ready'] = True
+        return status
+
+    def upsert_rows(self, table_name: str, column_names: List[str], rows: Iterable[tuple],
+                    key_column: str, hash_column: str) -> Dict[str, int]:
+        """
+        Upsert value tuples on a key column, skipping rows whose content hash is unchanged.
+
+        Rows with a new key are inserted; rows with a stored key are updated in
+        place only if their hash differs, so unchanged rows are neither
+        rewritten nor reindexed. Batching, commits and rollback work as in
+        insert_rows. The table needs a unique index on the key (prepare_upsert).
+
+        Args:
+            table_name: Target table
+            column_names: Columns, in the order of the values in each row (including both key and hash)
+            rows: Value tuples
+            key_column: Column holding the record's Zoho ID
+            hash_column: Column holding the row's content hash
+
+        Returns:
+            Counts of rows 'inserted', 'updated' and 'unchanged'
+        """
+        placeholders = ", ".join("?" for _ in column_names)
+        assignments = ", ".join(f"{name} = excluded.{name}" for name in column_names if name != key_column)
+        upsert_sql = (
+            f"INSERT INTO {table_name} ({', '.join(column_names)}) VALUES ({placeholders}) "
+            f"ON CONFLICT({key_column}) DO UPDATE SET {assignments} "
+            f"WHERE {table_name}.{hash_column} IS NOT excluded.{hash_column}"
+        )
+        conn = self.open().conn
+        # New rows get rowids above the current maximum, so counting them is a
+        # range scan over the new rows only (MAX(rowid) is a single index lookup)
+        max_rowid = conn.execute(f"SELECT COALESCE(MAX(rowid), 0) FROM {table_name}").fetchone()[0]
+
+        written, changed = self._execute_batches(table_name, upsert_sql, rows, count_changes=True)
+
+        inserted = conn.execute(f"SELECT COUNT(*) FROM {table_name} WHERE rowid > ?", (max_rowid,)).fetchone()[0]
+        return {'inserted': inserted, 'updated': changed - inserted, 'unchanged': written - changed}
+
+    def _execute_batches(self, table_name: str, sql: str, rows: Iterable[tuple], count_changes: bool = False):
+        """
+        Run a statement for every row in batches and sized transactions.
+
+        Returns:
+            Number of rows, or with ``count_changes`` a tuple of (rows, rows
+            changed by the statement itself, excluding trigger changes and
+            skipped upserts)
+        """
+        conn = self.open().conn
+
+        written, uncommitted, changed = 0, 0, 0
+        batch = []
+        try:
+            for row in rows:
+                batch.append(row)
+                if len(batch) < self.batch_size:
+                    continue
+                changed += conn.executemany(sql, batch).rowcount
+                written += len(batch)
+                uncommitted += len(batch)
+                batch = []
+                if uncommitted >= self.transaction_size:
+                    self.commit()
+                    uncommitted = 0
+                    self.logger.info(f"Loaded {written} records into {table_name}")
+            if batch:
+                changed += conn.executemany(sql, batch).rowcount
+                written += len(batch)
+            self.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        self.rows_inserted += written
+        return (written, changed) if count_changes else written
@@ -0,0 +1,121 @@
+"""
+Column Plan
+Compiled mapping of JSON record keys to insert tuple positions.
+
+Cleaning a record used to clean every field name (for every record), build an
+intermediate dict and then read it back in column order. Records of one module
+share the same keys, so the mapping is compiled once per (table, key
+sequence): a tuple giving the column position of each key, or -1 for keys the
+table has no column for. A record then becomes an insert tuple in one pass over
+its values.
+
+When the table has a ``content_hash`` column, each tuple also carries a hash
+of its values (import timestamps excluded), so upserts can skip rows whose
+content has not changed.
+"""
+import hashlib
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+# Columns filled with the time of the load rather than a record value
+IMPORT_TIMESTAMP_FIELDS = (
+    'import_timestamp', 'sync_timestamp', 'last_sync_time',
+    'data_import_time', 'table_sync_time'
+)
+
+# Column holding the hash of a row's values, compared by upserts
+CONTENT_HASH_FIELD = 'content_hash'
+
+# Key sequences compiled per table; records beyond that are mapped without caching
+MAX_PLANS_PER_TABLE = 1024
+
+
+def to_sql_value(value: Any, dumps: Callable[[Any], str]) -> Any:
+    """Convert a JSON value the way the populator stores it: text, 0/1, JSON text or NULL"""
+    value_type = type(value)
+    if value_type is str:
+        return value if value else None
+    if value is None:
+        return None
+    if value_type is bool:
+        return 1 if value else 0
+    if isinstance(value, (list, dict)):
+        return dumps(value)
+    text = str(value)
+    return text if text else None
+
+
+def content_hash(values: List[Any]) -> str:
+    """Hash of a row's SQL values (text, integers and NULLs), in column order"""
+    return hashlib.blake2b(repr(values).encode('utf-8'), digest_size=16).hexdigest()
+
+
+class RecordRowBuilder:
+    """
+    Builds insert tuples for one table from records, with compiled per-key-set plans.
+
+    Field names are cleaned once per distinct name; when two keys clean to the
+    same column, the later key wins (as with the previous dict-based cleaning).
+    """
+
+    def __init__(self, column_names: List[str], clean_field_name: Callable[[str], str],
+                 dumps: Callable[[Any], str]):
+        """
+        Args:
+            column_names: Table columns, in insert order
+            clean_field_name: Maps a JSON key to its column name
+            dumps: JSON encoder for list/dict values
+        """
+        self.column_names = list(column_names)
+        self.clean_field_name = clean_field_name
+        self.dumps = dumps
+        self._positions = {name: position for position, name in enumerate(self.column_names)}
+        self._timestamp_positions = [self._positions[name] for name in IMPORT_TIMESTAMP_FIELDS
+                                     if name in self._positions]
+        self._hash_position = self._positions.get(CONTENT_HASH_FIELD, -1)
+        self._plans: Dict[Tuple[str, ...], Tuple[int, ...]] = {}
+
+    def compile(self, keys: Tuple[str, ...]) -> Tuple[int, ...]:
+        """Column position of each key (-1 if the table has no column for it)"""
+        plan = self._plans.get(keys)
+        if plan is None:
+            # Import timestamp and content hash columns are filled by the builder, so keys mapping to them are skipped
+            skipped_positions = set(self._timestamp_positions)
+            skipped_positions.add(self._hash_position)
+            plan = tuple(-1 if position in skipped_positions else position
+                         for position in (self._positions.get(self.clean_field_name(key), -1) for key in keys))
+            if len(self._plans) < MAX_PLANS_PER_TABLE:
+                self._plans[keys] = plan
+        return plan
+
+    def rows(self, records: Iterable[Dict[str, Any]], import_timestamp: str) -> Iterator[tuple]:
+        """
+        Yield one insert tuple per record.
+
+        Args:
+            records: Records to convert (consumed lazily)
+            import_timestamp: Value for the import timestamp columns of this load
+        """
+        template = [None] * len(self.column_names)
+        timestamp_positions = self._timestamp_positions
+        hash_position = self._hash_position
+        if hash_position < 0:
+            for position in timestamp_positions:
+                template[position] = import_timestamp
+        dumps = self.dumps
+        for record in records:
+            plan = self.compile(tuple(record))
+            row = template.copy()
+            for value, position in zip(record.values(), plan):
+                if position < 0:
+                    continue
+                # Most values are strings; everything else goes through to_sql_value
+                if type(value) is str:
+                    row[position] = value if value else None
+                else:
+                    row[position] = to_sql_value(value, dumps)
+            if hash_position >= 0:
+                # Hashed before the import timestamps are set, so reloading the same record gives the same hash
+                row[hash_position] = content_hash(row)
+                for position in timestamp_positions:
+                    row[position] = import_timestamp
+            yield tuple(row)
@@ -4,10 +4,20 @@ Centralized configuration management for JSON2DB sync operations.
 Eliminates hardcoded paths and provides flexible configuration options.
 """
 import os
+import sqlite3
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 import json
 
+# Sync catalog written by api_sync on every finalized sync: table sync_catalog in the
+# .sync_index.db of a raw JSON base directory or sessions root, one row per event; the
+# newest row of a (base, timestamp_dir) decides whether that sync is still finalized
+SYNC_INDEX_FILENAME = ".sync_index.db"
+
+# Raw module storage saved by api_sync (JSON arrays, NDJSON directories, content-addressed manifests)
+RAW_MODULE_SUFFIXES = (".json", ".ndjson", ".manifest")
+RAW_NON_MODULE_PREFIXES = ("sync_metadata_", "sync_checkpoint_", "sync_verification_", "snapshot_")
+
 
 class JSON2DBConfig:
     """Centralized configuration for JSON2DB sync operations"""
@@ -39,7 +49,9 @@ class JSON2DBConfig:
             # Processing configuration
             "processing": {
                 "default_cutoff_days": 30,
-                "batch_size": 1000,
+                "batch_size": 1000,  # Rows per executemany call
+                "transaction_size": 50000,  # Rows per committed transaction
+                "write_mode": "upsert",  # 'upsert' on the Zoho ID, skipping unchanged rows, or 'replace' (INSERT OR REPLACE)
                 "max_memory_usage_mb": 512,
                 "enable_progress_logging": True,
                 "enable_duplicate_prevention": True,  # Always enable duplicate prevention
@@ -110,6 +122,7 @@ class JSON2DBConfig:
             "JSON2DB_CONSOLIDATED_PATH": ("data_source", "consolidated_path"),
             "JSON2DB_DATABASE_PATH": ("database", "path"),
             "JSON2DB_CUTOFF_DAYS": ("processing", "default_cutoff_days"),
+            "JSON2DB_WRITE_MODE": ("processing", "write_mode"),
             "JSON2DB_LOG_LEVEL": ("logging", "level"),
             "JSON2DB_LOG_DIR": ("logging", "log_dir")
         }
@@ -201,6 +214,13 @@ class JSON2DBConfig:
             if not sync_sessions_path.exists():
                 return None
             
+            # The sessions root's sync catalog lists every finalized sync with its modules
+            entries = self._sync_catalog_entries(sync_sessions_path, base=None) or []
+            sessions_with_data = sorted({entry["base"].split("/")[0] for entry in entries
+                                         if entry["base"] and entry["modules"]}, reverse=True)
+            if sessions_with_data and (sync_sessions_path / sessions_with_data[0]).is_dir():
+                return str(sync_sessions_path / sessions_with_data[0])
+            
             # Find all session folders
             session_folders = [
                 f for f in sync_sessions_path.iterdir() 
@@ -226,6 +246,40 @@ class JSON2DBConfig:
             print(f"Warning: Could not determine latest session folder: {e}")
             return None
     
+    def _sync_catalog_entries(self, root_dir: Path, base: Optional[str] = "") -> Optional[List[Dict[str, Any]]]:
+        """
+        Finalized syncs in the sync catalog of a raw JSON base or sessions root, newest first.
+        
+        The catalog is only read (opened read-only, never created); None if there is
+        no catalog yet, in which case callers scan the directories.
+        
+        Args:
+            root_dir: Raw JSON base directory or sync sessions root
+            base: Raw JSON base relative to root_dir ('' for root_dir itself, None for all bases)
+        """
+        db_path = Path(root_dir) / SYNC_INDEX_FILENAME
+        if not db_path.is_file():
+            return None
+        where, params = ("", []) if base is None else ("WHERE base = ?", [base])
+        try:
+            conn = sqlite3.connect(f"{db_path.resolve().as_uri()}?mode=ro", uri=True, timeout=30)
+            try:
+                if not conn.execute("SELECT 1 FROM catalog_meta WHERE key = 'backfilled'").fetchone():
+                    return None
+                rows = conn.execute(f"""
+                    SELECT c.base, c.timestamp_dir, c.modules FROM sync_catalog c
+                    JOIN (SELECT MAX(seq) AS seq FROM sync_catalog {where} GROUP BY base, timestamp_dir) latest
+                        ON c.seq = latest.seq
+                    WHERE c.status = 'finalized'
+                    ORDER BY c.timestamp_dir DESC, c.base DESC
+                """, params).fetchall()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return None
+        return [{"base": row[0], "timestamp_dir": row[1], "modules": json.loads(row[2]) if row[2] else {}}
+                for row in rows]
+    
     def _session_has_data_files(self, session_folder: Path) -> bool:
         """Check if a session folder contains actual data files (not just metadata)"""
         try:
@@ -233,12 +287,17 @@ class JSON2DBConfig:
             if not raw_json_path.exists():
                 return False
             
-            # Check all timestamp directories for actual data files
+            # The session's sync catalog records the modules (in any storage format) of each finalized sync
+            entries = self._sync_catalog_entries(raw_json_path)
+            if entries is not None:
+                return any(entry["modules"] for entry in entries)
+            
+            # Not catalogued yet: check all timestamp directories for module data
             for timestamp_dir in raw_json_path.iterdir():
                 if timestamp_dir.is_dir():
-                    for json_file in timestamp_dir.glob("*.json"):
-                        # If we find any non-metadata JSON file, this session has data
-                        if not json_file.name.startswith("sync_metadata_"):
+                    for data_path in timestamp_dir.iterdir():
+                        if (data_path.suffix in RAW_MODULE_SUFFIXES
+                                and not data_path.name.startswith(RAW_NON_MODULE_PREFIXES)):
                             return True
             
             return False
@@ -366,6 +425,12 @@ class JSON2DBConfig:
         if not db_path.parent.exists():
             validation["warnings"].append(f"Database directory does not exist: {db_path.parent}")
         
+        # Validate write mode
+        write_mode = self.get("processing", "write_mode", "upsert")
+        if write_mode not in ("upsert", "replace"):
+            validation["errors"].append(f"Unknown processing.write_mode: {write_mode} (expected 'upsert' or 'replace')")
+            validation["valid"] = False
+
         # Validate log directory
         log_dir = Path(self.get("logging", "log_dir"))
         if not log_dir.exists():
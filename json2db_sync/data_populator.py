@@ -2,19 +2,30 @@
 JSON Data Populator
 Populates JSON tables with data from consolidated JSON files, filtering by cutoff date
 """
-import json
 import sqlite3
 import logging
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Tuple, Callable, Iterable, Iterator
+import itertools
 import time
+from contextlib import contextmanager
 
 # Handle imports for both standalone and module usage
 try:
-    from .json_analyzer import JSONAnalyzer
+    from .json_analyzer import JSONAnalyzer, raw_store, json_codec, snapshot, dates
+    from .bulk_loader import BulkLoader
+    from .column_plan import RecordRowBuilder, IMPORT_TIMESTAMP_FIELDS, CONTENT_HASH_FIELD, to_sql_value
 except ImportError:
-    from json_analyzer import JSONAnalyzer
+    from json_analyzer import JSONAnalyzer, raw_store, json_codec, snapshot, dates
+    from bulk_loader import BulkLoader
+    from column_plan import RecordRowBuilder, IMPORT_TIMESTAMP_FIELDS, CONTENT_HASH_FIELD, to_sql_value
+
+# Formats tried for non-ISO dates in the cutoff filter (ambiguous slash dates month first)
+CUTOFF_DATE_FORMATS = ('%Y-%m-%d', '%m/%d/%Y', '%Y-%m-%d %H:%M:%S', '%d/%m/%Y')
+
+# Records tested against the cutoff date at a time while streaming a module file
+FILTER_BATCH_SIZE = 5000
 
 
 class SimpleDuplicatePreventionManager:
@@ -89,6 +100,13 @@ class JSONDataPopulator:
         self.db_path = Path(db_path)
         self.json_dir = Path(json_dir)
         
+        # Shared connection of the current population run (see _bulk_load)
+        self.loader = None
+        
+        # Cleaned field names and compiled column plans, reused across tables and runs
+        self._clean_names = {}
+        self._row_builders = {}
+        
         # Detect if we're working with session-based structure
         self.is_session_based = self._detect_session_structure()
         
@@ -108,6 +126,9 @@ class JSONDataPopulator:
             'tables_succeeded': 0,
             'tables_failed': 0,
             'total_records_inserted': 0,
+            'total_records_updated': 0,
+            'total_records_unchanged': 0,
+            'write_mode_fallbacks': {},  # table -> why it was loaded with INSERT OR REPLACE in upsert mode
             'errors': [],
             'cutoff_date': None,
             'start_time': None,
@@ -133,6 +154,31 @@ class JSONDataPopulator:
             'json_purchaseorders_line_items': [],
             'json_creditnotes_line_items': []
         }
+        
+        # Zoho ID of each table's records, the key rows are upserted on (processing.write_mode = 'upsert').
+        # Session-based runs name tables after the module files, hence the second spelling.
+        self.natural_keys = {
+            'json_invoices': 'invoice_id',
+            'json_bills': 'bill_id',
+            'json_sales_orders': 'salesorder_id',
+            'json_salesorders': 'salesorder_id',
+            'json_purchase_orders': 'purchaseorder_id',
+            'json_purchaseorders': 'purchaseorder_id',
+            'json_credit_notes': 'creditnote_id',
+            'json_creditnotes': 'creditnote_id',
+            'json_customer_payments': 'payment_id',
+            'json_customerpayments': 'payment_id',
+            'json_vendor_payments': 'payment_id',
+            'json_vendorpayments': 'payment_id',
+            'json_contacts': 'contact_id',
+            'json_items': 'item_id',
+            'json_organizations': 'organization_id',
+            'json_invoices_line_items': 'line_item_id',
+            'json_bills_line_items': 'line_item_id',
+            'json_salesorders_line_items': 'line_item_id',
+            'json_purchaseorders_line_items': 'line_item_id',
+            'json_creditnotes_line_items': 'line_item_id'
+        }
 
         # Initialize duplicate prevention manager
         try:
@@ -178,18 +224,14 @@ class JSONDataPopulator:
             
             for date_col in date_columns:
                 try:
-                    cursor.execute(f"SELECT MAX({date_col}) FROM invoices WHERE {date_col} IS NOT NULL AND {date_col} != ''")
-                    result = cursor.fetchone()
-                    if result and result[0]:
-                        # Try different date formats
-                        for date_format in ['%Y-%m-%d', '%m/%d/%Y', '%Y-%m-%d %H:%M:%S']:
-                            try:
-                                parsed_date = datetime.strptime(result[0][:10], date_format[:10])
-                                if not max_date or parsed_date > max_date:
-                                    max_date = parsed_date
-                                break
-                            except ValueError:
-                                continue
+                    # MAX() of the text would compare non-ISO dates as strings
+                    cursor.execute(f"SELECT {date_col} FROM invoices WHERE {date_col} IS NOT NULL AND {date_col} != ''")
+                    latest = dates.date_range([row[0] for row in cursor.fetchall()], CUTOFF_DATE_FORMATS).latest
+                    if latest:
+                        # Whole days, as the cutoff is a date
+                        latest = latest.replace(hour=0, minute=0, second=0, microsecond=0)
+                        if not max_date or latest > max_date:
+                            max_date = latest
                 except Exception as e:
                     self.logger.debug(f"Error checking {date_col}: {e}")
             
@@ -209,124 +251,155 @@ class JSONDataPopulator:
             self.logger.error(f"Error getting cutoff date: {e}")
             return (datetime.now() - timedelta(weeks=4)).strftime('%Y-%m-%d')
 
-    def filter_records_by_date(self, records: List[Dict], table_name: str, cutoff_date: str) -> List[Dict]:
-        """Filter records based on cutoff date"""
-        if not records:
-            return records
+    def _cutoff_filter(self, table_name: str, cutoff_date: str) -> Optional[Callable[[List[Dict]], List[bool]]]:
+        """
+        Batch cutoff test for a table, or None if the table is not filtered by date.
         
+        The returned function takes a list of records and returns one keep flag
+        per record: True if any of the table's date fields is on or after the
+        cutoff, or if the record has none of the date fields at all (better safe
+        than sorry). Each date field is parsed for the whole batch at once.
+        """
         date_fields = self.date_fields.get(table_name, [])
-        if not date_fields:
-            # For line item tables or tables without date fields, return all records
-            return records
+        if not date_fields or not cutoff_date:
+            # For line item tables or tables without date fields, keep all records
+            return None
         
-        filtered_records = []
-        cutoff_datetime = datetime.strptime(cutoff_date, '%Y-%m-%d')
+        cutoff_datetime = dates.parse_date(cutoff_date)
+        if cutoff_datetime is None:
+            raise ValueError(f"Invalid cutoff date: {cutoff_date}")
         
-        for record in records:
-            include_record = False
-            
-            # Check each possible date field
+        def keep_batch(records: List[Dict]) -> List[bool]:
+            keep = [False] * len(records)
             for date_field in date_fields:
-                if date_field in record and record[date_field]:
-                    try:
-                        # Try different date formats
-                        record_date = None
-                        date_value = str(record[date_field])
-                        
-                        for date_format in ['%Y-%m-%d', '%m/%d/%Y', '%Y-%m-%d %H:%M:%S', '%d/%m/%Y']:
-                            try:
-                                record_date = datetime.strptime(date_value[:10], date_format[:10])
-                                break
-                            except ValueError:
-                                continue
-                        
-                        if record_date and record_date >= cutoff_datetime:
-                            include_record = True
-                            break
-                            
-                    except Exception as e:
-                        self.logger.debug(f"Error parsing date {date_field}={record[date_field]}: {e}")
-                        continue
-            
-            # If no valid date found, include the record (better safe than sorry)
-            if include_record or not any(date_field in record for date_field in date_fields):
-                filtered_records.append(record)
+                values = [record.get(date_field) or None for record in records]
+                for index, on_or_after in enumerate(dates.on_or_after(values, cutoff_datetime, CUTOFF_DATE_FORMATS)):
+                    if on_or_after:
+                        keep[index] = True
+            for index, record in enumerate(records):
+                if not keep[index] and not any(date_field in record for date_field in date_fields):
+                    keep[index] = True
+            return keep
+        
+        return keep_batch
+
+    def filter_records_by_date(self, records: List[Dict], table_name: str, cutoff_date: str) -> List[Dict]:
+        """Filter records based on cutoff date"""
+        keep_batch = self._cutoff_filter(table_name, cutoff_date)
+        if not records or keep_batch is None:
+            return records
+        
+        filtered_records = [record for record, keep in zip(records, keep_batch(records)) if keep]
         
         self.logger.info(f"Filtered {table_name}: {len(records)} -> {len(filtered_records)} records")
         return filtered_records
 
     def clean_record_for_insert(self, record: Dict[str, Any], columns: Dict[str, Dict]) -> Dict[str, Any]:
-        """Clean and prepare record for database insertion"""
+        """Clean and prepare record for database insertion (bulk loads use _row_builder instead)"""
         cleaned_record = {}
         
         for field_name, field_value in record.items():
-            # Clean field name - handle case where analyzer is None (session-based operations)
-            if self.analyzer is not None and hasattr(self.analyzer, 'clean_field_name'):
-                clean_name = self.analyzer.clean_field_name(field_name)
-            else:
-                # Fallback field name cleaning for session-based operations
-                clean_name = self._clean_field_name_fallback(field_name)
+            clean_name = self._clean_field_name(field_name)
             
             # Skip if column doesn't exist in table
             if clean_name not in columns:
                 continue
             
-            # Handle different data types
-            if field_value is None or field_value == "":
-                cleaned_record[clean_name] = None
-            elif isinstance(field_value, (list, dict)):
-                # Convert complex objects to JSON strings
-                cleaned_record[clean_name] = json.dumps(field_value)
-            elif isinstance(field_value, bool):
-                # Convert boolean to integer (SQLite standard)
-                cleaned_record[clean_name] = 1 if field_value else 0
-            else:
-                # Convert to string and handle encoding
-                cleaned_record[clean_name] = str(field_value)
+            cleaned_record[clean_name] = to_sql_value(field_value, json_codec.dumps)
         
         # Add import timestamp fields if they exist in the table schema
         current_timestamp = datetime.now().isoformat()
-        import_timestamp_fields = [
-            'import_timestamp', 'sync_timestamp', 'last_sync_time', 
-            'data_import_time', 'table_sync_time'
-        ]
-        
-        for timestamp_field in import_timestamp_fields:
+        for timestamp_field in IMPORT_TIMESTAMP_FIELDS:
             if timestamp_field in columns:
                 cleaned_record[timestamp_field] = current_timestamp
         
         return cleaned_record
 
+    def _clean_field_name(self, field_name: str) -> str:
+        """Column name of a JSON key, cleaned once per distinct key"""
+        clean_name = self._clean_names.get(field_name)
+        if clean_name is None:
+            # Handle case where analyzer is None (session-based operations)
+            if self.analyzer is not None and hasattr(self.analyzer, 'clean_field_name'):
+                clean_name = self.analyzer.clean_field_name(field_name)
+            else:
+                # Fallback field name cleaning for session-based operations
+                clean_name = self._clean_field_name_fallback(field_name)
+            self._clean_names[field_name] = clean_name
+        return clean_name
+
+    def _row_builder(self, table_name: str, column_names: List[str]) -> RecordRowBuilder:
+        """Cached row builder (and its compiled column plans) for a table's columns"""
+        key = (table_name, tuple(column_names))
+        builder = self._row_builders.get(key)
+        if builder is None:
+            builder = RecordRowBuilder(column_names, self._clean_field_name, json_codec.dumps)
+            self._row_builders[key] = builder
+        return builder
+
+    def _iter_records(self, json_file_path: Path) -> Iterator[Dict]:
+        """Stream a module file; a snapshot file is read together with the syncs written after it"""
+        if json_file_path.parent.name == snapshot.SNAPSHOT_DIR:
+            view = snapshot.ConsolidatedView(json_file_path.parent.parent)
+            self.logger.info(f"Reading {json_file_path.name} as {view.describe()}")
+            return view.iter_module(raw_store.module_name_for_path(json_file_path))
+        return raw_store.iter_records(json_file_path)
+
+    def _stream_filtered_records(self, json_file_path: Path, table_name: str, cutoff_date: str,
+                                 result: Dict[str, Any]) -> Iterator[Dict]:
+        """
+        Yield the records of a module file that pass the cutoff date.
+        
+        Records are parsed as they are read and tested FILTER_BATCH_SIZE at a
+        time, so neither the whole file nor the records older than the cutoff
+        are ever held in a list. result['total_records'] and
+        result['records_filtered'] are updated as the records stream through.
+        """
+        keep_batch = self._cutoff_filter(table_name, cutoff_date)
+        records = self._iter_records(json_file_path)
+        if keep_batch is None:
+            for record in records:
+                result['total_records'] += 1
+                result['records_filtered'] += 1
+                yield record
+            return
+        
+        while True:
+            batch = list(itertools.islice(records, FILTER_BATCH_SIZE))
+            if not batch:
+                return
+            result['total_records'] += len(batch)
+            for record, keep in zip(batch, keep_batch(batch)):
+                if keep:
+                    result['records_filtered'] += 1
+                    yield record
+
     def populate_table(self, table_name: str, json_filename: str, cutoff_date: str) -> Dict[str, Any]:
         """Populate a single table with filtered JSON data"""
         result = {
             'success': False,
             'records_inserted': 0,
+            'records_updated': 0,
+            'records_unchanged': 0,
             'records_filtered': 0,
             'total_records': 0,
+            'write_mode': None,
+            'write_mode_fallback': None,
+            'duplicates_removed': 0,
             'error': None
         }
         
         try:
-            # Load JSON data
-            json_file = self.json_dir / json_filename
-            if not json_file.exists():
-                raise FileNotFoundError(f"JSON file not found: {json_file}")
-            
-            self.logger.info(f"Loading {json_filename} for table {table_name}")
-            with open(json_file, 'r', encoding='utf-8') as f:
-                all_records = json.load(f)
+            # Load JSON data (a .json array or the module's NDJSON directory)
+            json_file = raw_store.find_module_path(self.json_dir, Path(json_filename).stem)
+            if json_file is None:
+                raise FileNotFoundError(f"JSON file not found: {self.json_dir / json_filename}")
             
-            if not isinstance(all_records, list):
-                raise ValueError(f"Expected list in {json_filename}, got {type(all_records)}")
+            self.logger.info(f"Streaming {json_filename} for table {table_name}")
+            records = self._stream_filtered_records(json_file, table_name, cutoff_date, result)
+            first_record = next(records, None)
             
-            result['total_records'] = len(all_records)
-            
-            # Filter records by date
-            filtered_records = self.filter_records_by_date(all_records, table_name, cutoff_date)
-            result['records_filtered'] = len(filtered_records)
-            
-            if not filtered_records:
+            if first_record is None:
                 self.logger.info(f"No records to insert for {table_name} after filtering")
                 result['success'] = True
                 return result
@@ -340,46 +413,19 @@ class JSONDataPopulator:
             
             columns = self.analyzer.analysis_results[table_name]['analysis']['columns']
             
-            # Connect to database
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Prepare INSERT statement
-            column_names = list(columns.keys())
-            placeholders = ', '.join(['?' for _ in column_names])
-            insert_sql = f"INSERT OR REPLACE INTO {table_name} ({', '.join(column_names)}) VALUES ({placeholders})"
-            
-            # Process records in batches
-            batch_size = 100
-            total_inserted = 0
+            counts = self._write_records(table_name, columns, itertools.chain([first_record], records))
+            self.logger.info(f"Filtered {table_name}: {result['total_records']} -> {result['records_filtered']} records")
             
-            for i in range(0, len(filtered_records), batch_size):
-                batch = filtered_records[i:i + batch_size]
-                batch_data = []
-                
-                for record in batch:
-                    cleaned_record = self.clean_record_for_insert(record, columns)
-                    # Create tuple with values in column order
-                    values = tuple(cleaned_record.get(col_name) for col_name in column_names)
-                    batch_data.append(values)
-                
-                # Execute batch insert
-                cursor.executemany(insert_sql, batch_data)
-                total_inserted += len(batch_data)
-                
-                if total_inserted % 500 == 0:
-                    self.logger.info(f"Inserted {total_inserted}/{len(filtered_records)} records into {table_name}")
-            
-            conn.commit()
-            conn.close()
-            
-            result['records_inserted'] = total_inserted
+            result['records_inserted'] = counts['inserted']
+            result['records_updated'] = counts['updated']
+            result['records_unchanged'] = counts['unchanged']
+            self._copy_write_mode(result, counts)
             result['success'] = True
             
             # Track table population time for verification reports
-            self._track_table_population(table_name, total_inserted)
+            self._track_table_population(table_name, self._records_loaded(result))
             
-            self.logger.info(f"Successfully populated {table_name}: {total_inserted} records")
+            self.logger.info(f"Successfully populated {table_name}: {self._records_loaded(result)} records")
             
         except Exception as e:
             error_msg = f"Error populating {table_name}: {str(e)}"
@@ -393,39 +439,43 @@ class JSONDataPopulator:
         result = {
             'success': False,
             'records_inserted': 0,
+            'records_updated': 0,
+            'records_unchanged': 0,
             'records_filtered': 0,
             'total_records': 0,
+            'write_mode': None,
+            'write_mode_fallback': None,
+            'duplicates_removed': 0,
             'error': None
         }
         
         try:
-            # Load JSON data from specified path
+            # Load JSON data from specified path (a .json array or an NDJSON directory)
             if not json_file_path.exists():
                 raise FileNotFoundError(f"JSON file not found: {json_file_path}")
             
-            self.logger.info(f"Loading {json_file_path.name} from {json_file_path.parent.name} for table {table_name}")
-            with open(json_file_path, 'r', encoding='utf-8') as f:
-                all_records = json.load(f)
-            
-            if not isinstance(all_records, list):
-                raise ValueError(f"JSON file must contain an array of records")
-            
-            result['total_records'] = len(all_records)
+            self.logger.info(f"Streaming {json_file_path.name} from {json_file_path.parent.name} for table {table_name}")
+            records = self._stream_filtered_records(json_file_path, table_name, cutoff_date, result)
+            first_record = next(records, None)
             
-            # Filter records by cutoff date if specified
-            filtered_records = self.filter_records_by_date(all_records, table_name, cutoff_date)
-            result['records_filtered'] = len(filtered_records)
-            
-            if not filtered_records:
+            if first_record is None:
                 self.logger.info(f"No records found for {table_name} after date filtering")
                 result['success'] = True
                 return result
             
-            # Insert records into database
-            result['records_inserted'] = self.insert_records(table_name, filtered_records)
+            # Insert records into database batch by batch as they stream in
+            columns = self._get_insert_columns(table_name)
+            if not columns:
+                raise ValueError(f"No columns found for table {table_name}")
+            counts = self._write_records(table_name, columns, itertools.chain([first_record], records))
+            result['records_inserted'] = counts['inserted']
+            result['records_updated'] = counts['updated']
+            result['records_unchanged'] = counts['unchanged']
+            self._copy_write_mode(result, counts)
             result['success'] = True
             
-            self.logger.info(f"✅ Successfully populated {table_name}: {result['records_inserted']}/{result['total_records']} records")
+            self.logger.info(f"Filtered {table_name}: {result['total_records']} -> {result['records_filtered']} records")
+            self.logger.info(f"✅ Successfully populated {table_name}: {self._records_loaded(result)}/{result['total_records']} records")
             
         except Exception as e:
             error_msg = f"Error populating {table_name}: {str(e)}"
@@ -434,62 +484,125 @@ class JSONDataPopulator:
             
         return result
 
-    def insert_records(self, table_name: str, records: List[Dict]) -> int:
-        """Insert a list of records into the specified table"""
+    def _get_insert_columns(self, table_name: str) -> Dict[str, Dict]:
+        """Table columns from the analyzer, or from the database schema for session-based operations"""
+        if self.analyzer is None or not hasattr(self.analyzer, 'analysis_results') or not self.analyzer.analysis_results:
+            # For session-based operations, use database schema directly
+            return self._get_table_columns_from_db(table_name)
+        # Traditional structure with analyzer
+        if table_name not in self.analyzer.analysis_results:
+            return self._get_table_columns_from_db(table_name)
+        return self.analyzer.analysis_results[table_name]['analysis']['columns']
+
+    def insert_records(self, table_name: str, records: Iterable[Dict]) -> int:
+        """Insert records (a list or any iterable, consumed batch by batch) into the specified table"""
         if not records:
             return 0
         
         try:
             # Get table schema - handle both session-based and traditional structures
-            if self.analyzer is None or not hasattr(self.analyzer, 'analysis_results') or not self.analyzer.analysis_results:
-                # For session-based operations, use database schema directly
-                columns = self._get_table_columns_from_db(table_name)
-            else:
-                # Traditional structure with analyzer
-                if table_name not in self.analyzer.analysis_results:
-                    columns = self._get_table_columns_from_db(table_name)
-                else:
-                    columns = self.analyzer.analysis_results[table_name]['analysis']['columns']
-            
-            # Connect to database
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Prepare INSERT statement
-            column_names = list(columns.keys())
-            placeholders = ', '.join(['?' for _ in column_names])
-            insert_sql = f"INSERT OR REPLACE INTO {table_name} ({', '.join(column_names)}) VALUES ({placeholders})"
+            columns = self._get_insert_columns(table_name)
             
-            # Process records in batches
-            batch_size = 100
-            total_inserted = 0
-            
-            for i in range(0, len(records), batch_size):
-                batch = records[i:i + batch_size]
-                batch_data = []
-                
-                for record in batch:
-                    cleaned_record = self.clean_record_for_insert(record, columns)
-                    # Create tuple with values in column order
-                    values = tuple(cleaned_record.get(col_name) for col_name in column_names)
-                    batch_data.append(values)
-                
-                # Execute batch insert
-                cursor.executemany(insert_sql, batch_data)
-                total_inserted += len(batch_data)
-                
-                if total_inserted % 500 == 0:
-                    self.logger.info(f"Inserted {total_inserted}/{len(records)} records into {table_name}")
-            
-            conn.commit()
-            conn.close()
-            
-            return total_inserted
+            counts = self._write_records(table_name, columns, records)
+            return counts['inserted'] + counts['updated'] + counts['unchanged']
             
         except Exception as e:
             self.logger.error(f"Error inserting records into {table_name}: {e}")
             return 0
 
+    @contextmanager
+    def _bulk_load(self):
+        """
+        Open the shared bulk loader connection for a population run.
+        
+        Nested calls (e.g. populate_table inside populate_all_tables) reuse the
+        open loader; the outermost call closes it.
+        """
+        if self.loader is not None:
+            yield self.loader
+            return
+        
+        processing = self.config.get_processing_config()
+        self.loader = BulkLoader(
+            self.db_path,
+            batch_size=processing.get('batch_size', 1000),
+            transaction_size=processing.get('transaction_size', 50000),
+            timeout=self.config.get('database', 'connection_timeout', 30),
+            logger=self.logger
+        )
+        try:
+            with self.loader:
+                yield self.loader
+        finally:
+            self.loader = None
+
+    def _upsert_key(self, table_name: str) -> Tuple[Optional[str], Dict[str, Any]]:
+        """
+        Key column to upsert a table on, or None to load it with INSERT OR REPLACE.
+        
+        Returns:
+            Tuple of (key column or None, write mode details: 'write_mode',
+            'write_mode_fallback' (why an upsert table is loaded with INSERT OR
+            REPLACE, else None) and 'duplicates_removed')
+        """
+        details = {'write_mode': 'replace', 'write_mode_fallback': None, 'duplicates_removed': 0}
+        if self.config.get_processing_config().get('write_mode', 'upsert') != 'upsert':
+            return None, details
+        key_column = self.natural_keys.get(table_name)
+        if key_column is None:
+            details['write_mode_fallback'] = "no Zoho ID known for this table"
+        else:
+            with self._bulk_load() as loader:
+                status = loader.prepare_upsert(table_name, key_column, CONTENT_HASH_FIELD)
+            details['duplicates_removed'] = status['duplicates_removed']
+            if status['ready']:
+                details['write_mode'] = 'upsert'
+                return key_column, details
+            details['write_mode_fallback'] = status['reason']
+        self.logger.warning(f"⚠️ Loading {table_name} with INSERT OR REPLACE instead of upserting: {details['write_mode_fallback']}")
+        return None, details
+
+    def _write_records(self, table_name: str, columns: Dict[str, Dict], records: Iterable[Dict]) -> Dict[str, Any]:
+        """
+        Clean records and write them through the bulk loader.
+        
+        Tables with a Zoho ID are upserted on it and rows whose content hash is
+        unchanged are skipped; other tables (and write_mode 'replace') use
+        INSERT OR REPLACE, where every row counts as inserted.
+        
+        Returns:
+            Counts of rows 'inserted', 'updated' and 'unchanged', plus the
+            write mode details of _upsert_key
+        """
+        column_names = list(columns.keys())
+        key_column, details = self._upsert_key(table_name)
+        if key_column and key_column not in column_names:
+            key_column = None
+            details.update(write_mode='replace', write_mode_fallback=f"{table_name} columns have no Zoho ID")
+        if key_column and CONTENT_HASH_FIELD not in column_names:
+            column_names.append(CONTENT_HASH_FIELD)
+        rows = self._row_builder(table_name, column_names).rows(records, datetime.now().isoformat())
+        
+        with self._bulk_load() as loader:
+            if key_column:
+                counts = loader.upsert_rows(table_name, column_names, rows, key_column, CONTENT_HASH_FIELD)
+                self.logger.info(f"Upserted {table_name}: {counts['inserted']} inserted, "
+                                 f"{counts['updated']} updated, {counts['unchanged']} unchanged")
+            else:
+                counts = {'inserted': loader.insert_rows(table_name, column_names, rows), 'updated': 0, 'unchanged': 0}
+        return dict(counts, **details)
+
+    @staticmethod
+    def _copy_write_mode(result: Dict[str, Any], counts: Dict[str, Any]) -> None:
+        """Copy how a table was written (mode, fallback reason, duplicates removed) into its population result"""
+        for key in ('write_mode', 'write_mode_fallback', 'duplicates_removed'):
+            result[key] = counts[key]
+
+    @staticmethod
+    def _records_loaded(result: Dict[str, Any]) -> int:
+        """Records of a population result that are now in the table (inserted, updated or unchanged)"""
+        return result.get('records_inserted', 0) + result.get('records_updated', 0) + result.get('records_unchanged', 0)
+
     def populate_all_tables(self, force_recreate: bool = False) -> Dict[str, Any]:
         """Populate all JSON tables with filtered data"""
         self.stats['start_time'] = datetime.now()
@@ -517,46 +630,51 @@ class JSONDataPopulator:
         
         results = {}
         
-        # Process tables serially
-        for table_name, table_info in table_mappings.items():
-            self.stats['tables_processed'] += 1
-            
-            if self.is_session_based:
-                json_file_path = table_info['json_file_path']
-                json_filename = json_file_path.name
-            else:
-                json_filename = table_info['json_file']
-                json_file_path = self.json_dir / json_filename
-            
-            total_tables = len(table_mappings)
-            self.logger.info(f"Processing table {self.stats['tables_processed']}/{total_tables}: {table_name}")
-            
-            try:
+        # Process tables serially over one shared database connection
+        with self._bulk_load():
+            for table_name, table_info in table_mappings.items():
+                self.stats['tables_processed'] += 1
+                
                 if self.is_session_based:
-                    result = self.populate_table_from_path(table_name, json_file_path, cutoff_date)
+                    json_file_path = table_info['json_file_path']
+                    json_filename = json_file_path.name
                 else:
-                    result = self.populate_table(table_name, json_filename, cutoff_date)
-                results[table_name] = result
+                    json_filename = table_info['json_file']
+                    json_file_path = self.json_dir / json_filename
                 
-                if result['success']:
-                    self.stats['tables_succeeded'] += 1
-                    self.stats['total_records_inserted'] += result['records_inserted']
-                else:
-                    self.stats['tables_failed'] += 1
-                    self.stats['errors'].append(f"{table_name}: {result['error']}")
+                total_tables = len(table_mappings)
+                self.logger.info(f"Processing table {self.stats['tables_processed']}/{total_tables}: {table_name}")
+                
+                try:
+                    if self.is_session_based:
+                        result = self.populate_table_from_path(table_name, json_file_path, cutoff_date)
+                    else:
+                        result = self.populate_table(table_name, json_filename, cutoff_date)
+                    results[table_name] = result
                     
-            except Exception as e:
-                error_msg = f"Fatal error processing {table_name}: {str(e)}"
-                self.logger.error(error_msg)
-                self.stats['tables_failed'] += 1
-                self.stats['errors'].append(error_msg)
-                results[table_name] = {
-                    'success': False,
-                    'error': error_msg,
-                    'records_inserted': 0
-                }
-                # Continue to next table
-                continue
+                    if result['success']:
+                        self.stats['tables_succeeded'] += 1
+                        self.stats['total_records_inserted'] += result['records_inserted']
+                        self.stats['total_records_updated'] += result.get('records_updated', 0)
+                        self.stats['total_records_unchanged'] += result.get('records_unchanged', 0)
+                        if result.get('write_mode_fallback'):
+                            self.stats['write_mode_fallbacks'][table_name] = result['write_mode_fallback']
+                    else:
+                        self.stats['tables_failed'] += 1
+                        self.stats['errors'].append(f"{table_name}: {result['error']}")
+                        
+                except Exception as e:
+                    error_msg = f"Fatal error processing {table_name}: {str(e)}"
+                    self.logger.error(error_msg)
+                    self.stats['tables_failed'] += 1
+                    self.stats['errors'].append(error_msg)
+                    results[table_name] = {
+                        'success': False,
+                        'error': error_msg,
+                        'records_inserted': 0
+                    }
+                    # Continue to next table
+                    continue
         
         self.stats['end_time'] = datetime.now()
         self.logger.info("JSON data population completed")
@@ -600,46 +718,51 @@ class JSONDataPopulator:
         
         results = {}
         
-        # Process tables serially
-        for table_name, table_info in table_mappings.items():
-            self.stats['tables_processed'] += 1
-            
-            if self.is_session_based:
-                json_file_path = table_info['json_file_path']
-                json_filename = json_file_path.name
-            else:
-                json_filename = table_info['json_file']
-                json_file_path = self.json_dir / json_filename
-            
-            total_tables = len(table_mappings)
-            self.logger.info(f"Processing table {self.stats['tables_processed']}/{total_tables}: {table_name}")
-            
-            try:
+        # Process tables serially over one shared database connection
+        with self._bulk_load():
+            for table_name, table_info in table_mappings.items():
+                self.stats['tables_processed'] += 1
+                
                 if self.is_session_based:
-                    result = self.populate_table_from_path(table_name, json_file_path, cutoff_date)
+                    json_file_path = table_info['json_file_path']
+                    json_filename = json_file_path.name
                 else:
-                    result = self.populate_table(table_name, json_filename, cutoff_date)
-                results[table_name] = result
+                    json_filename = table_info['json_file']
+                    json_file_path = self.json_dir / json_filename
                 
-                if result['success']:
-                    self.stats['tables_succeeded'] += 1
-                    self.stats['total_records_inserted'] += result['records_inserted']
-                else:
-                    self.stats['tables_failed'] += 1
-                    self.stats['errors'].append(f"{table_name}: {result['error']}")
+                total_tables = len(table_mappings)
+                self.logger.info(f"Processing table {self.stats['tables_processed']}/{total_tables}: {table_name}")
+                
+                try:
+                    if self.is_session_based:
+                        result = self.populate_table_from_path(table_name, json_file_path, cutoff_date)
+                    else:
+                        result = self.populate_table(table_name, json_filename, cutoff_date)
+                    results[table_name] = result
                     
-            except Exception as e:
-                error_msg = f"Fatal error processing {table_name}: {str(e)}"
-                self.logger.error(error_msg)
-                self.stats['tables_failed'] += 1
-                self.stats['errors'].append(error_msg)
-                results[table_name] = {
-                    'success': False,
-                    'error': error_msg,
-                    'records_inserted': 0
-                }
-                # Continue to next table
-                continue
+                    if result['success']:
+                        self.stats['tables_succeeded'] += 1
+                        self.stats['total_records_inserted'] += result['records_inserted']
+                        self.stats['total_records_updated'] += result.get('records_updated', 0)
+                        self.stats['total_records_unchanged'] += result.get('records_unchanged', 0)
+                        if result.get('write_mode_fallback'):
+                            self.stats['write_mode_fallbacks'][table_name] = result['write_mode_fallback']
+                    else:
+                        self.stats['tables_failed'] += 1
+                        self.stats['errors'].append(f"{table_name}: {result['error']}")
+                        
+                except Exception as e:
+                    error_msg = f"Fatal error processing {table_name}: {str(e)}"
+                    self.logger.error(error_msg)
+                    self.stats['tables_failed'] += 1
+                    self.stats['errors'].append(error_msg)
+                    results[table_name] = {
+                        'success': False,
+                        'error': error_msg,
+                        'records_inserted': 0
+                    }
+                    # Continue to next table
+                    continue
         
         self.stats['end_time'] = datetime.now()
         self.logger.info(f"JSON data population with {cutoff_days} day cutoff completed")
@@ -652,7 +775,7 @@ class JSONDataPopulator:
         total_records = 0
         for table_name, result in results.items():
             if result.get('success', False):
-                records = result.get('records_inserted', 0)
+                records = self._records_loaded(result)
                 table_stats[table_name] = records
                 total_records += records
         
@@ -703,6 +826,14 @@ class JSONDataPopulator:
         print(f"Tables Succeeded: {stats['tables_succeeded']}")
         print(f"Tables Failed: {stats['tables_failed']}")
         print(f"Total Records Inserted: {stats['total_records_inserted']:,}")
+        print(f"Total Records Updated: {stats.get('total_records_updated', 0):,}")
+        print(f"Total Records Unchanged: {stats.get('total_records_unchanged', 0):,}")
+        
+        fallbacks = stats.get('write_mode_fallbacks', {})
+        if fallbacks:
+            print(f"\n⚠️ LOADED WITH INSERT OR REPLACE INSTEAD OF UPSERT ({len(fallbacks)}):")
+            for table_name, reason in fallbacks.items():
+                print(f"  {table_name}: {reason}")
         
         if results['success']:
             print("\n✓ DATA POPULATION SUCCESSFUL")
@@ -717,14 +848,16 @@ class JSONDataPopulator:
         
         print("\nTABLE DETAILS:")
         print("-" * 80)
-        print(f"{'Table Name':<30} {'Records':<12} {'Status':<10} {'Filtered':<10}")
+        print(f"{'Table Name':<30} {'Inserted':<10} {'Updated':<10} {'Unchanged':<10} {'Status':<10} {'Filtered':<10}")
         print("-" * 80)
         
         for table_name, result in results['table_results'].items():
             status = "SUCCESS" if result['success'] else "FAILED"
-            records = result.get('records_inserted', 0)
+            inserted = result.get('records_inserted', 0)
+            updated = result.get('records_updated', 0)
+            unchanged = result.get('records_unchanged', 0)
             filtered = result.get('records_filtered', 0)
-            print(f"{table_name:<30} {records:<12,} {status:<10} {filtered:<10,}")
+            print(f"{table_name:<30} {inserted:<10,} {updated:<10,} {unchanged:<10,} {status:<10} {filtered:<10,}")
         
         print("="*80)
 
@@ -749,15 +882,19 @@ class JSONDataPopulator:
                 # Fallback: try to get from current directory in case it's sync_sessions
                 timestamp_dirs = self.config.get_session_json_directories(str(self.json_dir))
         
-        # Collect all JSON files across timestamp directories, excluding metadata files
+        # A compacted raw_json base is read from its snapshot (merged with the later syncs on load)
+        for base in sorted({Path(d).parent for d in timestamp_dirs}):
+            view = snapshot.ConsolidatedView(base)
+            if view.has_snapshot():
+                for module_name, json_file in raw_store.list_module_paths(view.snapshot_dir).items():
+                    json_files.setdefault(module_name, json_file)
+        
+        # Collect all module files across timestamp directories (metadata files are not listed)
+        timestamp_dirs = sorted((Path(d) for d in timestamp_dirs if Path(d).name != snapshot.SNAPSHOT_DIR
+                                 and not Path(d).name.startswith(f"{snapshot.SNAPSHOT_DIR}.")),
+                                key=lambda d: d.name, reverse=True)
         for timestamp_dir in timestamp_dirs:
-            for json_file in timestamp_dir.glob("*.json"):
-                # Skip metadata files - they are not data arrays
-                if json_file.name.startswith("sync_metadata_"):
-                    self.logger.debug(f"Skipping metadata file: {json_file.name}")
-                    continue
-                    
-                module_name = json_file.stem
+            for module_name, json_file in raw_store.list_module_paths(timestamp_dir).items():
                 # Prefer newer timestamp files (first in list when sorted by name desc)
                 if module_name not in json_files:
                     json_files[module_name] = json_file
@@ -769,10 +906,8 @@ class JSONDataPopulator:
         """Get all JSON files from consolidated structure"""
         json_files = {}
         
-        # Direct JSON files in the directory
-        for json_file in self.json_dir.glob("*.json"):
-            module_name = json_file.stem
-            json_files[module_name] = json_file
+        # Direct JSON files (or NDJSON directories) in the directory
+        json_files.update(raw_store.list_module_paths(self.json_dir))
         
         return json_files
     
@@ -917,39 +1052,40 @@ class JSONDataPopulator:
             
             self.logger.info(f"Processing {len(json_files_dict)} files from session")
             
-            for file_key, file_path in json_files_dict.items():
-                try:
-                    # Determine table name from file
-                    table_name = f"json_{file_path.stem}"
-                    
-                    # Check if this specific file was already processed
-                    if (not force_reprocess and 
-                        self.duplicate_manager.is_file_processed(table_name, str(file_path), session_id)):
-                        self.logger.info(f"File {file_path.name} already processed, skipping")
-                        continue
-                    
-                    # Process the file
-                    cutoff_date = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
-                    result = self.populate_table_from_path(table_name, file_path, cutoff_date)
-                    
-                    if result.get('success'):
-                        records_processed = result.get('records_inserted', 0)
-                        total_records += records_processed
-                        files_processed += 1
+            with self._bulk_load():
+                for file_key, file_path in json_files_dict.items():
+                    try:
+                        # Determine table name from file
+                        table_name = f"json_{file_path.stem}"
                         
-                        # Track file processing
-                        self.duplicate_manager.track_file_processing(
-                            table_name, str(file_path), records_processed, session_id
-                        )
+                        # Check if this specific file was already processed
+                        if (not force_reprocess and 
+                            self.duplicate_manager.is_file_processed(table_name, str(file_path), session_id)):
+                            self.logger.info(f"File {file_path.name} already processed, skipping")
+                            continue
                         
-                        processed_modules.append(file_path.stem)
-                        self.logger.info(f"✅ Processed {file_path.stem}: {records_processed} records")
-                    else:
-                        self.logger.error(f"❌ Failed to process {file_path.name}: {result.get('error')}")
+                        # Process the file
+                        cutoff_date = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
+                        result = self.populate_table_from_path(table_name, file_path, cutoff_date)
                         
-                except Exception as e:
-                    self.logger.error(f"❌ Error processing file {file_path}: {e}")
-                    continue
+                        if result.get('success'):
+                            records_processed = self._records_loaded(result)
+                            total_records += records_processed
+                            files_processed += 1
+                            
+                            # Track file processing
+                            self.duplicate_manager.track_file_processing(
+                                table_name, str(file_path), records_processed, session_id
+                            )
+                            
+                            processed_modules.append(file_path.stem)
+                            self.logger.info(f"✅ Processed {file_path.stem}: {records_processed} records")
+                        else:
+                            self.logger.error(f"❌ Failed to process {file_path.name}: {result.get('error')}")
+                            
+                    except Exception as e:
+                        self.logger.error(f"❌ Error processing file {file_path}: {e}")
+                        continue
             
             # Mark session as completed
             if self.duplicate_manager:
@@ -1000,15 +1136,16 @@ class JSONDataPopulator:
                         filtered_dict[k] = v
                 json_files_dict = filtered_dict
             
-            for file_key, file_path in json_files_dict.items():
-                table_name = f"json_{file_path.stem}"
-                cutoff_date = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
-                result = self.populate_table_from_path(table_name, file_path, cutoff_date)
-                
-                if result.get('success'):
-                    records_processed = result.get('records_inserted', 0)
-                    total_records += records_processed
-                    processed_modules.append(file_path.stem)
+            with self._bulk_load():
+                for file_key, file_path in json_files_dict.items():
+                    table_name = f"json_{file_path.stem}"
+                    cutoff_date = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
+                    result = self.populate_table_from_path(table_name, file_path, cutoff_date)
+                    
+                    if result.get('success'):
+                        records_processed = self._records_loaded(result)
+                        total_records += records_processed
+                        processed_modules.append(file_path.stem)
             
             return {
                 'success': True,
@@ -1026,8 +1163,7 @@ class JSONDataPopulator:
         json_files = {}
         
         if self.json_dir.exists():
-            for json_file in self.json_dir.glob("*.json"):
-                json_files[json_file.stem] = json_file
+            json_files.update(raw_store.list_module_paths(self.json_dir))
         
         return json_files
     
@@ -1041,15 +1177,11 @@ class JSONDataPopulator:
     def _get_table_columns_from_db(self, table_name: str) -> Dict[str, Dict]:
         """Get table column information directly from database schema"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
             # Get table schema
-            cursor.execute(f"PRAGMA table_info({table_name})")
-            schema_info = cursor.fetchall()
+            with self._bulk_load() as loader:
+                schema_info = loader.table_info(table_name)
             
             if not schema_info:
-                conn.close()
                 raise ValueError(f"Table {table_name} not found in database")
             
             # Convert to format expected by the rest of the code
@@ -1062,7 +1194,6 @@ class JSONDataPopulator:
                     'nullable': not bool(row[3])  # not null flag
                 }
             
-            conn.close()
             return columns
             
         except Exception as e:
@@ -1082,31 +1213,27 @@ class JSONDataPopulator:
     def _track_table_population(self, table_name: str, records_inserted: int):
         """Track when a table was last populated for verification reports"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Create tracking table if it doesn't exist
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS table_population_tracking (
-                    table_name TEXT PRIMARY KEY,
-                    last_populated_time TEXT NOT NULL,
-                    records_count INTEGER,
-                    data_source TEXT
-                )
-            """)
-            
-            # Insert or update the tracking record
-            current_time = datetime.now().isoformat()
-            data_source = "json" if table_name.startswith("json_") else "csv"
-            
-            cursor.execute("""
-                INSERT OR REPLACE INTO table_population_tracking 
-                (table_name, last_populated_time, records_count, data_source)
-                VALUES (?, ?, ?, ?)
-            """, (table_name, current_time, records_inserted, data_source))
-            
-            conn.commit()
-            conn.close()
+            with self._bulk_load() as loader:
+                # Create tracking table if it doesn't exist
+                loader.execute("""
+                    CREATE TABLE IF NOT EXISTS table_population_tracking (
+                        table_name TEXT PRIMARY KEY,
+                        last_populated_time TEXT NOT NULL,
+                        records_count INTEGER,
+                        data_source TEXT
+                    )
+                """)
+                
+                # Insert or update the tracking record
+                current_time = datetime.now().isoformat()
+                data_source = "json" if table_name.startswith("json_") else "csv"
+                
+                loader.execute("""
+                    INSERT OR REPLACE INTO table_population_tracking 
+                    (table_name, last_populated_time, records_count, data_source)
+                    VALUES (?, ?, ?, ?)
+                """, (table_name, current_time, records_inserted, data_source))
+                loader.commit()
             
         except Exception as e:
             # Don't fail the main operation if tracking fails
@@ -2,13 +2,25 @@
 JSON Analyzer
 Analyzes consolidated JSON files to determine database table structure requirements.
 """
-import json
 import logging
+import sys
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Any, Set, Optional
 from collections import defaultdict
 
+# Raw data readers and the JSON codec are shared with api_sync, which writes the files
+# ({module}.json arrays or {module}.ndjson directories of compressed parts, and the
+# compacted snapshot/ directory read together with the syncs after it). When json2db_sync is
+# run from its own directory the project root is not on the path yet
+try:
+    from api_sync.processing import raw_store, json_codec, snapshot
+    from common import dates
+except ImportError:
+    sys.path.append(str(Path(__file__).resolve().parent.parent))
+    from api_sync.processing import raw_store, json_codec, snapshot
+    from common import dates
+
 
 class JSONAnalyzer:
     """Analyzes JSON files to determine database table requirements"""
@@ -137,7 +149,7 @@ class JSONAnalyzer:
         return raw_json_dir if raw_json_dir.exists() else None
     
     def _find_json_files_in_session(self, raw_json_dir: Path) -> List[Path]:
-        """Find JSON files in session-based timestamp directories"""
+        """Find module data (JSON files or NDJSON directories) in session-based timestamp directories"""
         json_files = []
         
         # Find timestamp directories within the session
@@ -148,9 +160,9 @@ class JSONAnalyzer:
         
         # Look for JSON files in timestamp directories
         for timestamp_dir in sorted(timestamp_dirs, reverse=True):
-            for json_file in timestamp_dir.glob("*.json"):
+            for module_name, json_file in raw_store.list_module_paths(timestamp_dir).items():
                 # Only add if we haven't already found this file type
-                if not any(existing.name == json_file.name for existing in json_files):
+                if not any(raw_store.module_name_for_path(existing) == module_name for existing in json_files):
                     json_files.append(json_file)
         
         return json_files
@@ -175,13 +187,12 @@ class JSONAnalyzer:
         self.logger.info(f"JSON Analysis started - Logging to: {log_file}")
 
     def analyze_json_file(self, json_file: Path) -> Dict[str, Any]:
-        """Analyze a single JSON file to determine its structure"""
+        """Analyze a single JSON file (or NDJSON module directory) to determine its structure"""
         try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            if not isinstance(data, list):
-                self.logger.warning(f"Expected list in {json_file.name}, got {type(data)}")
+            try:
+                data = raw_store.load_records(json_file, max_workers=4)
+            except ValueError as e:
+                self.logger.warning(str(e))
                 return {}
             
             if not data:
@@ -211,7 +222,7 @@ class JSONAnalyzer:
                         columns[col_name]['nullable'] = True  # Must be nullable since missing in first record
             
             # Extract date range information
-            date_info = self._extract_date_range(data, json_file.name)
+            date_info = self._extract_date_range(data, f"{raw_store.module_name_for_path(json_file)}.json")
             
             result = {
                 'record_count': len(data),
@@ -280,61 +291,23 @@ class JSONAnalyzer:
         if not date_field:
             return {'earliest_date': None, 'latest_date': None, 'date_field': None, 'total_records': len(data)}
         
-        # Extract all valid dates
-        valid_dates = []
-        for record in data:
-            if date_field in record and record[date_field]:
-                date_str = str(record[date_field])
-                parsed_date = self._parse_date_string(date_str)
-                if parsed_date:
-                    valid_dates.append(parsed_date)
+        # Earliest and latest date of the field, parsed as one batch
+        date_range = dates.date_range([record.get(date_field) or None for record in data])
         
-        if not valid_dates:
+        if not date_range.count:
             return {'earliest_date': None, 'latest_date': None, 'date_field': date_field, 'total_records': len(data)}
         
-        # Find min and max dates
-        earliest_date = min(valid_dates)
-        latest_date = max(valid_dates)
-        
         return {
-            'earliest_date': earliest_date.strftime('%Y-%m-%d'),
-            'latest_date': latest_date.strftime('%Y-%m-%d'),
+            'earliest_date': date_range.earliest.strftime('%Y-%m-%d'),
+            'latest_date': date_range.latest.strftime('%Y-%m-%d'),
             'date_field': date_field,
             'total_records': len(data),
-            'records_with_dates': len(valid_dates)
+            'records_with_dates': date_range.count
         }
     
     def _parse_date_string(self, date_str: str) -> Optional[datetime]:
-        """Parse various date string formats"""
-        if not date_str or date_str.lower() in ['null', 'none', '']:
-            return None
-        
-        # Common date formats in Zoho data
-        date_formats = [
-            '%Y-%m-%d',           # 2025-07-12
-            '%Y-%m-%d %H:%M:%S',  # 2025-07-12 10:30:00
-            '%d-%m-%Y',           # 12-07-2025
-            '%d/%m/%Y',           # 12/07/2025
-            '%m/%d/%Y',           # 07/12/2025
-            '%Y-%m-%dT%H:%M:%S',  # 2025-07-12T10:30:00
-            '%Y-%m-%dT%H:%M:%SZ', # 2025-07-12T10:30:00Z
-            '%Y-%m-%dT%H:%M:%S+00:00', # 2025-07-12T10:30:00+00:00
-        ]
-        
-        for fmt in date_formats:
-            try:
-                return datetime.strptime(date_str[:len(fmt.replace('%f', '000000'))], fmt)
-            except ValueError:
-                continue
-        
-        # Try to handle ISO format with timezone
-        try:
-            from dateutil.parser import parse
-            return parse(date_str)
-        except:
-            pass
-        
-        return None
+        """Parse various date string formats (see common.dates)"""
+        return dates.parse_date(date_str)
 
     def clean_field_name(self, field_name: str) -> str:
         """Clean field name for database compatibility"""
@@ -376,7 +349,7 @@ class JSONAnalyzer:
         
         if isinstance(value, (list, dict)):
             # Store complex objects as JSON text
-            json_str = json.dumps(value)
+            json_str = json_codec.dumps(value)
             return 'TEXT', len(json_str)
         
         # Default to TEXT for unknown types
@@ -433,7 +406,8 @@ class JSONAnalyzer:
             json_files = self._find_json_files_in_session(latest_session_path)
             
             for json_file in json_files:
-                json_filename = json_file.name
+                # NDJSON directories map to the same table as the module's .json file
+                json_filename = f"{raw_store.module_name_for_path(json_file)}.json"
                 table_name = self.json_to_table_map.get(json_filename)
                 
                 if not table_name:
@@ -454,10 +428,10 @@ class JSONAnalyzer:
             # Handle traditional flat structure
             self.logger.info("Using traditional flat structure")
             for json_filename, table_name in self.json_to_table_map.items():
-                json_file = self.json_dir / json_filename
+                json_file = raw_store.find_module_path(self.json_dir, json_filename[:-len('.json')])
                 
-                if not json_file.exists():
-                    self.logger.warning(f"JSON file not found: {json_file}")
+                if json_file is None:
+                    self.logger.warning(f"JSON file not found: {self.json_dir / json_filename}")
                     continue
                 
                 self.logger.info(f"Analyzing {json_filename} -> {table_name}")
@@ -559,8 +533,7 @@ class JSONAnalyzer:
         }
         
         try:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(report, f, indent=2, default=str)
+            json_codec.dump_file(report, output_path, indent=True, default=str)
             
             self.logger.info(f"Analysis report saved to: {output_path}")
             return str(output_path)
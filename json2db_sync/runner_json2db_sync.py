@@ -514,8 +514,10 @@ class JSON2DBSyncRunner:
                             # Check if this is from our tracking table (recent population)
                             try:
                                 # If the timestamp is very recent (today), it's likely from our tracking
-                                from datetime import datetime
-                                parsed_time = datetime.fromisoformat(last_modified_time.replace('T', ' '))
+                                from common.dates import parse_date
+                                parsed_time = parse_date(last_modified_time)
+                                if parsed_time is None:
+                                    raise ValueError(f"Could not parse date: {last_modified_time}")
                                 current_time = datetime.now()
                                 time_diff = current_time - parsed_time
                                 
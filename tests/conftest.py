@@ -0,0 +1,62 @@
+"""
+Shared pytest setup: make the project packages importable from the repo root.
+
+Also holds the fake HTTP helpers the client tests share (``from conftest import ...``).
+"""
+
+import sys
+from pathlib import Path
+
+import requests
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+
+class FakeResponse:
+    """Stand-in for ``requests.Response`` with a status code, a JSON body and headers."""
+
+    def __init__(self, status_code=200, data=None, headers=None):
+        self.status_code = status_code
+        self._data = data
+        self.headers = headers or {}
+        self.text = ""
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} error", response=self)
+
+    def json(self):
+        return self._data
+
+    def close(self):
+        pass
+
+
+class FakeTransport:
+    """
+    Stand-in for ZohoTransport that answers every GET with ``respond(tail, params)``.
+
+    ``tail`` is the last URL segment (the module name of a list call, the record ID
+    of a detail call); ``respond`` returns a FakeResponse or raises. The tails
+    requested are kept in ``calls``.
+    """
+    quota_ledger = None
+
+    def __init__(self, respond):
+        self.respond = respond
+        self.calls = []
+
+    def get(self, url, params=None, module=None):
+        tail = url.rsplit("/", 1)[1]
+        self.calls.append(tail)
+        return self.respond(tail, params)
+
+
+def fake_async_api(client, get_json):
+    """Route an AsyncZohoClient's requests to ``get_json(endpoint, params, module)``, bypassing the detail cache."""
+    client._get_json = get_json
+    client._cached_detail = lambda *args, **kwargs: None
+    client._store_detail = lambda *args, **kwargs: None
+    return client
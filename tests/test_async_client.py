@@ -0,0 +1,183 @@
+"""AsyncZohoClient failure reporting, detail concurrency and event-loop hygiene."""
+
+import asyncio
+import gc
+import threading
+
+import pytest
+
+from api_sync.core.async_client import AsyncZohoClient
+from conftest import fake_async_api
+
+
+def make_client(**kwargs):
+    return AsyncZohoClient("token", "org", "https://example.test", **kwargs)
+
+
+def test_failed_page_fails_the_module():
+    client = make_client()
+    pages = {1: (200, {"contacts": [{"contact_id": "1"}], "page_context": {"has_more_page": True}}),
+             2: (500, None)}
+
+    async def fake_get_json(endpoint, params=None, module=None):
+        return pages[params["page"]]
+
+    client._get_json = fake_get_json
+    with pytest.raises(RuntimeError):
+        asyncio.run(client.get_data_for_module("contacts"))
+
+
+def test_detail_cache_runs_off_the_event_loop():
+    client = make_client()
+    threads = {}
+
+    def cached_detail(module_name, record_id, last_modified_time=None):
+        threads["lookup"] = threading.get_ident()
+        return None
+
+    def store_detail(module_name, record_id, record, last_modified_time=None):
+        threads["store"] = threading.get_ident()
+
+    async def fake_get_json(endpoint, params=None, module=None):
+        return 200, {"invoice": {"invoice_id": "1"}}
+
+    async def fetch():
+        threads["loop"] = threading.get_ident()
+        return await client._get_detailed_record("invoices", "1")
+
+    client._cached_detail = cached_detail
+    client._store_detail = store_detail
+    client._get_json = fake_get_json
+    assert asyncio.run(fetch()) == {"invoice_id": "1"}
+    assert threads["lookup"] != threads["loop"]
+    assert threads["store"] != threads["loop"]
+
+
+def test_detail_fetches_keep_concurrency_in_flight_across_batches():
+    client = make_client(detail_concurrency={"invoices": 80})
+    headers = [{"invoice_id": str(i)} for i in range(120)]
+    state = {"in_flight": 0, "peak": 0}
+
+    async def fake_pages(module_name, since_timestamp=None, start_page=1):
+        yield headers
+
+    async def fake_get_json(endpoint, params=None, module=None):
+        state["in_flight"] += 1
+        state["peak"] = max(state["peak"], state["in_flight"])
+        await asyncio.sleep(0.01)
+        state["in_flight"] -= 1
+        return 200, {"invoice": {"invoice_id": endpoint.rsplit("/", 1)[1], "line_items": []}}
+
+    async def collect():
+        return [batch async for batch in client.iter_data_with_line_items("invoices", since_timestamp="2024-01-01")]
+
+    fake_async_api(client, fake_get_json)
+    client.iter_module_pages = fake_pages
+    batches = asyncio.run(collect())
+
+    assert state["peak"] == 80
+    assert [len(batch["headers"]) for batch in batches] == [50, 50, 20]
+    assert [batch["page_complete"] for batch in batches] == [False, False, True]
+    assert [r["invoice_id"] for batch in batches for r in batch["headers"]] == [h["invoice_id"] for h in headers]
+
+
+
+def test_every_failed_detail_fetch_is_retrieved():
+    client = make_client(detail_concurrency={"invoices": 5})
+    client.DETAIL_BATCH_SIZE = 2
+    headers = [{"invoice_id": str(i)} for i in range(1, 6)]
+    unretrieved = []
+
+    async def fake_pages(module_name, since_timestamp=None, start_page=1):
+        yield headers
+
+    async def fake_get_json(endpoint, params=None, module=None):
+        # Every record but the first fails after its retries
+        if not endpoint.endswith("/1"):
+            return 503, None
+        await asyncio.sleep(0.01)
+        return 200, {"invoice": {"invoice_id": "1", "line_items": []}}
+
+    async def collect():
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: unretrieved.append(context))
+        async for batch in client.iter_data_with_line_items("invoices", since_timestamp="2024-01-01"):
+            pass
+
+    fake_async_api(client, fake_get_json)
+    client.iter_module_pages = fake_pages
+    failed = False
+    try:
+        asyncio.run(collect())
+    except RuntimeError:
+        # Not kept: its traceback would keep the failed tasks alive
+        failed = True
+    # Failed tasks report exceptions nobody retrieved when they are collected
+    gc.collect()
+
+    assert failed
+    assert unretrieved == []
+
+class FakeResponse:
+    def __init__(self, status, body=None):
+        self.status = status
+        self.headers = {}
+        self._body = body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def json(self, content_type=None):
+        return self._body
+
+    async def text(self):
+        return ""
+
+
+class FakeSession:
+    closed = False
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.tokens = []
+
+    def get(self, url, params=None, headers=None):
+        self.tokens.append(headers["Authorization"])
+        return self.responses.pop(0)
+
+
+class FakeTokenProvider:
+    def __init__(self):
+        self.token = "old"
+        self.threads = []
+        self.refreshed = []
+
+    def get_token(self):
+        self.threads.append(threading.get_ident())
+        return self.token
+
+    def refresh(self, rejected_token):
+        self.threads.append(threading.get_ident())
+        self.refreshed.append(rejected_token)
+        self.token = "new"
+        return self.token
+
+
+def test_token_renewal_runs_off_the_event_loop_and_retries_401():
+    provider = FakeTokenProvider()
+    client = make_client(token_provider=provider)
+    session = FakeSession([FakeResponse(401), FakeResponse(200, {"ok": True})])
+    client._session = session
+
+    async def fetch():
+        loop_thread = threading.get_ident()
+        return loop_thread, await client._get_json("/invoices")
+
+    loop_thread, result = asyncio.run(fetch())
+
+    assert result == (200, {"ok": True})
+    assert provider.refreshed == ["old"]
+    assert session.tokens == ["Zoho-oauthtoken old", "Zoho-oauthtoken new"]
+    assert loop_thread not in provider.threads
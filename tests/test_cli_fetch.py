@@ -0,0 +1,36 @@
+"""`python -m api_sync fetch` goes through ApiSyncRunner (quota ledger, token provider, streaming)."""
+
+import argparse
+
+from api_sync import cli, runner_api_sync
+
+
+class FakeRunner:
+    calls = []
+
+    def __init__(self, log_level="INFO"):
+        self.api_client = object()
+
+    def fetch_data(self, module_name, since_timestamp=None, full_sync=False, resume=False):
+        self.calls.append((module_name, since_timestamp, full_sync, resume))
+        return {"success": True, "module": module_name, "record_count": 3, "line_item_count": 7,
+                "since": since_timestamp, "output_dir": "data/raw_json/2025-07-01_10-00-00"}
+
+
+def fetch_args(**overrides):
+    values = {"module": "invoices", "since": None, "full": False, "resume": False, "log_level": "INFO"}
+    values.update(overrides)
+    return argparse.Namespace(**values)
+
+
+def test_fetch_uses_the_runner(monkeypatch, capsys):
+    monkeypatch.setattr(runner_api_sync, "ApiSyncRunner", FakeRunner)
+    monkeypatch.setattr(cli, "setup_verbose_logging", lambda: None)
+    FakeRunner.calls = []
+
+    assert cli.cmd_fetch(fetch_args(since="2025-07-01T00:00:00+00:00")) == 0
+    assert cli.cmd_fetch(fetch_args(full=True)) == 0
+
+    assert FakeRunner.calls == [("invoices", "2025-07-01T00:00:00+00:00", False, False),
+                                ("invoices", None, True, False)]
+    assert "[DATA] Total line items: 7" in capsys.readouterr().out
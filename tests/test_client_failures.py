@@ -0,0 +1,56 @@
+"""Both fetch engines raise for a module that could not be fetched completely."""
+
+import asyncio
+
+import pytest
+import requests
+
+from api_sync.core.async_client import AsyncZohoClient
+from api_sync.core.client import ZohoClient
+from conftest import FakeResponse, FakeTransport, fake_async_api
+
+SINCE = "2025-07-01T00:00:00+05:30"
+
+
+def page(module_name, number):
+    """Page 1 holds one record and announces more; page 2 fails."""
+    if number == 2:
+        return 500, None
+    id_field = "invoice_id" if module_name == "invoices" else "contact_id"
+    return 200, {module_name: [{id_field: "1", "line_items": []}], "page_context": {"has_more_page": True}}
+
+
+def respond(tail, params):
+    if tail in ("invoices", "contacts"):
+        return FakeResponse(*page(tail, params["page"]))
+    return FakeResponse(200, {"invoice": {"invoice_id": tail, "line_items": []}})
+
+
+def sync_client():
+    return ZohoClient("token", "org", "https://example.test", transport=FakeTransport(respond))
+
+
+def async_client():
+    async def fake_get_json(endpoint, params=None, module=None):
+        module_name = endpoint.strip("/")
+        if module_name in ("invoices", "contacts"):
+            return page(module_name, params["page"])
+        return 200, {"invoice": {"invoice_id": endpoint.rsplit("/", 1)[1], "line_items": []}}
+
+    return fake_async_api(AsyncZohoClient("token", "org", "https://example.test"), fake_get_json)
+
+
+def test_sync_engine_raises_for_a_partial_module():
+    client = sync_client()
+    with pytest.raises(requests.exceptions.RequestException):
+        client.get_data_for_module("contacts")
+    with pytest.raises(requests.exceptions.RequestException):
+        client.get_data_for_module_with_line_items("invoices", SINCE)
+
+
+def test_async_engine_raises_for_a_partial_module():
+    client = async_client()
+    with pytest.raises(RuntimeError):
+        asyncio.run(client.get_data_for_module("contacts"))
+    with pytest.raises(RuntimeError):
+        asyncio.run(client.get_data_for_module_with_line_items("invoices", SINCE))
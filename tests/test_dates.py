@@ -0,0 +1,33 @@
+"""Ambiguous dates parse the same way regardless of what was parsed before."""
+
+from datetime import datetime
+
+import pytest
+
+from common import dates
+
+
+@pytest.fixture(autouse=True)
+def fresh_parser():
+    dates.clear_cache()
+    yield
+    dates.clear_cache()
+
+
+def test_ambiguous_slash_date_is_read_day_first_after_a_month_first_match():
+    assert dates.parse_date("12/25/2025") == datetime(2025, 12, 25)
+    assert dates.parse_date("01/02/2025") == datetime(2025, 2, 1)
+
+
+def test_ambiguous_slash_date_is_read_month_first_after_a_day_first_match():
+    formats = ("%Y-%m-%d", "%m/%d/%Y", "%Y-%m-%d %H:%M:%S", "%d/%m/%Y")
+    assert dates.parse_date("25/12/2025", formats) == datetime(2025, 12, 25)
+    assert dates.parse_date("01/02/2025", formats) == datetime(2025, 1, 2)
+    cutoff = datetime(2025, 1, 15)
+    assert dates.on_or_after(["25/12/2025", "01/02/2025", "02/01/2025"], cutoff, formats) == [True, False, True]
+
+
+def test_unambiguous_values_parse_with_the_matching_format():
+    for day in range(13, 29):
+        assert dates.parse_date(f"{day}/03/2025") == datetime(2025, 3, day)
+    assert dates.date_range(["12/25/2025", "01/02/2025"]).earliest == datetime(2025, 2, 1)
@@ -0,0 +1,77 @@
+"""Detail fetches that fail after every retry fail the module instead of dropping records."""
+
+import asyncio
+
+import pytest
+import requests
+
+from api_sync.core.async_client import AsyncZohoClient
+from api_sync.core.client import ZohoClient
+from api_sync.core.transport import CircuitOpenError
+from api_sync.runner_api_sync import ApiSyncRunner
+from conftest import FakeResponse, FakeTransport, fake_async_api
+
+HEADERS = [{"invoice_id": str(i), "last_modified_time": "2025-07-01T10:00:00+0530"} for i in range(1, 4)]
+
+
+def make_client(outcomes):
+    """A client whose detail requests are answered from ``outcomes`` keyed by record ID (default: success)."""
+    def respond(record_id, params):
+        outcome = outcomes.get(record_id, 200)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return FakeResponse(outcome, {"invoice": {"invoice_id": record_id, "line_items": []}})
+
+    client = ZohoClient("token", "org", "https://example.test", transport=FakeTransport(respond))
+    client.iter_module_pages = lambda module_name, since_timestamp=None, start_page=1: iter([HEADERS])
+    return client
+
+
+def fetch_all(client):
+    return list(client.iter_data_with_line_items("invoices", since_timestamp="2025-07-01T00:00:00+05:30"))
+
+
+@pytest.mark.parametrize("outcome", [CircuitOpenError("open"), requests.exceptions.ConnectionError("reset"), 503])
+def test_exhausted_detail_failure_raises(outcome):
+    with pytest.raises(requests.exceptions.RequestException):
+        fetch_all(make_client({"2": outcome}))
+
+
+def test_missing_record_is_skipped():
+    batches = fetch_all(make_client({"2": 404}))
+    assert [record["invoice_id"] for record in batches[0]["headers"]] == ["1", "3"]
+
+
+def test_async_exhausted_detail_failure_raises():
+    async def fake_pages(module_name, since_timestamp=None, start_page=1):
+        yield HEADERS
+
+    async def fake_get_json(endpoint, params=None, module=None):
+        if endpoint.endswith("/2"):
+            return 503, None
+        return 200, {"invoice": {"invoice_id": endpoint.rsplit("/", 1)[1], "line_items": []}}
+
+    async def collect():
+        return [batch async for batch in client.iter_data_with_line_items("invoices", "2025-07-01T00:00:00+05:30")]
+
+    client = fake_async_api(AsyncZohoClient("token", "org", "https://example.test"), fake_get_json)
+    client.iter_module_pages = fake_pages
+    with pytest.raises(RuntimeError):
+        asyncio.run(collect())
+
+
+def test_failed_module_is_not_finalized(tmp_path):
+    class FailingClient:
+        MODULES_WITH_LINE_ITEMS = ZohoClient.MODULES_WITH_LINE_ITEMS
+
+        def iter_data_with_line_items(self, module_name, since_timestamp=None, start_page=1, skip_ids=None):
+            yield {"headers": [{"invoice_id": "1"}], "line_items": [], "page": 1, "page_complete": False}
+            raise CircuitOpenError("open")
+
+    runner = ApiSyncRunner(api_client=FailingClient())
+    result = runner.fetch_data("invoices", full_sync=True, output_dir=str(tmp_path))
+
+    assert result["success"] is False
+    # The temporary directory is kept for --resume and never renamed into a sync
+    assert all(path.name.endswith(".tmp") for path in tmp_path.iterdir() if path.is_dir())
+    assert list(tmp_path.glob("*.tmp/sync_checkpoint_invoices.json"))
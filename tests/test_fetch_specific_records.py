@@ -0,0 +1,43 @@
+"""Targeted re-fetches must return the upstream record, never a cached copy."""
+
+import asyncio
+
+from api_sync.core.async_client import AsyncZohoClient
+from api_sync.core.client import ZohoClient
+from api_sync.core.detail_cache import DetailRecordCache
+from conftest import FakeResponse, FakeTransport
+
+STALE = {"invoice_id": "1", "status": "draft", "last_modified_time": "2025-07-01T10:00:00+0530"}
+FRESH = {"invoice_id": "1", "status": "paid", "last_modified_time": "2025-07-02T10:00:00+0530"}
+
+
+def stale_cache(tmp_path):
+    cache = DetailRecordCache(str(tmp_path / "detail_cache.db"))
+    cache.put("invoices", "1", STALE)
+    return cache
+
+
+def test_fetch_specific_records_skips_cache(tmp_path):
+    cache = stale_cache(tmp_path)
+    transport = FakeTransport(lambda tail, params: FakeResponse(200, {"invoice": FRESH}))
+    client = ZohoClient("token", "org", "https://example.test", transport=transport, detail_cache=cache)
+
+    assert client.fetch_specific_records("invoices", ["1"]) == [FRESH]
+    assert transport.calls == ["1"]
+    # The fresh record replaces the stale one for later header-driven lookups
+    assert cache.get("invoices", "1", FRESH["last_modified_time"]) == FRESH
+
+
+def test_async_fetch_specific_records_skips_cache(tmp_path):
+    cache = stale_cache(tmp_path)
+    client = AsyncZohoClient("token", "org", "https://example.test", detail_cache=cache)
+    calls = []
+
+    async def fake_get_json(endpoint, params=None, module=None):
+        calls.append(endpoint)
+        return 200, {"invoice": FRESH}
+
+    client._get_json = fake_get_json
+    assert asyncio.run(client.fetch_specific_records("invoices", ["1"])) == [FRESH]
+    assert calls == ["/invoices/1"]
+    assert cache.get("invoices", "1", FRESH["last_modified_time"]) == FRESH
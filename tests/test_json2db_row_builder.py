@@ -0,0 +1,77 @@
+"""Compiled insert rows match clean_record_for_insert, and content hashes survive reloads."""
+
+import pytest
+
+from json2db_sync.column_plan import CONTENT_HASH_FIELD, IMPORT_TIMESTAMP_FIELDS, content_hash
+from json2db_sync.data_populator import JSONDataPopulator
+
+COLUMNS = ["invoice_id", "status", "total", "is_paid", "line_items", "customer_name", "cf_region",
+           "import_timestamp", "sync_timestamp", CONTENT_HASH_FIELD]
+IMPORT_TIMESTAMP = "2025-07-01T10:00:00"
+
+RECORDS = [
+    {"invoice_id": "1", "status": "paid", "total": 12.5, "is_paid": True, "line_items": [{"item_id": "a"}],
+     "Customer Name": "Acme", "unknown_field": "dropped"},
+    # Colliding cleaned keys: the later key wins
+    {"invoice_id": "2", "customer_name": "first", "Customer-Name": "second", "CF Region": "", "cf_region": "EU"},
+    # Keys that clean to the columns the builder fills itself
+    {"invoice_id": "3", "Import Timestamp": "1999-01-01", "sync_timestamp": "stale", "Content Hash": "forged"},
+    {"invoice_id": "4", "status": None, "total": 0, "is_paid": False, "line_items": []},
+    {},
+]
+
+
+@pytest.fixture
+def populator(tmp_path, monkeypatch):
+    # The populator writes its log file below the working directory
+    monkeypatch.chdir(tmp_path)
+    return JSONDataPopulator(str(tmp_path / "test.db"), str(tmp_path))
+
+
+def build_rows(populator, records, columns=COLUMNS, import_timestamp=IMPORT_TIMESTAMP):
+    return list(populator._row_builder("json_invoices", columns).rows(records, import_timestamp))
+
+
+@pytest.mark.parametrize("record", RECORDS, ids=["types", "collisions", "reserved-columns", "falsy", "empty"])
+def test_rows_match_clean_record_for_insert(populator, record):
+    columns = {name: {} for name in COLUMNS}
+    cleaned = populator.clean_record_for_insert(record, columns)
+    row = dict(zip(COLUMNS, build_rows(populator, [record])[0]))
+
+    for name in COLUMNS:
+        if name in IMPORT_TIMESTAMP_FIELDS:
+            # Filled with the load time, never a record value (clean_record_for_insert uses the current time)
+            assert row[name] == IMPORT_TIMESTAMP
+        elif name != CONTENT_HASH_FIELD:
+            assert row[name] == cleaned.get(name), name
+    hashed = [None if name == CONTENT_HASH_FIELD or name in IMPORT_TIMESTAMP_FIELDS else row[name] for name in COLUMNS]
+    assert row[CONTENT_HASH_FIELD] == content_hash(hashed)
+
+
+def test_later_keys_win_and_reserved_columns_ignore_record_values(populator):
+    collisions, reserved = (dict(zip(COLUMNS, row)) for row in build_rows(populator, RECORDS[1:3]))
+    assert (collisions["customer_name"], collisions["cf_region"]) == ("second", "EU")
+    assert reserved["import_timestamp"] == reserved["sync_timestamp"] == IMPORT_TIMESTAMP
+    assert reserved[CONTENT_HASH_FIELD] != "forged"
+
+
+def test_rows_without_a_hash_column_match_too(populator):
+    columns = [name for name in COLUMNS if name != CONTENT_HASH_FIELD]
+    for record in RECORDS:
+        cleaned = populator.clean_record_for_insert(record, {name: {} for name in columns})
+        row = dict(zip(columns, build_rows(populator, [record], columns)[0]))
+        assert {name: value for name, value in row.items() if name not in IMPORT_TIMESTAMP_FIELDS} == \
+            {name: cleaned.get(name) for name in columns if name not in IMPORT_TIMESTAMP_FIELDS}
+
+
+def test_content_hash_is_stable_across_reloads(populator, tmp_path):
+    first = build_rows(populator, RECORDS)
+    # Another run: a new populator, a later import time and the keys in another order
+    # (except for the colliding keys, whose order decides the value)
+    reordered = [record if index == 1 else dict(reversed(list(record.items()))) for index, record in enumerate(RECORDS)]
+    reloaded = build_rows(JSONDataPopulator(str(tmp_path / "test.db"), str(tmp_path)), reordered,
+                          import_timestamp="2025-07-02T10:00:00")
+
+    hash_position = COLUMNS.index(CONTENT_HASH_FIELD)
+    assert [row[hash_position] for row in reloaded] == [row[hash_position] for row in first]
+    assert len({row[hash_position] for row in first}) == len(RECORDS)
@@ -0,0 +1,39 @@
+"""json2db finds the latest api_sync session from the sync catalog without importing api_sync."""
+
+import sys
+
+from api_sync.processing import raw_data_handler
+from json2db_sync.config import SYNC_INDEX_FILENAME, JSON2DBConfig
+
+
+def sync_session(root, session, timestamp_dir, records):
+    output_base_dir = str(root / session / "raw_json")
+    raw_data_handler.save_raw_json_temp(records, "invoices", timestamp_dir, output_base_dir, storage_format="json")
+    raw_data_handler.finalize_sync_timestamp(timestamp_dir, output_base_dir)
+
+
+def test_latest_session_with_data_comes_from_the_catalog(tmp_path, monkeypatch):
+    monkeypatch.setenv("JSON2DB_API_SYNC_PATH", str(tmp_path))
+    sync_session(tmp_path, "sync_session_2025-07-01_10-00-00", "2025-07-01_10-00-00", [{"invoice_id": "1"}])
+    sync_session(tmp_path, "sync_session_2025-07-02_10-00-00", "2025-07-02_10-00-00", [{"invoice_id": "2"}])
+    # A newer session without data (e.g. a sync that found nothing)
+    sync_session(tmp_path, "sync_session_2025-07-03_10-00-00", "2025-07-03_10-00-00", [])
+    assert (tmp_path / SYNC_INDEX_FILENAME).exists()
+
+    sys.modules.pop("api_sync.processing.sync_catalog", None)
+    config = JSON2DBConfig()
+    assert config.get_latest_session_folder() == str(tmp_path / "sync_session_2025-07-02_10-00-00")
+    assert "api_sync.processing.sync_catalog" not in sys.modules
+
+
+def test_uncatalogued_sessions_are_scanned(tmp_path, monkeypatch):
+    monkeypatch.setenv("JSON2DB_API_SYNC_PATH", str(tmp_path))
+    timestamp_dir = tmp_path / "sync_session_2025-07-01_10-00-00" / "raw_json" / "2025-07-01_10-00-00"
+    timestamp_dir.mkdir(parents=True)
+    (timestamp_dir / "sync_metadata_invoices.json").write_text("{}")
+    config = JSON2DBConfig()
+    assert not config._session_has_data_files(timestamp_dir.parent.parent)
+
+    (timestamp_dir / "invoices.ndjson").mkdir()
+    assert config._session_has_data_files(timestamp_dir.parent.parent)
+    assert not (tmp_path / SYNC_INDEX_FILENAME).exists()
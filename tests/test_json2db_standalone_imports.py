@@ -0,0 +1,16 @@
+"""json2db_sync entry points import when run from their own directory."""
+
+import os
+import subprocess
+import sys
+
+from conftest import PROJECT_ROOT
+
+
+def test_entry_points_import_from_package_directory():
+    env = {key: value for key, value in os.environ.items() if key != "PYTHONPATH"}
+    result = subprocess.run(
+        [sys.executable, "-c", "import main_json2db_sync, runner_json2db_sync"],
+        cwd=PROJECT_ROOT / "json2db_sync", env=env, capture_output=True, text=True,
+    )
+    assert result.returncode == 0, result.stderr
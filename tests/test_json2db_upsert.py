@@ -0,0 +1,102 @@
+"""json2db upserts: insert/update/unchanged counts and tables loaded before upserts existed."""
+
+import sqlite3
+
+import pytest
+
+from json2db_sync.bulk_loader import BulkLoader, supports_upsert
+from json2db_sync.column_plan import content_hash
+
+pytestmark = pytest.mark.skipif(not supports_upsert(), reason="SQLite 3.24+ required for upserts")
+
+COLUMNS = ["invoice_id", "status", "content_hash"]
+
+
+def create_legacy_table(db_path):
+    """A json table as table_generator creates it: surrogate ID, no unique Zoho ID."""
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE json_invoices (id INTEGER PRIMARY KEY AUTOINCREMENT, invoice_id TEXT, status TEXT)")
+    conn.commit()
+    conn.close()
+
+
+def rows(records):
+    return [(invoice_id, status, content_hash([invoice_id, status])) for invoice_id, status in records]
+
+
+def upsert(loader, records):
+    return loader.upsert_rows("json_invoices", COLUMNS, rows(records), "invoice_id", "content_hash")
+
+
+def test_upsert_counts(tmp_path):
+    db_path = str(tmp_path / "test.db")
+    create_legacy_table(db_path)
+    with BulkLoader(db_path, batch_size=2) as loader:
+        assert loader.prepare_upsert("json_invoices", "invoice_id", "content_hash")["ready"]
+        assert upsert(loader, [("1", "draft"), ("2", "sent"), ("3", "paid")]) == \
+            {"inserted": 3, "updated": 0, "unchanged": 0}
+        assert upsert(loader, [("1", "draft"), ("2", "paid"), ("3", "paid"), ("4", "draft")]) == \
+            {"inserted": 1, "updated": 1, "unchanged": 2}
+        assert upsert(loader, [("1", "draft"), ("2", "paid")]) == {"inserted": 0, "updated": 0, "unchanged": 2}
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT invoice_id, status FROM json_invoices ORDER BY invoice_id").fetchall() == \
+        [("1", "draft"), ("2", "paid"), ("3", "paid"), ("4", "draft")]
+
+
+def test_prepare_upsert_removes_duplicate_keys(tmp_path):
+    db_path = str(tmp_path / "test.db")
+    create_legacy_table(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.executemany("INSERT INTO json_invoices (invoice_id, status) VALUES (?, ?)",
+                     [("1", "draft"), ("2", "sent"), ("1", "paid"), ("1", "void"), (None, "x"), (None, "y")])
+    conn.commit()
+    conn.close()
+
+    with BulkLoader(db_path) as loader:
+        status = loader.prepare_upsert("json_invoices", "invoice_id", "content_hash")
+        assert status == {"ready": True, "reason": None, "duplicates_removed": 2}
+        # Ready tables are not scanned again
+        assert loader.prepare_upsert("json_invoices", "invoice_id", "content_hash")["duplicates_removed"] == 0
+        assert upsert(loader, [("1", "void"), ("2", "sent")]) == {"inserted": 0, "updated": 2, "unchanged": 0}
+
+    conn = sqlite3.connect(db_path)
+    # The latest row per Zoho ID is kept; rows without one are left alone
+    assert conn.execute("SELECT invoice_id, status FROM json_invoices ORDER BY id").fetchall() == \
+        [("2", "sent"), ("1", "void"), (None, "x"), (None, "y")]
+    with pytest.raises(sqlite3.IntegrityError):
+        conn.execute("INSERT INTO json_invoices (invoice_id, status) VALUES ('2', 'dup')")
+
+
+def test_prepare_upsert_leaves_table_unchanged_on_failure(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "test.db")
+    create_legacy_table(db_path)
+
+    with BulkLoader(db_path) as loader:
+        assert loader.prepare_upsert("json_invoices", "customer_id", "content_hash") == \
+            {"ready": False, "reason": "no customer_id column", "duplicates_removed": 0}
+        loader.execute("CREATE TABLE uq_json_invoices_invoice_id (x)")  # index name taken: CREATE INDEX fails
+        with pytest.raises(sqlite3.OperationalError):
+            loader.prepare_upsert("json_invoices", "invoice_id", "content_hash")
+
+    conn = sqlite3.connect(db_path)
+    assert [row[1] for row in conn.execute("PRAGMA table_info(json_invoices)")] == ["id", "invoice_id", "status"]
+
+
+def test_populator_reports_write_mode_fallback(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # the populator writes its log file to ./logs
+    from json2db_sync.data_populator import JSONDataPopulator
+
+    db_path = str(tmp_path / "test.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE json_invoices (id INTEGER PRIMARY KEY AUTOINCREMENT, customer_name TEXT)")
+    conn.commit()
+    conn.close()
+
+    populator = JSONDataPopulator(db_path=db_path, json_dir=str(tmp_path))
+    populator.config.get_processing_config()["write_mode"] = "upsert"
+    counts = populator._write_records("json_invoices", populator._get_table_columns_from_db("json_invoices"),
+                                      [{"customer_name": "Acme"}])
+    assert counts["inserted"] == 1
+    assert counts["write_mode"] == "replace"
+    assert counts["write_mode_fallback"] == "no invoice_id column"
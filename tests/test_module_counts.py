@@ -0,0 +1,34 @@
+"""Module counts come from the sync metadata without re-reading unchanged files."""
+
+import os
+
+from api_sync.processing import raw_data_handler, raw_store
+
+TIMESTAMP = "2025-07-01_10-00-00"
+
+
+def save(base, records):
+    raw_data_handler.save_raw_json_temp(records, "invoices", TIMESTAMP, str(base), storage_format="json")
+    raw_data_handler.finalize_sync_timestamp(TIMESTAMP, str(base))
+    return base / TIMESTAMP / "invoices.json"
+
+
+def test_unchanged_file_is_not_checksummed(tmp_path, monkeypatch):
+    save(tmp_path, [{"invoice_id": "1"}, {"invoice_id": "2"}])
+
+    def fail(path):
+        raise AssertionError("checksum recomputed for an unchanged file")
+    monkeypatch.setattr(raw_store, "storage_checksum", fail)
+
+    assert raw_data_handler.read_module_counts("invoices", TIMESTAMP, str(tmp_path))["records_found"] == 2
+
+
+def test_touched_file_is_verified_by_checksum(tmp_path):
+    file_path = save(tmp_path, [{"invoice_id": "1"}, {"invoice_id": "2"}])
+    os.utime(file_path, (1, 1))
+    assert raw_data_handler.read_module_counts("invoices", TIMESTAMP, str(tmp_path))["records_found"] == 2
+
+    # Same size, different content: the checksum catches the rewrite
+    file_path.write_bytes(file_path.read_bytes().replace(b'"2"', b'"3"'))
+    assert raw_data_handler.read_module_counts("invoices", TIMESTAMP, str(tmp_path)) is None
+    assert raw_data_handler.count_module_records("invoices", TIMESTAMP, str(tmp_path)) == 2
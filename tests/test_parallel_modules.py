@@ -0,0 +1,73 @@
+"""fetch_all_modules runs modules concurrently, each into its own finalized directory."""
+
+import threading
+
+import pytest
+import requests
+
+from api_sync import runner_api_sync
+from api_sync.core.client import ZohoClient
+from api_sync.processing import raw_store
+from api_sync.runner_api_sync import ApiSyncRunner
+
+MODULES = ["contacts", "items", "customerpayments"]
+
+
+class ParallelClient:
+    """Yields one page per module once every module has started; ``failing`` breaks after its page."""
+    MODULES_WITH_LINE_ITEMS = ZohoClient.MODULES_WITH_LINE_ITEMS
+
+    def __init__(self, failing=None):
+        self.failing = failing
+        # Only passes if all modules are in flight at the same time
+        self.started = threading.Barrier(len(MODULES), timeout=5)
+
+    def iter_data_with_line_items(self, module_name, since_timestamp=None, start_page=1, skip_ids=None):
+        self.started.wait()
+        yield {"headers": [{"id": f"{module_name}-1"}], "line_items": [], "page": 1, "page_complete": True}
+        if module_name == self.failing:
+            raise requests.exceptions.ConnectionError("connection reset")
+
+
+@pytest.fixture
+def runner(monkeypatch):
+    def make(client):
+        runner = ApiSyncRunner(api_client=client)
+        monkeypatch.setattr(runner.config, "max_parallel_modules", len(MODULES))
+        monkeypatch.setattr(runner.config, "compaction_threshold", 2)
+        monkeypatch.setattr(runner_api_sync.config, "get_fetchable_modules",
+                            lambda: {name: name for name in MODULES})
+        return runner
+    return make
+
+
+def test_modules_finalize_into_their_own_directories(runner, tmp_path):
+    result = runner(ParallelClient(failing="items")).fetch_all_modules(
+        full_sync=True, output_dir=str(tmp_path), parallel=True)
+
+    details = result["details"]
+    assert result["summary"]["failed_modules"] == ["items"]
+    finalized = {name: details[name]["timestamp"] for name in MODULES if name != "items"}
+    # Modules started in the same second still get distinct directories
+    assert len(set(finalized.values())) == len(finalized)
+    for name, timestamp in finalized.items():
+        assert details[name]["finalized"] is True
+        records = list(raw_store.iter_records(raw_store.find_module_path(tmp_path / timestamp, name)))
+        assert records == [{"id": f"{name}-1"}]
+
+    # The failed module keeps only its resumable temporary directory, which compaction leaves alone
+    directories = sorted(path.name for path in tmp_path.iterdir() if path.is_dir() and path.name != "snapshot")
+    assert sorted(finalized.values()) == [name for name in directories if not name.endswith(".tmp")]
+    assert len([name for name in directories if name.endswith(".tmp")]) == 1
+    assert result["summary"]["compaction"]["merged_dirs"] == len(finalized)
+
+
+def test_modules_are_skipped_when_the_quota_runs_low(runner, tmp_path):
+    sync = runner(ParallelClient())
+    sync.get_remaining_quota = lambda: 0
+
+    result = sync.fetch_all_modules(full_sync=True, output_dir=str(tmp_path), parallel=True)
+
+    assert sorted(result["summary"]["skipped_modules"]) == sorted(MODULES)
+    assert all(detail["skipped"] for detail in result["details"].values())
+    assert not [path for path in tmp_path.iterdir() if path.is_dir()]
@@ -0,0 +1,36 @@
+"""QuotaLedger merges the counts of processes that flush concurrently."""
+
+import json
+import multiprocessing
+from datetime import date
+
+from api_sync.core.quota import QuotaLedger
+
+PROCESSES = 4
+CALLS_PER_PROCESS = 150
+
+
+def charge_calls(ledger_path, module):
+    ledger = QuotaLedger(ledger_path, "org", flush_interval=0)
+    for _ in range(CALLS_PER_PROCESS):
+        ledger.record_call(module, 200)
+    ledger.flush()
+
+
+def test_concurrent_flushes_add_up(tmp_path):
+    ledger_path = str(tmp_path / "quota_ledger.json")
+    modules = [f"module{index}" for index in range(PROCESSES)]
+    workers = [multiprocessing.Process(target=charge_calls, args=(ledger_path, module)) for module in modules]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+        assert worker.exitcode == 0
+
+    with open(ledger_path, encoding="utf-8") as f:
+        day_entry = json.load(f)["org"][date.today().isoformat()]
+    assert day_entry["calls"] == PROCESSES * CALLS_PER_PROCESS
+    assert day_entry["by_module"] == {module: CALLS_PER_PROCESS for module in modules}
+    assert QuotaLedger(ledger_path, "org").calls_today() == PROCESSES * CALLS_PER_PROCESS
+    # No writer left a temp file behind
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["quota_ledger.json", "quota_ledger.json.lock"]
@@ -0,0 +1,19 @@
+"""Adaptive backoff of TokenBucketRateLimiter."""
+
+from api_sync.core.rate_limiter import TokenBucketRateLimiter
+
+
+def test_burst_of_429s_halves_rate_once():
+    limiter = TokenBucketRateLimiter(100)
+    for _ in range(8):
+        limiter.record_throttled()
+    assert limiter.current_requests_per_minute == 50
+    assert not limiter.try_acquire()
+
+
+def test_429_after_cooldown_halves_again(monkeypatch):
+    limiter = TokenBucketRateLimiter(100)
+    limiter.record_throttled()
+    monkeypatch.setattr(limiter, "_decrease_cooldown_until", 0.0)
+    limiter.record_throttled()
+    assert limiter.current_requests_per_minute == 25
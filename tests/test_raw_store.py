@@ -0,0 +1,125 @@
+"""Raw module files read back exactly what was written, in every layout."""
+
+import json
+import sys
+
+import pytest
+
+from api_sync.processing import raw_store
+from api_sync.processing.raw_data_handler import RawJsonPageWriter
+
+RECORDS = [
+    {"invoice_id": "1", "notes": "first line\n  {not a record", "line_items": [{"line_item_id": "1-1"}]},
+    {"invoice_id": "2", "custom": {"nested": {"deep": [1, 2]}}, "tags": []},
+    {"invoice_id": "3", "total": 12.5, "paid": None},
+]
+
+
+def write(path, text):
+    path.write_bytes(text.encode("utf-8"))
+    return path
+
+
+@pytest.mark.parametrize("text", [
+    json.dumps(RECORDS, indent=2),
+    json.dumps(RECORDS, indent=4),
+    json.dumps(RECORDS, indent="\t"),
+    json.dumps(RECORDS),
+    json.dumps(RECORDS, indent=2).replace("\n", "\r\n"),
+    json.dumps(RECORDS, indent=0),
+    json.dumps([]),
+    "[\n]",
+    json.dumps([RECORDS[0], 7, "text", [RECORDS[1]], None, RECORDS[2]], indent=2),
+    json.dumps([RECORDS[0], RECORDS[1], {"a": [{"b": 1}]}, 3], indent=2),
+    json.dumps(["only", "strings"], indent=2),
+], ids=["indent-2", "indent-4", "tabs", "compact", "crlf", "indent-0", "empty", "empty-indented",
+        "mixed", "trailing-number", "strings"])
+def test_json_arrays_read_like_json_load(tmp_path, text):
+    path = write(tmp_path / "invoices.json", text)
+    expected = json.loads(text)
+
+    assert list(raw_store.iter_json_array(path)) == expected
+    assert raw_store.count_records(path) == len(expected)
+
+
+def test_streamed_module_file_reads_back(tmp_path):
+    writer = RawJsonPageWriter("invoices", "2025-07-01_10-00-00", str(tmp_path), storage_format="json")
+    writer.write_page(RECORDS[:2])
+    writer.write_page(RECORDS[2:])
+    writer.close()
+
+    assert list(raw_store.iter_records(writer.file_path)) == RECORDS
+    assert raw_store.count_records(writer.file_path) == len(RECORDS)
+
+
+def test_a_file_that_is_not_an_array_is_rejected(tmp_path):
+    path = write(tmp_path / "invoices.json", json.dumps({"invoices": RECORDS}, indent=2))
+    with pytest.raises(ValueError):
+        list(raw_store.iter_json_array(path))
+
+
+def ndjson_records(count, start=1):
+    return [{"contact_id": str(i), "name": f"Contact {i}"} for i in range(start, start + count)]
+
+
+def test_ndjson_parts_round_trip(tmp_path):
+    directory = tmp_path / "contacts.ndjson"
+    writer = raw_store.NdjsonPartWriter(directory, "gz", chunk_records=2)
+    writer.write(ndjson_records(3))
+    writer.write(ndjson_records(2, start=4))
+    assert writer.close() == 5
+
+    parts = raw_store.part_paths(directory)
+    assert [part.name for part in parts] == [f"part-{i:05d}.ndjson.gz" for i in range(3)]
+    assert list(raw_store.iter_records(directory)) == ndjson_records(5)
+    assert raw_store.count_records(directory) == 5
+    assert [raw_store.count_records(part) for part in parts] == [2, 2, 1]
+
+
+def test_ndjson_writer_resumes_from_a_checkpoint(tmp_path):
+    directory = tmp_path / "contacts.ndjson.partial"
+    writer = raw_store.NdjsonPartWriter(directory, "gz", chunk_records=2)
+    writer.write(ndjson_records(3))
+    state = writer.checkpoint_state()
+    # Lost on resume: the rest of part 1 and a whole new part
+    writer.write(ndjson_records(3, start=4))
+    writer.abort()
+    assert len(raw_store.part_paths(directory)) == 3
+
+    resumed = raw_store.NdjsonPartWriter(directory, "gz", chunk_records=2, resume_state=state)
+    resumed.write(ndjson_records(2, start=4))
+    assert resumed.close() == 5
+    assert list(raw_store.iter_records(directory)) == ndjson_records(5)
+    assert raw_store.count_records(directory) == 5
+
+
+def test_page_writer_resumes_an_ndjson_partial_directory(tmp_path):
+    writer = RawJsonPageWriter("contacts", "2025-07-01_10-00-00", str(tmp_path), storage_format="ndjson.gz")
+    writer.write_page(ndjson_records(2))
+    state = writer.checkpoint_state()
+    writer.write_page(ndjson_records(1, start=3))
+    writer.abort(keep_partial=True)
+    assert writer.partial_path.name == "contacts.ndjson.partial" and writer.partial_path.is_dir()
+
+    resumed = RawJsonPageWriter("contacts", "2025-07-01_10-00-00", str(tmp_path),
+                                resume_state=state, storage_format="ndjson.gz")
+    resumed.write_page(ndjson_records(2, start=3))
+    resumed.close()
+    assert list(raw_store.iter_records(resumed.file_path)) == ndjson_records(4)
+    assert raw_store.count_records(resumed.file_path) == 4
+
+
+def test_zst_without_zstandard_fails_clearly(tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, "zstandard", None)
+    directory = tmp_path / "contacts.ndjson"
+
+    with pytest.raises(ImportError, match="pip install zstandard"):
+        raw_store.NdjsonPartWriter(directory, "zst")
+    assert not directory.exists()
+
+    directory.mkdir()
+    (directory / "part-00000.ndjson.zst").write_bytes(b"")
+    with pytest.raises(ImportError, match="zstandard"):
+        list(raw_store.iter_records(directory))
+    # Writing falls back to gzip instead
+    assert raw_store.resolve_format("ndjson.zst") == "ndjson.gz"
@@ -0,0 +1,42 @@
+"""Status and report lookups never create the sync index database."""
+
+from api_sync.processing import raw_store
+from api_sync.processing.local_index import INDEX_FILENAME, SyncSummaryIndex
+from api_sync.processing.sync_catalog import SyncCatalog
+
+
+def write_sync(base, timestamp_dir, records):
+    directory = base / timestamp_dir
+    directory.mkdir(parents=True)
+    raw_store.write_records(raw_store.module_path(directory, "invoices", "json"), records, "json")
+
+
+def test_read_only_lookups_leave_no_index(tmp_path):
+    write_sync(tmp_path, "2025-07-01_10-00-00", [{"invoice_id": "1"}, {"invoice_id": "2"}])
+    write_sync(tmp_path, "2025-07-02_10-00-00", [{"invoice_id": "3"}])
+
+    summary = SyncSummaryIndex(str(tmp_path), read_only=True).get("2025-07-01_10-00-00", "invoices")
+    catalog = SyncCatalog(str(tmp_path), read_only=True)
+
+    assert summary["record_count"] == 2
+    assert [entry["timestamp_dir"] for entry in catalog.entries()] == ["2025-07-02_10-00-00", "2025-07-01_10-00-00"]
+    assert catalog.latest()["timestamp_dir"] == "2025-07-02_10-00-00"
+    assert not (tmp_path / INDEX_FILENAME).exists()
+
+
+def test_read_only_lookups_use_an_existing_index(tmp_path):
+    write_sync(tmp_path, "2025-07-01_10-00-00", [{"invoice_id": "1"}])
+    SyncSummaryIndex(str(tmp_path)).get("2025-07-01_10-00-00", "invoices")
+    SyncCatalog(str(tmp_path)).entries()
+    index_file = tmp_path / INDEX_FILENAME
+    before = index_file.stat().st_mtime_ns
+
+    write_sync(tmp_path, "2025-07-02_10-00-00", [{"invoice_id": "2"}])
+    summary = SyncSummaryIndex(str(tmp_path), read_only=True).get("2025-07-02_10-00-00", "invoices")
+    entries = SyncCatalog(str(tmp_path), read_only=True).entries()
+
+    # The new directory is summarized from its file but not recorded; the catalog is read as stored
+    assert summary["record_count"] == 1
+    assert [entry["timestamp_dir"] for entry in entries] == ["2025-07-01_10-00-00"]
+    assert SyncSummaryIndex(str(tmp_path)).summaries("2025-07-02_10-00-00") == {}
+    assert index_file.stat().st_mtime_ns == before
@@ -0,0 +1,60 @@
+"""Unchanged detailed records are served from the index, not from the saved module files."""
+
+import shutil
+import sqlite3
+
+from api_sync.processing import raw_store
+from api_sync.processing.local_index import INDEX_FILENAME, LocalRecordIndex
+
+OLD = "2025-07-01T10:00:00+0530"
+NEW = "2025-07-02T10:00:00+0530"
+
+
+def write_sync(base, timestamp_dir, records):
+    directory = base / timestamp_dir
+    directory.mkdir(parents=True)
+    raw_store.write_records(raw_store.module_path(directory, "invoices", "json"), records, "json")
+
+
+def invoice(record_id, modified, status="sent"):
+    return {"invoice_id": record_id, "last_modified_time": modified, "status": status, "line_items": []}
+
+
+def test_reused_records_come_from_the_index(tmp_path):
+    write_sync(tmp_path, "2025-07-01_10-00-00", [invoice("1", OLD), invoice("2", OLD)])
+    write_sync(tmp_path, "2025-07-02_10-00-00", [invoice("2", NEW, "paid"), invoice("3", OLD)])
+    index = LocalRecordIndex(str(tmp_path))
+    index.refresh("invoices", "invoice_id")
+    for timestamp_dir in ("2025-07-01_10-00-00", "2025-07-02_10-00-00"):
+        shutil.rmtree(tmp_path / timestamp_dir)
+
+    headers = [{"invoice_id": "1", "last_modified_time": OLD},
+               {"invoice_id": "2", "last_modified_time": NEW},
+               {"invoice_id": "3", "last_modified_time": NEW},
+               {"invoice_id": "4", "last_modified_time": OLD}]
+    try:
+        assert index.find_unchanged("invoices", headers, "invoice_id") == {
+            "1": invoice("1", OLD), "2": invoice("2", NEW, "paid")}
+    finally:
+        index.close()
+
+
+def test_index_without_stored_records_is_rebuilt(tmp_path):
+    write_sync(tmp_path, "2025-07-01_10-00-00", [invoice("1", OLD)])
+    conn = sqlite3.connect(str(tmp_path / INDEX_FILENAME))
+    with conn:
+        conn.execute("CREATE TABLE record_versions (module TEXT NOT NULL, record_id TEXT NOT NULL, "
+                     "last_modified_time TEXT, content_hash TEXT NOT NULL, timestamp_dir TEXT NOT NULL, "
+                     "PRIMARY KEY (module, record_id))")
+        conn.execute("CREATE TABLE indexed_dirs (module TEXT NOT NULL, timestamp_dir TEXT NOT NULL, "
+                     "PRIMARY KEY (module, timestamp_dir))")
+        conn.execute("INSERT INTO record_versions VALUES ('invoices', '1', ?, 'x', '2025-07-01_10-00-00')", (OLD,))
+        conn.execute("INSERT INTO indexed_dirs VALUES ('invoices', '2025-07-01_10-00-00')")
+    conn.close()
+
+    index = LocalRecordIndex(str(tmp_path))
+    try:
+        headers = [{"invoice_id": "1", "last_modified_time": OLD}]
+        assert index.find_unchanged("invoices", headers, "invoice_id") == {"1": invoice("1", OLD)}
+    finally:
+        index.close()
@@ -0,0 +1,76 @@
+"""Retention cleanup keeps the newest syncs and only drops records nothing refers to."""
+
+from api_sync.processing import raw_store
+from api_sync.processing.record_store import (
+    RECORD_STORE_FILE, RecordStore, collect_garbage, read_manifest, write_manifest
+)
+
+DIRS = ["2025-07-01_10-00-00", "2025-07-02_10-00-00", "2025-07-03_10-00-00", "2025-07-04_10-00-00"]
+
+
+def invoices(day):
+    return [{"invoice_id": f"{day}{i}", "status": "sent", "line_items": [{"line_item_id": f"{day}{i}-1"}]}
+            for i in range(3)]
+
+
+def write_syncs(base):
+    for day, timestamp_dir in enumerate(DIRS):
+        directory = base / timestamp_dir
+        directory.mkdir(parents=True)
+        raw_store.write_records(raw_store.module_path(directory, "invoices", "json"), invoices(day), "json")
+
+
+def test_retention_keeps_the_newest_directories_and_temp_dirs(tmp_path):
+    write_syncs(tmp_path)
+    (tmp_path / "2025-07-05_10-00-00.tmp").mkdir()
+
+    result = collect_garbage(tmp_path, keep=2)
+
+    assert result["deleted_dirs"] == DIRS[:2]
+    # Expired directories are compacted into snapshot/ before they are deleted
+    remaining = sorted(d.name for d in tmp_path.iterdir() if d.is_dir() and d.name != "snapshot")
+    assert remaining == DIRS[2:] + ["2025-07-05_10-00-00.tmp"]
+
+
+def test_dry_run_deletes_nothing(tmp_path):
+    write_syncs(tmp_path)
+    before = sorted(str(p.relative_to(tmp_path)) for p in tmp_path.rglob("*"))
+
+    result = collect_garbage(tmp_path, keep=1, dedupe=True, dry_run=True)
+
+    assert result["deleted_dirs"] == DIRS[:3]
+    assert result["freed_bytes"] > 0
+    assert sorted(str(p.relative_to(tmp_path)) for p in tmp_path.rglob("*")) == before
+
+
+def test_deduplicated_manifest_reads_back_the_original_records(tmp_path):
+    write_syncs(tmp_path)
+
+    result = collect_garbage(tmp_path, keep=len(DIRS), dedupe=True)
+
+    assert result["deduplicated_modules"] == len(DIRS)
+    for day, timestamp_dir in enumerate(DIRS):
+        path = raw_store.find_module_path(tmp_path / timestamp_dir, "invoices")
+        assert path.suffix == ".manifest"
+        assert list(raw_store.iter_records(path)) == invoices(day)
+
+
+def test_nested_session_store_manifests_do_not_keep_base_records(tmp_path):
+    session_raw = tmp_path / "sync_session_2025-07-01_10-00-00" / "raw_json"
+    nested_store = session_raw / RECORD_STORE_FILE
+    base_store = tmp_path / RECORD_STORE_FILE
+    shared = invoices(0)
+    # The base store holds the records too, but only the nested session's manifest lists them
+    write_manifest(session_raw / DIRS[0] / "invoices.manifest", shared, store_path=nested_store)
+    store = RecordStore(base_store)
+    hashes = store.put_many(shared)
+    store.close()
+
+    result = collect_garbage(tmp_path, keep=1)
+
+    assert result["removed_records"] == len(shared)
+    store = RecordStore(nested_store)
+    try:
+        assert set(store.get_many(hashes)) == set(read_manifest(session_raw / DIRS[0] / "invoices.manifest"))
+    finally:
+        store.close()
@@ -0,0 +1,51 @@
+"""Line items of re-fetched parents replace the older line item set in the snapshot view."""
+
+from api_sync.processing import raw_store
+from api_sync.processing.snapshot import ConsolidatedView, merge_line_items
+
+
+def invoice(invoice_id, modified, item_ids):
+    items = [{"line_item_id": item_id, "parent_id": invoice_id, "parent_type": "invoice"} for item_id in item_ids]
+    return {"invoice_id": invoice_id, "last_modified_time": modified, "line_items": items}, items
+
+
+def write_sync(base, timestamp_dir, invoices):
+    directory = base / timestamp_dir
+    directory.mkdir(parents=True)
+    headers, line_items = [], []
+    for record, items in invoices:
+        headers.append(record)
+        line_items.extend(items)
+    raw_store.write_records(raw_store.module_path(directory, "invoices", "json"), headers, "json")
+    raw_store.write_records(raw_store.module_path(directory, "invoices_line_items", "json"), line_items, "json")
+
+
+def item_ids(records):
+    return sorted(record["line_item_id"] for record in records)
+
+
+def test_merge_line_items_replaces_per_parent():
+    old = [{"line_item_id": "a1", "parent_id": "A"}, {"line_item_id": "a2", "parent_id": "A"},
+           {"line_item_id": "b1", "parent_id": "B"}, {"line_item_id": "c1", "parent_id": "C"}]
+    new = [{"line_item_id": "a1", "parent_id": "A", "rate": 2}]
+    merged = merge_line_items([(old, set()), (new, {"A", "C"})], "line_item_id")
+    # a2 was deleted from A, C lost all its items, B was not re-fetched
+    assert merged == [{"line_item_id": "b1", "parent_id": "B"}, {"line_item_id": "a1", "parent_id": "A", "rate": 2}]
+
+
+def test_deleted_line_items_drop_out_of_snapshot_and_deltas(tmp_path):
+    write_sync(tmp_path, "2025-07-01_10-00-00", [invoice("A", "2025-07-01", ["a1", "a2"]),
+                                                 invoice("B", "2025-07-01", ["b1"]),
+                                                 invoice("C", "2025-07-01", ["c1"])])
+    view = ConsolidatedView(str(tmp_path))
+    view.compact("json")
+
+    # A lost a2, C lost its only line item
+    write_sync(tmp_path, "2025-07-02_10-00-00", [invoice("A", "2025-07-02", ["a1"]),
+                                                 invoice("C", "2025-07-02", [])])
+    assert item_ids(view.load_module("invoices_line_items")) == ["a1", "b1"]
+    assert item_ids(view.iter_module("invoices_line_items")) == ["a1", "b1"]
+
+    view.compact("json")
+    assert item_ids(view.load_module("invoices_line_items")) == ["a1", "b1"]
+    assert len(view.load_module("invoices")) == 3
@@ -0,0 +1,43 @@
+"""Finalized syncs reach the sync catalog even when the first catalog append fails."""
+
+import argparse
+import sqlite3
+
+from api_sync import cli
+from api_sync.processing import raw_data_handler
+from api_sync.processing.sync_catalog import SyncCatalog
+
+
+def finalize_with_failing_catalog(tmp_path, monkeypatch, failures):
+    attempts = []
+
+    def flaky_record_sync(*args):
+        attempts.append(args)
+        if len(attempts) <= failures:
+            raise sqlite3.OperationalError("database is locked")
+        record_sync(*args)
+
+    record_sync = raw_data_handler.record_sync
+    monkeypatch.setattr(raw_data_handler, "record_sync", flaky_record_sync)
+    monkeypatch.setattr(raw_data_handler.time, "sleep", lambda seconds: None)
+    raw_data_handler.save_raw_json_temp([{"invoice_id": "1"}], "invoices", "2025-07-01_10-00-00",
+                                        str(tmp_path), storage_format="json")
+    assert raw_data_handler.finalize_sync_timestamp("2025-07-01_10-00-00", str(tmp_path))
+    return attempts
+
+
+def test_catalog_append_is_retried(tmp_path, monkeypatch):
+    attempts = finalize_with_failing_catalog(tmp_path, monkeypatch, failures=2)
+
+    assert len(attempts) == raw_data_handler.CATALOG_ATTEMPTS
+    assert SyncCatalog(tmp_path).latest()["timestamp_dir"] == "2025-07-01_10-00-00"
+
+
+def test_catalog_command_rebuilds_an_uncatalogued_sync(tmp_path, monkeypatch):
+    # The catalog is created (and scanned) before the sync it then misses
+    assert SyncCatalog(tmp_path).latest() is None
+    finalize_with_failing_catalog(tmp_path, monkeypatch, failures=raw_data_handler.CATALOG_ATTEMPTS)
+    assert SyncCatalog(tmp_path).latest() is None
+
+    assert cli.cmd_catalog(argparse.Namespace(rebuild=True, directory=str(tmp_path))) == 0
+    assert SyncCatalog(tmp_path).latest()["modules"] == {"invoices": "invoices.json"}
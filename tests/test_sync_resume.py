@@ -0,0 +1,163 @@
+"""Checkpointed syncs resume without losing or duplicating records."""
+
+import asyncio
+
+import requests
+
+from api_sync.core.async_client import AsyncZohoClient
+from api_sync.core.client import ZohoClient
+from api_sync.processing import raw_store
+from api_sync.processing.raw_data_handler import RawJsonPageWriter, SyncCheckpoint
+from api_sync.runner_api_sync import ApiSyncRunner
+from conftest import FakeResponse, FakeTransport, fake_async_api
+
+SINCE = "2025-07-01T00:00:00+05:30"
+HEADERS = [{"invoice_id": str(i), "last_modified_time": "2025-07-01T10:00:00+0530"} for i in range(1, 4)]
+
+
+def missing_record(record_id, params):
+    """Record 2 is gone (404); every other ID returns its detailed record."""
+    if record_id == "2":
+        return FakeResponse(404)
+    return FakeResponse(200, {"invoice": {"invoice_id": record_id, "line_items": []}})
+
+
+def test_page_with_a_missing_detail_stays_open():
+    client = ZohoClient("token", "org", "https://example.test", transport=FakeTransport(missing_record))
+    client.iter_module_pages = lambda module_name, since_timestamp=None, start_page=1: iter([HEADERS])
+
+    batches = list(client.iter_data_with_line_items("invoices", since_timestamp=SINCE))
+
+    assert [record["invoice_id"] for record in batches[0]["headers"]] == ["1", "3"]
+    assert [batch["page_complete"] for batch in batches] == [False]
+
+
+def test_async_page_with_a_missing_detail_stays_open():
+    async def fake_pages(module_name, since_timestamp=None, start_page=1):
+        yield HEADERS
+
+    async def fake_get_json(endpoint, params=None, module=None):
+        if endpoint.endswith("/2"):
+            return 404, None
+        return 200, {"invoice": {"invoice_id": endpoint.rsplit("/", 1)[1], "line_items": []}}
+
+    async def collect():
+        return [batch async for batch in client.iter_data_with_line_items("invoices", SINCE)]
+
+    client = fake_async_api(AsyncZohoClient("token", "org", "https://example.test"), fake_get_json)
+    client.iter_module_pages = fake_pages
+
+    assert [batch["page_complete"] for batch in asyncio.run(collect())] == [False]
+
+
+def paged_transport(failures):
+    """Serves 3 list pages of 3 invoices and their details; each ID in ``failures`` fails once."""
+    failures = dict(failures)
+
+    def respond(tail, params):
+        if tail == "invoices":
+            page = params["page"]
+            headers = [{"invoice_id": str(i)} for i in range(page * 3 - 2, page * 3 + 1)]
+            return FakeResponse(200, {"invoices": headers, "page_context": {"has_more_page": page < 3}})
+        failure = failures.pop(tail, None)
+        if isinstance(failure, Exception):
+            raise failure
+        if failure is not None:
+            return FakeResponse(failure)
+        return FakeResponse(200, {"invoice": {"invoice_id": tail, "line_items": [{"line_item_id": f"{tail}-1"}]}})
+
+    return FakeTransport(respond)
+
+
+def detail_calls(transport):
+    return [tail for tail in transport.calls if tail != "invoices"]
+
+
+def make_runner(transport):
+    client = ZohoClient("token", "org", "https://example.test", transport=transport)
+    client.DETAIL_BATCH_SIZE = 2
+    client._has_comprehensive_line_item_data = lambda module_name: False
+    return ApiSyncRunner(api_client=client)
+
+
+def assert_synced_once(sync_dir):
+    ids = [r["invoice_id"] for r in raw_store.iter_records(raw_store.find_module_path(sync_dir, "invoices"))]
+    line_ids = [r["line_item_id"] for r in
+                raw_store.iter_records(raw_store.find_module_path(sync_dir, "invoices_line_items"))]
+    assert sorted(ids, key=int) == [str(i) for i in range(1, 10)]
+    assert sorted(line_ids, key=lambda value: int(value.split("-")[0])) == [f"{i}-1" for i in range(1, 10)]
+    assert not list(sync_dir.glob("sync_checkpoint_*.json"))
+
+
+def test_checkpoint_round_trip(tmp_path):
+    writer = RawJsonPageWriter("contacts", "2025-07-01_10-00-00", str(tmp_path))
+    checkpoint = SyncCheckpoint("contacts", "2025-07-01_10-00-00", str(tmp_path), SINCE)
+    writer.write_page([{"contact_id": "1"}, {"contact_id": "2"}])
+    checkpoint.save([writer], page=1, detail_ids=["1", "2"])
+    # Written after the checkpoint, so a resume must drop it
+    writer.write_page([{"contact_id": "3"}])
+    writer.abort(keep_partial=True)
+
+    loaded = SyncCheckpoint.find_latest("contacts", str(tmp_path))
+    assert (loaded.run_timestamp, loaded.since_timestamp, loaded.last_completed_page) == ("2025-07-01_10-00-00", SINCE, 1)
+    assert loaded.fetched_detail_ids == {"1", "2"}
+
+    resumed = RawJsonPageWriter("contacts", "2025-07-01_10-00-00", str(tmp_path),
+                                resume_state=loaded.outputs["contacts"])
+    resumed.write_page([{"contact_id": "3"}])
+    resumed.close()
+    assert [r["contact_id"] for r in raw_store.iter_records(resumed.file_path)] == ["1", "2", "3"]
+
+
+def test_checkpoint_only_advances_over_contiguous_complete_pages(tmp_path):
+    checkpoint = SyncCheckpoint("contacts", "2025-07-01_10-00-00", str(tmp_path), SINCE)
+    checkpoint.save([], page=2)
+    checkpoint.save([], page=3)
+    assert checkpoint.last_completed_page == 0
+    assert SyncCheckpoint.find_latest("contacts", str(tmp_path)).completed_pages == {2, 3}
+
+    checkpoint.save([], page=1)
+    assert (checkpoint.last_completed_page, checkpoint.completed_pages) == (3, set())
+
+
+def test_interrupted_fetch_resumes_without_gaps_or_duplicates(tmp_path):
+    # Record 6 fails after page 2's first batch (4, 5) was written and checkpointed
+    transport = paged_transport({"6": requests.exceptions.ConnectionError("connection reset")})
+    runner = make_runner(transport)
+
+    first = runner.fetch_data("invoices", full_sync=True, output_dir=str(tmp_path))
+    assert first["success"] is False
+    checkpoint = SyncCheckpoint.find_latest("invoices", str(tmp_path))
+    assert checkpoint.last_completed_page == 1
+    assert checkpoint.fetched_detail_ids == {"1", "2", "3", "4", "5"}
+
+    transport.calls = []
+    second = runner.fetch_data("invoices", resume=True, output_dir=str(tmp_path))
+    assert second["success"] is True and second["resumed"] is True
+    assert second["timestamp"] == checkpoint.run_timestamp
+    # Only the record that failed and the pages after it were requested again
+    assert detail_calls(transport) == ["6", "7", "8", "9"]
+
+    sync_dir = tmp_path / second["timestamp"]
+    ids = [r["invoice_id"] for r in raw_store.iter_records(raw_store.find_module_path(sync_dir, "invoices"))]
+    assert ids == [str(i) for i in range(1, 10)]
+    assert_synced_once(sync_dir)
+
+
+def test_resume_starts_at_a_page_left_open_before_a_later_complete_page(tmp_path):
+    # Page 1 stays open (one-off 403 on record 2), page 2 completes, page 3 fails
+    transport = paged_transport({"2": 403, "7": requests.exceptions.ConnectionError("connection reset")})
+    runner = make_runner(transport)
+
+    first = runner.fetch_data("invoices", full_sync=True, output_dir=str(tmp_path))
+    assert first["success"] is False
+    checkpoint = SyncCheckpoint.find_latest("invoices", str(tmp_path))
+    assert checkpoint.last_completed_page == 0
+    assert checkpoint.completed_pages == {2}
+
+    transport.calls = []
+    second = runner.fetch_data("invoices", resume=True, output_dir=str(tmp_path))
+    assert second["success"] is True
+    # Page 1 is listed again for record 2; records already written are not refetched
+    assert detail_calls(transport) == ["2", "7", "8", "9"]
+    assert_synced_once(tmp_path / second["timestamp"])
@@ -0,0 +1,140 @@
+"""The credential cache, the access token provider and the transport's refresh on 401."""
+
+import multiprocessing
+import stat
+import threading
+import time
+
+import pytest
+
+from api_sync.core import auth
+from api_sync.core.auth import AccessTokenProvider
+from api_sync.core.token_cache import TOKEN_EXPIRY_MARGIN, CredentialCache
+from api_sync.core.transport import ZohoTransport
+from conftest import FakeResponse
+
+CREDENTIALS = {"zoho_client_id": "client", "zoho_client_secret": "secret", "zoho_refresh_token": "refresh"}
+PROCESSES = 4
+SAVES_PER_PROCESS = 25
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return CredentialCache(str(tmp_path / "cache" / "credentials.json"))
+
+
+@pytest.fixture
+def exchanges(monkeypatch):
+    """Replace the token endpoint; returns the list of tokens handed out."""
+    issued = []
+    lock = threading.Lock()
+
+    def request_access_token(zoho_credentials):
+        # Slow enough for concurrent callers to pile up behind the provider lock
+        time.sleep(0.05)
+        with lock:
+            issued.append(f"token-{len(issued) + 1}")
+            return issued[-1], 3600
+    monkeypatch.setattr(auth, "request_access_token", request_access_token)
+    return issued
+
+
+def test_cache_file_is_owner_only(cache):
+    cache.save_credentials("project", {"zoho_client_id": "client"})
+
+    assert stat.S_IMODE(cache.cache_file.stat().st_mode) == 0o600
+    assert stat.S_IMODE(cache.cache_file.parent.stat().st_mode) == 0o700
+    assert cache.get_credentials("project") == {"zoho_client_id": "client"}
+
+
+def test_expired_credentials_are_a_miss(tmp_path):
+    cache = CredentialCache(str(tmp_path / "credentials.json"), credentials_ttl=-1)
+    cache.save_credentials("project", {"zoho_client_id": "client"})
+    assert cache.get_credentials("project") is None
+
+
+def test_access_tokens_expire_early_by_the_margin(cache):
+    cache.save_access_token(CREDENTIALS, "nearly-expired", TOKEN_EXPIRY_MARGIN - 5)
+    assert cache.get_access_token(CREDENTIALS) is None
+
+    cache.save_access_token(CREDENTIALS, "valid", TOKEN_EXPIRY_MARGIN + 60)
+    assert cache.get_access_token(CREDENTIALS)["access_token"] == "valid"
+    # Another refresh token has its own entry
+    assert cache.get_access_token(dict(CREDENTIALS, zoho_refresh_token="other")) is None
+
+
+def save_projects(cache_file, worker):
+    cache = CredentialCache(cache_file)
+    for index in range(SAVES_PER_PROCESS):
+        cache.save_credentials(f"project-{worker}-{index}", {"zoho_client_id": str(index)})
+
+
+def test_concurrent_processes_keep_every_entry(tmp_path):
+    cache_file = str(tmp_path / "credentials.json")
+    workers = [multiprocessing.Process(target=save_projects, args=(cache_file, worker)) for worker in range(PROCESSES)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+        assert worker.exitcode == 0
+
+    cache = CredentialCache(cache_file)
+    assert all(cache.get_credentials(f"project-{worker}-{index}") is not None
+               for worker in range(PROCESSES) for index in range(SAVES_PER_PROCESS))
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["credentials.json", "credentials.json.lock"]
+
+
+def test_provider_reuses_its_token_and_the_cached_one(cache, exchanges):
+    provider = AccessTokenProvider(CREDENTIALS, cache=cache)
+    assert provider.get_token() == provider.get_token() == "token-1"
+
+    # A later run reads the token from the cache instead of exchanging the refresh token
+    assert AccessTokenProvider(CREDENTIALS, cache=cache).get_token() == "token-1"
+    assert exchanges == ["token-1"]
+
+
+def test_provider_renews_a_token_inside_the_expiry_margin(cache, exchanges):
+    cache.save_access_token(CREDENTIALS, "nearly-expired", TOKEN_EXPIRY_MARGIN - 5)
+    assert AccessTokenProvider(CREDENTIALS, cache=cache).get_token() == "token-1"
+
+
+def test_concurrent_401s_refresh_once(cache, exchanges):
+    provider = AccessTokenProvider(CREDENTIALS, cache=cache)
+    rejected = provider.get_token()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(provider.refresh(rejected))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert exchanges == ["token-1", "token-2"]
+    assert results == ["token-2"] * 8
+    assert cache.get_access_token(CREDENTIALS)["access_token"] == "token-2"
+
+
+def make_transport(monkeypatch, cache, statuses):
+    transport = ZohoTransport(headers={}, token_provider=AccessTokenProvider(CREDENTIALS, cache=cache))
+    transport.rate_limiter.acquire = lambda: None
+    sent_tokens = []
+
+    def get(url, headers=None, **kwargs):
+        sent_tokens.append(headers["Authorization"])
+        return FakeResponse(statuses.pop(0))
+    monkeypatch.setattr(transport.session, "get", get)
+    return transport, sent_tokens
+
+
+def test_transport_refreshes_the_token_once_on_401(monkeypatch, cache, exchanges):
+    transport, sent_tokens = make_transport(monkeypatch, cache, [401, 200])
+
+    assert transport.get("https://example.test/invoices").status_code == 200
+    assert sent_tokens == ["Zoho-oauthtoken token-1", "Zoho-oauthtoken token-2"]
+
+
+def test_transport_returns_a_second_401(monkeypatch, cache, exchanges):
+    transport, sent_tokens = make_transport(monkeypatch, cache, [401, 401])
+
+    assert transport.get("https://example.test/invoices").status_code == 401
+    assert len(sent_tokens) == 2
+    assert exchanges == ["token-1", "token-2"]
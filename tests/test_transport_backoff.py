@@ -0,0 +1,50 @@
+"""429s without Retry-After back off longer than server and connection errors."""
+
+import pytest
+import requests
+
+from api_sync.core import transport as transport_module
+from api_sync.core.transport import ZohoTransport
+from conftest import FakeResponse
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+    monkeypatch.setattr(transport_module.time, "sleep", delays.append)
+    return delays
+
+
+def make_transport(monkeypatch, responses):
+    transport = ZohoTransport(headers={})
+    transport.rate_limiter.acquire = lambda: None
+    transport.rate_limiter.record_throttled = lambda: None
+
+    def get(url, **kwargs):
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+    monkeypatch.setattr(transport.session, "get", get)
+    return transport
+
+
+def test_throttled_retry_waits_several_seconds(monkeypatch, sleeps):
+    transport = make_transport(monkeypatch, [FakeResponse(429), FakeResponse(429), FakeResponse(200)])
+    assert transport.get("https://example.test").status_code == 200
+    assert 2.5 <= sleeps[0] <= 5.0
+    assert 5.0 <= sleeps[1] <= 10.0
+
+
+def test_server_and_network_errors_keep_the_short_base(monkeypatch, sleeps):
+    transport = make_transport(monkeypatch, [FakeResponse(503), requests.exceptions.ConnectionError("reset"),
+                                             FakeResponse(200)])
+    assert transport.get("https://example.test").status_code == 200
+    assert 0.5 <= sleeps[0] <= 1.0
+    assert 1.0 <= sleeps[1] <= 2.0
+
+
+def test_retry_after_wins(monkeypatch, sleeps):
+    transport = make_transport(monkeypatch, [FakeResponse(429, headers={"Retry-After": "1"}), FakeResponse(200)])
+    assert transport.get("https://example.test").status_code == 200
+    assert sleeps == [1.0]
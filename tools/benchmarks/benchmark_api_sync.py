@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+API Sync Throughput Benchmarks (offline)
+
+Runs ApiSyncRunner.fetch_data and fetch_all_modules against the local
+MockZohoServer at several dataset sizes and reports records/sec, API
+calls/sec, peak RSS and the number of 429 responses. Nothing touches the
+network, Secret Manager or real API quota.
+
+Each run happens in a fresh child process (so peak RSS belongs to that run
+alone) with its own temporary working directory; the mock server runs in the
+parent process.
+
+Usage:
+    python benchmark_api_sync.py                                  # 100, 1000, 5000 records
+    python benchmark_api_sync.py --sizes 1000 --latency 0.02 --throttle-every 100
+    python benchmark_api_sync.py --scenarios fetch_all_modules --parallel --engine async
+    python benchmark_api_sync.py --output benchmark_results.json
+"""
+
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = BENCHMARK_DIR.parent.parent
+sys.path.insert(0, str(BENCHMARK_DIR))
+
+from mock_zoho_server import MockZohoServer, generate_dataset, ORGANIZATION_ID
+
+SCENARIOS = ("fetch_data", "fetch_all_modules")
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB (None if it cannot be measured)."""
+    try:
+        import resource
+    except ImportError:
+        # Windows: psutil reports the peak working set
+        try:
+            import psutil
+        except ImportError:
+            return None
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / (1024 * 1024)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_scenario(options: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run one benchmark in the current (child) process.
+
+    Args:
+        options: Scenario, base_url, engine, module, rpm, parallel and detail_cache settings
+
+    Returns:
+        Elapsed seconds, record/line item counts, success flag and peak RSS
+    """
+    sys.path.insert(0, str(PROJECT_ROOT))
+    work_dir = tempfile.mkdtemp(prefix="api_sync_bench_")
+    # Relative data/ paths used by the client resolve inside the temporary directory
+    os.chdir(work_dir)
+
+    from api_sync.core.client import ZohoClient
+    from api_sync.core.rate_limiter import TokenBucketRateLimiter
+    from api_sync.core.detail_cache import DetailRecordCache
+    from api_sync.runner_api_sync import ApiSyncRunner
+    from api_sync.config import get_config
+
+    config = get_config()
+    client_kwargs = dict(
+        rate_limiter=TokenBucketRateLimiter(options["rpm"]),
+        detail_concurrency=config.detail_fetch_concurrency,
+        detail_cache=DetailRecordCache(os.path.join(work_dir, "detail_cache.db")) if options["detail_cache"] else None
+    )
+    if options["engine"] == "async":
+        from api_sync.core.async_client import AsyncZohoClientAdapter
+        api_client = AsyncZohoClientAdapter("mock-token", ORGANIZATION_ID, options["base_url"], **client_kwargs)
+    else:
+        api_client = ZohoClient("mock-token", ORGANIZATION_ID, options["base_url"], **client_kwargs)
+
+    runner = ApiSyncRunner(log_level="WARNING", api_client=api_client)
+    runner.config.json_base_dir = os.path.join(work_dir, "raw_json")
+    runner.config.max_parallel_modules = options["max_parallel_modules"]
+
+    # The client reports progress on stdout; keep the benchmark table readable
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        if options["scenario"] == "fetch_data":
+            result = runner.fetch_data(options["module"], full_sync=True)
+            records = result.get("record_count", 0)
+            line_items = result.get("line_item_count", 0)
+            success = result.get("success", False)
+        else:
+            result = runner.fetch_all_modules(full_sync=True, respect_quota=False, parallel=options["parallel"])
+            records = result["summary"]["total_records"]
+            line_items = result["summary"]["total_line_items"]
+            success = result["summary"]["success"]
+    elapsed = time.perf_counter() - start
+
+    if hasattr(api_client, "close"):
+        api_client.close()
+
+    return {
+        "elapsed": elapsed,
+        "records": records,
+        "line_items": line_items,
+        "success": success,
+        "peak_rss_mb": peak_rss_mb()
+    }
+
+
+def _child(options: Dict[str, Any], queue) -> None:
+    try:
+        queue.put(run_scenario(options))
+    except Exception as e:
+        queue.put({"error": f"{type(e).__name__}: {e}"})
+
+
+def benchmark(server: MockZohoServer, options: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run one scenario in a child process and combine its results with the server counters.
+    """
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    server.reset_stats()
+    process = context.Process(target=_child, args=(dict(options, base_url=server.base_url), queue))
+    process.start()
+    outcome = queue.get()
+    process.join()
+    calls = server.stats()
+
+    if "error" in outcome:
+        return dict(outcome, scenario=options["scenario"])
+
+    elapsed = outcome["elapsed"]
+    return {
+        "scenario": options["scenario"],
+        "engine": options["engine"],
+        "parallel": options["parallel"] if options["scenario"] == "fetch_all_modules" else None,
+        "success": outcome["success"],
+        "elapsed_s": round(elapsed, 3),
+        "records": outcome["records"],
+        "line_items": outcome["line_items"],
+        "records_per_s": round(outcome["records"] / elapsed, 1) if elapsed else None,
+        "api_calls": calls["requests"],
+        "calls_per_s": round(calls["requests"] / elapsed, 1) if elapsed else None,
+        "detail_calls": calls["detail_calls"],
+        "throttled_429": calls["throttled"],
+        "peak_rss_mb": round(outcome["peak_rss_mb"], 1) if outcome["peak_rss_mb"] is not None else None
+    }
+
+
+def print_table(results) -> None:
+    columns = [("size", 7), ("scenario", 18), ("elapsed_s", 10), ("records", 8), ("records_per_s", 14),
+               ("api_calls", 10), ("calls_per_s", 12), ("throttled_429", 14), ("peak_rss_mb", 12)]
+    print("\n" + " ".join(name.ljust(width) for name, width in columns))
+    print("-" * (sum(width for _, width in columns) + len(columns) - 1))
+    for result in results:
+        if "error" in result:
+            print(f"{str(result['size']).ljust(7)} {result['scenario'].ljust(18)} ERROR: {result['error']}")
+            continue
+        print(" ".join(str(result.get(name, "")).ljust(width) for name, width in columns))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline api_sync throughput benchmarks")
+    parser.add_argument("--sizes", default="100,1000,5000", help="Comma-separated records per module")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="fetch_data and/or fetch_all_modules")
+    parser.add_argument("--module", default="invoices", help="Module for the fetch_data scenario")
+    parser.add_argument("--engine", choices=["sync", "async"], default="sync")
+    parser.add_argument("--parallel", action="store_true", help="Fetch modules in parallel in fetch_all_modules")
+    parser.add_argument("--max-parallel-modules", type=int, default=4)
+    parser.add_argument("--rpm", type=int, default=60000,
+                        help="Client rate limit in requests/minute (Zoho allows 100; raise it to measure the client)")
+    parser.add_argument("--latency", type=float, default=0.005, help="Mock server latency per request (s)")
+    parser.add_argument("--throttle-every", type=int, default=0, help="Mock server answers every Nth request with 429")
+    parser.add_argument("--retry-after", type=float, default=0.0, help="Retry-After for injected 429s (s)")
+    parser.add_argument("--detail-cache", action="store_true", help="Use a (cold) detail cache")
+    parser.add_argument("--output", "-o", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    scenarios = [name for name in args.scenarios.split(",") if name]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    print("API SYNC BENCHMARK (offline mock server)")
+    print(f"Engine: {args.engine} | rate limit: {args.rpm}/min | latency: {args.latency}s | "
+          f"429 every: {args.throttle_every or 'never'} | parallel modules: {args.parallel}")
+
+    results = []
+    for size in sizes:
+        dataset = generate_dataset(size)
+        with MockZohoServer(dataset, latency=args.latency, throttle_every=args.throttle_every,
+                            retry_after=args.retry_after) as server:
+            for scenario in scenarios:
+                print(f"  running {scenario} with {size} records per module...")
+                result = benchmark(server, {
+                    "scenario": scenario,
+                    "module": args.module,
+                    "engine": args.engine,
+                    "parallel": args.parallel,
+                    "max_parallel_modules": args.max_parallel_modules,
+                    "rpm": args.rpm,
+                    "detail_cache": args.detail_cache
+                })
+                result["size"] = size
+                results.append(result)
+
+    print_table(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"settings": vars(args), "results": results}, f, indent=2)
+        print(f"\nResults saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Date Parsing Micro-Benchmark
+
+Compares the previous per-module date loops with common.dates on
+synthetic invoices (generated with the mock server's dataset generator):
+
+- cutoff filter: JSONDataPopulator's cutoff test on last_modified_time (the
+  previous loop ran strptime over four formats for every record)
+- date range: earliest/latest date of a field, as JSONAnalyzer reports it (the
+  previous loop tried eight strptime formats per value)
+- freshness parse: GlobalSyncRunner._parse_date on single values
+
+The date module is measured with the scalar backend and, when pandas is
+installed, with the vectorized batch backend. Its LRU cache is cleared before
+every run, so the figures are for a first pass over the data.
+Each measurement is the median of --repeat runs.
+
+Usage:
+    python benchmark_dates.py                          # 50,000 invoices
+    python benchmark_dates.py --records 200000 --repeat 5 -o dates.json
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Callable, Optional
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = BENCHMARK_DIR.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(BENCHMARK_DIR))
+
+from common import dates
+
+CUTOFF_DATE = "2024-06-01"
+
+
+def legacy_keep(record: Dict[str, Any], date_fields: List[str], cutoff_datetime: datetime) -> bool:
+    """The previous per-record cutoff test of JSONDataPopulator."""
+    for date_field in date_fields:
+        if date_field in record and record[date_field]:
+            record_date = None
+            date_value = str(record[date_field])
+            for date_format in ['%Y-%m-%d', '%m/%d/%Y', '%Y-%m-%d %H:%M:%S', '%d/%m/%Y']:
+                try:
+                    record_date = datetime.strptime(date_value[:10], date_format[:10])
+                    break
+                except ValueError:
+                    continue
+            if record_date and record_date >= cutoff_datetime:
+                return True
+    return not any(date_field in record for date_field in date_fields)
+
+
+def legacy_parse(date_str: str) -> Optional[datetime]:
+    """The previous JSONAnalyzer format loop (without its dateutil fallback)."""
+    for fmt in ['%Y-%m-%d', '%Y-%m-%d %H:%M:%S', '%d-%m-%Y', '%d/%m/%Y', '%m/%d/%Y',
+                '%Y-%m-%dT%H:%M:%S', '%Y-%m-%dT%H:%M:%SZ', '%Y-%m-%dT%H:%M:%S+00:00']:
+        try:
+            return datetime.strptime(date_str, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def legacy_freshness_parse(date_str: str) -> datetime:
+    """The previous GlobalSyncRunner._parse_date for the common cases."""
+    for fmt in ['%Y-%m-%d %H:%M:%S', '%Y-%m-%d', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%dT%H:%M:%SZ', '%d/%m/%Y', '%m/%d/%Y']:
+        try:
+            return datetime.strptime(date_str, fmt)
+        except ValueError:
+            continue
+    if '+' in date_str and 'T' in date_str:
+        return datetime.strptime(date_str.split('+')[0], '%Y-%m-%dT%H:%M:%S')
+    return datetime.strptime(date_str.split()[0] if ' ' in date_str else date_str, '%Y-%m-%d')
+
+
+def timed(function: Callable[[], Any], repeat: int) -> float:
+    """Median wall time of ``function`` in milliseconds, with cold date caches."""
+    times = []
+    for _ in range(repeat):
+        dates.clear_cache()
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return round(statistics.median(times) * 1000, 2)
+
+
+def benchmark(records: List[Dict[str, Any]], repeat: int, backends: List[str]) -> List[Dict[str, Any]]:
+    from json2db_sync.data_populator import JSONDataPopulator
+
+    populator = JSONDataPopulator.__new__(JSONDataPopulator)
+    populator.date_fields = {'json_invoices': ['last_modified_time']}
+    cutoff_datetime = datetime.strptime(CUTOFF_DATE, '%Y-%m-%d')
+    modified = [record['last_modified_time'] for record in records]
+    business = [record['date'] for record in records]
+
+    rows = [{
+        "strategy": "legacy",
+        "cutoff_filter_ms": timed(lambda: [legacy_keep(record, ['last_modified_time'], cutoff_datetime)
+                                           for record in records], repeat),
+        "date_range_ms": timed(lambda: (lambda parsed: (min(parsed), max(parsed)))(
+            [parsed for parsed in map(legacy_parse, business) if parsed]), repeat),
+        "freshness_parse_ms": timed(lambda: [legacy_freshness_parse(value) for value in modified], repeat),
+    }]
+    for backend in backends:
+        dates.use_backend(backend)
+        keep_batch = populator._cutoff_filter('json_invoices', CUTOFF_DATE)
+        rows.append({
+            "strategy": f"dates ({dates.backend()})",
+            "cutoff_filter_ms": timed(lambda: keep_batch(records), repeat),
+            "date_range_ms": timed(lambda: dates.date_range(business), repeat),
+            "freshness_parse_ms": timed(lambda: [dates.parse_date(value) for value in modified], repeat),
+        })
+    dates.use_backend("auto")
+    return rows
+
+
+def print_table(rows: List[Dict[str, Any]]) -> None:
+    columns = [("strategy", 18), ("cutoff_filter_ms", 17), ("date_range_ms", 14), ("freshness_parse_ms", 19)]
+    print("\n" + " ".join(name.ljust(width) for name, width in columns))
+    print("-" * (sum(width for _, width in columns) + len(columns) - 1))
+    for row in rows:
+        print(" ".join(str(row.get(name, "")).ljust(width) for name, width in columns))
+
+    legacy = rows[0]
+    for row in rows[1:]:
+        speedups = ", ".join(f"{metric[:-3]} x{legacy[metric] / row[metric]:.1f}"
+                             for metric in ("cutoff_filter_ms", "date_range_ms", "freshness_parse_ms") if row[metric])
+        print(f"  {row['strategy']}: {speedups}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Date parsing micro-benchmark")
+    parser.add_argument("--records", type=int, default=50000, help="Synthetic invoices")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (median is reported)")
+    parser.add_argument("--output", "-o", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    from mock_zoho_server import generate_dataset
+
+    try:
+        import pandas  # noqa: F401
+        backends = ["python", "pandas"]
+    except ImportError:
+        backends = ["python"]
+
+    print("DATE PARSING BENCHMARK")
+    print(f"pandas: {'available' if 'pandas' in backends else 'not installed (scalar backend only)'} | "
+          f"{args.records} invoices | {args.repeat} runs per measurement")
+    records = generate_dataset(args.records, modules=["invoices"])["invoices"]
+    rows = benchmark(records, args.repeat, backends)
+
+    print_table(rows)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"settings": vars(args), "results": rows}, f, indent=2)
+        print(f"\nResults saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+JSON2DB Load Benchmark
+
+Measures records/sec of loading JSON records into the json_* tables with the
+previous per-table path (a new connection per table, per schema lookup and per
+population-tracking row, executemany batches of 100, SQLite's default rollback
+journal with synchronous=FULL) and with JSONDataPopulator's bulk loader (one
+connection for the run, WAL, synchronous=NORMAL, 64 MB page cache,
+temp_store=MEMORY, processing.batch_size batches and sized transactions, records
+turned into insert tuples through compiled column plans).
+
+Tables are created from a JSONAnalyzer/TableGenerator analysis of synthetic
+invoices, bills, contacts and items (plus the invoice line items) generated
+with the mock server's dataset generator. Every run loads into a fresh copy of
+the empty database; each measurement is the median of --repeat runs.
+
+Two figures are reported per strategy: end-to-end (records cleaned and
+inserted; the previous path cleans through a dict per record, the bulk path
+through column plans) and insert-only (pre-cleaned value tuples, so the
+difference between the strategies is the database work alone).
+
+The reload measurement loads the dataset into a database that already holds
+it, with --changed percent of the records edited, once per write mode:
+'replace' (INSERT OR REPLACE, every row deleted and reinserted) and 'upsert'
+(keyed on the Zoho ID, unchanged rows skipped by content hash). Besides the
+time it reports the bytes the reload appended to the WAL (automatic
+checkpoints are off during the reload, so that is everything it wrote).
+
+Usage:
+    python benchmark_json2db_load.py                          # 5,000 records per module
+    python benchmark_json2db_load.py --records 20000 --repeat 5
+    python benchmark_json2db_load.py --work-dir /data/tmp -o load.json   # database on a real disk
+    python benchmark_json2db_load.py --changed 5                          # 5% of records edited before the reload
+"""
+
+import argparse
+import copy
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Callable
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = BENCHMARK_DIR.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(BENCHMARK_DIR))
+
+from api_sync.processing import json_codec, raw_store
+
+MODULES = ["invoices", "bills", "contacts", "items"]
+
+# Batch size of the previous insert loop
+LEGACY_BATCH_SIZE = 100
+
+
+def write_dataset(raw_dir: Path, records: int) -> Dict[str, int]:
+    """Write synthetic module files (and invoice line items) in the consolidated layout."""
+    from mock_zoho_server import generate_dataset
+
+    raw_dir.mkdir(parents=True)
+    dataset = generate_dataset(records, modules=MODULES)
+    dataset["invoices_line_items"] = [dict(line_item, invoice_id=invoice["invoice_id"])
+                                      for invoice in dataset["invoices"] for line_item in invoice["line_items"]]
+    for module_name, module_records in dataset.items():
+        raw_store.write_records(raw_dir / f"{module_name}.json", module_records, raw_store.FORMAT_JSON)
+    return {module_name: len(module_records) for module_name, module_records in dataset.items()}
+
+
+def create_schema(raw_dir: Path, db_path: Path) -> Dict[str, List[Dict[str, Any]]]:
+    """Create the json_* tables for the dataset and return the records per table."""
+    from json2db_sync.json_analyzer import JSONAnalyzer
+    from json2db_sync.table_generator import TableGenerator
+
+    analyzer = JSONAnalyzer(str(raw_dir))
+    analysis = analyzer.analyze_all_json_files()
+    generator = TableGenerator(analyzer)
+
+    conn = sqlite3.connect(str(db_path))
+    try:
+        for table_name, table_info in analysis.items():
+            sql = generator.generate_table_sql(table_name, table_info['analysis'])
+            conn.execute(sql['create_table'])
+            for index_sql in sql['indexes']:
+                conn.execute(index_sql)
+        conn.commit()
+    finally:
+        conn.close()
+    return {table_name: raw_store.load_records(Path(table_info['file_path']))
+            for table_name, table_info in analysis.items()}
+
+
+def legacy_clean_record(populator, record: Dict[str, Any], columns: Dict[str, Dict]) -> Dict[str, Any]:
+    """The previous clean_record_for_insert: every field name cleaned for every record, via a dict."""
+    cleaned_record = {}
+    for field_name, field_value in record.items():
+        clean_name = populator._clean_field_name_fallback(field_name)
+        if clean_name not in columns:
+            continue
+        if field_value is None or field_value == "":
+            cleaned_record[clean_name] = None
+        elif isinstance(field_value, (list, dict)):
+            cleaned_record[clean_name] = json_codec.dumps(field_value)
+        elif isinstance(field_value, bool):
+            cleaned_record[clean_name] = 1 if field_value else 0
+        else:
+            cleaned_record[clean_name] = str(field_value)
+    current_timestamp = datetime.now().isoformat()
+    for timestamp_field in ['import_timestamp', 'sync_timestamp', 'last_sync_time', 'data_import_time', 'table_sync_time']:
+        if timestamp_field in columns:
+            cleaned_record[timestamp_field] = current_timestamp
+    return cleaned_record
+
+
+def legacy_load(populator, db_path: Path, tables: Dict[str, List[Dict[str, Any]]], precleaned: Dict[str, Any] = None) -> int:
+    """The previous insert_records loop: connection per table, batches of 100, default pragmas, dict cleaning."""
+    total = 0
+    for table_name, records in tables.items():
+        conn = sqlite3.connect(str(db_path))
+        columns = {row[1]: {'type': row[2], 'nullable': not bool(row[3])}
+                   for row in conn.execute(f"PRAGMA table_info({table_name})")}
+        conn.close()
+
+        conn = sqlite3.connect(str(db_path))
+        cursor = conn.cursor()
+        column_names = list(columns.keys())
+        placeholders = ', '.join(['?' for _ in column_names])
+        insert_sql = f"INSERT OR REPLACE INTO {table_name} ({', '.join(column_names)}) VALUES ({placeholders})"
+        if precleaned is not None:
+            rows = precleaned[table_name]
+            for i in range(0, len(rows), LEGACY_BATCH_SIZE):
+                cursor.executemany(insert_sql, rows[i:i + LEGACY_BATCH_SIZE])
+        else:
+            for i in range(0, len(records), LEGACY_BATCH_SIZE):
+                batch_data = []
+                for record in records[i:i + LEGACY_BATCH_SIZE]:
+                    cleaned_record = legacy_clean_record(populator, record, columns)
+                    batch_data.append(tuple(cleaned_record.get(col_name) for col_name in column_names))
+                cursor.executemany(insert_sql, batch_data)
+        conn.commit()
+        conn.close()
+
+        conn = sqlite3.connect(str(db_path))
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS table_population_tracking (
+                table_name TEXT PRIMARY KEY, last_populated_time TEXT NOT NULL,
+                records_count INTEGER, data_source TEXT
+            )
+        """)
+        conn.execute("INSERT OR REPLACE INTO table_population_tracking VALUES (?, datetime('now'), ?, 'json')",
+                     (table_name, len(records)))
+        conn.commit()
+        conn.close()
+        total += len(records)
+    return total
+
+
+def bulk_load(populator, db_path: Path, tables: Dict[str, List[Dict[str, Any]]], precleaned: Dict[str, Any] = None) -> int:
+    """JSONDataPopulator with its shared bulk loader connection."""
+    populator.db_path = db_path
+    total = 0
+    with populator._bulk_load() as loader:
+        for table_name, records in tables.items():
+            if precleaned is not None:
+                column_names = [row[1] for row in loader.table_info(table_name)]
+                inserted = loader.insert_rows(table_name, column_names, precleaned[table_name])
+            else:
+                inserted = populator.insert_records(table_name, records)
+            populator._track_table_population(table_name, inserted)
+            total += inserted
+    return total
+
+
+def preclean(populator, schema_db: Path, tables: Dict[str, List[Dict[str, Any]]]) -> Dict[str, List[tuple]]:
+    """Value tuples of every table, cleaned once."""
+    rows = {}
+    conn = sqlite3.connect(str(schema_db))
+    try:
+        for table_name, records in tables.items():
+            columns = {row[1]: {'type': row[2]} for row in conn.execute(f"PRAGMA table_info({table_name})")}
+            rows[table_name] = list(populator._row_builder(table_name, list(columns)).rows(records, datetime.now().isoformat()))
+    finally:
+        conn.close()
+    return rows
+
+
+def timed_load(load: Callable[..., int], populator, schema_db: Path, run_dir: Path,
+               tables: Dict[str, List[Dict[str, Any]]], repeat: int, precleaned=None) -> Dict[str, Any]:
+    """Median seconds and records/sec of a load strategy into fresh copies of the empty database."""
+    times, loaded = [], 0
+    for run in range(repeat):
+        db_path = run_dir / f"run_{run}.db"
+        shutil.copyfile(schema_db, db_path)
+        start = time.perf_counter()
+        loaded = load(populator, db_path, tables, precleaned)
+        times.append(time.perf_counter() - start)
+        for suffix in ("", "-wal", "-shm", "-journal"):
+            Path(f"{db_path}{suffix}").unlink(missing_ok=True)
+    seconds = statistics.median(times)
+    return {"records": loaded, "seconds": round(seconds, 3), "records_per_sec": round(loaded / seconds) if seconds else 0}
+
+
+def edit_records(tables: Dict[str, List[Dict[str, Any]]], percent: float, key_columns: Dict[str, str]) -> Dict[str, List[Dict[str, Any]]]:
+    """Copy of the tables with ``percent`` of the records of each table edited (one text field changed)."""
+    edited = {}
+    for table_name, records in tables.items():
+        step = max(1, round(100 / percent)) if percent > 0 else 0
+        table_records = []
+        for index, record in enumerate(records):
+            if step and index % step == 0:
+                record = copy.copy(record)
+                field = next((key for key, value in record.items()
+                              if isinstance(value, str) and key != key_columns.get(table_name)), None)
+                if field:
+                    record[field] += " (edited)"
+            table_records.append(record)
+        edited[table_name] = table_records
+    return edited
+
+
+def reload(populator, schema_db: Path, run_dir: Path, tables: Dict[str, List[Dict[str, Any]]],
+           edited: Dict[str, List[Dict[str, Any]]], write_mode: str, repeat: int) -> Dict[str, Any]:
+    """Median seconds, WAL bytes and row counts of reloading a loaded database in a write mode."""
+    populator.config.get_processing_config()['write_mode'] = write_mode
+    times, wal_bytes, counts = [], [], {}
+    for run in range(repeat):
+        db_path = run_dir / f"reload_{run}.db"
+        shutil.copyfile(schema_db, db_path)
+        bulk_load(populator, db_path, tables)
+
+        populator.db_path = db_path
+        start = time.perf_counter()
+        with populator._bulk_load() as loader:
+            # Checkpoint what the first load wrote, then keep everything the reload writes in the WAL
+            loader.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            loader.execute("PRAGMA wal_autocheckpoint=0")
+            counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+            for table_name, records in edited.items():
+                written = populator._write_records(table_name, populator._get_insert_columns(table_name), records)
+                for name in counts:
+                    counts[name] += written[name]
+            times.append(time.perf_counter() - start)
+            wal_path = Path(f"{db_path}-wal")
+            wal_bytes.append(wal_path.stat().st_size if wal_path.exists() else 0)
+        for suffix in ("", "-wal", "-shm", "-journal"):
+            Path(f"{db_path}{suffix}").unlink(missing_ok=True)
+    seconds = statistics.median(times)
+    loaded = sum(counts.values())
+    return dict(counts, records=loaded, seconds=round(seconds, 3),
+                records_per_sec=round(loaded / seconds) if seconds else 0,
+                wal_mb=round(statistics.median(wal_bytes) / (1024 * 1024), 2))
+
+
+def print_reload_table(rows: List[Dict[str, Any]]) -> None:
+    columns = [("strategy", 10), ("records", 9), ("inserted", 9), ("updated", 9), ("unchanged", 10),
+               ("seconds", 9), ("records_per_sec", 16), ("wal_mb", 8)]
+    print("\nRELOAD\n" + " ".join(name.ljust(width) for name, width in columns))
+    print("-" * (sum(width for _, width in columns) + len(columns) - 1))
+    for row in rows:
+        print(" ".join(str(row.get(name, "")).ljust(width) for name, width in columns))
+
+    by_strategy = {row["strategy"]: row for row in rows}
+    replace, upsert = by_strategy.get("replace"), by_strategy.get("upsert")
+    if replace and upsert and upsert["seconds"] and upsert["wal_mb"]:
+        print(f"  upsert: x{replace['seconds'] / upsert['seconds']:.1f} faster, "
+              f"x{replace['wal_mb'] / upsert['wal_mb']:.1f} less WAL")
+
+
+def print_table(rows: List[Dict[str, Any]]) -> None:
+    columns = [("strategy", 10), ("mode", 12), ("records", 9), ("seconds", 9), ("records_per_sec", 16)]
+    print("\n" + " ".join(name.ljust(width) for name, width in columns))
+    print("-" * (sum(width for _, width in columns) + len(columns) - 1))
+    for row in rows:
+        print(" ".join(str(row.get(name, "")).ljust(width) for name, width in columns))
+
+    by_mode = {}
+    for row in rows:
+        by_mode.setdefault(row["mode"], {})[row["strategy"]] = row
+    for mode, strategies in by_mode.items():
+        if strategies.get("legacy", {}).get("records_per_sec"):
+            speedup = strategies["bulk"]["records_per_sec"] / strategies["legacy"]["records_per_sec"]
+            print(f"  {mode}: bulk loader x{speedup:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Records/sec of the json2db load paths")
+    parser.add_argument("--records", type=int, default=5000, help="Records per module")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (median is reported)")
+    parser.add_argument("--changed", type=float, default=1.0, help="Percent of records edited before the reload")
+    parser.add_argument("--work-dir", help="Directory for the benchmark databases (default: system temp dir)")
+    parser.add_argument("--output", "-o", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    output = Path(args.output).resolve() if args.output else None
+    work_dir = Path(tempfile.mkdtemp(prefix="json2db_load_bench_", dir=args.work_dir))
+    cwd = os.getcwd()
+    try:
+        # The json2db components write their log files to ./logs
+        os.chdir(work_dir)
+        from json2db_sync.data_populator import JSONDataPopulator
+
+        print("JSON2DB LOAD BENCHMARK")
+        counts = write_dataset(work_dir / "raw", args.records)
+        print(f"  {sum(counts.values())} records in {len(counts)} tables | {args.repeat} runs per measurement | {work_dir}")
+
+        schema_db = work_dir / "schema.db"
+        tables = create_schema(work_dir / "raw", schema_db)
+        populator = JSONDataPopulator(db_path=str(schema_db), json_dir=str(work_dir / "raw"))
+        logging.getLogger().setLevel(logging.WARNING)
+        print(f"  batch_size={populator.config.get_processing_config().get('batch_size')} "
+              f"transaction_size={populator.config.get_processing_config().get('transaction_size')}")
+
+        precleaned = preclean(populator, schema_db, tables)
+        rows = []
+        for mode, cleaned in (("end-to-end", None), ("insert-only", precleaned)):
+            for strategy, load in (("legacy", legacy_load), ("bulk", bulk_load)):
+                print(f"  measuring {strategy} ({mode})...")
+                rows.append(dict(timed_load(load, populator, schema_db, work_dir, tables, args.repeat, cleaned),
+                                 strategy=strategy, mode=mode))
+
+        edited = edit_records(tables, args.changed, populator.natural_keys)
+        reload_rows = []
+        for write_mode in ("replace", "upsert"):
+            print(f"  measuring reload ({write_mode}, {args.changed}% edited)...")
+            reload_rows.append(dict(reload(populator, schema_db, work_dir, tables, edited, write_mode, args.repeat),
+                                    strategy=write_mode))
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print_table(rows)
+    print_reload_table(reload_rows)
+
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump({"settings": vars(args), "tables": counts, "results": rows, "reload": reload_rows}, f, indent=2)
+        print(f"\nResults saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+JSON Codec Micro-Benchmark
+
+Compares the standard library json module with orjson (through
+api_sync.processing.json_codec) on the largest raw module files: parse time
+(from text, from bytes, and from a memory map), serialize time (indented, as the
+raw files are written, and compact, as NDJSON parts are written), and the
+per-record encoding of nested fields done by clean_record_for_insert.
+
+The largest ``{module}.json`` files under --data-dir are used; if there are
+none, a synthetic invoices file is generated with the mock server's dataset
+generator. Each measurement is the median of --repeat runs.
+
+Usage:
+    python benchmark_json_codec.py                            # 3 largest files in data/raw_json
+    python benchmark_json_codec.py --data-dir ../data/raw_json --files 5
+    python benchmark_json_codec.py --synthetic-records 50000 --output codec.json
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Callable
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = BENCHMARK_DIR.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(BENCHMARK_DIR))
+
+from api_sync.processing import json_codec, raw_store
+
+
+def largest_module_files(data_dir: Path, count: int) -> List[Path]:
+    """The ``count`` largest module JSON files in the finalized timestamp directories."""
+    if not data_dir.is_dir():
+        return []
+    files = []
+    for timestamp_dir in data_dir.iterdir():
+        if timestamp_dir.is_dir() and not timestamp_dir.name.endswith(".tmp"):
+            files.extend(path for path in raw_store.list_module_paths(timestamp_dir).values() if path.suffix == ".json")
+    return sorted(files, key=lambda path: path.stat().st_size, reverse=True)[:count]
+
+
+def synthetic_file(work_dir: Path, records: int) -> Path:
+    """Write a synthetic invoices.json in the raw file format."""
+    from mock_zoho_server import generate_dataset
+
+    path = work_dir / "synthetic" / "invoices.json"
+    path.parent.mkdir()
+    raw_store.write_records(path, generate_dataset(records, modules=["invoices"])["invoices"], raw_store.FORMAT_JSON)
+    return path
+
+
+def timed(function: Callable[[], Any], repeat: int) -> float:
+    """Median wall time of ``function`` in milliseconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return round(statistics.median(times) * 1000, 2)
+
+
+def encode_nested_fields(records: List[Dict[str, Any]], dumps: Callable[[Any], str]) -> None:
+    """Encode list/dict fields the way clean_record_for_insert does."""
+    for record in records:
+        for value in record.values():
+            if isinstance(value, (list, dict)):
+                dumps(value)
+
+
+def benchmark_file(path: Path, repeat: int, orjson_available: bool) -> List[Dict[str, Any]]:
+    """Parse/serialize timings of one file for each backend."""
+    raw_bytes = path.read_bytes()
+    raw_text = raw_bytes.decode("utf-8")
+    records = json.loads(raw_text)
+
+    rows = []
+    for backend in ("json", "orjson") if orjson_available else ("json",):
+        json_codec.use_backend(backend)
+        if backend == "json":
+            parse = {
+                "parse_text_ms": timed(lambda: json.loads(raw_text), repeat),
+                "parse_bytes_ms": timed(lambda: json_codec.loads(raw_bytes), repeat),
+                "parse_file_ms": timed(lambda: json_codec.load_file(path), repeat),
+                "dump_indent_ms": timed(lambda: json.dumps(records, ensure_ascii=False, indent=2), repeat),
+                "dump_compact_ms": timed(lambda: json_codec.dumpb(records), repeat),
+                # clean_record_for_insert used json.dumps with default settings
+                "nested_fields_ms": timed(lambda: encode_nested_fields(records, json.dumps), repeat)
+            }
+        else:
+            parse = {
+                "parse_text_ms": timed(lambda: json_codec.loads(raw_text), repeat),
+                "parse_bytes_ms": timed(lambda: json_codec.loads(raw_bytes), repeat),
+                "parse_file_ms": timed(lambda: json_codec.load_file(path), repeat),
+                "dump_indent_ms": timed(lambda: json_codec.dumpb(records, indent=True), repeat),
+                "dump_compact_ms": timed(lambda: json_codec.dumpb(records), repeat),
+                "nested_fields_ms": timed(lambda: encode_nested_fields(records, json_codec.dumps), repeat)
+            }
+        rows.append(dict(parse, file=f"{path.parent.name}/{path.name}", size_mb=round(len(raw_bytes) / (1024 * 1024), 2),
+                         records=len(records), backend=backend))
+    json_codec.use_backend("auto")
+    return rows
+
+
+def print_table(rows: List[Dict[str, Any]]) -> None:
+    columns = [("file", 34), ("size_mb", 8), ("records", 8), ("backend", 8), ("parse_text_ms", 14),
+               ("parse_bytes_ms", 15), ("parse_file_ms", 14), ("dump_indent_ms", 15), ("dump_compact_ms", 16),
+               ("nested_fields_ms", 16)]
+    print("\n" + " ".join(name.ljust(width) for name, width in columns))
+    print("-" * (sum(width for _, width in columns) + len(columns) - 1))
+    for row in rows:
+        print(" ".join(str(row.get(name, "")).ljust(width) for name, width in columns))
+
+    # Speed-up of orjson over the standard library per file
+    by_file = {}
+    for row in rows:
+        by_file.setdefault(row["file"], {})[row["backend"]] = row
+    for name, backends in by_file.items():
+        if "orjson" in backends:
+            stdlib, fast = backends["json"], backends["orjson"]
+            speedups = ", ".join(
+                f"{metric[:-3]} x{stdlib[metric] / fast[metric]:.1f}"
+                for metric in ("parse_file_ms", "dump_indent_ms", "nested_fields_ms") if fast[metric])
+            print(f"  {name}: {speedups}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON codec micro-benchmark on raw module files")
+    parser.add_argument("--data-dir", default=str(PROJECT_ROOT / "data" / "raw_json"),
+                        help="Raw JSON base directory to take the largest module files from")
+    parser.add_argument("--files", type=int, default=3, help="Number of largest module files to benchmark")
+    parser.add_argument("--synthetic-records", type=int, default=20000,
+                        help="Records in the synthetic file used when no module files are found")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (median is reported)")
+    parser.add_argument("--output", "-o", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    try:
+        import orjson  # noqa: F401
+        orjson_available = True
+    except ImportError:
+        orjson_available = False
+
+    print("JSON CODEC BENCHMARK")
+    print(f"orjson: {'available' if orjson_available else 'not installed (standard library only)'} | "
+          f"{args.repeat} runs per measurement")
+
+    with tempfile.TemporaryDirectory(prefix="json_codec_bench_") as work_dir:
+        files = largest_module_files(Path(args.data_dir), args.files)
+        if not files:
+            print(f"  no module files in {args.data_dir}, generating {args.synthetic_records} synthetic invoices...")
+            files = [synthetic_file(Path(work_dir), args.synthetic_records)]
+
+        rows = []
+        for path in files:
+            print(f"  benchmarking {path}...")
+            rows.extend(benchmark_file(path, args.repeat, orjson_available))
+
+    print_table(rows)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"settings": vars(args), "results": rows}, f, indent=2)
+        print(f"\nResults saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Import-Time Report
+
+Runs each entry point under ``python -X importtime`` in a fresh interpreter and
+summarizes the output: total import time, the slowest modules (self time) and
+whether heavy or network libraries (requests, Google Cloud, PyYAML, dotenv,
+aiohttp, pandas) were loaded. ``status`` and ``verify --quick`` are expected to
+start without any network library; the report flags them if they do.
+
+Each entry point is run once to warm the bytecode cache and then ``--repeat``
+times; the median run is reported. Commands run in a temporary working
+directory, so they never read or write the project's data/ folder.
+
+Usage:
+    python import_time.py                        # all entry points, 5 runs each
+    python import_time.py --top 15 --budget-ms 150
+    python import_time.py --output import_time.json
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+# name -> (interpreter arguments, must start without network libraries)
+ENTRY_POINTS = {
+    "import api_sync": (["-c", "import api_sync"], True),
+    "import api_sync.cli": (["-c", "import api_sync.cli"], True),
+    "import api_sync.runner_api_sync": (["-c", "import api_sync.runner_api_sync"], True),
+    "import global_runner": (["-c", "import global_runner.runner_zoho_data_sync"], True),
+    "api_sync status": (["-m", "api_sync", "status"], True),
+    "api_sync verify --quick": (["-m", "api_sync", "verify", "--quick"], True),
+    "import api_sync.core.client": (["-c", "import api_sync.core.client"], False)
+}
+
+# Top-level packages reported when they are imported
+HEAVY_PACKAGES = ("requests", "urllib3", "google", "grpc", "yaml", "dotenv", "aiohttp", "pandas", "numpy")
+NETWORK_PACKAGES = ("requests", "urllib3", "google", "grpc", "aiohttp")
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """
+    Parse ``-X importtime`` output.
+
+    Returns:
+        List of {module, self_us, cumulative_us, depth, root} in output order,
+        where root is the top-level import the module was loaded by
+    """
+    entries = []
+    pending = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            entry = {
+                "module": module,
+                "self_us": int(self_us),
+                "cumulative_us": int(cumulative_us),
+                # importtime indents nested imports by two spaces per level
+                "depth": (len(indent) - 1) // 2
+            }
+            entries.append(entry)
+            pending.append(entry)
+            # Nested imports are printed before the top-level import that triggered them
+            if entry["depth"] == 0:
+                for nested in pending:
+                    nested["root"] = module
+                pending = []
+    return entries
+
+
+def measure(arguments: List[str], work_dir: str) -> List[Dict[str, Any]]:
+    """Run one interpreter under -X importtime and return its parsed import entries."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(PROJECT_ROOT), os.getenv("PYTHONPATH")])))
+    completed = subprocess.run([sys.executable, "-X", "importtime"] + arguments, cwd=work_dir, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    return parse_importtime(completed.stderr)
+
+
+def summarize(entries: List[Dict[str, Any]], top: int) -> Dict[str, Any]:
+    """Total time, slowest modules and heavy packages of one run."""
+    # site and what it imports is interpreter startup, the same for every entry point
+    entries = [entry for entry in entries if entry.get("root") != "site"]
+    loaded = {entry["module"].split(".")[0] for entry in entries}
+    # Top-level imports (depth 0) add up to the whole run
+    total_us = sum(entry["cumulative_us"] for entry in entries if entry["depth"] == 0)
+    slowest = sorted(entries, key=lambda entry: entry["self_us"], reverse=True)[:top]
+    return {
+        "total_ms": round(total_us / 1000, 1),
+        "modules": len(entries),
+        "heavy_packages": sorted(package for package in HEAVY_PACKAGES if package in loaded),
+        "slowest": [{"module": entry["module"], "self_ms": round(entry["self_us"] / 1000, 2)} for entry in slowest]
+    }
+
+
+def report(name: str, arguments: List[str], offline: bool, repeat: int, top: int,
+           budget_ms: Optional[float]) -> Dict[str, Any]:
+    """Measure an entry point ``repeat`` times and return the median run's summary."""
+    with tempfile.TemporaryDirectory(prefix="api_sync_importtime_") as work_dir:
+        measure(arguments, work_dir)
+        runs = [summarize(measure(arguments, work_dir), top) for _ in range(repeat)]
+    median_total = statistics.median(run["total_ms"] for run in runs)
+    result = min(runs, key=lambda run: abs(run["total_ms"] - median_total))
+    network = [package for package in result["heavy_packages"] if package in NETWORK_PACKAGES]
+    result.update({
+        "entry_point": name,
+        "total_ms": median_total,
+        "offline_expected": offline,
+        "network_packages": network,
+        "within_budget": budget_ms is None or median_total <= budget_ms,
+        "ok": not (offline and network) and (budget_ms is None or median_total <= budget_ms)
+    })
+    return result
+
+
+def print_report(results: List[Dict[str, Any]], top: int) -> None:
+    print(f"\n{'entry point'.ljust(34)} {'total_ms'.ljust(9)} {'modules'.ljust(8)} heavy packages")
+    print("-" * 80)
+    for result in results:
+        flag = "" if result["ok"] else "  <-- " + (
+            "network libraries at startup" if result["network_packages"] and result["offline_expected"]
+            else "over budget")
+        print(f"{result['entry_point'].ljust(34)} {str(result['total_ms']).ljust(9)} {str(result['modules']).ljust(8)} "
+              f"{', '.join(result['heavy_packages']) or '-'}{flag}")
+
+    for result in results:
+        print(f"\nSlowest imports: {result['entry_point']} (self time, top {top})")
+        for entry in result["slowest"]:
+            print(f"  {str(entry['self_ms']).rjust(8)} ms  {entry['module']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time report for the sync entry points")
+    parser.add_argument("--entry-points", default=",".join(ENTRY_POINTS), help="Comma-separated entry point names")
+    parser.add_argument("--repeat", type=int, default=5, help="Measured runs per entry point (median is reported)")
+    parser.add_argument("--top", type=int, default=10, help="Slowest modules to list per entry point")
+    parser.add_argument("--budget-ms", type=float, help="Fail if an offline entry point's import time exceeds this")
+    parser.add_argument("--output", "-o", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.entry_points.split(",") if name.strip()]
+    unknown = set(names) - set(ENTRY_POINTS)
+    if unknown:
+        parser.error(f"Unknown entry points: {', '.join(sorted(unknown))}")
+
+    print("IMPORT-TIME REPORT (python -X importtime)")
+    print(f"Python {sys.version.split()[0]} | {args.repeat} runs per entry point | "
+          f"budget: {f'{args.budget_ms} ms' if args.budget_ms else 'none'}")
+
+    results = []
+    for name in names:
+        arguments, offline = ENTRY_POINTS[name]
+        print(f"  measuring {name}...")
+        results.append(report(name, arguments, offline, args.repeat, args.top,
+                              args.budget_ms if offline else None))
+
+    print_report(results, args.top)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"settings": vars(args), "results": results}, f, indent=2)
+        print(f"\nResults saved to {args.output}")
+
+    return 0 if all(result["ok"] for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
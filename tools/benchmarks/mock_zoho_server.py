@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Offline Mock Zoho Books API Server
+
+A local stand-in for the Zoho Books v3 API, so ZohoClient and ApiSyncRunner
+throughput can be measured without credentials, network access or real API
+quota. It is seeded with synthetic, Zoho-shaped data from generate_dataset().
+
+Serves:
+- GET /books/v3/organizations
+- GET /books/v3/{module}?page=N&per_page=M&last_modified_time=YYYY-MM-DDTHH:MM:SS+0000
+  (paginated headers with page_context, filtered by last_modified_time)
+- GET /books/v3/{module}/{id}   (detailed record including line_items)
+
+Configurable per-request latency and 429 injection (every Nth request, with a
+Retry-After header) exercise the client's rate limiting and retry paths.
+
+Usage:
+    python mock_zoho_server.py                      # 1,000 records per module on port 8765
+    python mock_zoho_server.py --records 5000 --latency 0.05 --throttle-every 50
+
+    # Programmatic
+    with MockZohoServer(generate_dataset(1000)) as server:
+        client = ZohoClient("token", "org", server.base_url)
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, List, Any, Optional
+from urllib.parse import urlparse, parse_qs
+
+ORGANIZATION_ID = "806931205"
+ZOHO_TIME_FORMAT = "%Y-%m-%dT%H:%M:%S%z"
+
+# module -> (record ID field, has line items)
+MOCK_MODULES = {
+    "invoices": ("invoice_id", True),
+    "bills": ("bill_id", True),
+    "salesorders": ("salesorder_id", True),
+    "purchaseorders": ("purchaseorder_id", True),
+    "creditnotes": ("creditnote_id", True),
+    "contacts": ("contact_id", False),
+    "items": ("item_id", False),
+    "customerpayments": ("payment_id", False),
+    "vendorpayments": ("payment_id", False)
+}
+MOCK_MODULES_INDEX = {name: position for position, name in enumerate(MOCK_MODULES)}
+
+# Header fields the list endpoint returns; everything else is detail-only
+LIST_FIELDS = ("customer_id", "customer_name", "vendor_id", "vendor_name", "date", "due_date",
+               "status", "total", "balance", "currency_code", "created_time", "last_modified_time")
+
+
+def generate_dataset(records_per_module: int, modules: Optional[List[str]] = None, seed: int = 42,
+                     max_line_items: int = 5, start: datetime = datetime(2024, 1, 1)) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Generate synthetic Zoho-shaped records.
+
+    Args:
+        records_per_module: Number of records for every module
+        modules: Modules to generate (all mock modules if None)
+        seed: Random seed, so datasets are reproducible
+        max_line_items: Maximum line items per transaction record
+        start: Earliest created/last_modified time
+
+    Returns:
+        Dictionary mapping module name -> list of detailed records, oldest first
+    """
+    rng = random.Random(seed)
+    dataset = {}
+    for module_name in modules or list(MOCK_MODULES):
+        id_field, has_line_items = MOCK_MODULES[module_name]
+        records = []
+        for index in range(records_per_module):
+            created = start + timedelta(minutes=index * 7 + rng.randint(0, 6))
+            modified = created + timedelta(hours=rng.randint(0, 72))
+            record = {
+                id_field: str(460000000000000000 + MOCK_MODULES_INDEX[module_name] * 10000000 + index),
+                "customer_id": str(460000000000001000 + rng.randint(0, 499)),
+                "customer_name": f"Customer {rng.randint(1, 500)}",
+                "date": created.strftime("%Y-%m-%d"),
+                "due_date": (created + timedelta(days=30)).strftime("%Y-%m-%d"),
+                "status": rng.choice(["draft", "sent", "paid", "overdue", "void"]),
+                "currency_code": "BTN",
+                "reference_number": f"REF-{index:06d}",
+                "notes": "Synthetic record generated for offline benchmarks",
+                "created_time": created.strftime("%Y-%m-%dT%H:%M:%S+0000"),
+                "last_modified_time": modified.strftime("%Y-%m-%dT%H:%M:%S+0000")
+            }
+            total = 0.0
+            if has_line_items:
+                line_items = []
+                for position in range(rng.randint(1, max_line_items)):
+                    quantity = rng.randint(1, 20)
+                    rate = round(rng.uniform(5, 500), 2)
+                    line_items.append({
+                        # 18 digits like real Zoho IDs (20-digit IDs overflow INTEGER columns)
+                        "line_item_id": str(460000001000000000 + (int(record[id_field]) - 460000000000000000) * 100 + position),
+                        "item_id": str(460000000000002000 + rng.randint(0, 999)),
+                        "name": f"Item {rng.randint(1, 1000)}",
+                        "description": "Synthetic line item",
+                        "quantity": quantity,
+                        "rate": rate,
+                        "item_total": round(quantity * rate, 2),
+                        "item_order": position + 1
+                    })
+                    total += quantity * rate
+                record["line_items"] = line_items
+            else:
+                total = round(rng.uniform(10, 10000), 2)
+            record["total"] = round(total, 2)
+            record["balance"] = record["total"] if record["status"] != "paid" else 0.0
+            records.append(record)
+        records.sort(key=lambda r: r["last_modified_time"])
+        dataset[module_name] = records
+    return dataset
+
+
+class MockZohoServer:
+    """
+    Threaded HTTP server that answers Zoho Books v3 list and detail requests.
+
+    Request counters (``stats()``) are shared by all handler threads.
+    """
+
+    def __init__(self, dataset: Dict[str, List[Dict[str, Any]]], host: str = "127.0.0.1", port: int = 0,
+                 per_page: int = 200, latency: float = 0.0, throttle_every: int = 0, retry_after: float = 0.0):
+        """
+        Initialize the server (call start() or use it as a context manager).
+
+        Args:
+            dataset: Records per module, as returned by generate_dataset()
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+            per_page: Default page size when the client sends no per_page
+            latency: Seconds added to every response
+            throttle_every: Answer every Nth request with 429 (0 disables)
+            retry_after: Retry-After seconds sent with injected 429s
+        """
+        self.dataset = dataset
+        self.per_page = per_page
+        self.latency = latency
+        self.throttle_every = throttle_every
+        self.retry_after = retry_after
+        self._lock = threading.Lock()
+        self._counters = {"requests": 0, "list_calls": 0, "detail_calls": 0, "throttled": 0, "not_found": 0}
+        self._details = {
+            module_name: {record[MOCK_MODULES[module_name][0]]: record for record in records}
+            for module_name, records in dataset.items()
+        }
+        self._parsed_times = {
+            module_name: [datetime.strptime(record["last_modified_time"], ZOHO_TIME_FORMAT) for record in records]
+            for module_name, records in dataset.items()
+        }
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/books/v3"
+
+    def start(self) -> "MockZohoServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="mock-zoho", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counters)
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            for key in self._counters:
+                self._counters[key] = 0
+
+    def _count(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] += 1
+            return self._counters[key]
+
+    def _list_page(self, module_name: str, query: Dict[str, List[str]]) -> Dict[str, Any]:
+        page = max(1, int(query.get("page", ["1"])[0]))
+        per_page = max(1, int(query.get("per_page", [str(self.per_page)])[0]))
+        records = self.dataset[module_name]
+
+        since = query.get("last_modified_time", [None])[0]
+        if since:
+            cutoff = datetime.strptime(since.replace(" ", "+"), ZOHO_TIME_FORMAT)
+            times = self._parsed_times[module_name]
+            # Records are sorted by last_modified_time, so the match is a suffix
+            low, high = 0, len(times)
+            while low < high:
+                middle = (low + high) // 2
+                if times[middle] >= cutoff:
+                    high = middle
+                else:
+                    low = middle + 1
+            records = records[low:]
+
+        start = (page - 1) * per_page
+        page_records = [{field: record[field] for field in (MOCK_MODULES[module_name][0],) + LIST_FIELDS if field in record}
+                        for record in records[start:start + per_page]]
+        return {
+            "code": 0,
+            "message": "success",
+            module_name: page_records,
+            "page_context": {
+                "page": page,
+                "per_page": per_page,
+                "has_more_page": start + per_page < len(records)
+            }
+        }
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                request_number = server._count("requests")
+                if server.latency:
+                    time.sleep(server.latency)
+                if server.throttle_every and request_number % server.throttle_every == 0:
+                    server._count("throttled")
+                    self._send(429, {"code": 44, "message": "Too many requests"},
+                               {"Retry-After": str(server.retry_after)})
+                    return
+
+                url = urlparse(self.path)
+                parts = [part for part in url.path.split("/") if part]
+                if parts[:2] == ["books", "v3"]:
+                    parts = parts[2:]
+
+                if parts == ["organizations"]:
+                    server._count("list_calls")
+                    self._send(200, {"code": 0, "organizations": [
+                        {"organization_id": ORGANIZATION_ID, "name": "Mock Organization", "currency_code": "BTN"}
+                    ]})
+                elif len(parts) == 1 and parts[0] in server.dataset:
+                    server._count("list_calls")
+                    self._send(200, server._list_page(parts[0], parse_qs(url.query)))
+                elif len(parts) == 2 and parts[0] in server._details:
+                    server._count("detail_calls")
+                    record = server._details[parts[0]].get(parts[1])
+                    if record is None:
+                        server._count("not_found")
+                        self._send(404, {"code": 1002, "message": "Record does not exist"})
+                    else:
+                        self._send(200, {"code": 0, "message": "success", parts[0].rstrip("s"): record})
+                else:
+                    server._count("not_found")
+                    self._send(404, {"code": 5, "message": "Invalid URL"})
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline mock Zoho Books API server")
+    parser.add_argument("--records", type=int, default=1000, help="Records per module")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--throttle-every", type=int, default=0, help="Answer every Nth request with 429")
+    parser.add_argument("--retry-after", type=float, default=0.0, help="Retry-After seconds for injected 429s")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    server = MockZohoServer(generate_dataset(args.records, seed=args.seed), port=args.port,
+                            latency=args.latency, throttle_every=args.throttle_every, retry_after=args.retry_after)
+    print(f"Mock Zoho Books API serving {args.records} records per module at {server.base_url}")
+    server.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print(f"\nStopping. Request counts: {server.stats()}")
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()